@@ -0,0 +1 @@
+"""Бенчмарки окремих підсистем бота (запуск: python -m benchmarks.<назва>)."""
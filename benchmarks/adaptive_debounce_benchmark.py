@@ -0,0 +1,172 @@
+"""Replay-бенчмарк: фіксований DEBOUNCE_SECONDS проти адаптивного debounce.
+
+Запуск:
+    python -m benchmarks.adaptive_debounce_benchmark               # історії з data/dialogs
+    python -m benchmarks.adaptive_debounce_benchmark --synthetic 500
+
+Для кожного користувача програємо моменти його повідомлень і рахуємо, коли
+кожна політика закрила б пачку. Метрики:
+- time-to-reply — скільки після останнього повідомлення пачки бот ще чекав
+  (час роботи LLM однаковий для обох політик і не враховується);
+- split — частка пачок, після яких наступне повідомлення тієї ж серії
+  (не пізніше --split-gap секунд) прийшло вже після закриття пачки.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Додаємо шлях до кореня проєкту, щоб імпорт src працював із будь-якої теки.
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from settings import DEBOUNCE_SECONDS, HISTORY_BASE_DIR
+from src.router.utils.adaptive_debounce import AdaptiveDebounce, TypingCadence, _parse_created_at
+
+# (time-to-reply, split) для кожної пачки
+BatchResult = Tuple[float, bool]
+
+
+def load_timelines(base_dir: str) -> Dict[str, List[float]]:
+    """Збирає моменти повідомлень користувачів з усіх чанків історії."""
+
+    timelines: Dict[str, List[float]] = {}
+    for root, _, files in os.walk(base_dir):
+        for name in sorted(files):
+            if not (name.startswith("chunk_") and name.endswith(".json")):
+                continue
+            try:
+                with open(os.path.join(root, name), "r", encoding="utf-8") as file:
+                    data = json.load(file)
+            except (OSError, json.JSONDecodeError):
+                continue
+            for message in data.get("messages") or []:
+                if message.get("role") != "user":
+                    continue
+                at = _parse_created_at(message.get("created_at"))
+                if at is not None:
+                    timelines.setdefault(root, []).append(at)
+    return {user: sorted(times) for user, times in timelines.items() if len(times) > 1}
+
+
+def synthetic_timelines(users: int, seed: int) -> Dict[str, List[float]]:
+    """Генерує користувачів з різним темпом: одиночні питання, швидкі та повільні серії."""
+
+    rng = random.Random(seed)
+    timelines: Dict[str, List[float]] = {}
+    for index in range(users):
+        style = rng.choice(["single", "fast", "slow"])
+        now = 0.0
+        times: List[float] = []
+        for _ in range(rng.randint(10, 40)):
+            now += rng.uniform(300, 3600)
+            if style == "single":
+                size = 1 if rng.random() < 0.85 else 2
+                median_gap = 6.0
+            elif style == "fast":
+                size = rng.randint(1, 5)
+                median_gap = 3.0
+            else:
+                size = rng.randint(1, 4)
+                median_gap = 16.0
+            for position in range(size):
+                if position:
+                    now += rng.lognormvariate(0, 0.5) * median_gap
+                times.append(now)
+        timelines[f"synthetic_{index}_{style}"] = times
+    return timelines
+
+
+def replay_fixed(times: List[float], debounce: float, split_gap: float) -> List[BatchResult]:
+    """Поточна поведінка: вікно DEBOUNCE_SECONDS від першого повідомлення пачки."""
+
+    results: List[BatchResult] = []
+    index = 0
+    while index < len(times):
+        close = times[index] + debounce
+        last = index
+        while last + 1 < len(times) and times[last + 1] <= close:
+            last += 1
+        results.append(_batch_result(times, last, close, split_gap))
+        index = last + 1
+    return results
+
+
+def replay_adaptive(times: List[float], policy: AdaptiveDebounce, split_gap: float) -> List[BatchResult]:
+    """Адаптивна політика: кожне повідомлення переносить закриття пачки."""
+
+    cadence = TypingCadence(seeded=True)
+    results: List[BatchResult] = []
+    index = 0
+    while index < len(times):
+        policy.observe(cadence, times[index])
+        close = times[index] + policy.delay_for(cadence, times[index])
+        last = index
+        while last + 1 < len(times) and times[last + 1] <= close:
+            last += 1
+            policy.observe(cadence, times[last])
+            close = times[last] + policy.delay_for(cadence, times[last])
+        policy.close_batch(cadence)
+        results.append(_batch_result(times, last, close, split_gap))
+        index = last + 1
+    return results
+
+
+def _batch_result(times: List[float], last: int, close: float, split_gap: float) -> BatchResult:
+    split = last + 1 < len(times) and times[last + 1] - times[last] <= split_gap
+    return close - times[last], split
+
+
+def _summary(results: List[BatchResult]) -> Tuple[float, float, float]:
+    waits = sorted(wait for wait, _ in results)
+    p90 = waits[min(len(waits) - 1, int(0.9 * len(waits)))]
+    split_rate = sum(1 for _, split in results if split) / len(results)
+    return statistics.median(waits), p90, split_rate
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--dialogs-dir", default=HISTORY_BASE_DIR)
+    parser.add_argument("--synthetic", type=int, default=0, help="кількість синтетичних користувачів")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--split-gap", type=float, default=20.0)
+    args = parser.parse_args()
+
+    timelines = (
+        synthetic_timelines(args.synthetic, args.seed)
+        if args.synthetic
+        else load_timelines(args.dialogs_dir)
+    )
+    if not timelines:
+        print("ℹ️ Немає історій для replay. Спробуйте --synthetic 500.")
+        return
+
+    policy = AdaptiveDebounce()
+    fixed: List[BatchResult] = []
+    adaptive: List[BatchResult] = []
+    for times in timelines.values():
+        fixed.extend(replay_fixed(times, DEBOUNCE_SECONDS, args.split_gap))
+        adaptive.extend(replay_adaptive(times, policy, args.split_gap))
+
+    fixed_median, fixed_p90, fixed_split = _summary(fixed)
+    adaptive_median, adaptive_p90, adaptive_split = _summary(adaptive)
+    print(f"📊 Користувачів: {len(timelines)}")
+    print(f"{'policy':>9} {'batches':>8} {'median_s':>9} {'p90_s':>7} {'split':>7}")
+    print(f"{'fixed':>9} {len(fixed):>8} {fixed_median:>9.2f} {fixed_p90:>7.2f} {fixed_split:>7.1%}")
+    print(
+        f"{'adaptive':>9} {len(adaptive):>8} {adaptive_median:>9.2f} "
+        f"{adaptive_p90:>7.2f} {adaptive_split:>7.1%}"
+    )
+    print(f"⚡ Медіанний time-to-reply покращено на {fixed_median - adaptive_median:.2f} с.")
+
+
+if __name__ == "__main__":
+    main()
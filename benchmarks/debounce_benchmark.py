@@ -0,0 +1,124 @@
+"""Порівняння debounce "задача на користувача" з колесом таймерів DebounceWheel.
+
+Запуск:
+    python -m benchmarks.debounce_benchmark --users 10000 100000 --delay 2
+
+Для кожної кількості користувачів міряємо:
+- пам'ять, яку тримають заведені таймери (tracemalloc, окремий прогін);
+- CPU-час (process_time) на заведення, одне скидання та спрацювання всіх таймерів;
+- найбільше запізнення спрацювання відносно запланованого моменту.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List
+
+# Додаємо шлях до кореня проєкту, щоб імпорт src працював із будь-якої теки.
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src.router.utils.debounce_wheel import DebounceWheel
+
+
+class _TaskPerUser:
+    """Стара схема: окрема asyncio-задача зі sleep для кожного користувача."""
+
+    def __init__(self, on_due: Callable[[int], None]) -> None:
+        self._on_due = on_due
+        self._tasks: Dict[int, asyncio.Task] = {}
+
+    def arm(self, user_id: int, delay: float) -> None:
+        previous = self._tasks.get(user_id)
+        if previous is not None:
+            previous.cancel()
+        self._tasks[user_id] = asyncio.create_task(self._sleep_and_fire(user_id, delay))
+
+    async def _sleep_and_fire(self, user_id: int, delay: float) -> None:
+        await asyncio.sleep(delay)
+        self._tasks.pop(user_id, None)
+        self._on_due(user_id)
+
+
+class _WheelAdapter:
+    def __init__(self, on_due: Callable[[int], None]) -> None:
+        self._wheel = DebounceWheel(
+            on_due=lambda batch: [on_due(user_id) for user_id, _ in batch],
+            tick_seconds=0.05,
+        )
+
+    def arm(self, user_id: int, delay: float) -> None:
+        self._wheel.arm(user_id, user_id, delay)
+
+
+async def _run_scenario(kind: str, users: int, delay: float, trace_memory: bool) -> dict:
+    loop = asyncio.get_running_loop()
+    fired: List[float] = []
+    done = asyncio.Event()
+
+    def on_due(_: int) -> None:
+        fired.append(loop.time())
+        if len(fired) == users:
+            done.set()
+
+    engine = _TaskPerUser(on_due) if kind == "tasks" else _WheelAdapter(on_due)
+
+    if trace_memory:
+        tracemalloc.start()
+        baseline = tracemalloc.take_snapshot()
+
+    cpu_started = time.process_time()
+    for user_id in range(users):
+        engine.arm(user_id, delay)
+    # Кожен користувач дописує ще одне повідомлення — таймер скидається.
+    for user_id in range(users):
+        engine.arm(user_id, delay)
+    armed_at = loop.time()
+    arm_cpu = time.process_time() - cpu_started
+
+    memory_mb = None
+    if trace_memory:
+        snapshot = tracemalloc.take_snapshot()
+        diff = snapshot.compare_to(baseline, "filename")
+        memory_mb = sum(stat.size_diff for stat in diff) / (1024 * 1024)
+        tracemalloc.stop()
+
+    await asyncio.wait_for(done.wait(), timeout=delay * 10 + 30)
+    total_cpu = time.process_time() - cpu_started
+
+    return {
+        "arm_cpu": arm_cpu,
+        "total_cpu": total_cpu,
+        "memory_mb": memory_mb,
+        "max_late": max(fired) - (armed_at + delay),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--users", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--delay", type=float, default=2.0)
+    args = parser.parse_args()
+
+    print(
+        f"{'users':>8} {'engine':>7} {'mem_MB':>8} {'arm_cpu_s':>10} "
+        f"{'total_cpu_s':>12} {'max_late_s':>11}"
+    )
+    for users in args.users:
+        for kind in ("tasks", "wheel"):
+            memory = asyncio.run(_run_scenario(kind, users, args.delay, trace_memory=True))
+            timing = asyncio.run(_run_scenario(kind, users, args.delay, trace_memory=False))
+            print(
+                f"{users:>8} {kind:>7} {memory['memory_mb']:>8.1f} {timing['arm_cpu']:>10.3f} "
+                f"{timing['total_cpu']:>12.3f} {timing['max_late']:>11.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Навантажувальний тест режиму шардів: пропускна здатність від кількості процесів.
+
+Запуск:
+    python -m benchmarks.sharding_benchmark --shards 1 2 4 --messages 2000 --users 200
+
+Кожне повідомлення у воркері проходить імітацію CPU-роботи роутера: збірка
+контексту з історії (json.dumps) і розбір "відповіді LLM" (json.loads),
+після чого відповідь іде через основний процес у фейковий TelegramAPI.
+Рядок "inline" — та сама робота в одному процесі без шардів.
+Міряємо повідомлень за секунду та чи збережено порядок по кожному користувачу.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List
+
+# Додаємо шлях до кореня проєкту, щоб імпорт src працював із будь-якої теки.
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src.sharding import ShardedRouter
+
+# Скільки повідомлень історії "збирає" роутер на кожне вхідне.
+CONTEXT_MESSAGES = 300
+
+
+class _CpuRouter:
+    """Роутер, що імітує CPU-частину циклу: промпт, JSON, відповідь."""
+
+    def __init__(self, telegram, shard_id: int) -> None:
+        self.telegram = telegram
+        self.shard_id = shard_id
+        self._context = [
+            {"role": "user" if index % 2 else "assistant", "content": f"повідомлення {index} " * 8}
+            for index in range(CONTEXT_MESSAGES)
+        ]
+
+    async def start(self) -> None:
+        return None
+
+    async def handle_incoming_message(
+        self, user_id, chat_id, content, msg_type, media_meta, message_time, message_id=None
+    ) -> None:
+        payload = json.dumps({"messages": self._context + [{"role": "user", "content": content}]})
+        parsed = json.loads(payload)
+        answer = json.loads(json.dumps({"actions": [{"type": "send_message", "content": content}]}))
+        assert len(parsed["messages"]) == CONTEXT_MESSAGES + 1
+        await self.telegram.send_message(chat_id, answer["actions"][0]["content"])
+
+    async def record_reaction(self, user_id, message_id, emoji, message_time_iso) -> None:
+        return None
+
+
+def build_cpu_router(telegram, shard_id: int) -> _CpuRouter:
+    return _CpuRouter(telegram, shard_id)
+
+
+class _FakeTelegram:
+    def __init__(self, expected: int) -> None:
+        self.sent: Dict[int, List[int]] = {}
+        self.expected = expected
+        self.done = asyncio.Event()
+        self._count = 0
+
+    async def send_message(self, chat_id, text):
+        self.sent.setdefault(chat_id, []).append(int(text.rsplit(":", 1)[1]))
+        self._count += 1
+        if self._count == self.expected:
+            self.done.set()
+        return None
+
+
+async def _run(shards: int, messages: int, users: int) -> dict:
+    telegram = _FakeTelegram(messages)
+    router = (
+        ShardedRouter(telegram_api=telegram, shards=shards, router_factory=build_cpu_router)
+        if shards
+        else build_cpu_router(telegram, 0)
+    )
+    await router.start()
+
+    now = datetime.now(timezone.utc)
+    started = time.perf_counter()
+    for index in range(messages):
+        user_id = index % users
+        await router.handle_incoming_message(user_id, user_id, f"{user_id}:{index}", "text", None, now, index)
+    await asyncio.wait_for(telegram.done.wait(), timeout=600)
+    elapsed = time.perf_counter() - started
+
+    if shards:
+        await router.stop()
+    ordered = all(sent == sorted(sent) for sent in telegram.sent.values())
+    return {"elapsed": elapsed, "rate": messages / elapsed, "ordered": ordered}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--messages", type=int, default=2_000)
+    parser.add_argument("--users", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"CPU: {os.cpu_count()}")
+    print(f"{'mode':>8} {'elapsed_s':>10} {'msg_per_s':>10} {'ordered':>8}")
+    for shards in [0] + args.shards:
+        result = asyncio.run(_run(shards, args.messages, args.users))
+        mode = "inline" if shards == 0 else f"{shards} sh"
+        print(f"{mode:>8} {result['elapsed']:>10.2f} {result['rate']:>10.0f} {str(result['ordered']):>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -53,6 +53,76 @@ USER_INFO_SYSTEM_PROMPT = True
 ANSWER_TO_TELEGRAM_BOTS = False
 
 
+# ──────────────────────────────────────────────────────────────
+# СЕСІЯ TELEGRAM
+# ──────────────────────────────────────────────────────────────
+
+# Тримати сесію Telethon у пам'яті та скидати її в .session файл пачками
+# (менше записів у SQLite під великим потоком апдейтів)
+TELEGRAM_MEMORY_SESSION = False
+
+# Як часто (секунди) зберігати сесію з пам'яті в .session файл
+TELEGRAM_SESSION_CHECKPOINT_SECONDS = 60
+
+
+# ──────────────────────────────────────────────────────────────
+# ПРИЙОМ ВХІДНИХ АПДЕЙТІВ
+# ──────────────────────────────────────────────────────────────
+
+# Скільки воркерів паралельно обробляють вхідні повідомлення
+# (відправник, user_info, mark_read, завантаження та розпізнавання voice)
+INGEST_WORKERS = 4
+
+# Скільки подій може чекати на воркера; понад це нові відкидаються
+INGEST_MAX_PENDING = 10_000
+
+# Скільки останніх очікувань у черзі тримати для метрик (p50/p95)
+INGEST_LATENCY_SAMPLES = 1_000
+
+# Вікно (секунди), за яке позначки «прочитано» в одному чаті
+# об'єднуються в один запит до Telegram
+READ_ACK_WINDOW_SECONDS = 1.0
+
+
+# ──────────────────────────────────────────────────────────────
+# ВИХІДНІ ВІДПРАВКИ (ЧЕРГА ТА ЛІМІТИ TELEGRAM)
+# ──────────────────────────────────────────────────────────────
+
+# Спільний ліміт відправок акаунта: токенів за секунду і максимальний сплеск.
+# Для user-акаунтів Telegram жорсткіший за ботів, тому з запасом.
+OUTBOUND_GLOBAL_RATE_PER_SECOND = 20.0
+OUTBOUND_GLOBAL_BURST = 20
+
+# Ліміт відправок в один чат (Telegram тримає близько 1 повідомлення/с)
+OUTBOUND_CHAT_RATE_PER_SECOND = 1.0
+OUTBOUND_CHAT_BURST = 3
+
+# Скільки разів повторювати відправку після FloodWait, і яку найдовшу
+# паузу FloodWait ще варто чекати (довші — помилка одразу)
+OUTBOUND_FLOOD_MAX_RETRIES = 3
+OUTBOUND_MAX_FLOOD_WAIT_SECONDS = 300
+
+# Скільки останніх затримок у черзі тримати для метрик (p50/p95)
+OUTBOUND_DELAY_SAMPLES = 1_000
+
+
+# ──────────────────────────────────────────────────────────────
+# КЕШ КОРИСТУВАЧІВ ТА PEER-ІВ TELEGRAM
+# ──────────────────────────────────────────────────────────────
+
+# Скільки сутностей (користувачів, чатів) тримати в LRU-кеші
+ENTITY_CACHE_MAX_ENTRIES = 50_000
+
+# Через скільки секунд запис вважається застарілим і резолвиться заново
+ENTITY_CACHE_TTL_SECONDS = 24 * 60 * 60
+
+# Файл кешу, щоб після перезапуску не резолвити всіх заново
+ENTITY_CACHE_PATH = os.path.join(DATA_DIR, "telegram", "entity_cache.json")
+
+# Після стількох змін кеш зберігається на диск
+ENTITY_CACHE_SAVE_EVERY = 50
+
+
 # ──────────────────────────────────────────────────────────────
 # ЧАСОВІ НАЛАШТУВАННЯ
 # ──────────────────────────────────────────────────────────────
@@ -60,9 +130,82 @@ ANSWER_TO_TELEGRAM_BOTS = False
 # Затримка перед запуском чергового циклу (секунди)
 DEBOUNCE_SECONDS = 14
 
+# Чи переносити debounce на нові DEBOUNCE_SECONDS з кожним новим повідомленням.
+# False — вікно відраховується від першого повідомлення пачки.
+DEBOUNCE_RESET_ON_MESSAGE = False
+
+# Адаптивний debounce: вікно підлаштовується під темп набору користувача
+# (див. src/router/utils/adaptive_debounce.py). Кожне нове повідомлення
+# переносить таймер. Поки вибірка пауз мала — звичайне вікно DEBOUNCE_SECONDS
+# без перенесення. Вимкнено за замовчуванням, щоб поведінка не змінювалась.
+ADAPTIVE_DEBOUNCE_ENABLED = False
+ADAPTIVE_DEBOUNCE_MIN_SECONDS = 3.0
+ADAPTIVE_DEBOUNCE_MAX_SECONDS = 30.0
+
+# Пачка ніколи не чекає довше за це від першого повідомлення
+ADAPTIVE_DEBOUNCE_MAX_WINDOW_SECONDS = 60.0
+
+# Пауза, довша за цю, вважається кінцем серії повідомлень
+ADAPTIVE_DEBOUNCE_BURST_GAP_SECONDS = 60.0
+
+# Допустима ймовірність, що наступне повідомлення серії прийде вже після відповіді
+ADAPTIVE_DEBOUNCE_TAIL_PROBABILITY = 0.1
+
+# Мінімум пауз у вибірці, з якого довіряємо адаптивному вікну, і розмір вибірки
+ADAPTIVE_DEBOUNCE_MIN_SAMPLES = 8
+ADAPTIVE_DEBOUNCE_WINDOW = 100
+
+# Запас понад очікувану паузу (секунди)
+ADAPTIVE_DEBOUNCE_MARGIN_SECONDS = 1.0
+
+# Колесо таймерів debounce: крок (точність спрацювання) і кількість слотів.
+# Один оберт колеса = DEBOUNCE_TICK_SECONDS * DEBOUNCE_WHEEL_SLOTS секунд.
+DEBOUNCE_TICK_SECONDS = 0.25
+DEBOUNCE_WHEEL_SLOTS = 512
+
+# Скільки користувачів віддавати в чергу циклів за одну пачку
+DEBOUNCE_BATCH_SIZE = 256
+
+# Скільки користувачів одночасно обробляються (прийом повідомлень, виклик LLM,
+# планування дій) — спільний ліміт для всіх акторів користувачів
+DIALOG_CYCLE_WORKERS = 32
+
+# Розмір скриньки актора користувача: понад нього нові повідомлення чекають
+USER_MAILBOX_SIZE = 200
+
+# Актор без повідомлень довше за стільки секунд завершується (створиться знову)
+USER_ACTOR_IDLE_SECONDS = 60.0
+
+# Скільки секунд під час зупинки чекати, поки актори дообробляють скриньки
+# і поточні цикли; решту підхопить журнал inbox після перезапуску
+ROUTER_SHUTDOWN_GRACE_SECONDS = 10.0
+
+# Стан користувача в пам'яті роутера вивантажується, якщо до нього не
+# зверталися стільки секунд (лише коли в нього немає незавершеної роботи:
+# inbox, цикл, debounce, спекуляція, відкладені дії)
+USER_STATE_IDLE_TTL_SECONDS = 60 * 60
+
+# Жорстка межа кількості станів у пам'яті (понад неї — вивантаження за LRU)
+USER_STATE_MAX_STATES = 50_000
+
+# Як часто перевіряти неактивні стани (секунди)
+USER_STATE_SWEEP_SECONDS = 60
+
 # Базова тривалість "набору тексту"
 TYPING_SECONDS_DEFAULT = 15.0
 
+# Як часто оновлювати статус typing, поки він має бути видимим (Telegram
+# сам гасить його приблизно через 5 секунд)
+TYPING_REFRESH_SECONDS = 4.0
+
+# Скільки тримати typing після завершення показу, якщо одразу може початися
+# наступний (без мерехтіння і зайвих RPC між діями плану)
+TYPING_LINGER_SECONDS = 1.5
+
+# Чи переривати поточний план дій, коли користувач пише нове повідомлення.
+# Невиконані дії скидаються, а нові повідомлення обробляє свіжий цикл.
+PLAN_INTERRUPT_ENABLED = True
+
 
 # ──────────────────────────────────────────────────────────────
 # НАЛАШТУВАННЯ LLM
@@ -75,6 +218,212 @@ LLM_TOP_P = 0.92
 LLM_PRESENCE_PENALTY = 0.92
 LLM_FREQUENCY_PENALTY = 0.6
 
+# Загальний таймаут HTTP-запиту до LLM (секунди)
+LLM_REQUEST_TIMEOUT_SECONDS = 30
+
+# Структурований вивід: None — вимкнено, "json_object" — JSON-режим провайдера,
+# "json_schema" — строга схема дій. Якщо провайдер не підтримує response_format,
+# клієнт сам вимкне його після першої відмови.
+LLM_RESPONSE_FORMAT: str | None = "json_object"
+
+# Скільки разів можна перепитати LLM, якщо відповідь не вдалося розібрати
+# навіть після локального ремонту JSON
+LLM_JSON_REASK_ATTEMPTS = 1
+
+
+# ──────────────────────────────────────────────────────────────
+# ВАЛІДАЦІЯ ДІЙ LLM
+# ──────────────────────────────────────────────────────────────
+
+# Верхня межа паузи перед дією (секунди). Більші значення від LLM обрізаються.
+ACTION_MAX_WAIT_SECONDS = 120.0
+
+# Верхня межа імітації набору тексту для однієї дії/повідомлення (секунди)
+ACTION_MAX_HUMAN_SECONDS = 60.0
+
+
+# ──────────────────────────────────────────────────────────────
+# ПЛАНУВАЛЬНИК ВІДКЛАДЕНИХ ДІЙ
+# ──────────────────────────────────────────────────────────────
+
+# Чи виконувати дії LLM через центральний планувальник. Тоді цикл діалогу не
+# чекає на wait_seconds, а одразу повертається після планування дій.
+SCHEDULER_ENABLED = True
+
+# Файл, куди зберігаються ще не виконані дії (щоб пережити перезапуск)
+SCHEDULER_STATE_PATH = os.path.join(DATA_DIR, "scheduler", "pending_actions.json")
+
+# Дії, які прострочили більше ніж на стільки секунд (наприклад, бот був
+# вимкнений), після перезапуску не виконуються. None — виконувати завжди.
+SCHEDULER_MAX_LATENESS_SECONDS: float | None = 6 * 60 * 60
+
+# Як довго (секунди) збирати зміни планів перед перезаписом файлу.
+# Запис іде у фоновому потоці, щоб диск не гальмував обробку чатів.
+SCHEDULER_FLUSH_SECONDS = 0.5
+
+
+# ──────────────────────────────────────────────────────────────
+# ЖУРНАЛ ВХІДНИХ ПОВІДОМЛЕНЬ (ВІДНОВЛЕННЯ ПІСЛЯ ПЕРЕЗАПУСКУ)
+# ──────────────────────────────────────────────────────────────
+
+# Чи журналювати inbox роутера, щоб після перезапуску відповісти всім,
+# чиї повідомлення ще не були оброблені
+INBOX_JOURNAL_ENABLED = True
+
+# Append-only файл журналу (JSON Lines)
+INBOX_JOURNAL_PATH = os.path.join(DATA_DIR, "router", "inbox_journal.jsonl")
+
+# Після стількох записів журнал стискається до поточного стану
+INBOX_JOURNAL_COMPACT_EVERY = 5_000
+
+# Чи робити fsync після кожного запису (надійніше, але повільніше)
+INBOX_JOURNAL_FSYNC = False
+
+# Повідомлення, старші за стільки секунд, після перезапуску не обробляються.
+# None — відповідати завжди.
+INBOX_JOURNAL_MAX_AGE_SECONDS: float | None = 24 * 60 * 60
+
+
+# ──────────────────────────────────────────────────────────────
+# ЗАХИСТ ВІД ФЛУДУ (ОБМЕЖЕННЯ INBOX ТА ЗВОРОТНИЙ ТИСК)
+# ──────────────────────────────────────────────────────────────
+
+# Чи склеювати текст з останнім текстовим входженням, коли inbox уже
+# заповнений (INBOX_MAX_ENTRIES), замість того щоб відкидати повідомлення.
+# До заповнення кожне повідомлення лишається окремим входженням.
+INBOX_COALESCE_TEXT = True
+
+# Максимальна довжина склеєного тексту (символи); довше — нове входження
+INBOX_MAX_TEXT_CHARS = 4_000
+
+# Скільки входжень може бути в inbox одного користувача до циклу;
+# далі текст склеюється, а медіа відкидається (у історії лишається лічильник)
+INBOX_MAX_ENTRIES = 30
+
+# Скільки описів медіа (voice, фото, відео, документи) приймати в один пакет
+INBOX_MAX_MEDIA = 5
+
+# Глобальна межа повідомлень, що чекають у скриньках усіх акторів.
+# Понад неї повідомлення з неприорітетних чатів відкидаються одразу.
+ROUTER_INGEST_QUEUE_LIMIT = 5_000
+
+# Чати, повідомлення з яких ніколи не відкидаються через перевантаження
+ROUTER_PRIORITY_CHAT_IDS: set[int] = set()
+
+
+# ──────────────────────────────────────────────────────────────
+# ШАРДИ РОУТЕРА (КІЛЬКА ПРОЦЕСІВ)
+# ──────────────────────────────────────────────────────────────
+
+# Кількість процесів-воркерів з LLMRouter. 0 або 1 — все в одному процесі.
+# Інакше основний процес лише приймає апдейти Telethon і розподіляє
+# користувачів між воркерами за user_id (consistent hashing).
+ROUTER_SHARDS = 0
+
+# Адреса локального каналу між основним процесом і воркерами
+ROUTER_SHARD_HOST = "127.0.0.1"
+
+# Віртуальних вузлів на один шард у кільці хешування (рівномірність розподілу)
+ROUTER_SHARD_VNODES = 64
+
+# Скільки чекати, поки всі воркери підключаться після старту (секунди)
+ROUTER_SHARD_CONNECT_TIMEOUT_SECONDS = 60.0
+
+
+# ──────────────────────────────────────────────────────────────
+# СПЕКУЛЯТИВНА ГЕНЕРАЦІЯ ПІД ЧАС DEBOUNCE
+# ──────────────────────────────────────────────────────────────
+
+# Чи запускати LLM ще під час debounce з поточним inbox. Якщо нових
+# повідомлень не буде, цикл забере готову відповідь без очікування LLM.
+SPECULATIVE_GENERATION_ENABLED = False
+
+# Добові ліміти токенів, витрачених на викинуті спекуляції
+SPECULATIVE_MAX_WASTED_TOKENS_PER_USER = 20_000
+SPECULATIVE_MAX_WASTED_TOKENS_GLOBAL = 500_000
+
+
+# ──────────────────────────────────────────────────────────────
+# БЮДЖЕТ ЗАТРИМКИ ТА РЕЗЕРВНА МОДЕЛЬ
+# ──────────────────────────────────────────────────────────────
+
+# Бюджет (секунди) на виклик LLM в одному циклі для всіх чатів.
+# None — бюджет вимкнено, завжди використовуємо основну модель.
+LLM_LATENCY_BUDGET_SECONDS: float | None = None
+
+# Окремі бюджети для чатів, де швидка відповідь важливіша за якість
+# (chat_id -> секунди). Перекривають LLM_LATENCY_BUDGET_SECONDS.
+LLM_LATENCY_BUDGET_BY_CHAT: dict[int, float] = {}
+
+# Скільки останніх замірів тримати для кожної пари (модель, глибина черги)
+LLM_LATENCY_WINDOW = 50
+
+# Мінімум замірів, після якого прогнозу затримки можна довіряти
+LLM_LATENCY_MIN_SAMPLES = 5
+
+# Перцентиль, який вважаємо "очікуваною" затримкою (консервативна оцінка)
+LLM_LATENCY_PERCENTILE = 0.75
+
+# Глибина черги, вище якої всі заміри складаються в один кошик
+LLM_LATENCY_MAX_DEPTH_BUCKET = 8
+
+# Заміри, старші за стільки секунд, у прогнозі не враховуються — інакше після
+# серії таймаутів основна модель лишалася б "повільною" до перезапуску
+LLM_LATENCY_MAX_AGE_SECONDS = 10 * 60
+
+# Кожен N-й виклик, для якого прогноз радить резервну модель, все одно йде
+# в основну (з таймаутом бюджету) — так прогноз оновлюється свіжими замірами
+LLM_FALLBACK_PROBE_EVERY = 10
+
+
+# ──────────────────────────────────────────────────────────────
+# ЗАПИС ТА ВІДТВОРЕННЯ ВІДПОВІДЕЙ LLM (CASSETTE)
+# ──────────────────────────────────────────────────────────────
+
+# Режим касети: "off" — звичайна робота, "record" — пишемо кожну пару
+# запит/відповідь, "replay" — відповідаємо з касети без мережі.
+# Можна перевизначити змінною оточення LLM_CASSETTE_MODE.
+LLM_CASSETTE_MODE = "off"
+
+# Файл касети (JSONL, один запис на рядок)
+LLM_CASSETTE_PATH = os.path.join(DATA_DIR, "llm_cassettes", "default.jsonl")
+
+# Множник записаних затримок під час replay (1.0 — як у продакшені, 0 — миттєво)
+LLM_REPLAY_LATENCY_SCALE = 1.0
+
+
+# ──────────────────────────────────────────────────────────────
+# ЛОКАЛЬНИЙ STUB-СЕРВЕР LLM (НАВАНТАЖУВАЛЬНІ ТЕСТИ)
+# ──────────────────────────────────────────────────────────────
+
+LLM_STUB_HOST = "127.0.0.1"
+LLM_STUB_PORT = 8089
+
+# Розподіл затримки відповіді: "fixed:1.2", "uniform:0.5,2", "normal:1,0.3",
+# "lognormal:0,0.5" (параметри ln-розподілу) або "exp:1.5" (середнє)
+LLM_STUB_LATENCY = "lognormal:0,0.5"
+
+# Частка відповідей з помилкою 500 та 429 (0..1)
+LLM_STUB_ERROR_RATE = 0.0
+LLM_STUB_RATE_LIMIT_RATE = 0.0
+
+# Значення Retry-After (секунди) для відповідей 429
+LLM_STUB_RETRY_AFTER_SECONDS = 2
+
+# Інтервал між чанками у потоковому режимі (stream=true)
+LLM_STUB_STREAM_CHUNK_DELAY = 0.02
+
+
+# ──────────────────────────────────────────────────────────────
+# ОБЛІК ТОКЕНІВ ТА ЗАТРИМОК (USAGE LEDGER)
+# ──────────────────────────────────────────────────────────────
+
+# Чи записувати кожен виклик LLM у журнал витрат
+USAGE_LEDGER_ENABLED = True
+
+# Журнал лише доповнюється (JSONL, один виклик — один рядок)
+USAGE_LEDGER_PATH = os.path.join(DATA_DIR, "usage", "ledger.jsonl")
+
 
 # ──────────────────────────────────────────────────────────────
 # РОЗПІЗНАВАННЯ МОВЛЕННЯ (STT)
@@ -82,6 +82,14 @@ class RefreshMetaCommand(BaseCommand):
     """Оновлення метаданих усіх чанків діалогів до актуального формату."""
 
 
+@dataclass
+class TopUsageCommand(BaseCommand):
+    """Топ користувачів за витратами токенів із затримками p50/p95."""
+
+    limit: int
+    days: Optional[int]
+
+
 @dataclass
 class HelpCommand(BaseCommand):
     """Вивід довідки щодо доступних команд."""
@@ -19,11 +19,13 @@ from src.admin_console.commands import (
     SendMessageCommand,
     SyncUnreadCommand,
     ShowHistoryCommand,
+    TopUsageCommand,
 )
 from src.admin_console.utils import sanitize_text
 from src.history.history_manager import HistoryManager
 from src.router.llm_router import LLMRouter
 from src.telegram_api.telegram_api import TelegramAPI
+from src.usage.usage_ledger import UsageLedger
 
 
 async def _resolve_user(
@@ -41,7 +43,7 @@ async def _resolve_user(
         raise ValueError("Потрібно вказати user_id або username.")
 
     try:
-        entity = await telegram.client.get_entity(username)
+        entity = await telegram.resolve_entity(username)
         resolved_id = getattr(entity, "id", None)
         resolved_username = getattr(entity, "username", None) or username
     except Exception as exc:
@@ -418,3 +420,41 @@ async def handle_sync_unread(
         trigger_llm=cmd.trigger_llm,
     )
     print("✅ Синхронізацію непрочитаних завершено.")
+
+
+async def handle_top_usage(cmd: TopUsageCommand, ledger: UsageLedger) -> None:
+    """Виводить таблицю користувачів з найбільшими витратами токенів.
+
+    Дані читаються з append-only журналу, який веде основний процес бота,
+    тому команда показує актуальну картину навіть з окремої адмін-консолі.
+    """
+
+    ranked = await asyncio.to_thread(ledger.top_users, cmd.limit, cmd.days)
+    if not ranked:
+        print("ℹ️ Журнал витрат LLM порожній.")
+        return
+
+    headers = ["user_id", "calls", "prompt", "completion", "cached", "total", "p50_s", "p95_s"]
+    rows: list[list[str]] = []
+    for user_id, bucket in ranked:
+        p50 = bucket.percentile(0.5)
+        p95 = bucket.percentile(0.95)
+        rows.append(
+            [
+                str(user_id),
+                str(bucket.calls),
+                str(bucket.prompt_tokens),
+                str(bucket.completion_tokens),
+                str(bucket.cached_tokens),
+                str(bucket.total_tokens),
+                f"{p50:.2f}" if p50 is not None else "-",
+                f"{p95:.2f}" if p95 is not None else "-",
+            ]
+        )
+
+    widths = [max(len(headers[idx]), *(len(row[idx]) for row in rows)) for idx in range(len(headers))]
+    period = f"за останні {cmd.days} дн." if cmd.days else "за весь період"
+    print(f"💸 Топ-{cmd.limit} користувачів за токенами {period}:")
+    print(" | ".join(value.ljust(widths[idx]) for idx, value in enumerate(headers)))
+    for row in rows:
+        print(" | ".join(value.ljust(widths[idx]) for idx, value in enumerate(row)))
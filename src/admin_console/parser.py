@@ -16,6 +16,7 @@ from src.admin_console.commands import (
     SendMessageCommand,
     SyncUnreadCommand,
     ShowHistoryCommand,
+    TopUsageCommand,
 )
 from src.admin_console.utils import sanitize_text
 
@@ -138,6 +139,18 @@ def parse_command(line: str) -> BaseCommand:
             trigger_llm=trigger_llm,
         )
 
+    if cmd == "top_usage":
+        limit = 10
+        days = None
+        try:
+            if len(args) >= 1:
+                limit = int(args[0])
+            if len(args) >= 2:
+                days = int(args[1])
+        except ValueError:
+            raise ValueError("Синтаксис: top_usage [limit] [days] — обидва параметри числа.")
+        return TopUsageCommand(name="top_usage", limit=limit, days=days)
+
     if cmd == "help":
         return HelpCommand(name="help")
 
@@ -16,6 +16,7 @@ from src.admin_console.commands import (
     SendMessageCommand,
     SyncUnreadCommand,
     ShowHistoryCommand,
+    TopUsageCommand,
 )
 from src.admin_console.handlers import (
     handle_append_system_prompt,
@@ -26,6 +27,7 @@ from src.admin_console.handlers import (
     handle_send_message,
     handle_sync_unread,
     handle_show_history,
+    handle_top_usage,
 )
 from src.history.history_manager import HistoryManager
 from src.router.llm_router import LLMRouter
@@ -52,6 +54,7 @@ def _print_help() -> None:
   delete_dialog <target>              — повністю видалити діалог
   refresh_meta                        — оновити метадані всіх чанків діалогів
   sync_unread <target> [trigger]      — підтягнути непрочитані та позначити їх прочитаними (з trigger запустить LLM)
+  top_usage [limit] [days]            — топ користувачів за токенами з p50/p95 затримки LLM (дефолт 10, весь період)
   help                                — показати цю підказку
   exit                                — завершити роботу консолі
 """
@@ -108,6 +111,8 @@ async def run_admin_console(
                 )
             elif isinstance(command, RefreshMetaCommand):
                 await handle_refresh_meta(history=history)
+            elif isinstance(command, TopUsageCommand):
+                await handle_top_usage(command, ledger=router.usage_ledger)
             else:
                 print("⚠️ Невідома команда після парсингу.")
         except Exception as exc:
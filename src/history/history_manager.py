@@ -177,13 +177,7 @@ class HistoryManager:
             }
 
         # Додаємо нове повідомлення
-        message = {
-            "role": role,
-            "content": content,
-            # Коли точно було відправлено/отримано повідомлення (UTC без інформації про часовий пояс).
-            "created_at": self._normalize_created_at(message_time_iso),
-            "message_id": message_id,
-        }
+        message = self.build_message(role, content, message_time_iso, message_id)
         chunk_data["messages"].append(message)
 
         # Оновлюємо метадані лише після нового запису, щоб зафіксувати останні message_id.
@@ -193,6 +187,26 @@ class HistoryManager:
         # Зберігаємо чанк
         self._save_chunk(chunk_path, chunk_data)
 
+    def build_message(
+        self,
+        role: str,
+        content: str | None,
+        message_time_iso: str | None = None,
+        message_id: int | None = None,
+    ) -> Dict[str, Any]:
+        """Повертає запис повідомлення точно в тому вигляді, як його збереже append_message.
+
+        Використовується, коли потрібно показати LLM повідомлення, які ще не
+        записані в історію (наприклад, для спекулятивної генерації).
+        """
+        return {
+            "role": role,
+            "content": content,
+            # Коли точно було відправлено/отримано повідомлення (UTC без інформації про часовий пояс).
+            "created_at": self._normalize_created_at(message_time_iso),
+            "message_id": message_id,
+        }
+
     def get_recent_context(self, user_id: int) -> List[Dict[str, Any]]:
         """
         Повертає "хвіст" історії для користувача у вигляді списку повідомлень
@@ -1,3 +1,13 @@
-from .llm_api import LLMAPI
+from .cassette import CassetteMissError, LLMCassette
+from .llm_api import LLMAPI, LLMHTTPError, LLMTimeoutError
+from .result import LLMResult, LLMUsage
 
-__all__ = ["LLMAPI"]
+__all__ = [
+    "CassetteMissError",
+    "LLMAPI",
+    "LLMCassette",
+    "LLMHTTPError",
+    "LLMResult",
+    "LLMTimeoutError",
+    "LLMUsage",
+]
@@ -0,0 +1,191 @@
+"""Касета для запису та детермінованого відтворення відповідей LLM.
+
+Формат файлу — JSONL: кожен рядок описує одну пару запит/відповідь
+у компактному вигляді (ключ, затримка, сире тіло відповіді провайдера).
+Ключ — sha256 нормалізованого payload, тож однакові запити з однаковими
+параметрами потрапляють в один слот касети. Нестабільні між запусками
+поля (час і message_id у рядках історії, ISO-мітки часу) у ключ не входять:
+інакше повторний прогін роутера ніколи не влучав би в записаний слот.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, List
+
+from .config import LLM_CASSETTE_MODE, LLM_CASSETTE_PATH, LLM_REPLAY_LATENCY_SCALE
+
+CASSETTE_MODES = ("off", "record", "replay")
+
+# Нестабільні фрагменти тексту повідомлень і їх заміна в ключі касети.
+# Рядок історії роутера: "date: <час> | message_id: <id> | message: ...".
+_VOLATILE_PATTERNS = (
+    (re.compile(r"date: [^|]*\|"), "date: * |"),
+    (re.compile(r"(message_id\s*[:=]\s*)(?:\d+|unknown)"), r"\1*"),
+    (re.compile(r'("\w*_?id"\s*:\s*)\d+'), r"\1*"),
+    (re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?"), "*"),
+)
+
+
+class CassetteMissError(RuntimeError):
+    """У касеті немає запису для запиту, який прийшов у режимі replay."""
+
+
+class LLMCassette:
+    """Записує або відтворює відповіді LLM з файлу на диску."""
+
+    def __init__(
+        self,
+        path: str,
+        mode: str = "record",
+        latency_scale: float = 1.0,
+    ) -> None:
+        """Готує касету.
+
+        Параметри
+        ----------
+        path: str
+            Шлях до JSONL-файлу касети.
+        mode: str
+            "record" — дописуємо нові записи, "replay" — лише читаємо.
+        latency_scale: float
+            Множник записаних затримок під час replay (0 — без очікування).
+        """
+
+        if mode not in CASSETTE_MODES or mode == "off":
+            raise ValueError(f"Непідтримуваний режим касети: {mode}")
+
+        self.path = path
+        self.mode = mode
+        self.latency_scale = max(0.0, float(latency_scale))
+
+        self._lock = threading.Lock()
+        # key -> список записів; однаковий запит може повторюватись кілька разів.
+        self._entries: Dict[str, List[dict]] = {}
+        # key -> скільки разів уже віддали запис (для повторних однакових запитів).
+        self._cursor: Dict[str, int] = {}
+
+        if self.mode == "replay":
+            self._load()
+
+    @classmethod
+    def from_config(cls) -> "LLMCassette | None":
+        """Створює касету згідно з налаштуваннями або повертає None, якщо вона вимкнена."""
+
+        if LLM_CASSETTE_MODE == "off":
+            return None
+        return cls(
+            path=LLM_CASSETTE_PATH,
+            mode=LLM_CASSETTE_MODE,
+            latency_scale=LLM_REPLAY_LATENCY_SCALE,
+        )
+
+    @staticmethod
+    def make_key(payload: Dict[str, Any]) -> str:
+        """Повертає стабільний хеш payload незалежно від порядку ключів.
+
+        Час і message_id у тексті повідомлень замінюються на "*", тож той самий
+        діалог, прогнаний пізніше з іншими id, потрапляє в той самий слот.
+        """
+
+        normalized = json.dumps(
+            LLMCassette._strip_volatile(payload),
+            sort_keys=True,
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _strip_volatile(payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Копія payload без нестабільних між запусками фрагментів у messages."""
+
+        messages = []
+        for message in payload.get("messages") or []:
+            content = message.get("content")
+            if isinstance(content, str):
+                for pattern, replacement in _VOLATILE_PATTERNS:
+                    content = pattern.sub(replacement, content)
+                message = {**message, "content": content}
+            messages.append(message)
+        return {**payload, "messages": messages}
+
+    def record(
+        self,
+        payload: Dict[str, Any],
+        response: Dict[str, Any],
+        latency: float,
+        server_seconds: float | None = None,
+    ) -> None:
+        """Дописує пару запит/відповідь у кінець файлу касети."""
+
+        entry = {
+            "key": self.make_key(payload),
+            "model": payload.get("model"),
+            "latency": round(float(latency), 4),
+            "server_seconds": server_seconds,
+            "response": response,
+        }
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":"))
+
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.write(line + "\n")
+            self._entries.setdefault(entry["key"], []).append(entry)
+
+    def replay(self, payload: Dict[str, Any]) -> tuple[Dict[str, Any], float | None]:
+        """Повертає записану відповідь і серверний час, витримавши записану затримку.
+
+        Затримка масштабується множником latency_scale.
+        Якщо однаковий запит надходить кілька разів, віддаємо записи по черзі,
+        а після останнього — повторюємо його.
+        """
+
+        key = self.make_key(payload)
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                raise CassetteMissError(
+                    f"❌ У касеті {self.path} немає відповіді для запиту {key[:12]}"
+                )
+            position = self._cursor.get(key, 0)
+            entry = entries[min(position, len(entries) - 1)]
+            self._cursor[key] = position + 1
+
+        delay = float(entry.get("latency") or 0) * self.latency_scale
+        if delay > 0:
+            # replay виконується в потоці asyncio.to_thread, тому звичайний sleep тут доречний.
+            time.sleep(delay)
+        return entry["response"], entry.get("server_seconds")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(entries) for entries in self._entries.values())
+
+    def _load(self) -> None:
+        """Зчитує всі записи касети у пам'ять, пропускаючи биті рядки."""
+
+        if not os.path.exists(self.path):
+            print(f"⚠️ Касета {self.path} не знайдена, replay відповідатиме помилкою.")
+            return
+
+        with open(self.path, "r", encoding="utf-8") as file:
+            for line in file:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                key = entry.get("key")
+                if key and isinstance(entry.get("response"), dict):
+                    self._entries.setdefault(key, []).append(entry)
+
+        print(f"📼 Завантажено {len(self)} записів касети з {self.path}")
@@ -5,20 +5,38 @@ import settings as project_settings
 
 load_dotenv()
 
+# запис/відтворення відповідей LLM (див. cassette.py)
+LLM_CASSETTE_MODE = os.getenv("LLM_CASSETTE_MODE", project_settings.LLM_CASSETTE_MODE)
+LLM_CASSETTE_PATH = os.getenv("LLM_CASSETTE_PATH", project_settings.LLM_CASSETTE_PATH)
+LLM_REPLAY_LATENCY_SCALE = float(
+    os.getenv("LLM_REPLAY_LATENCY_SCALE", project_settings.LLM_REPLAY_LATENCY_SCALE)
+)
+
 # базові LLM налаштування
 LLM_API_KEY = os.getenv("LLM_API_KEY")
-if not LLM_API_KEY:
+# У режимі replay мережа не потрібна, тож і ключ необов'язковий.
+if not LLM_API_KEY and LLM_CASSETTE_MODE != "replay":
     raise RuntimeError("❌ LLM_API_KEY не знайдено в .env")
 
 LLM_BASE_URL = os.getenv(
     "LLM_BASE_URL", "https://api.mistral.ai/v1/chat/completions"
 )
 LLM_MODEL = os.getenv("LLM_MODEL", "mistral-small-latest")
+# Дешевша/швидша модель, на яку переходимо, коли основна не вкладається в бюджет
+LLM_FALLBACK_MODEL = os.getenv("LLM_FALLBACK_MODEL") or None
 LLM_TEMPERATURE = project_settings.LLM_TEMPERATURE
 LLM_MAX_TOKENS = project_settings.LLM_MAX_TOKENS
 LLM_TOP_P = project_settings.LLM_TOP_P
 LLM_PRESENCE_PENALTY = project_settings.LLM_PRESENCE_PENALTY
 LLM_FREQUENCY_PENALTY = project_settings.LLM_FREQUENCY_PENALTY
+LLM_REQUEST_TIMEOUT_SECONDS = project_settings.LLM_REQUEST_TIMEOUT_SECONDS
+
+# налаштування прогнозу затримки
+LLM_LATENCY_WINDOW = project_settings.LLM_LATENCY_WINDOW
+LLM_LATENCY_MIN_SAMPLES = project_settings.LLM_LATENCY_MIN_SAMPLES
+LLM_LATENCY_PERCENTILE = project_settings.LLM_LATENCY_PERCENTILE
+LLM_LATENCY_MAX_DEPTH_BUCKET = project_settings.LLM_LATENCY_MAX_DEPTH_BUCKET
+LLM_LATENCY_MAX_AGE_SECONDS = project_settings.LLM_LATENCY_MAX_AGE_SECONDS
 
 # директорія src/
 MODULE_DIR = os.path.dirname(__file__)
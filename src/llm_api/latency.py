@@ -0,0 +1,118 @@
+"""Ковзна статистика затримок LLM з прив'язкою до глибини черги запитів."""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Tuple
+
+from .config import (
+    LLM_LATENCY_MAX_AGE_SECONDS,
+    LLM_LATENCY_MAX_DEPTH_BUCKET,
+    LLM_LATENCY_MIN_SAMPLES,
+    LLM_LATENCY_PERCENTILE,
+    LLM_LATENCY_WINDOW,
+)
+
+
+class LatencyTracker:
+    """Зберігає останні заміри затримки для кожної пари (модель, глибина черги).
+
+    Глибина черги — кількість запитів, які вже виконувались у момент старту
+    нового. Чим більше паралельних запитів, тим повільніше відповідає провайдер,
+    тому прогноз беремо саме з кошика поточної глибини.
+    Заміри старші за max_age_seconds у прогноз не йдуть: без цього модель,
+    яку перестали викликати через поганий прогноз, ніколи б його не виправила.
+    Методи потокобезпечні, бо generate викликається через asyncio.to_thread.
+    """
+
+    def __init__(
+        self,
+        window: int = LLM_LATENCY_WINDOW,
+        min_samples: int = LLM_LATENCY_MIN_SAMPLES,
+        percentile: float = LLM_LATENCY_PERCENTILE,
+        max_depth_bucket: int = LLM_LATENCY_MAX_DEPTH_BUCKET,
+        max_age_seconds: float | None = LLM_LATENCY_MAX_AGE_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.window = window
+        self.min_samples = min_samples
+        self.percentile = percentile
+        self.max_depth_bucket = max_depth_bucket
+        self.max_age_seconds = max_age_seconds
+
+        self._clock = clock
+        # (модель, кошик) -> [(момент заміру, секунди)]
+        self._samples: Dict[Tuple[str, int], Deque[Tuple[float, float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, model: str, depth: int, seconds: float) -> None:
+        """Додає замір тривалості завершеного запиту."""
+
+        self._append(model, depth, float(seconds))
+
+    def observe_timeout(self, model: str, depth: int) -> None:
+        """Фіксує таймаут: справжня затримка невідома, лише що вона більша за ліміт.
+
+        Такий замір не підмішується як звичайне число (ліміт таймауту), а
+        вважається "нескінченним": у перцентилі він переважує будь-який бюджет,
+        поки не застаріє.
+        """
+
+        self._append(model, depth, math.inf)
+
+    def estimate(self, model: str, depth: int) -> float | None:
+        """Повертає очікувану затримку для моделі на заданій глибині черги.
+
+        Якщо для точної глибини замало свіжих замірів, беремо найближчий кошик,
+        де їх достатньо. Коли даних немає зовсім — повертаємо None (прогноз
+        невідомий). math.inf означає, що на цьому перцентилі запити не вкладались
+        у таймаут.
+        """
+
+        target = self._bucket(depth)
+        with self._lock:
+            self._expire()
+            candidates = [
+                (abs(bucket - target), [seconds for _, seconds in samples])
+                for (sample_model, bucket), samples in self._samples.items()
+                if sample_model == model and len(samples) >= self.min_samples
+            ]
+
+        if not candidates:
+            return None
+
+        _, samples = min(candidates, key=lambda item: item[0])
+        samples.sort()
+        index = min(len(samples) - 1, int(self.percentile * len(samples)))
+        return samples[index]
+
+    def _append(self, model: str, depth: int, seconds: float) -> None:
+        key = (model, self._bucket(depth))
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = deque(maxlen=self.window)
+                self._samples[key] = samples
+            samples.append((self._clock(), seconds))
+
+    def _expire(self) -> None:
+        """Відкидає застарілі заміри (викликається під замком)."""
+
+        if self.max_age_seconds is None:
+            return
+        oldest = self._clock() - self.max_age_seconds
+        for key in list(self._samples):
+            samples = self._samples[key]
+            # Заміри додаються по часу, тож застарілі — на початку черги.
+            while samples and samples[0][0] < oldest:
+                samples.popleft()
+            if not samples:
+                del self._samples[key]
+
+    def _bucket(self, depth: int) -> int:
+        """Обмежує глибину, щоб рідкісні піки не розпорошували статистику."""
+
+        return max(0, min(int(depth), self.max_depth_bucket))
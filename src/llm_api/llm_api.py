@@ -2,15 +2,36 @@
 llm_api.py — універсальний клієнт для LLM API.
 """
 
+import threading
+import time
+
 import requests
 from .config import (
     LLM_API_KEY,
     LLM_BASE_URL,
+    LLM_FALLBACK_MODEL,
     LLM_MODEL,
     LLM_TEMPERATURE,
     LLM_MAX_TOKENS,
+    LLM_REQUEST_TIMEOUT_SECONDS,
     LLM_TOP_P,
 )
+from .cassette import LLMCassette
+from .latency import LatencyTracker
+from .result import LLMResult, LLMUsage
+
+
+class LLMTimeoutError(RuntimeError):
+    """LLM не встигла відповісти за відведений таймаут."""
+
+
+class LLMHTTPError(RuntimeError):
+    """Провайдер повернув не-200 відповідь."""
+
+    def __init__(self, status_code: int, text: str) -> None:
+        super().__init__(f"❌ Помилка LLM API ({status_code}): {text}")
+        self.status_code = status_code
+        self.text = text
 
 
 class LLMAPI:
@@ -18,9 +39,16 @@ class LLMAPI:
 
     BASE_URL = LLM_BASE_URL
 
-    def __init__(self):
+    def __init__(self, cassette: LLMCassette | None = None):
+        """Готує клієнт.
+
+        cassette: необов'язкова касета для запису відповідей або
+            офлайн-відтворення без мережі (див. LLMCassette).
+        """
+
         self.api_key = LLM_API_KEY
         self.model = LLM_MODEL
+        self.fallback_model = LLM_FALLBACK_MODEL
         self.temperature = LLM_TEMPERATURE
         self.max_tokens = LLM_MAX_TOKENS
 
@@ -30,35 +58,156 @@ class LLMAPI:
             "LLM_TOP_P": str(LLM_TOP_P),
         }
 
-    def generate(self, messages: list[dict]) -> str:
+        # Статистика затримок для прогнозу, чи вкладеться модель у бюджет.
+        self.latency = LatencyTracker()
+        # Кількість запитів, що виконуються зараз (глибина черги).
+        self._in_flight = 0
+        self._in_flight_lock = threading.Lock()
+
+        # Чи приймає провайдер поле response_format (вимикаємо після першої відмови).
+        self.response_format_supported = True
+
+        self.cassette = cassette
+        if self.cassette is not None:
+            print(f"📼 Касета LLM у режимі {self.cassette.mode}: {self.cassette.path}")
+
+    @property
+    def in_flight(self) -> int:
+        """Скільки запитів до LLM виконується в цю мить."""
+
+        with self._in_flight_lock:
+            return self._in_flight
+
+    def generate(
+        self,
+        messages: list[dict],
+        model: str | None = None,
+        timeout: float | None = None,
+        response_format: dict | None = None,
+    ) -> LLMResult:
         """
         Приймає повний список messages (system/user/assistant)
-        і повертає текст відповіді.
+        і повертає LLMResult: текст відповіді, usage та час виконання.
 
+        model: модель для цього запиту (за замовчуванням — основна self.model).
+        timeout: ліміт очікування в секундах; якщо його перевищено —
+            кидаємо LLMTimeoutError, щоб викликач міг перейти на іншу модель.
+        response_format: структурований вивід (JSON-режим або схема). Якщо
+            провайдер його відхиляє, повторюємо запит без нього і більше не надсилаємо.
         """
-        
+
+        target_model = model or self.model
         payload = {
-            "model": self.model,
+            "model": target_model,
             "messages": messages,
             "temperature": self.temperature,
             "max_tokens": self.max_tokens,
             # LLM_TOP_P використовуємо у headers і тілі; решта пенальті поки не потрібні
             "top_p": LLM_TOP_P,
         }
+        if response_format is not None and self.response_format_supported:
+            payload["response_format"] = response_format
 
-        print("🌐 Надсилаю запит у LLM...")
+        replaying = self.cassette is not None and self.cassette.mode == "replay"
+        print(
+            f"🌐 Надсилаю запит у LLM ({target_model})..."
+            if not replaying
+            else f"📼 Відтворюю відповідь LLM ({target_model}) з касети..."
+        )
+
+        with self._in_flight_lock:
+            depth = self._in_flight
+            self._in_flight += 1
+        started = time.monotonic()
+        completed = False
+        timed_out = False
+
+        try:
+            if replaying:
+                data, server_seconds = self.cassette.replay(payload)
+            else:
+                request_timeout = timeout or LLM_REQUEST_TIMEOUT_SECONDS
+                try:
+                    data, server_seconds = self._post(payload, request_timeout)
+                except LLMHTTPError as exc:
+                    if "response_format" not in payload or not self._rejects_response_format(exc):
+                        raise
+                    print("⚠️ Провайдер не підтримує response_format — вимикаю його і повторюю запит.")
+                    self.response_format_supported = False
+                    payload.pop("response_format")
+                    # Повтор вкладається в той самий таймаут, а не отримує новий.
+                    remaining = request_timeout - (time.monotonic() - started)
+                    if remaining <= 0:
+                        raise LLMTimeoutError(
+                            f"❌ LLM ({target_model}) не відповіла за {request_timeout}с"
+                        ) from exc
+                    data, server_seconds = self._post(payload, remaining)
+            completed = True
+        except LLMTimeoutError:
+            timed_out = True
+            raise
+        finally:
+            elapsed = time.monotonic() - started
+            with self._in_flight_lock:
+                self._in_flight -= 1
+            if completed:
+                self.latency.observe(target_model, depth, elapsed)
+            elif timed_out:
+                # Таймаут — не звичайний замір: справжня затримка невідома.
+                self.latency.observe_timeout(target_model, depth)
+
+        if self.cassette is not None and self.cassette.mode == "record":
+            self.cassette.record(payload, data, elapsed, server_seconds)
 
-        resp = requests.post(
-            self.BASE_URL,
-            headers=self.headers,
-            json=payload,
-            timeout=30,
+        result = LLMResult(
+            content=data["choices"][0]["message"]["content"],
+            model=data.get("model") or target_model,
+            usage=LLMUsage.from_response(data),
+            wall_seconds=round(elapsed, 4),
+            server_seconds=server_seconds,
         )
+        print(
+            f"✅ Відповідь від LLM отримано за {elapsed:.2f}с "
+            f"(tokens: {result.usage.prompt_tokens}→{result.usage.completion_tokens})."
+        )
+        return result
+
+    @staticmethod
+    def _rejects_response_format(exc: LLMHTTPError) -> bool:
+        """Чи відхилив провайдер саме параметр response_format.
+
+        Будь-яка інша 400/422 (наприклад, зламане тіло запиту зі словом "json")
+        не повинна назавжди вимикати структурований вивід.
+        """
+
+        return exc.status_code in (400, 422) and "response_format" in exc.text
+
+    def _post(self, payload: dict, timeout: float) -> tuple[dict, float | None]:
+        """Виконує HTTP-запит до провайдера.
+
+        Повертає розібране тіло відповіді та серверний час обробки в секундах
+        (із заголовка openai-processing-ms, якщо провайдер його надсилає).
+        """
+
+        try:
+            resp = requests.post(
+                self.BASE_URL,
+                headers=self.headers,
+                json=payload,
+                timeout=timeout,
+            )
+        except requests.Timeout as exc:
+            raise LLMTimeoutError(
+                f"❌ LLM ({payload.get('model')}) не відповіла за {timeout}с"
+            ) from exc
 
         if resp.status_code != 200:
-            raise RuntimeError(f"❌ Помилка LLM API: {resp.text}")
+            raise LLMHTTPError(resp.status_code, resp.text)
+
+        server_ms = resp.headers.get("openai-processing-ms")
+        try:
+            server_seconds = float(server_ms) / 1000 if server_ms else None
+        except ValueError:
+            server_seconds = None
 
-        data = resp.json()
-        answer = data["choices"][0]["message"]["content"]
-        print("✅ Відповідь від LLM отримано.")
-        return answer
+        return resp.json(), server_seconds
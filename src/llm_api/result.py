@@ -0,0 +1,67 @@
+"""Структурований результат виклику LLM: текст, usage та час виконання."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict
+
+
+@dataclass
+class LLMUsage:
+    """Кількість токенів, яку провайдер порахував за запит."""
+
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    @classmethod
+    def from_response(cls, data: Dict[str, Any]) -> "LLMUsage":
+        """Дістає usage з відповіді провайдера, не падаючи на відсутніх полях.
+
+        Різні провайдери віддають кешовані токени по-різному: OpenAI — у
+        prompt_tokens_details.cached_tokens, DeepSeek — у prompt_cache_hit_tokens,
+        деякі — просто cached_tokens. Перевіряємо всі варіанти.
+        """
+
+        usage = data.get("usage") or {}
+        details = usage.get("prompt_tokens_details") or {}
+        cached = (
+            details.get("cached_tokens")
+            or usage.get("prompt_cache_hit_tokens")
+            or usage.get("cached_tokens")
+            or 0
+        )
+        return cls(
+            prompt_tokens=_safe_int(usage.get("prompt_tokens")),
+            completion_tokens=_safe_int(usage.get("completion_tokens")),
+            cached_tokens=_safe_int(cached),
+        )
+
+
+@dataclass
+class LLMResult:
+    """Відповідь LLM разом з метаданими для обліку витрат і затримок.
+
+    server_seconds — час обробки на боці провайдера (із заголовка
+    openai-processing-ms, якщо він є), wall_seconds — повний час виклику
+    з нашого боку, включно з мережею та чергою.
+    """
+
+    content: str
+    model: str
+    usage: LLMUsage = field(default_factory=LLMUsage)
+    wall_seconds: float = 0.0
+    server_seconds: float | None = None
+
+
+def _safe_int(value: Any) -> int:
+    """Безпечно перетворює значення на int, повертаючи 0 у разі невдачі."""
+
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
@@ -0,0 +1,5 @@
+"""Локальний OpenAI-сумісний stub-сервер LLM для навантажувальних тестів."""
+
+from .server import LatencyDistribution, StubLLMServer
+
+__all__ = ["LatencyDistribution", "StubLLMServer"]
@@ -0,0 +1,12 @@
+from settings import (
+    LLM_STUB_ERROR_RATE,
+    LLM_STUB_HOST,
+    LLM_STUB_LATENCY,
+    LLM_STUB_PORT,
+    LLM_STUB_RATE_LIMIT_RATE,
+    LLM_STUB_RETRY_AFTER_SECONDS,
+    LLM_STUB_STREAM_CHUNK_DELAY,
+)
+
+# Налаштування stub-сервера визначаються у settings.py, тут лише реекспорт,
+# щоб модуль сервера не залежав від структури глобального конфігу.
@@ -0,0 +1,102 @@
+"""Навантажувальний прогін LLMAPI проти локального stub-сервера.
+
+Запуск:
+    python -m src.llm_stub.load --requests 200 --concurrency 16 --latency uniform:0.2,1.5
+
+Якщо --url не задано, stub-сервер піднімається в цьому ж процесі на вільному порту.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .server import StubLLMServer
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    """Повертає перцентиль відсортованого списку (0 для порожнього)."""
+
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(fraction * len(ordered)))
+    return ordered[index]
+
+
+def main() -> None:
+    """Запускає паралельні виклики LLMAPI.generate і друкує підсумок."""
+
+    parser = argparse.ArgumentParser(description="Навантажувальний тест LLMAPI через stub")
+    parser.add_argument("--url", default=None, help="endpoint уже запущеного stub-сервера")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", default="uniform:0.2,1.0")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if url is None:
+        server = StubLLMServer(
+            port=0,
+            latency=args.latency,
+            error_rate=args.error_rate,
+            rate_limit_rate=args.rate_limit_rate,
+            seed=args.seed,
+        ).start()
+        url = server.url
+
+    # Ключ для stub не потрібен, але конфіг LLM вимагає його наявності.
+    os.environ.setdefault("LLM_API_KEY", "stub-key")
+    from src.llm_api.llm_api import LLMAPI
+
+    api = LLMAPI()
+    api.BASE_URL = url
+
+    messages = [
+        {"role": "system", "content": "stub load test"},
+        {"role": "user", "content": "date: 2024-01-01T00:00:00 | message_id: 1 | message: привіт"},
+    ]
+
+    latencies: list[float] = []
+    failures = 0
+
+    def _one_call(_: int) -> float | None:
+        started = time.monotonic()
+        try:
+            api.generate(messages)
+        except Exception:
+            return None
+        return time.monotonic() - started
+
+    wall_started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for result in pool.map(_one_call, range(args.requests)):
+            if result is None:
+                failures += 1
+            else:
+                latencies.append(result)
+    wall = time.monotonic() - wall_started
+
+    print("\n================= STUB LOAD SUMMARY =================")
+    print(f"requests={args.requests} concurrency={args.concurrency} wall={wall:.2f}s")
+    print(f"ok={len(latencies)} failed={failures} throughput={len(latencies) / wall:.1f} req/s")
+    if latencies:
+        print(
+            f"p50={_percentile(latencies, 0.5):.3f}s p95={_percentile(latencies, 0.95):.3f}s "
+            f"mean={statistics.mean(latencies):.3f}s"
+        )
+    if server is not None:
+        print(f"server stats: {server.stats}")
+        server.stop()
+    print("====================================================")
+
+
+if __name__ == "__main__":
+    main()
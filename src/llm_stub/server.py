@@ -0,0 +1,407 @@
+"""OpenAI-сумісний stub-сервер, що відповідає валідними діями з actions.txt.
+
+Запуск:
+    python -m src.llm_stub.server --port 8089 --latency lognormal:0,0.5 \
+        --error-rate 0.02 --rate-limit-rate 0.05
+
+Після цього достатньо виставити LLM_BASE_URL=http://127.0.0.1:8089/v1/chat/completions,
+щоб LLMAPI і роутер працювали без мережі з контрольованою затримкою та помилками.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+
+from .config import (
+    LLM_STUB_ERROR_RATE,
+    LLM_STUB_HOST,
+    LLM_STUB_LATENCY,
+    LLM_STUB_PORT,
+    LLM_STUB_RATE_LIMIT_RATE,
+    LLM_STUB_RETRY_AFTER_SECONDS,
+    LLM_STUB_STREAM_CHUNK_DELAY,
+)
+
+# Шукаємо message_id у форматі, який будує LLMRouter._format_history_content.
+_MESSAGE_ID_RE = re.compile(r"message_id:\s*(\d+)")
+
+_REPLIES = [
+    "Привіт! Радий тебе чути 🙂",
+    "Так, розумію, про що ти.",
+    "Цікаво, розкажи детальніше?",
+    "Ха, це було смішно 😄",
+    "Зараз трохи зайнятий, але відповім.",
+    "Згоден з тобою.",
+]
+_REACTIONS = ["👍", "❤", "😁", "🔥", "🤔"]
+
+
+class LatencyDistribution:
+    """Генератор затримок за текстовою специфікацією ("lognormal:0,0.5" тощо)."""
+
+    KINDS = ("fixed", "uniform", "normal", "lognormal", "exp")
+
+    def __init__(self, spec: str, rng: random.Random | None = None) -> None:
+        kind, _, raw_params = spec.partition(":")
+        kind = kind.strip().lower()
+        if kind not in self.KINDS:
+            raise ValueError(f"Невідомий розподіл затримки: {spec}")
+
+        try:
+            params = [float(value) for value in raw_params.split(",") if value.strip()]
+        except ValueError as exc:
+            raise ValueError(f"Некоректні параметри розподілу: {spec}") from exc
+
+        expected = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2, "exp": 1}[kind]
+        if len(params) != expected:
+            raise ValueError(f"Розподіл {kind} потребує {expected} параметр(и): {spec}")
+
+        self.spec = spec
+        self.kind = kind
+        self.params = params
+        self._rng = rng or random.Random()
+
+    def sample(self) -> float:
+        """Повертає одну затримку в секундах (не менше нуля)."""
+
+        if self.kind == "fixed":
+            value = self.params[0]
+        elif self.kind == "uniform":
+            value = self._rng.uniform(*self.params)
+        elif self.kind == "normal":
+            value = self._rng.gauss(*self.params)
+        elif self.kind == "lognormal":
+            value = self._rng.lognormvariate(*self.params)
+        else:
+            mean = self.params[0]
+            value = self._rng.expovariate(1.0 / mean) if mean > 0 else 0.0
+        return max(0.0, value)
+
+
+class StubLLMServer:
+    """Багатопотоковий HTTP-сервер із керованими затримками та помилками.
+
+    Використовується як із командного рядка, так і з тестів/бенчмарків:
+    start() піднімає сервер у фоновому потоці, stop() зупиняє його.
+    """
+
+    def __init__(
+        self,
+        host: str = LLM_STUB_HOST,
+        port: int = LLM_STUB_PORT,
+        latency: str = LLM_STUB_LATENCY,
+        error_rate: float = LLM_STUB_ERROR_RATE,
+        rate_limit_rate: float = LLM_STUB_RATE_LIMIT_RATE,
+        retry_after_seconds: int = LLM_STUB_RETRY_AFTER_SECONDS,
+        stream_chunk_delay: float = LLM_STUB_STREAM_CHUNK_DELAY,
+        seed: int | None = None,
+    ) -> None:
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self.latency = LatencyDistribution(latency, rng=self._rng)
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after_seconds = retry_after_seconds
+        self.stream_chunk_delay = stream_chunk_delay
+
+        self.stats: Dict[str, int] = {"requests": 0, "ok": 0, "errors": 0, "rate_limited": 0}
+        self._stats_lock = threading.Lock()
+
+        self._httpd = ThreadingHTTPServer((host, port), _StubRequestHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.stub = self  # type: ignore[attr-defined]
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        """Повна адреса endpoint-а chat/completions (з фактичним портом)."""
+
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1/chat/completions"
+
+    def start(self) -> "StubLLMServer":
+        """Запускає сервер у фоновому daemon-потоці."""
+
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        """Блокуючий запуск для командного рядка."""
+
+        self._httpd.serve_forever()
+
+    def stop(self) -> None:
+        """Зупиняє сервер і звільняє порт."""
+
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    # =====================
+    # Внутрішня логіка відповідей
+    # =====================
+
+    def _roll(self) -> str:
+        """Вирішує результат запиту: ok, error чи rate_limited."""
+
+        with self._rng_lock:
+            value = self._rng.random()
+        if value < self.rate_limit_rate:
+            return "rate_limited"
+        if value < self.rate_limit_rate + self.error_rate:
+            return "errors"
+        return "ok"
+
+    def _sample_latency(self) -> float:
+        with self._rng_lock:
+            return self.latency.sample()
+
+    def _count(self, key: str) -> None:
+        with self._stats_lock:
+            self.stats[key] = self.stats.get(key, 0) + 1
+
+    def build_actions(self, messages: List[dict]) -> List[dict]:
+        """Генерує список дій у форматі actions.txt для останнього повідомлення користувача."""
+
+        last_user_id = None
+        for message in reversed(messages):
+            if message.get("role") != "user":
+                continue
+            match = _MESSAGE_ID_RE.search(str(message.get("content") or ""))
+            if match:
+                last_user_id = int(match.group(1))
+            break
+
+        with self._rng_lock:
+            react = last_user_id is not None and self._rng.random() < 0.3
+            reaction = self._rng.choice(_REACTIONS)
+            replies_count = self._rng.choice([1, 1, 2, 3])
+            replies = [self._rng.choice(_REPLIES) for _ in range(replies_count)]
+            human_seconds = [round(self._rng.uniform(1, 4), 1) for _ in replies]
+
+        actions: List[dict] = []
+        if react:
+            actions.append(
+                {
+                    "type": "react_to_message",
+                    "wait_seconds": 0,
+                    "message_id": last_user_id,
+                    "reaction": reaction,
+                }
+            )
+
+        if replies_count == 1:
+            actions.append(
+                {
+                    "type": "send_message",
+                    "wait_seconds": 0,
+                    "human_seconds": human_seconds[0],
+                    "content": replies[0],
+                }
+            )
+        else:
+            actions.append(
+                {
+                    "type": "send_messages",
+                    "wait_seconds": 0,
+                    "human_seconds": 0,
+                    "messages_count": replies_count,
+                    "messages": [
+                        {"content": text, "wait_seconds": 1, "human_seconds": seconds}
+                        for text, seconds in zip(replies, human_seconds)
+                    ],
+                }
+            )
+        return actions
+
+    @staticmethod
+    def estimate_tokens(messages: List[dict]) -> int:
+        """Грубо оцінює кількість токенів (≈4 символи на токен)."""
+
+        chars = sum(len(str(message.get("content") or "")) for message in messages)
+        return max(1, math.ceil(chars / 4))
+
+
+class _StubRequestHandler(BaseHTTPRequestHandler):
+    """Обробник запитів, що імітує endpoint chat/completions."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        # Не засмічуємо консоль під час навантажувальних тестів.
+        return
+
+    @property
+    def stub(self) -> StubLLMServer:
+        return self.server.stub  # type: ignore[attr-defined]
+
+    def do_POST(self) -> None:  # noqa: N802
+        if not self.path.rstrip("/").endswith("chat/completions"):
+            self._send_json(404, {"error": {"message": "unknown endpoint"}})
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self._send_json(400, {"error": {"message": "invalid JSON body"}})
+            return
+
+        stub = self.stub
+        stub._count("requests")
+        started = time.monotonic()
+        outcome = stub._roll()
+
+        if outcome == "rate_limited":
+            stub._count("rate_limited")
+            self._send_json(
+                429,
+                {"error": {"message": "rate limit exceeded", "type": "rate_limit"}},
+                extra_headers={"Retry-After": str(stub.retry_after_seconds)},
+            )
+            return
+
+        time.sleep(stub._sample_latency())
+
+        if outcome == "errors":
+            stub._count("errors")
+            self._send_json(500, {"error": {"message": "stub internal error"}})
+            return
+
+        messages = payload.get("messages") or []
+        actions: Any = stub.build_actions(messages)
+        if payload.get("response_format"):
+            # JSON-режим вимагає об'єкт на верхньому рівні — як у реальних провайдерів.
+            actions = {"actions": actions}
+        content = json.dumps(actions, ensure_ascii=False)
+        prompt_tokens = stub.estimate_tokens(messages)
+        completion_tokens = max(1, math.ceil(len(content) / 4))
+        model = payload.get("model") or "stub"
+        processing_ms = int((time.monotonic() - started) * 1000)
+
+        stub._count("ok")
+        if payload.get("stream"):
+            self._send_stream(model, content, processing_ms)
+            return
+
+        self._send_json(
+            200,
+            {
+                "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                    "prompt_tokens_details": {"cached_tokens": 0},
+                },
+            },
+            extra_headers={"openai-processing-ms": str(processing_ms)},
+        )
+
+    def _send_json(
+        self, status: int, body: dict, extra_headers: Dict[str, str] | None = None
+    ) -> None:
+        raw = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        for key, value in (extra_headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def _send_stream(self, model: str, content: str, processing_ms: int) -> None:
+        """Віддає відповідь у форматі SSE-чанків, як це робить OpenAI з stream=true."""
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.send_header("openai-processing-ms", str(processing_ms))
+        self.end_headers()
+        self.close_connection = True
+
+        chunk_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        pieces = [content[i : i + 24] for i in range(0, len(content), 24)] or [""]
+        for index, piece in enumerate(pieces):
+            delta: Dict[str, str] = {"content": piece}
+            if index == 0:
+                delta["role"] = "assistant"
+            event = {
+                "id": chunk_id,
+                "object": "chat.completion.chunk",
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": None}],
+            }
+            self.wfile.write(f"data: {json.dumps(event, ensure_ascii=False)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+            if self.stub.stream_chunk_delay > 0:
+                time.sleep(self.stub.stream_chunk_delay)
+
+        final = {
+            "id": chunk_id,
+            "object": "chat.completion.chunk",
+            "model": model,
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+        }
+        self.wfile.write(f"data: {json.dumps(final)}\n\n".encode("utf-8"))
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+def main() -> None:
+    """Точка входу командного рядка."""
+
+    parser = argparse.ArgumentParser(description="Локальний stub-сервер LLM")
+    parser.add_argument("--host", default=LLM_STUB_HOST)
+    parser.add_argument("--port", type=int, default=LLM_STUB_PORT)
+    parser.add_argument("--latency", default=LLM_STUB_LATENCY)
+    parser.add_argument("--error-rate", type=float, default=LLM_STUB_ERROR_RATE)
+    parser.add_argument("--rate-limit-rate", type=float, default=LLM_STUB_RATE_LIMIT_RATE)
+    parser.add_argument("--retry-after", type=int, default=LLM_STUB_RETRY_AFTER_SECONDS)
+    parser.add_argument("--stream-chunk-delay", type=float, default=LLM_STUB_STREAM_CHUNK_DELAY)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    server = StubLLMServer(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after_seconds=args.retry_after,
+        stream_chunk_delay=args.stream_chunk_delay,
+        seed=args.seed,
+    )
+    print(f"🧪 Stub LLM слухає на {server.url} (latency={args.latency})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Stub LLM зупинено.")
+    finally:
+        print(f"📊 Статистика: {server.stats}")
+
+
+if __name__ == "__main__":
+    main()
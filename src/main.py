@@ -1,17 +1,40 @@
 import asyncio
 
 from src.history.history_manager import HistoryManager
+from src.llm_api.cassette import LLMCassette
 from src.llm_api.llm_api import LLMAPI
 from src.llm_api.utils.loader import load_system_prompt
 from src.router.llm_router import LLMRouter
+from src.sharding import ShardedRouter
+from src.sharding.config import ROUTER_SHARDS
+from src.speech_to_text.config import check_credentials
 from src.telegram_api.telegram_api import TelegramAPI
 
 
 async def main() -> None:
     """Точка входу: збирає сервіси, підключає їх і запускає Telegram-клієнт."""
 
+    # Ключі Google перевіряємо одразу, щоб не дізнатися про них з першого voice.
+    check_credentials()
     telegram_api = TelegramAPI()
-    llm_api = LLMAPI()
+
+    if ROUTER_SHARDS > 1:
+        # Режим шардів: цей процес лише приймає апдейти й виконує виклики
+        # Telegram, а LLMRouter-и працюють в окремих процесах.
+        sharded_router = ShardedRouter(telegram_api=telegram_api)
+        telegram_api.set_router(sharded_router)
+        await telegram_api.connect()
+        await sharded_router.start()
+        try:
+            await telegram_api.run()
+        finally:
+            await sharded_router.stop()
+            await telegram_api.disconnect()
+        return
+
+    # Касета вмикається через LLM_CASSETTE_MODE (record/replay) — у replay
+    # роутер працює офлайн з записаними відповідями та затримками.
+    llm_api = LLMAPI(cassette=LLMCassette.from_config())
     history = HistoryManager()
     system_prompt = load_system_prompt()
 
@@ -25,7 +48,15 @@ async def main() -> None:
     telegram_api.set_router(router)
 
     await telegram_api.connect()
-    await telegram_api.run()
+    # Планувальник відновлює відкладені дії, тож стартує вже після підключення.
+    await router.start()
+    try:
+        await telegram_api.run()
+    finally:
+        # Спершу роутер: поточні цикли ще можуть відправити відповіді, а
+        # відкладені дії та inbox зберігаються на диск. Потім — відключення.
+        await router.stop()
+        await telegram_api.disconnect()
 
 
 if __name__ == "__main__":
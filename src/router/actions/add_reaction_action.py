@@ -4,9 +4,10 @@ from __future__ import annotations
 
 import asyncio
 from datetime import datetime, timezone
-from typing import Any, Dict
 
 from src.history.history_manager import HistoryManager
+from src.router.actions.schema import AddReactionAction
+from src.router.utils.interrupt import sleep_unless_interrupted
 from src.telegram_api.telegram_api import TelegramAPI
 
 
@@ -15,9 +16,9 @@ async def handle_add_reaction(
     history: HistoryManager,
     chat_id: int,
     user_id: int,
-    payload: Dict[str, Any],
-    human_seconds: float,
-) -> None:
+    action: AddReactionAction,
+    interrupt: asyncio.Event | None = None,
+) -> bool:
     """Ставить реакцію на конкретне повідомлення користувача.
 
     Параметри:
@@ -25,19 +26,21 @@ async def handle_add_reaction(
     - history: не використовується, але лишається для сумісності інтерфейсу.
     - chat_id: ідентифікатор чату, де лежить цільове повідомлення.
     - user_id: ідентифікатор користувача (лише для логів у разі потреби).
-    - payload: очікуємо message_id та emoji.
-    - human_seconds: скільки секунд імітувати паузу перед реакцією.
-    """
+    - action: типізована дія з message_id, emoji та human_seconds
+      (скільки секунд імітувати паузу перед реакцією).
+    - interrupt: подія нового повідомлення; якщо спрацює під час паузи —
+      реакцію не ставимо.
 
-    target_message_id = payload.get("message_id")
-    emoji = payload.get("emoji") or "👍"
+    Повертає False, якщо реакцію скасовано новим повідомленням, інакше True.
+    """
 
-    if target_message_id is None:
-        return
+    target_message_id = action.message_id
+    emoji = action.emoji
 
     # Якщо потрібно імітувати затримку перед реакцією – чекаємо в async-режимі.
-    if human_seconds > 0:
-        await asyncio.sleep(human_seconds)
+    # Нове повідомлення користувача перериває паузу, і реакція скасовується.
+    if await sleep_unless_interrupted(action.human_seconds, interrupt):
+        return False
 
     await telegram.send_reaction(chat_id, target_message_id, emoji)
 
@@ -53,3 +56,4 @@ async def handle_add_reaction(
         # був прив'язаний саме ботівський запис, а не користувацький target_message_id.
         message_id=last_assistant_message_id,
     )
+    return True
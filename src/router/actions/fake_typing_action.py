@@ -2,9 +2,10 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict
+import asyncio
 
 from src.history.history_manager import HistoryManager
+from src.router.actions.schema import FakeTypingAction
 from src.telegram_api.telegram_api import TelegramAPI
 
 
@@ -13,9 +14,9 @@ async def handle_fake_typing(
     history: HistoryManager,
     chat_id: int,
     user_id: int,
-    payload: Dict[str, Any],
-    human_seconds: float,
-) -> None:
+    action: FakeTypingAction,
+    interrupt: asyncio.Event | None = None,
+) -> bool:
     """Показує статус набору тексту без фактичного відправлення повідомлення.
 
     Параметри:
@@ -23,9 +24,12 @@ async def handle_fake_typing(
     - history: не використовується, присутній для єдиного інтерфейсу.
     - chat_id: ідентифікатор чату, де треба показати typing.
     - user_id: ідентифікатор користувача (лише для відповідності сигнатурі).
-    - payload: не використовується для цієї дії.
-    - human_seconds: тривалість індикації "typing" у секундах.
+    - action: типізована дія; human_seconds — тривалість індикації "typing".
+    - interrupt: подія нового повідомлення, яка достроково знімає typing.
+
+    Повертає False, якщо typing знято новим повідомленням, інакше True.
     """
 
-    if human_seconds > 0:
-        await telegram.send_typing(chat_id, human_seconds)
+    if action.human_seconds > 0:
+        return not await telegram.send_typing(chat_id, action.human_seconds, interrupt=interrupt)
+    return True
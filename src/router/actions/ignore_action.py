@@ -2,9 +2,10 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict
+import asyncio
 
 from src.history.history_manager import HistoryManager
+from src.router.actions.schema import IgnoreAction
 from src.telegram_api.telegram_api import TelegramAPI
 
 
@@ -13,13 +14,13 @@ async def handle_ignore(
     history: HistoryManager,
     chat_id: int,
     user_id: int,
-    payload: Dict[str, Any],
-    human_seconds: float,
-) -> None:
+    action: IgnoreAction,
+    interrupt: asyncio.Event | None = None,
+) -> bool:
     """Ігнорує запитану дію без будь-яких побічних ефектів.
 
     Параметри залишено для сумісності з іншими хендлерами, але не використовуються.
     """
 
     # Намірено нічого не робимо, щоб пропустити дію без змін стану.
-    return
+    return True
@@ -0,0 +1,294 @@
+"""Типізовані дії LLM та скомпільований валідатор схеми з actions.txt.
+
+Сира відповідь моделі — це список dict-ів довільної форми. ActionValidator за
+один прохід перетворює її на незмінні slotted-об'єкти дій:
+- нормалізує старі/альтернативні назви типів (react_to_message, fake_typping);
+- приводить числа до float/int і обрізає wait_seconds/human_seconds до меж
+  ACTION_MAX_WAIT_SECONDS / ACTION_MAX_HUMAN_SECONDS;
+- відкидає биті елементи, рахуючи причину відмови в `stats`.
+
+Збирачі для кожного типу будуються один раз у конструкторі, тож під час
+розбору немає ні пошуку полів за схемою, ні повторних перевірок.
+"""
+
+from __future__ import annotations
+
+import math
+from collections import Counter
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, ClassVar, Dict, Iterable, List, Tuple, Union
+
+from settings import ACTION_MAX_HUMAN_SECONDS, ACTION_MAX_WAIT_SECONDS
+
+DEFAULT_REACTION = "👍"
+
+
+@dataclass(frozen=True, slots=True)
+class MessagePart:
+    """Одне повідомлення всередині send_messages."""
+
+    content: str
+    wait_seconds: float = 0.0
+    human_seconds: float = 0.0
+
+
+@dataclass(frozen=True, slots=True)
+class SendMessageAction:
+    type: ClassVar[str] = "send_message"
+
+    content: str
+    wait_seconds: float = 0.0
+    human_seconds: float = 0.0
+
+
+@dataclass(frozen=True, slots=True)
+class SendMessagesAction:
+    type: ClassVar[str] = "send_messages"
+
+    messages: Tuple[MessagePart, ...]
+    wait_seconds: float = 0.0
+    human_seconds: float = 0.0
+
+
+@dataclass(frozen=True, slots=True)
+class AddReactionAction:
+    type: ClassVar[str] = "add_reaction"
+
+    message_id: int
+    emoji: str = DEFAULT_REACTION
+    wait_seconds: float = 0.0
+    human_seconds: float = 0.0
+
+
+@dataclass(frozen=True, slots=True)
+class FakeTypingAction:
+    type: ClassVar[str] = "fake_typing"
+
+    wait_seconds: float = 0.0
+    human_seconds: float = 0.0
+
+
+@dataclass(frozen=True, slots=True)
+class IgnoreAction:
+    type: ClassVar[str] = "ignore"
+
+    wait_seconds: float = 0.0
+
+
+@dataclass(frozen=True, slots=True)
+class WaitAction:
+    type: ClassVar[str] = "wait"
+
+    wait_seconds: float = 0.0
+
+
+Action = Union[
+    SendMessageAction,
+    SendMessagesAction,
+    AddReactionAction,
+    FakeTypingAction,
+    IgnoreAction,
+    WaitAction,
+]
+
+
+class _Rejected(Exception):
+    """Внутрішній сигнал: елемент не відповідає схемі (reason — ключ для stats)."""
+
+    def __init__(self, reason: str) -> None:
+        super().__init__(reason)
+        self.reason = reason
+
+
+class ActionValidator:
+    """Перетворює сирі dict-и від LLM у типізовані дії з підрахунком відмов."""
+
+    # Старі/альтернативні назви типів, які досі трапляються у відповідях моделі.
+    ALIASES: ClassVar[Dict[str, str]] = {
+        "react_to_message": "add_reaction",
+        "fake_typping": "fake_typing",
+    }
+
+    def __init__(
+        self,
+        max_wait_seconds: float = ACTION_MAX_WAIT_SECONDS,
+        max_human_seconds: float = ACTION_MAX_HUMAN_SECONDS,
+    ) -> None:
+        self.max_wait_seconds = float(max_wait_seconds)
+        self.max_human_seconds = float(max_human_seconds)
+        # accepted, rejected:<причина>, clamped:<поле>, dropped_part:<причина>
+        self.stats: Counter = Counter()
+        self._builders: Dict[str, Callable[[dict], Action]] = self._compile()
+
+    def validate(self, raw_actions: Iterable[Any]) -> List[Action]:
+        """Повертає лише валідні дії у вихідному порядку."""
+
+        actions: List[Action] = []
+        for raw in raw_actions:
+            try:
+                actions.append(self._build(raw))
+            except _Rejected as exc:
+                self.stats[f"rejected:{exc.reason}"] += 1
+                print(f"ℹ️ Дію відхилено ({exc.reason}): {raw}")
+                continue
+            self.stats["accepted"] += 1
+        return actions
+
+    def _build(self, raw: Any) -> Action:
+        if not isinstance(raw, dict):
+            raise _Rejected("not_object")
+
+        action_type = raw.get("type")
+        if not isinstance(action_type, str) or not action_type:
+            raise _Rejected("missing_type")
+
+        builder = self._builders.get(self.ALIASES.get(action_type, action_type))
+        if builder is None:
+            raise _Rejected("unknown_type")
+
+        # Старий формат тримав поля у вкладеному payload — розгортаємо його.
+        payload = raw.get("payload")
+        body = {**raw, **payload} if isinstance(payload, dict) else raw
+        return builder(body)
+
+    # =====================
+    # Компіляція збирачів
+    # =====================
+
+    def _compile(self) -> Dict[str, Callable[[dict], Action]]:
+        """Будує збирач для кожного типу дії один раз на інстанс валідатора."""
+
+        wait = self._seconds_reader("wait_seconds", self.max_wait_seconds)
+        human = self._seconds_reader("human_seconds", self.max_human_seconds)
+        stats = self.stats
+
+        def text(body: dict, name: str) -> str:
+            value = body.get(name)
+            if value is None:
+                raise _Rejected(f"missing_field:{name}")
+            if not isinstance(value, str) or not value.strip():
+                raise _Rejected(f"invalid_text:{name}")
+            return value
+
+        def message_id(body: dict) -> int:
+            value = body.get("message_id")
+            if value is None:
+                raise _Rejected("missing_field:message_id")
+            if isinstance(value, bool):
+                raise _Rejected("invalid_int:message_id")
+            if isinstance(value, str) and value.strip().isdigit():
+                value = int(value.strip())
+            if isinstance(value, float) and value.is_integer():
+                value = int(value)
+            if not isinstance(value, int) or value <= 0:
+                raise _Rejected("invalid_int:message_id")
+            return value
+
+        def parts(body: dict, default_human: float) -> Tuple[MessagePart, ...]:
+            raw_parts = body.get("messages")
+            if not isinstance(raw_parts, list):
+                raise _Rejected("missing_field:messages")
+
+            built: List[MessagePart] = []
+            for raw_part in raw_parts:
+                try:
+                    if not isinstance(raw_part, dict):
+                        raise _Rejected("not_object")
+                    built.append(
+                        MessagePart(
+                            content=text(raw_part, "content"),
+                            wait_seconds=wait(raw_part),
+                            human_seconds=human(raw_part) or default_human,
+                        )
+                    )
+                except _Rejected as exc:
+                    # Бите повідомлення не валить усю пачку — лише випадає з неї.
+                    stats[f"dropped_part:{exc.reason}"] += 1
+            if not built:
+                raise _Rejected("empty_messages")
+            return tuple(built)
+
+        def build_send_message(body: dict) -> Action:
+            return SendMessageAction(
+                content=text(body, "content"),
+                wait_seconds=wait(body),
+                human_seconds=human(body),
+            )
+
+        def build_send_messages(body: dict) -> Action:
+            action_human = human(body)
+            return SendMessagesAction(
+                messages=parts(body, action_human),
+                wait_seconds=wait(body),
+                human_seconds=action_human,
+            )
+
+        def build_add_reaction(body: dict) -> Action:
+            emoji = body.get("reaction") or body.get("emoji") or DEFAULT_REACTION
+            if not isinstance(emoji, str):
+                raise _Rejected("invalid_text:reaction")
+            return AddReactionAction(
+                message_id=message_id(body),
+                emoji=emoji,
+                wait_seconds=wait(body),
+                human_seconds=human(body),
+            )
+
+        def build_fake_typing(body: dict) -> Action:
+            return FakeTypingAction(wait_seconds=wait(body), human_seconds=human(body))
+
+        def build_ignore(body: dict) -> Action:
+            return IgnoreAction(wait_seconds=wait(body))
+
+        def build_wait(body: dict) -> Action:
+            return WaitAction(wait_seconds=wait(body))
+
+        return {
+            SendMessageAction.type: build_send_message,
+            SendMessagesAction.type: build_send_messages,
+            AddReactionAction.type: build_add_reaction,
+            FakeTypingAction.type: build_fake_typing,
+            IgnoreAction.type: build_ignore,
+            WaitAction.type: build_wait,
+        }
+
+    def _seconds_reader(self, name: str, maximum: float) -> Callable[..., float]:
+        """Готує функцію, яка читає поле-секунди, приводить до float і обрізає до меж."""
+
+        stats = self.stats
+        clamped_key = f"clamped:{name}"
+
+        def read(body: dict, default: float = 0.0) -> float:
+            value = body.get(name)
+            if value is None or value == "":
+                return default
+            if isinstance(value, bool):
+                raise _Rejected(f"invalid_number:{name}")
+            try:
+                seconds = float(value)
+            except (TypeError, ValueError):
+                raise _Rejected(f"invalid_number:{name}") from None
+            if not math.isfinite(seconds):
+                raise _Rejected(f"invalid_number:{name}")
+            if seconds < 0 or seconds > maximum:
+                stats[clamped_key] += 1
+                seconds = min(max(seconds, 0.0), maximum)
+            return seconds
+
+        return read
+
+
+def action_to_dict(action: Action) -> Dict[str, Any]:
+    """Серіалізує дію назад у сирий формат actions.txt (для збереження на диск)."""
+
+    return {"type": action.type, **asdict(action)}
+
+
+def planned_seconds(action: Action) -> float:
+    """Скільки секунд дія займе за планом (паузи + імітація набору)."""
+
+    if isinstance(action, SendMessagesAction):
+        return action.wait_seconds + sum(
+            part.wait_seconds + part.human_seconds for part in action.messages
+        )
+    return action.wait_seconds + getattr(action, "human_seconds", 0.0)
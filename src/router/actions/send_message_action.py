@@ -2,10 +2,11 @@
 
 from __future__ import annotations
 
+import asyncio
 from datetime import datetime, timezone
-from typing import Any, Dict
 
 from src.history.history_manager import HistoryManager
+from src.router.actions.schema import SendMessageAction
 from src.telegram_api.telegram_api import TelegramAPI
 
 
@@ -14,9 +15,9 @@ async def handle_send_message(
     history: HistoryManager,
     chat_id: int,
     user_id: int,
-    payload: Dict[str, Any],
-    human_seconds: float,
-) -> None:
+    action: SendMessageAction,
+    interrupt: asyncio.Event | None = None,
+) -> bool:
     """Надсилає текстове повідомлення в чат і записує його в історію.
 
     Параметри:
@@ -24,19 +25,20 @@ async def handle_send_message(
     - history: менеджер історії, куди додаємо новий запис від бота.
     - chat_id: ідентифікатор чату, куди потрібно надіслати текст.
     - user_id: ідентифікатор користувача, якого стосується діалог.
-    - payload: словник із полями дії, очікуємо payload["content"].
-    - human_seconds: скільки секунд потрібно імітувати набір перед відправкою.
+    - action: типізована дія з текстом (content) та human_seconds —
+      скільки секунд потрібно імітувати набір перед відправкою.
+    - interrupt: подія нового повідомлення; якщо вона спрацює під час typing,
+      текст уже неактуальний і не надсилається.
+
+    Повертає False, якщо відправку скасовано новим повідомленням, інакше True.
     """
 
-    content = payload.get("content") if isinstance(payload, dict) else None
-    # На всяк випадок дозволяємо передати текст напряму без словника payload.
-    if not content and isinstance(payload, str):
-        content = payload
-    if not content:
-        return
+    content = action.content
 
     # Показуємо статус "typing" перед надсиланням, щоб виглядало природніше.
-    await telegram.send_typing(chat_id, human_seconds)
+    if await telegram.send_typing(chat_id, action.human_seconds, interrupt=interrupt):
+        print(f"✋ Відправку скасовано: користувач {user_id} написав нове повідомлення.")
+        return False
 
     try:
         message = await telegram.send_message(chat_id, content)
@@ -57,3 +59,4 @@ async def handle_send_message(
     except Exception as exc:
         # Не кидаємо помилку вище, щоб не зупинити сценарій інших дій.
         print(f"❌ Не вдалося відправити повідомлення користувачу {user_id}: {exc}")
+    return True
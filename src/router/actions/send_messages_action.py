@@ -4,9 +4,10 @@ from __future__ import annotations
 
 import asyncio
 from datetime import datetime, timezone
-from typing import Any, Dict, Iterable
 
 from src.history.history_manager import HistoryManager
+from src.router.actions.schema import SendMessagesAction
+from src.router.utils.interrupt import sleep_unless_interrupted
 from src.telegram_api.telegram_api import TelegramAPI
 
 
@@ -15,9 +16,9 @@ async def handle_send_messages(
     history: HistoryManager,
     chat_id: int,
     user_id: int,
-    payload: Dict[str, Any],
-    human_seconds: float,
-) -> None:
+    action: SendMessagesAction,
+    interrupt: asyncio.Event | None = None,
+) -> bool:
     """Надсилає кілька текстових повідомлень підряд і записує їх в історію.
 
     Параметри:
@@ -25,54 +26,57 @@ async def handle_send_messages(
     - history: менеджер історії, куди додаємо кожен меседж від бота.
     - chat_id: ідентифікатор чату, куди потрібно надіслати текст.
     - user_id: ідентифікатор користувача, якого стосується діалог.
-    - payload: словник із полями дії, очікуємо payload["messages"] як список.
-    - human_seconds: базовий час для індикації "typing", якщо у вкладених елементах він відсутній.
-    """
+    - action: типізована дія зі списком повідомлень (MessagePart); паузи та
+      human_seconds кожного повідомлення вже перевірені й обрізані валідатором.
+    - interrupt: подія нового повідомлення; між меседжами та під час пауз
+      перевіряємо її і не надсилаємо решту пачки, якщо вона спрацювала.
 
-    raw_messages = payload.get("messages")
-    if not raw_messages or not isinstance(raw_messages, Iterable) or isinstance(
-        raw_messages, (str, bytes)
-    ):
-        return
+    Повертає False, якщо решту пачки скасовано новим повідомленням, інакше True.
+    """
 
-    for raw_message in raw_messages:
-        if not isinstance(raw_message, dict):
-            continue
+    last_index = len(action.messages) - 1
+    # Один статус typing на всю пачку: між меседжами він не згасає і не
+    # мерехтить, а зникає разом з останнім повідомленням.
+    async with telegram.typing_session(chat_id) as typing:
+        for index, part in enumerate(action.messages):
+            content = part.content
 
-        content = raw_message.get("content")
-        if not content:
-            continue
+            # Пауза перед конкретним повідомленням, щоб зімітувати затримку між ними.
+            interrupted = await sleep_unless_interrupted(part.wait_seconds, interrupt)
 
-        message_wait_seconds = float(raw_message.get("wait_seconds", 0) or 0)
-        message_human_seconds = float(
-            raw_message.get("human_seconds", human_seconds) or human_seconds or 0
-        )
+            # Імітуємо набір саме цього меседжу.
+            if not interrupted:
+                interrupted = await telegram.send_typing(
+                    chat_id, part.human_seconds, interrupt=interrupt
+                )
 
-        # Пауза перед конкретним повідомленням, щоб зімітувати затримку між ними.
-        if message_wait_seconds > 0:
-            await asyncio.sleep(message_wait_seconds)
+            if interrupted:
+                print(f"✋ Решту пачки скасовано: користувач {user_id} написав нове повідомлення.")
+                return False
 
-        # Показуємо статус "typing" для кожного меседжу окремо.
-        await telegram.send_typing(chat_id, message_human_seconds)
+            if index == last_index:
+                # Утримання знімаємо до відправки — typing згасне разом з останнім меседжем.
+                typing.release()
 
-        try:
-            message = await telegram.send_message(chat_id, content)
-            message_time_iso = (
-                message.date.astimezone(timezone.utc).isoformat()
-                if getattr(message, "date", None)
-                else datetime.now(timezone.utc).isoformat()
-            )
-            message_id = getattr(message, "id", None)
-            # Фіксуємо кожне відправлене повідомлення бота в історії.
-            history.append_message(
-                user_id=user_id,
-                role="assistant",
-                content=content,
-                message_time_iso=message_time_iso,
-                message_id=message_id,
-            )
-        except Exception as exc:
-            # Не кидаємо помилку вище, щоб не зірвати відправку наступних меседжів.
-            print(
-                f"❌ Не вдалося відправити повідомлення користувачу {user_id}: {exc}"
-            )
+            try:
+                message = await telegram.send_message(chat_id, content)
+                message_time_iso = (
+                    message.date.astimezone(timezone.utc).isoformat()
+                    if getattr(message, "date", None)
+                    else datetime.now(timezone.utc).isoformat()
+                )
+                message_id = getattr(message, "id", None)
+                # Фіксуємо кожне відправлене повідомлення бота в історії.
+                history.append_message(
+                    user_id=user_id,
+                    role="assistant",
+                    content=content,
+                    message_time_iso=message_time_iso,
+                    message_id=message_id,
+                )
+            except Exception as exc:
+                # Не кидаємо помилку вище, щоб не зірвати відправку наступних меседжів.
+                print(
+                    f"❌ Не вдалося відправити повідомлення користувачу {user_id}: {exc}"
+                )
+    return True
@@ -2,9 +2,10 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict
+import asyncio
 
 from src.history.history_manager import HistoryManager
+from src.router.actions.schema import WaitAction
 from src.telegram_api.telegram_api import TelegramAPI
 
 
@@ -13,9 +14,9 @@ async def handle_wait(
     history: HistoryManager,
     chat_id: int,
     user_id: int,
-    payload: Dict[str, Any],
-    human_seconds: float,
-) -> None:
+    action: WaitAction,
+    interrupt: asyncio.Event | None = None,
+) -> bool:
     """Порожній хендлер для дії очікування без додаткових ефектів.
 
     Часова затримка для цієї дії уже обробляється на рівні LLMRouter
@@ -24,4 +25,4 @@ async def handle_wait(
     """
 
     # Намірено нічого не робимо, щоб лише зафіксувати коректність дії.
-    return
+    return True
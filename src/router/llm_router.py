@@ -5,22 +5,43 @@ from __future__ import annotations
 import asyncio
 import json
 import os
+import time
+from collections import Counter
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import Awaitable, Callable, Dict, List, Optional, Sequence
 
 from settings import (
     ACTIONS_SYSTEM_PROMPT,
+    ADAPTIVE_DEBOUNCE_ENABLED,
+    DEBOUNCE_RESET_ON_MESSAGE,
     DEBOUNCE_SECONDS,
     HISTORY_BASE_DIR,
+    INBOX_JOURNAL_ENABLED,
+    INBOX_JOURNAL_PATH,
+    ROUTER_INGEST_QUEUE_LIMIT,
+    ROUTER_PRIORITY_CHAT_IDS,
+    ROUTER_SHUTDOWN_GRACE_SECONDS,
+    LLM_FALLBACK_PROBE_EVERY,
+    LLM_JSON_REASK_ATTEMPTS,
+    LLM_LATENCY_BUDGET_BY_CHAT,
+    LLM_LATENCY_BUDGET_SECONDS,
+    LLM_RESPONSE_FORMAT,
+    PLAN_INTERRUPT_ENABLED,
+    SCHEDULER_ENABLED,
+    SCHEDULER_STATE_PATH,
+    SPECULATIVE_GENERATION_ENABLED,
     USER_INFO_FILENAME,
     USER_INFO_SYSTEM_PROMPT,
 )
 from src.history.history_manager import HistoryManager
-from src.llm_api.llm_api import LLMAPI
+from src.llm_api.llm_api import LLMAPI, LLMTimeoutError
+from src.llm_api.result import LLMResult
 from src.llm_api.utils.loader import load_optional_prompt
 from src.speech_to_text import SpeechResult, transcribe_voice
 from src.router.actions import (
+    Action,
+    ActionValidator,
     handle_add_reaction,
     handle_fake_typing,
     handle_ignore,
@@ -28,7 +49,21 @@ from src.router.actions import (
     handle_send_message,
     handle_wait,
 )
+from src.router.actions.schema import planned_seconds
+from src.router.utils.adaptive_debounce import AdaptiveDebounce, TypingCadence
+from src.router.utils.debounce_wheel import DebounceWheel
+from src.router.utils.inbox_journal import InboxJournal, JournalEntry
+from src.router.utils.inbox_policy import DROPPED, MERGED, InboxPolicy
+from src.router.utils.interrupt import is_interrupted, sleep_unless_interrupted
+from src.router.utils.json_repair import repair_json
+from src.router.utils.plan_graph import PlanStep, build_plan_graph
+from src.router.utils.response_format import JSON_MODE_INSTRUCTION, build_response_format
+from src.router.utils.speculation import Speculation, SpeculationBudget
+from src.router.utils.user_actor import ActorSystem
+from src.router.utils.user_state_store import UserStateStore
+from src.scheduler.action_scheduler import ActionScheduler
 from src.telegram_api.telegram_api import TelegramAPI
+from src.usage.usage_ledger import UsageLedger
 
 
 @dataclass
@@ -36,10 +71,38 @@ class UserState:
     """Стан одного користувача всередині роутера."""
 
     inbox: List["ReceivedMessage"] = field(default_factory=list)
+    # Скільки повідомлень прийнято з часу останнього циклу (разом зі склеєними
+    # та відкинутими) — стільки записів журналу забирає наступний цикл.
+    accepted: int = 0
+    # Склеєні з попереднім та відкинуті політикою inbox (або через перевантаження).
+    inbox_merged: int = 0
+    inbox_dropped: int = 0
     busy: bool = False
     last_activity: datetime | None = None
-    debounce_task: asyncio.Task | None = None
+    # Debounce уже спрацював, і запит на цикл лежить у скриньці актора.
+    cycle_queued: bool = False
+    # Темп набору користувача для адаптивного debounce.
+    cadence: TypingCadence = field(default_factory=TypingCadence)
+    # Спекулятивна генерація, запущена під час debounce (якщо ввімкнено).
+    speculation: Speculation | None = None
     last_chat_id: int | None = None
+    # Цикл перервався перезапуском процесу: повідомлення вже в історії, але
+    # відповіді ще не було — наступний цикл потрібен навіть з порожнім inbox.
+    resume_pending: bool = False
+    last_model_choice: "ModelChoice | None" = None
+    # Спрацьовує, коли під час виконання плану приходить нове повідомлення.
+    interrupt: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+@dataclass
+class ModelChoice:
+    """Фіксує, яку модель обрано для циклу і чому (для логів та аналізу)."""
+
+    model: str
+    reason: str
+    budget_seconds: float | None = None
+    expected_seconds: float | None = None
+    elapsed_seconds: float | None = None
 
 
 @dataclass
@@ -53,6 +116,36 @@ class ReceivedMessage:
     message_id: int | None
 
 
+@dataclass
+class InboundMessage:
+    """Вхідне повідомлення у скриньці актора користувача (ще не прийняте в inbox)."""
+
+    chat_id: int
+    content: str
+    msg_type: str
+    media_meta: dict | None
+    message_time: datetime
+    message_id: int | None
+
+
+@dataclass
+class CycleRequest:
+    """Запит на цикл діалогу у скриньці актора: debounce користувача завершився."""
+
+    chat_id: int
+
+
+def _parse_message_time(value: str | None) -> datetime:
+    """message_time_iso з журналу → datetime (зараз, якщо часу немає або він битий)."""
+
+    if value:
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            pass
+    return datetime.now(timezone.utc)
+
+
 class LLMRouter:
     """Роутер, який пов'язує Telegram, історію та LLM (Grok 4 Fast)."""
 
@@ -62,28 +155,62 @@ class LLMRouter:
         llm_api: LLMAPI,
         history_manager: HistoryManager,
         system_prompt: str,
+        usage_ledger: UsageLedger | None = None,
+        shard_id: int | None = None,
     ) -> None:
-        """Зберігає залежності й готує словник станів користувачів."""
+        """Зберігає залежності й готує словник станів користувачів.
+
+        shard_id передається лише в режимі кількох процесів: тоді файли стану
+        (відкладені дії, журнал inbox) у кожного шарду свої.
+        """
 
         self.telegram = telegram_api
         self.llm = llm_api
         self.history = history_manager
         self.system_prompt = system_prompt
+        self.shard_id = shard_id
+        # Журнал витрат токенів/затримок по кожному виклику LLM.
+        self.usage_ledger = usage_ledger or UsageLedger()
+        # Структурований вивід для провайдера (None — вимкнено).
+        self.response_format = build_response_format(LLM_RESPONSE_FORMAT)
+        # Лічильники успішності розбору відповідей LLM (ok/repaired/reask_ok/failed).
+        self.parse_stats: Counter = Counter()
+        # Валідатор схеми дій: сирі dict-и → типізовані об'єкти (свої лічильники в .stats).
+        self.action_validator = ActionValidator()
+        # Метрики переривання планів: plans, interrupted, dropped_actions, saved_seconds.
+        self.plan_stats: Counter = Counter()
+        # Планувальник відкладених дій; створюється в start() лише в основному процесі.
+        self.scheduler: ActionScheduler | None = None
+        # Журнал inbox для відновлення після перезапуску; теж лише в основному процесі.
+        self.inbox_journal: InboxJournal | None = None
+        # Один debounce-двигун на всіх користувачів.
+        self.debounce = DebounceWheel(on_due=self._on_debounce_due)
+        self.adaptive_debounce = AdaptiveDebounce() if ADAPTIVE_DEBOUNCE_ENABLED else None
+        # Спекулятивна генерація: started, hits, misses, deferred, skipped_budget, wasted_tokens, saved_seconds.
+        self.speculation_budget = SpeculationBudget()
+        # Скільки разів прогноз радив резервну модель (для проб основної).
+        self._predicted_fallbacks = 0
+        self.speculation_stats: Counter = Counter()
+        # Актори користувачів: прийом повідомлень і цикли одного користувача
+        # виконуються строго по черзі, а загальна паралельність обмежена.
+        self.actors = ActorSystem(handler=self._handle_actor_message)
+        # Обмеження inbox під час флуду та лічильники: merged, dropped, shed.
+        self.inbox_policy = InboxPolicy()
+        self.inbox_stats: Counter = Counter()
         self.actions_prompt: Optional[str] = None
 
-        self._state: Dict[int, UserState] = {}
-        # Реєстр доступних хендлерів для різних типів дій.
+        # Стани користувачів з вивантаженням неактивних (idle TTL + LRU-ліміт).
+        self._states: UserStateStore[UserState] = UserStateStore(
+            factory=UserState, can_evict=self._can_evict_state
+        )
+        # Реєстр хендлерів за нормалізованим типом дії (аліаси розв'язує валідатор).
         self._action_handlers: Dict[
             str,
-            Callable[
-                [TelegramAPI, HistoryManager, int, int, dict, float],
-                Awaitable[None],
-            ],
+            Callable[[TelegramAPI, HistoryManager, int, int, Action], Awaitable[bool]],
         ] = {
             "send_message": handle_send_message,
             "send_messages": handle_send_messages,
             "add_reaction": handle_add_reaction,
-            "react_to_message": handle_add_reaction,
             "fake_typing": handle_fake_typing,
             "ignore": handle_ignore,
             "wait": handle_wait,
@@ -93,6 +220,124 @@ class LLMRouter:
         if ACTIONS_SYSTEM_PROMPT:
             self.actions_prompt = load_optional_prompt("actions")
 
+    async def start(self) -> None:
+        """Запускає фонові служби роутера (планувальник відкладених дій, журнал inbox).
+
+        Адмін-консоль start() не викликає, тому там дії виконуються одразу.
+        """
+
+        if SCHEDULER_ENABLED and self.scheduler is None:
+            self.scheduler = ActionScheduler(
+                executor=self._run_scheduled_action, path=self._state_path(SCHEDULER_STATE_PATH)
+            )
+            await self.scheduler.start()
+        if INBOX_JOURNAL_ENABLED and self.inbox_journal is None:
+            self.inbox_journal = InboxJournal(path=self._state_path(INBOX_JOURNAL_PATH))
+            await self._restore_inbox(self.inbox_journal.replay())
+
+    async def stop(self, grace_seconds: float = ROUTER_SHUTDOWN_GRACE_SECONDS) -> None:
+        """Зупиняє роутер: нові цикли не стартують, поточні дообробляються, стан зберігається.
+
+        Викликається до client.disconnect(), поки дії ще можна відправити.
+        Що не встигло за grace_seconds, лишається в журналі inbox і на диску
+        планувальника — після перезапуску це буде оброблено.
+        """
+
+        # Debounce більше не спрацьовує — нових циклів не буде.
+        await self.debounce.stop()
+        if grace_seconds > 0 and not await self.actors.drain(grace_seconds):
+            print(f"⏳ Актори не завершили роботу за {grace_seconds} с — решту відновить журнал inbox.")
+        await self.actors.stop()
+        if self.scheduler is not None:
+            await self.scheduler.stop()
+            self.scheduler = None
+        if self.inbox_journal is not None:
+            self.inbox_journal.close()
+            self.inbox_journal = None
+        self.print_stats()
+        print("🛑 Роутер зупинено.")
+
+    def print_stats(self) -> None:
+        """Друкує підсумкові лічильники роутера (викликається при зупинці)."""
+
+        spec = self.speculation_stats
+        started = spec["started"]
+        hit_rate = spec["hits"] / started if started else 0.0
+        print(
+            f"🔮 Спекуляція: {spec['hits']} влучань з {started} запусків ({hit_rate:.0%}), "
+            f"промахів {spec['misses']}, відкладено {spec['deferred']}, "
+            f"пропущено через бюджет {spec['skipped_budget']}; "
+            f"змарновано {spec['wasted_tokens']} токенів, заощаджено {spec['saved_seconds']:.1f} с."
+        )
+        plans = self.plan_stats
+        print(
+            f"🗂️ Плани дій: {plans['plans']}, перервано {plans['interrupted']} "
+            f"(скинуто {plans['dropped_actions']} дій, заощаджено {plans['saved_seconds']:.1f} с), "
+            f"паралельне виконання заощадило {plans['parallel_saved_seconds']:.1f} с."
+        )
+        states = self.state_metrics()
+        print(
+            f"🧠 Стани користувачів: живих {states['live_states']} "
+            f"(~{states['approx_bytes'] / 1024:.0f} КБ), створено {states.get('created', 0)}, "
+            f"вивантажено неактивних {states.get('evicted_idle', 0)}, за LRU {states.get('evicted_lru', 0)}."
+        )
+
+    def _state_path(self, path: str) -> str:
+        """Шлях до файлу стану з урахуванням шарду (pending.json → pending.shard-2.json)."""
+
+        if self.shard_id is None:
+            return path
+        root, ext = os.path.splitext(path)
+        return f"{root}.shard-{self.shard_id}{ext}"
+
+    async def record_reaction(
+        self, user_id: int, message_id: int | None, emoji: str, message_time_iso: str
+    ) -> None:
+        """Фіксує в історії реакцію користувача на наше повідомлення."""
+
+        # Формат читається як людьми, так і LLM; message_id зв'язує реакцію з меседжем.
+        self.history.append_message(
+            user_id=user_id,
+            role="user",
+            content=f"[REACTION] '{emoji}' on message_id = {message_id}",
+            message_time_iso=message_time_iso,
+            message_id=message_id,
+        )
+
+    async def _restore_inbox(self, entries: Sequence[JournalEntry]) -> None:
+        """Повертає повідомлення з журналу акторам, ніби вони щойно надійшли.
+
+        Медіа при цьому обробляються заново (наприклад, voice розпізнається ще
+        раз), а користувачам з перерваним циклом цикл запускається навіть без
+        нових повідомлень.
+        """
+
+        restored_messages = 0
+        for entry in entries:
+            state = self._get_state(entry.user_id)
+            state.last_chat_id = entry.chat_id
+            state.resume_pending = entry.cycle_started_at is not None
+            for message in entry.messages:
+                await self.actors.send(
+                    entry.user_id,
+                    InboundMessage(
+                        chat_id=entry.chat_id,
+                        content=message.get("content") or "",
+                        msg_type=message.get("msg_type") or "text",
+                        media_meta=message.get("media_meta") or {},
+                        message_time=_parse_message_time(message.get("message_time_iso")),
+                        message_id=message.get("message_id"),
+                    ),
+                )
+                restored_messages += 1
+            if not entry.messages:
+                self._start_debounce(entry.user_id, entry.chat_id)
+
+        if entries:
+            print(
+                f"♻️ Відновлено з журналу inbox: користувачів {len(entries)}, повідомлень {restored_messages}."
+            )
+
     async def handle_incoming_message(
         self,
         user_id: int,
@@ -102,14 +347,114 @@ class LLMRouter:
         media_meta: dict | None,
         message_time: datetime,
         message_id: int | None = None,
-    ) -> None:
-        """Реєструє нове повідомлення та за потреби запускає debounce.
+        prepare_media: bool = False,
+    ) -> bool:
+        """Передає нове повідомлення актору користувача.
 
         content вже містить стислий опис медіа (для не тексту), msg_type визначає
         тип повідомлення, а message_id передаємо, щоб зберегти у історії точний
-        зв'язок із Telegram.
+        зв'язок із Telegram. Якщо скринька актора повна, чекаємо на місце.
+        Коли ж у скриньках усіх акторів забагато повідомлень, неприорітетні
+        чати відкидаються одразу — метод повертає False, і TelegramAPI не
+        позначає таке повідомлення прочитаним (його підтягне sync_unread).
+
+        prepare_media=True (конвеєр прийому TelegramAPI) — voice розпізнається
+        тут, уже після журналу та сигналу переривання, а не в слоті актора.
+        """
+
+        if (
+            self.actors.queued >= ROUTER_INGEST_QUEUE_LIMIT
+            and chat_id not in ROUTER_PRIORITY_CHAT_IDS
+        ):
+            # Стан не створюємо: під флудом не заводимо пам'ять на тих, кого не обслуговуємо.
+            if user_id in self._states:
+                self._get_state(user_id).inbox_dropped += 1
+            self.inbox_stats["shed"] += 1
+            print(f"🚧 Перевантаження ({self.actors.queued} у черзі) — повідомлення від {user_id} відкинуто.")
+            return False
+
+        state = self._get_state(user_id)
+        if self.inbox_journal is not None:
+            # Журналюємо ще до скриньки актора: після аварії повідомлення пройде прийом заново.
+            self.inbox_journal.record_message(
+                user_id,
+                chat_id,
+                {
+                    "content": content,
+                    "msg_type": msg_type,
+                    "media_meta": media_meta or {},
+                    "message_time_iso": message_time.astimezone(timezone.utc).isoformat(),
+                    "message_id": message_id,
+                },
+            )
+        if PLAN_INTERRUPT_ENABLED and state.busy and not state.interrupt.is_set():
+            # Цикл ще виконується — просимо план зупинитися на найближчій безпечній
+            # точці; саме повідомлення актор прийме одразу після циклу.
+            state.interrupt.set()
+            print(f"✋ Нове повідомлення від {user_id} — переривую поточний план дій.")
+
+        if prepare_media:
+            content, media_meta = await self._prepare_incoming_media(
+                chat_id=chat_id,
+                content=content,
+                msg_type=msg_type,
+                media_meta=media_meta,
+                message_id=message_id,
+            )
+
+        await self.actors.send(
+            user_id,
+            InboundMessage(
+                chat_id=chat_id,
+                content=content,
+                msg_type=msg_type,
+                media_meta=media_meta,
+                message_time=message_time,
+                message_id=message_id,
+            ),
+        )
+        return True
+
+    async def _prepare_incoming_media(
+        self,
+        chat_id: int,
+        content: str,
+        msg_type: str,
+        media_meta: dict | None,
+        message_id: int | None = None,
+    ) -> tuple[str, dict | None]:
+        """Завантажує та розпізнає медіа ще до передачі повідомлення актору.
+
+        Працює у воркері конвеєра прийому TelegramAPI: так важке STT обмежене
+        пулом прийому і не займає слот актора, потрібний циклам діалогу.
+        Підготовлений voice позначається `prepared`, щоб актор не розпізнавав
+        його вдруге (у журналі лишається сирий запис — після аварії voice
+        розпізнається заново).
         """
 
+        if msg_type != "voice":
+            return content, media_meta
+        prepared_text, prepared_media_meta = await self._prepare_voice_content(
+            chat_id=chat_id,
+            media_meta=media_meta,
+            message_id=message_id,
+        )
+        prepared_media_meta["prepared"] = True
+        return prepared_text, prepared_media_meta
+
+    async def _handle_actor_message(
+        self, user_id: int, message: InboundMessage | CycleRequest
+    ) -> None:
+        """Обробник скриньки актора: прийом повідомлення або цикл діалогу."""
+
+        if isinstance(message, CycleRequest):
+            await self._start_cycle_after_debounce(user_id, message.chat_id)
+        else:
+            await self._accept_incoming_message(user_id, message)
+
+    async def _accept_incoming_message(self, user_id: int, message: InboundMessage) -> None:
+        """Кладе повідомлення в inbox (з розпізнаванням медіа) і заводить debounce."""
+
         handlers_map = {
             "text": self._handle_text_message,
             "voice": self._handle_voice_message,
@@ -120,17 +465,18 @@ class LLMRouter:
             "photo": self._handle_photo_message,
         }
 
-        handler = handlers_map.get(msg_type, self._handle_text_message)
+        self._get_state(user_id).accepted += 1
+        handler = handlers_map.get(message.msg_type, self._handle_text_message)
         await handler(
             user_id=user_id,
-            chat_id=chat_id,
-            content=content,
-            media_meta=media_meta,
-            message_time=message_time,
-            message_id=message_id,
-            msg_type=msg_type,
+            chat_id=message.chat_id,
+            content=message.content,
+            media_meta=message.media_meta,
+            message_time=message.message_time,
+            message_id=message.message_id,
+            msg_type=message.msg_type,
         )
-        self._maybe_start_processing(user_id=user_id, chat_id=chat_id)
+        self._maybe_start_processing(user_id=user_id, chat_id=message.chat_id)
 
     async def _handle_text_message(
         self,
@@ -173,7 +519,8 @@ class LLMRouter:
         chat_id: int
             Чат, з якого прийшло голосове повідомлення (потрібен для завантаження файла).
         content: str
-            Початковий опис voice з TelegramAPI (потрібен лише для сумісності сигнатури).
+            Опис voice з TelegramAPI; якщо voice уже розпізнано в конвеєрі
+            прийому (media_meta["prepared"]), це готовий текст із транскрипцією.
         media_meta: dict | None
             Метадані voice (тривалість, file_id тощо), доповнюються інформацією про транскрипцію.
         message_time: datetime
@@ -184,11 +531,15 @@ class LLMRouter:
             Тип повідомлення ("voice").
         """
 
-        prepared_text, prepared_media_meta = await self._prepare_voice_content(
-            chat_id=chat_id,
-            media_meta=media_meta,
-            message_id=message_id,
-        )
+        if (media_meta or {}).get("prepared"):
+            # Уже розпізнано в конвеєрі прийому (prepare_incoming_media).
+            prepared_text, prepared_media_meta = content, media_meta
+        else:
+            prepared_text, prepared_media_meta = await self._prepare_voice_content(
+                chat_id=chat_id,
+                media_meta=media_meta,
+                message_id=message_id,
+            )
 
         self._register_inbox_message(
             user_id=user_id,
@@ -394,75 +745,155 @@ class LLMRouter:
 
         state = self._get_state(user_id)
         message_time_iso = message_time.astimezone(timezone.utc).isoformat()
-        state.inbox.append(
+        outcome = self.inbox_policy.add(
+            state.inbox,
             ReceivedMessage(
                 content=content,
                 msg_type=msg_type,
                 media_meta=media_meta or {},
                 message_time_iso=message_time_iso,
                 message_id=message_id,
-            )
+            ),
         )
+        if outcome == MERGED:
+            state.inbox_merged += 1
+            self.inbox_stats["merged"] += 1
+        elif outcome == DROPPED:
+            state.inbox_dropped += 1
+            self.inbox_stats["dropped"] += 1
+            print(f"🚧 Inbox {user_id} переповнений — повідомлення ({msg_type}) відкинуто.")
         state.last_activity = datetime.now(timezone.utc)
         state.last_chat_id = chat_id
-        print(f"🧠 Додано повідомлення від {user_id} ({msg_type}): {content}")
+        if self.adaptive_debounce is not None:
+            if not state.cadence.seeded:
+                self.adaptive_debounce.seed_from_history(
+                    state.cadence, self.history.get_recent_context(user_id)
+                )
+            self.adaptive_debounce.observe(state.cadence, time.time())
+        if outcome != DROPPED:
+            print(f"🧠 Додано повідомлення від {user_id} ({msg_type}): {content}")
 
     def _maybe_start_processing(self, user_id: int, chat_id: int) -> None:
         """Приймає рішення, чи потрібно запускати debounce/цикл обробки."""
 
         state = self._get_state(user_id)
 
-        if state.busy:
-            print(f"⏳ Користувач {user_id} вже обробляється. Чекаємо завершення поточного циклу.")
+        if PLAN_INTERRUPT_ENABLED and self.scheduler is not None:
+            # Заплановані, але ще не виконані дії вже неактуальні — знімаємо їх.
+            dropped = self.scheduler.cancel(user_id)
+            if dropped is not None or self.scheduler.is_running(user_id):
+                state.interrupt.set()
+            if dropped is not None:
+                # Якщо перша з решти дій ще чекала в купі — частину паузи вже відміряно.
+                waited = 0.0
+                if not dropped.in_flight:
+                    first = dropped.actions[0]
+                    waited = first.wait_seconds - max(0.0, dropped.due_at - time.time())
+                self._record_plan_interrupt(user_id, list(dropped.actions), spent_seconds=waited)
+
+        if state.cycle_queued:
+            print(f"⌚ Цикл для {user_id} уже в черзі — повідомлення потрапить у пакет.")
             return
 
-        if state.debounce_task and not state.debounce_task.done():
+        if not self.debounce.is_pending(user_id) or self._adaptive_window(state):
+            self._start_debounce(user_id, chat_id)
+        elif DEBOUNCE_RESET_ON_MESSAGE:
+            self.debounce.arm(user_id, chat_id, DEBOUNCE_SECONDS)
+            print(f"⌚ Debounce для {user_id} перенесено на {DEBOUNCE_SECONDS} с.")
+        else:
             print(f"⌚ Debounce вже запущений для {user_id} — новий не стартує.")
-            return
 
-        self._start_debounce(user_id, chat_id)
+        if SPECULATIVE_GENERATION_ENABLED:
+            self._start_speculation(user_id, chat_id)
 
     def _get_state(self, user_id: int) -> UserState:
         """Повертає (або створює) стан користувача."""
 
-        if user_id not in self._state:
-            self._state[user_id] = UserState()
-        return self._state[user_id]
+        return self._states.get(user_id)
+
+    def _can_evict_state(self, user_id: int, state: UserState) -> bool:
+        """Стан можна вивантажити, лише якщо в ньому немає незавершеної роботи."""
+
+        if state.inbox or state.busy or state.cycle_queued or state.resume_pending:
+            return False
+        if state.speculation is not None:
+            return False
+        if self.debounce.is_pending(user_id) or self.actors.has_work(user_id):
+            return False
+        if self.scheduler is not None and (
+            self.scheduler.has_pending(user_id) or self.scheduler.is_running(user_id)
+        ):
+            return False
+        return True
+
+    def state_metrics(self) -> Dict[str, int]:
+        """Метрики пам'яті роутера: живі стани, вивантаження та приблизний обсяг."""
+
+        return {
+            "live_states": len(self._states),
+            "approx_bytes": self._states.approx_bytes(),
+            **self._states.stats,
+        }
 
     def _start_debounce(self, user_id: int, chat_id: int) -> None:
-        """Створює asyncio-задачу debounce для конкретного користувача."""
+        """Заводить debounce користувача в спільному колесі таймерів.
+
+        В адаптивному режимі (коли вибірка пауз користувача вже достатня)
+        кожне повідомлення переносить таймер на вікно, розраховане з темпу
+        набору. Інакше — звичайне вікно DEBOUNCE_SECONDS від першого повідомлення.
+        """
 
         state = self._get_state(user_id)
-        if state.debounce_task and not state.debounce_task.done():
+        if not self._adaptive_window(state):
+            self.debounce.arm(user_id, chat_id, DEBOUNCE_SECONDS, reset=False)
             return
 
-        state.debounce_task = asyncio.create_task(
-            self._debounce_and_start_cycle(user_id, chat_id)
+        delay = self.adaptive_debounce.delay_for(state.cadence, time.time())
+        self.debounce.arm(user_id, chat_id, delay)
+        print(f"⌚ Адаптивний debounce для {user_id}: {delay:.1f} с.")
+
+    def _adaptive_window(self, state: UserState) -> bool:
+        """Чи рахувати debounce користувача адаптивно (увімкнено й вибірка достатня)."""
+
+        return self.adaptive_debounce is not None and self.adaptive_debounce.is_calibrated(
+            state.cadence
         )
 
-    async def _debounce_and_start_cycle(self, user_id: int, chat_id: int) -> None:
-        """Чекає DEBOUNCE_SECONDS, потім запускає цикл діалогу."""
+    def _on_debounce_due(self, batch: List[tuple]) -> None:
+        """Колбек колеса таймерів: кладе запит на цикл у скриньки акторів."""
 
-        try:
-            await asyncio.sleep(DEBOUNCE_SECONDS)
+        for user_id, chat_id in batch:
             state = self._get_state(user_id)
-            state.debounce_task = None
+            if state.cycle_queued:
+                continue
+            if self.actors.try_send(user_id, CycleRequest(chat_id=chat_id)):
+                state.cycle_queued = True
+            else:
+                # Скринька повна вхідними — останнє з них знову заведе debounce.
+                print(f"⚠️ Скринька {user_id} переповнена, цикл відкладено до наступного повідомлення.")
+
+    async def _start_cycle_after_debounce(self, user_id: int, chat_id: int) -> None:
+        """Запускає цикл діалогу після того, як debounce спрацював."""
+
+        state = self._get_state(user_id)
+        state.cycle_queued = False
+        try:
             target_chat_id = state.last_chat_id or chat_id
             if not target_chat_id:
                 print(f"⚠️ Немає chat_id для користувача {user_id}. Пропускаю цикл.")
                 return
             await self._run_dialog_cycle(user_id, target_chat_id)
         except asyncio.CancelledError:
-            print(f"🛑 Debounce скасовано для користувача {user_id}.")
+            print(f"🛑 Цикл скасовано для користувача {user_id}.")
             raise
         except Exception as exc:
-            print(f"❌ Помилка у debounce для {user_id}: {exc}")
+            print(f"❌ Помилка у циклі для {user_id}: {exc}")
 
     async def _run_dialog_cycle(self, user_id: int, chat_id: int) -> None:
         """Основний цикл: історія → Grok → typing → відправка відповіді."""
 
         state = self._get_state(user_id)
-        if not state.inbox:
+        if not state.inbox and not state.resume_pending:
             print(f"📭 Inbox порожній для {user_id}, нічого обробляти.")
             state.busy = False
             return
@@ -471,6 +902,12 @@ class LLMRouter:
         try:
             batch_messages = list(state.inbox)
             state.inbox.clear()
+            accepted, merged, dropped = state.accepted, state.inbox_merged, state.inbox_dropped
+            state.accepted = state.inbox_merged = state.inbox_dropped = 0
+            # Усе, що прийшло до цього моменту, вже в пакеті — план поки актуальний.
+            state.interrupt.clear()
+            if self.adaptive_debounce is not None:
+                self.adaptive_debounce.close_batch(state.cadence)
             print(f"📦 Пакет із {len(batch_messages)} повідомлень для користувача {user_id}.")
 
             for message in batch_messages:
@@ -481,11 +918,35 @@ class LLMRouter:
                     message_time_iso=message.message_time_iso,
                     message_id=message.message_id,
                 )
+            if dropped:
+                # LLM має знати, що частину флуду не показано (склеєне видно і так).
+                self.history.append_message(
+                    user_id=user_id,
+                    role="user",
+                    content=f"[INBOX] merged {merged} messages, dropped {dropped} (flood protection)",
+                    message_time_iso=datetime.now(timezone.utc).isoformat(),
+                )
+            # Пакет уже в історії: після перезапуску з цього місця потрібен лише новий цикл.
+            state.resume_pending = False
+            if self.inbox_journal is not None:
+                self.inbox_journal.record_cycle_start(user_id, chat_id, accepted)
 
             messages_for_llm = self._build_llm_messages(user_id=user_id)
+            chosen_model: str | None = None
 
             try:
-                answer_raw = await asyncio.to_thread(self.llm.generate, messages_for_llm)
+                result, choice = await self._generate_for_cycle(
+                    user_id=user_id, chat_id=chat_id, messages_for_llm=messages_for_llm
+                )
+                answer_raw = result.content
+                chosen_model = choice.model
+                state.last_model_choice = choice
+                self._record_usage(user_id, result, kind="dialog", reason=choice.reason)
+                print(
+                    f"🎛️ Модель для {user_id}: {choice.model} | причина: {choice.reason}"
+                    f" | бюджет={choice.budget_seconds} | прогноз={choice.expected_seconds}"
+                    f" | фактично={choice.elapsed_seconds}"
+                )
             except Exception as exc:
                 print(f"❌ Помилка при виклику LLM для {user_id}: {exc}")
                 answer_raw = "[]"
@@ -501,23 +962,229 @@ class LLMRouter:
                 print(answer_raw)
             print("====================================================\n")
 
-            actions = self._parse_actions(answer_raw)
-            await self._execute_actions(chat_id=chat_id, user_id=user_id, actions=actions)
+            actions = await self._resolve_actions(
+                user_id=user_id,
+                messages_for_llm=messages_for_llm,
+                answer_raw=answer_raw,
+                model=chosen_model,
+            )
+            await self._dispatch_plan(chat_id=chat_id, user_id=user_id, actions=actions)
+            if self.inbox_journal is not None:
+                self.inbox_journal.record_cycle_done(user_id)
         finally:
             state.busy = False
-        if state.inbox:
-            print(
-                f"🔁 Після відповіді у {user_id} залишилися нові повідомлення. Запускаю новий debounce."
-            )
-            next_chat_id = state.last_chat_id or chat_id
-            if next_chat_id:
-                self._start_debounce(user_id, next_chat_id)
+        # Повідомлення, що прийшли під час циклу, чекають у скриньці актора —
+        # він прийме їх одразу після повернення звідси і заведе новий debounce.
+        print(f"🟢 Цикл завершено для {user_id}.")
+
+    async def _generate_for_cycle(
+        self, user_id: int, chat_id: int, messages_for_llm: List[dict]
+    ) -> tuple[LLMResult, ModelChoice]:
+        """Бере готову спекулятивну відповідь, якщо вона для тих самих повідомлень.
+
+        Інакше (або якщо спекуляція впала) генерує відповідь звичайним шляхом.
+        """
+
+        state = self._get_state(user_id)
+        speculation = state.speculation
+        state.speculation = None
+        if speculation is not None and speculation.discarded:
+            # Викинута генерація ще йде — цикл її не чекає, і перезапуск уже не потрібен.
+            speculation.restart_chat_id = None
+            speculation = None
+
+        if speculation is not None and speculation.messages == messages_for_llm:
+            cycle_started = asyncio.get_running_loop().time()
+            try:
+                result, choice = await speculation.task
+            except Exception as exc:
+                print(f"⚠️ Спекулятивна генерація для {user_id} впала: {exc}. Генерую заново.")
             else:
+                finished_at = speculation.finished_at or cycle_started
+                saved = max(0.0, min(cycle_started, finished_at) - speculation.started_at)
+                self.speculation_stats["hits"] += 1
+                self.speculation_stats["saved_seconds"] += round(saved, 3)
+                print(f"🔮 Спекуляція влучила для {user_id}: зекономлено {saved:.1f} с.")
+                choice.reason = f"speculative_{choice.reason}"
+                return result, choice
+        elif speculation is not None:
+            self._discard_speculation(user_id, speculation)
+
+        return await self._generate_with_budget(chat_id=chat_id, messages_for_llm=messages_for_llm)
+
+    def _start_speculation(self, user_id: int, chat_id: int) -> None:
+        """Запускає генерацію з поточним inbox, поки триває debounce."""
+
+        state = self._get_state(user_id)
+        previous = state.speculation
+        if previous is not None:
+            # Прийшло нове повідомлення — попередня спекуляція вже неактуальна.
+            if not previous.discarded:
+                self._discard_speculation(user_id, previous)
+            if not previous.task.done():
+                # Не більше однієї генерації на користувача: нова стартує, коли ця завершиться.
+                previous.restart_chat_id = chat_id
+                self.speculation_stats["deferred"] += 1
+                return
+            state.speculation = None
+
+        if not state.inbox:
+            return
+        if not self.speculation_budget.allows(user_id):
+            self.speculation_stats["skipped_budget"] += 1
+            return
+
+        messages_for_llm = self._build_llm_messages(user_id=user_id, pending=state.inbox)
+        loop = asyncio.get_running_loop()
+        task = asyncio.create_task(
+            self._generate_with_budget(chat_id=chat_id, messages_for_llm=messages_for_llm)
+        )
+        speculation = Speculation(messages=messages_for_llm, task=task, started_at=loop.time())
+        task.add_done_callback(
+            lambda _task: self._on_speculation_done(user_id, speculation, loop.time())
+        )
+        state.speculation = speculation
+        self.speculation_stats["started"] += 1
+
+    def _discard_speculation(self, user_id: int, speculation: Speculation) -> None:
+        """Позначає спекуляцію викинутою; токени рахуються, коли вона завершиться."""
+
+        speculation.discarded = True
+        self.speculation_stats["misses"] += 1
+        if speculation.task.done():
+            self._count_wasted_speculation(user_id, speculation)
+
+    def _on_speculation_done(self, user_id: int, speculation: Speculation, finished_at: float) -> None:
+        speculation.finished_at = finished_at
+        if speculation.discarded:
+            self._count_wasted_speculation(user_id, speculation)
+
+        if user_id not in self._states or speculation.restart_chat_id is None:
+            return
+        state = self._get_state(user_id)
+        if state.speculation is not speculation:
+            return
+        # Поки йшла викинута генерація, прийшли нові повідомлення — спекулюємо
+        # з актуальним inbox, якщо debounce ще не закінчився.
+        state.speculation = None
+        if self.debounce.is_pending(user_id) and not state.cycle_queued:
+            self._start_speculation(user_id, speculation.restart_chat_id)
+
+    def _count_wasted_speculation(self, user_id: int, speculation: Speculation) -> None:
+        """Додає токени викинутої спекуляції до бюджету та журналу usage."""
+
+        if speculation.waste_counted:
+            return
+        speculation.waste_counted = True
+        task = speculation.task
+        if task.cancelled() or task.exception() is not None:
+            return
+
+        result, choice = task.result()
+        tokens = result.usage.total_tokens
+        self.speculation_budget.add_waste(user_id, tokens)
+        self.speculation_stats["wasted_tokens"] += tokens
+        self._record_usage(user_id, result, kind="speculative_wasted", reason=choice.reason)
+
+    def _record_usage(
+        self, user_id: int, result: LLMResult, kind: str, reason: str | None = None
+    ) -> None:
+        """Дописує витрати одного виклику LLM у журнал usage."""
+
+        self.usage_ledger.record(
+            user_id=user_id,
+            model=result.model,
+            prompt_tokens=result.usage.prompt_tokens,
+            completion_tokens=result.usage.completion_tokens,
+            cached_tokens=result.usage.cached_tokens,
+            wall_seconds=result.wall_seconds,
+            server_seconds=result.server_seconds,
+            kind=kind,
+            reason=reason,
+        )
+
+    def _latency_budget_for(self, chat_id: int) -> float | None:
+        """Повертає бюджет затримки LLM для чату (індивідуальний або загальний)."""
+
+        return LLM_LATENCY_BUDGET_BY_CHAT.get(chat_id, LLM_LATENCY_BUDGET_SECONDS)
+
+    async def _generate_with_budget(
+        self, chat_id: int, messages_for_llm: List[dict]
+    ) -> tuple[LLMResult, ModelChoice]:
+        """Викликає LLM з урахуванням бюджету затримки для чату.
+
+        Якщо прогноз затримки основної моделі на поточній глибині черги вже
+        перевищує бюджет — одразу йдемо в резервну модель. Інакше пробуємо
+        основну з таймаутом, рівним бюджету, і переходимо на резервну лише
+        після таймауту. Кожен LLM_FALLBACK_PROBE_EVERY-й виклик із прогнозом
+        "резервна" все одно пробує основну (primary_probe), щоб прогноз
+        оновлювався, а не застигав на старих таймаутах.
+        """
+
+        primary_model = self.llm.model
+        fallback_model = self.llm.fallback_model
+        budget = self._latency_budget_for(chat_id)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+
+        if budget is None or not fallback_model or fallback_model == primary_model:
+            result = await asyncio.to_thread(
+                self.llm.generate, messages_for_llm, response_format=self.response_format
+            )
+            return result, ModelChoice(
+                model=primary_model,
+                reason="primary",
+                budget_seconds=budget,
+                elapsed_seconds=round(loop.time() - started, 3),
+            )
+
+        depth = self.llm.in_flight
+        expected = self.llm.latency.estimate(primary_model, depth)
+
+        probe = False
+        if expected is not None and expected > budget:
+            self._predicted_fallbacks += 1
+            probe = self._predicted_fallbacks % LLM_FALLBACK_PROBE_EVERY == 0
+        if expected is not None and expected > budget and not probe:
+            reason = "fallback_predicted"
+        else:
+            try:
+                result = await asyncio.wait_for(
+                    asyncio.to_thread(
+                        self.llm.generate,
+                        messages_for_llm,
+                        model=primary_model,
+                        timeout=budget,
+                        response_format=self.response_format,
+                    ),
+                    timeout=budget,
+                )
+                return result, ModelChoice(
+                    model=primary_model,
+                    reason="primary_probe" if probe else "primary_within_budget",
+                    budget_seconds=budget,
+                    expected_seconds=expected,
+                    elapsed_seconds=round(loop.time() - started, 3),
+                )
+            except (asyncio.TimeoutError, LLMTimeoutError):
+                reason = "fallback_timeout"
                 print(
-                    f"⚠️ Не вдалося визначити chat_id для нового циклу користувача {user_id}."
+                    f"⏱️ Основна модель {primary_model} не вклалась у {budget}с, перемикаюсь на {fallback_model}."
                 )
-        else:
-            print(f"🟢 Цикл завершено для {user_id}.")
+
+        result = await asyncio.to_thread(
+            self.llm.generate,
+            messages_for_llm,
+            model=fallback_model,
+            response_format=self.response_format,
+        )
+        return result, ModelChoice(
+            model=fallback_model,
+            reason=reason,
+            budget_seconds=budget,
+            expected_seconds=expected,
+            elapsed_seconds=round(loop.time() - started, 3),
+        )
 
     async def trigger_proactive_message(
         self, user_id: int, chat_id: int, instruction: str = "Напиши повідомлення цьому користувачу"
@@ -534,7 +1201,11 @@ class LLMRouter:
         messages_for_llm.append({"role": "system", "content": proactive_instruction})
 
         try:
-            answer_raw = await asyncio.to_thread(self.llm.generate, messages_for_llm)
+            result = await asyncio.to_thread(
+                self.llm.generate, messages_for_llm, response_format=self.response_format
+            )
+            answer_raw = result.content
+            self._record_usage(user_id, result, kind="proactive")
         except Exception as exc:
             print(f"❌ Помилка при виклику LLM (proactive) для {user_id}: {exc}")
             answer_raw = "[]"
@@ -548,7 +1219,9 @@ class LLMRouter:
             print(answer_raw)
         print("==============================================================\n")
 
-        actions = self._parse_actions(answer_raw)
+        actions = await self._resolve_actions(
+            user_id=user_id, messages_for_llm=messages_for_llm, answer_raw=answer_raw
+        )
         await self._execute_actions(chat_id=chat_id, user_id=user_id, actions=actions)
 
     async def send_single_message_proactively(
@@ -573,7 +1246,11 @@ class LLMRouter:
         messages_for_llm.append({"role": "system", "content": proactive_instruction})
 
         try:
-            answer_raw = await asyncio.to_thread(self.llm.generate, messages_for_llm)
+            result = await asyncio.to_thread(
+                self.llm.generate, messages_for_llm, response_format=self.response_format
+            )
+            answer_raw = result.content
+            self._record_usage(user_id, result, kind="admin_proactive")
         except Exception as exc:
             print(f"❌ Помилка при виклику LLM (admin proactive) для {user_id}: {exc}")
             answer_raw = "[]"
@@ -587,7 +1264,9 @@ class LLMRouter:
             print(answer_raw)
         print("====================================================================\n")
 
-        actions = self._parse_actions(answer_raw)
+        actions = await self._resolve_actions(
+            user_id=user_id, messages_for_llm=messages_for_llm, answer_raw=answer_raw
+        )
         await self._execute_actions(chat_id=chat_id, user_id=user_id, actions=actions)
 
     async def sync_unread_for_user(
@@ -618,17 +1297,12 @@ class LLMRouter:
             f"user={last_user_message_id} | assistant={last_assistant_message_id} | anchor={anchor_message_id}."
         )
 
-        unread_messages = await self.telegram.fetch_dialog_messages_after(
+        # Записи йдуть потоком від старого до нового — одразу пишемо їх в історію.
+        synced_count = 0
+        max_message_id = 0
+        async for message in self.telegram.iter_dialog_messages_after(
             chat_id, last_message_id=anchor_message_id, limit=50
-        )
-
-        if not unread_messages:
-            print(
-                f"ℹ️ Нових вхідних повідомлень не знайдено для користувача {user_id} у чаті {chat_id}."
-            )
-            return
-
-        for message in unread_messages:
+        ):
             content = message.get("text") or ""
             msg_type = message.get("msg_type") or "text"
             media_meta = message.get("media_meta") or {}
@@ -664,12 +1338,19 @@ class LLMRouter:
                 "📌 Додано повідомлення з sync_unread: "
                 f"role={role} | type={msg_type} | id={message_id} | text={content}"
             )
+            synced_count += 1
+            max_message_id = max(max_message_id, message_id or 0)
+
+        if not synced_count:
+            print(
+                f"ℹ️ Нових вхідних повідомлень не знайдено для користувача {user_id} у чаті {chat_id}."
+            )
+            return
 
-        max_message_id = max((msg.get("id") or 0 for msg in unread_messages), default=0)
         if max_message_id:
             await self.telegram.mark_messages_read(chat_id, max_message_id)
         print(
-            f"📥 Додано {len(unread_messages)} повідомлень у історію для користувача {user_id}."
+            f"📥 Додано {synced_count} повідомлень у історію для користувача {user_id}."
         )
 
         if trigger_llm:
@@ -679,8 +1360,15 @@ class LLMRouter:
                 " і не надсилає відповіді користувачу."
             )
 
-    def _build_llm_messages(self, user_id: int) -> List[dict]:
-        """Формує список повідомлень для LLM з урахуванням системних промптів та історії."""
+    def _build_llm_messages(
+        self, user_id: int, pending: Sequence[ReceivedMessage] = ()
+    ) -> List[dict]:
+        """Формує список повідомлень для LLM з урахуванням системних промптів та історії.
+
+        pending — повідомлення з inbox, які ще не записані в історію (для
+        спекулятивної генерації). Вони форматуються так само, як після запису,
+        щоб результат можна було порівняти з фактичним циклом.
+        """
 
         messages_for_llm: List[dict] = []
 
@@ -688,6 +1376,10 @@ class LLMRouter:
         if ACTIONS_SYSTEM_PROMPT and self.actions_prompt:
             messages_for_llm.append({"role": "system", "content": self.actions_prompt})
 
+        # JSON-режим провайдера вимагає об'єкт, тому пояснюємо обгортку {"actions": [...]}.
+        if self.response_format is not None:
+            messages_for_llm.append({"role": "system", "content": JSON_MODE_INSTRUCTION})
+
         # Базовий системний промпт завжди йде після інструкцій до дій.
         messages_for_llm.append({"role": "system", "content": self.system_prompt})
 
@@ -698,6 +1390,15 @@ class LLMRouter:
                 messages_for_llm.append({"role": "system", "content": user_info_content})
 
         history_messages = self.history.get_recent_context(user_id)
+        history_messages.extend(
+            self.history.build_message(
+                role="user",
+                content=message.content,
+                message_time_iso=message.message_time_iso,
+                message_id=message.message_id,
+            )
+            for message in pending
+        )
         for item in history_messages:
             role = item.get("role")
             content = item.get("content")
@@ -749,106 +1450,255 @@ class LLMRouter:
             f"message: {content}"
         )
 
-    @staticmethod
-    def _parse_actions(answer_raw: str) -> List[dict]:
-        """Парсить відповідь LLM у список дій або повертає порожній список для невалідного JSON."""
+    def _parse_actions(self, answer_raw: str) -> Optional[List[dict]]:
+        """Парсить відповідь LLM у список дій.
 
-        try:
-            data = json.loads(answer_raw)
-            if isinstance(data, dict):
-                data = [data]
-            if not isinstance(data, Sequence):
-                raise ValueError("Відповідь не є масивом дій")
-            actions: List[dict] = []
-            for raw_action in data:
-                if isinstance(raw_action, dict):
-                    actions.append(raw_action)
-                else:
-                    print(f"ℹ️ Пропускаю елемент відповіді, бо він не dict: {raw_action}")
-            return actions
-        except Exception as exc:
-            # Логуємо факт, що відповіді не можна розпарсити, і не відправляємо сирий текст користувачу.
-            print(
-                "⚠️ Отримано невалідний JSON від LLM, відповіді не буде надіслано: "
-                f"{exc}"
-            )
-            return []
+        Спершу пробуємо локальний ремонт JSON (огорожі, коми, обрив). Повертає
+        None, якщо відповідь так і не вдалося розібрати — тоді викликач може
+        перепитати модель.
+        """
 
-    async def _execute_actions(
-        self, chat_id: int, user_id: int, actions: Sequence[dict]
-    ) -> None:
-        """По черзі виконує екшени, які повернула LLM, враховуючи затримку wait_seconds."""
+        data, fixes = repair_json(answer_raw)
+        if data is None:
+            print(f"⚠️ Отримано невалідний JSON від LLM (ремонт: {fixes or 'не допоміг'}).")
+            return None
 
-        if not actions:
-            # Якщо дій немає (наприклад, LLM повернула невалідний JSON), нічого не виконуємо.
-            print("ℹ️ Список дій порожній, нема що виконувати.")
-            return
+        if fixes:
+            self.parse_stats["repaired"] += 1
+            print(f"🩹 JSON відповіді LLM відремонтовано локально: {', '.join(fixes)}")
+        else:
+            self.parse_stats["ok"] += 1
+
+        # JSON-режим повертає об'єкт-обгортку {"actions": [...]}.
+        if isinstance(data, dict) and isinstance(data.get("actions"), list):
+            data = data["actions"]
+        if isinstance(data, dict):
+            data = [data]
+        if not isinstance(data, list):
+            print("⚠️ Відповідь LLM не є масивом дій.")
+            return None
 
-        for action in actions:
-            action_type_raw = action.get("type")
-            action_type = self._normalize_action_type(action_type_raw)
-            wait_seconds = float(action.get("wait_seconds", 0) or 0)
-            human_seconds = float(action.get("human_seconds", 0) or 0)
+        actions: List[dict] = []
+        for raw_action in data:
+            if isinstance(raw_action, dict):
+                actions.append(raw_action)
+            else:
+                print(f"ℹ️ Пропускаю елемент відповіді, бо він не dict: {raw_action}")
+        return actions
 
-            if not action_type:
-                print("ℹ️ Отримано дію без типу, пропускаю її.")
-                continue
+    async def _resolve_actions(
+        self,
+        user_id: int,
+        messages_for_llm: List[dict],
+        answer_raw: str,
+        model: str | None = None,
+    ) -> List[Action]:
+        """Повертає типізовані дії з відповіді LLM, за потреби перепитуючи модель.
+
+        Перепитування обмежене LLM_JSON_REASK_ATTEMPTS, щоб зламана модель не
+        з'їдала бюджет нескінченними повторами. Якщо нічого не вийшло —
+        повертаємо порожній список і не відправляємо сирий текст користувачу.
+        Розібрані dict-и проходять через ActionValidator: биті дії відкидаються,
+        паузи обрізаються до дозволених меж.
+        """
 
-            payload = self._build_payload_for_action(
-                action_type=action_type, action_body=action
-            )
-            handler = self._action_handlers.get(action_type)
+        actions = self._parse_actions(answer_raw)
+        attempts = 0
+
+        while actions is None and attempts < LLM_JSON_REASK_ATTEMPTS:
+            attempts += 1
+            print(f"🔁 Перепитую LLM про валідний JSON для {user_id} (спроба {attempts}).")
+            reask_messages = list(messages_for_llm) + [
+                {"role": "assistant", "content": answer_raw},
+                {
+                    "role": "system",
+                    "content": (
+                        "Попередня відповідь не є валідним JSON. Поверни ту саму відповідь "
+                        "лише як валідний JSON у потрібному форматі, без пояснень."
+                    ),
+                },
+            ]
+            try:
+                result = await asyncio.to_thread(
+                    self.llm.generate,
+                    reask_messages,
+                    model=model,
+                    response_format=self.response_format,
+                )
+            except Exception as exc:
+                print(f"❌ Помилка при повторному виклику LLM для {user_id}: {exc}")
+                break
 
-            if not handler:
-                # Невідомий тип — просто пропускаємо, щоб не ламати сценарій.
-                print(f"ℹ️ Невідомий тип дії від LLM: {action_type_raw}. Пропускаю.")
-                continue
+            self._record_usage(user_id, result, kind="reask")
+            answer_raw = result.content
+            actions = self._parse_actions(answer_raw)
+            if actions is not None:
+                self.parse_stats["reask_ok"] += 1
 
-            if wait_seconds > 0:
-                # Перед виконанням будь-якої дії робимо просту паузу, якщо її вимагає LLM.
-                await asyncio.sleep(wait_seconds)
+        if actions is None:
+            self.parse_stats["failed"] += 1
+            print("⚠️ Відповідь LLM так і не вдалося розібрати, відповіді не буде надіслано.")
+            return []
+        return self.action_validator.validate(actions)
 
-            await handler(
-                telegram=self.telegram,
-                history=self.history,
-                chat_id=chat_id,
-                user_id=user_id,
-                payload=payload,
-                human_seconds=human_seconds,
+    async def _dispatch_plan(self, chat_id: int, user_id: int, actions: Sequence[Action]) -> None:
+        """Передає план циклу діалогу планувальнику або виконує його одразу.
+
+        З планувальником цикл не чекає на wait_seconds: дії стають у купу, а
+        state.busy знімається одразу після планування.
+        """
+
+        state = self._get_state(user_id)
+        interrupt = state.interrupt if PLAN_INTERRUPT_ENABLED else None
+
+        if self.scheduler is None:
+            await self._execute_actions(
+                chat_id=chat_id, user_id=user_id, actions=actions, interrupt=interrupt
             )
+            return
 
-    @staticmethod
-    def _normalize_action_type(action_type: Optional[str]) -> Optional[str]:
-        """Нормалізує назви дій, щоб підтримувати старий і новий формати від LLM."""
+        if not actions:
+            print("ℹ️ Список дій порожній, нема що планувати.")
+            return
+        self.plan_stats["plans"] += 1
+        if is_interrupted(interrupt):
+            # Поки LLM думала, користувач написав ще — план застарів ще до старту.
+            self._record_plan_interrupt(user_id, actions, spent_seconds=0.0)
+            return
+        self.scheduler.submit(user_id, chat_id, actions)
+        print(f"🗓️ Заплановано дій для {user_id}: {len(actions)}.")
 
-        if not action_type:
-            return None
-        aliases = {
-            "react_to_message": "add_reaction",
-            "fake_typping": "fake_typing",
-        }
-        return aliases.get(action_type, action_type)
+    async def _run_scheduled_action(self, user_id: int, chat_id: int, action: Action) -> None:
+        """Виконує одну дію з планувальника (пауза wait_seconds уже минула)."""
 
-    @staticmethod
-    def _build_payload_for_action(action_type: str, action_body: dict) -> dict:
-        """Готує payload для хендлера, враховуючи новий формат екшенів без вкладеного payload."""
+        handler = self._action_handlers.get(action.type)
+        if not handler:
+            print(f"ℹ️ Немає хендлера для дії {action.type}. Пропускаю.")
+            return
+
+        state = self._get_state(user_id)
+        await handler(
+            telegram=self.telegram,
+            history=self.history,
+            chat_id=chat_id,
+            user_id=user_id,
+            action=action,
+            interrupt=state.interrupt if PLAN_INTERRUPT_ENABLED else None,
+        )
+
+    async def _execute_actions(
+        self,
+        chat_id: int,
+        user_id: int,
+        actions: Sequence[Action],
+        interrupt: asyncio.Event | None = None,
+    ) -> None:
+        """Виконує перевірені дії за графом залежностей, враховуючи wait_seconds.
+
+        Відправки йдуть строго по черзі, а реакції та fake_typing перекриваються
+        з наступними кроками (див. plan_graph). Якщо передано interrupt, план
+        зупиняється на безпечних точках (перед кроком, під час паузи чи typing,
+        між меседжами send_messages), щойно користувач напише нове
+        повідомлення. Невиконані дії відкидаються — нові повідомлення обробить
+        наступний цикл.
+        """
 
-        if action_body.get("payload"):
-            # Старий формат вже має payload – повертаємо як є.
-            return action_body.get("payload") or {}
+        if not actions:
+            # Якщо дій немає (наприклад, LLM повернула невалідний JSON), нічого не виконуємо.
+            print("ℹ️ Список дій порожній, нема що виконувати.")
+            return
 
-        if action_type == "send_message":
-            return {"content": action_body.get("content")}
+        loop = asyncio.get_running_loop()
+        self.plan_stats["plans"] += 1
+
+        # Скільки часу зайняв кожен розпочатий крок (пауза + хендлер).
+        durations: Dict[int, float] = {}
+        tasks: Dict[int, asyncio.Task] = {}
+        started = loop.time()
+        for step in build_plan_graph(actions):
+            dependency = tasks.get(step.depends_on) if step.depends_on is not None else None
+            tasks[step.index] = asyncio.create_task(
+                self._run_plan_step(chat_id, user_id, step, dependency, interrupt, durations)
+            )
+        await asyncio.gather(*tasks.values())
+        elapsed = loop.time() - started
+
+        remaining = [index for index, task in tasks.items() if not task.result()]
+        if remaining:
+            self._record_plan_interrupt(
+                user_id,
+                [actions[index] for index in remaining],
+                spent_seconds=sum(durations.get(index, 0.0) for index in remaining),
+            )
+            return
 
-        if action_type == "send_messages":
-            return {"messages": action_body.get("messages")}
+        # Послідовне виконання зайняло б суму тривалостей усіх кроків.
+        saved_seconds = sum(durations.values()) - elapsed
+        if saved_seconds > 0.01:
+            self.plan_stats["parallel_saved_seconds"] += round(saved_seconds, 3)
+            print(
+                f"⚡ План для {user_id} виконано за {elapsed:.1f} с замість "
+                f"{elapsed + saved_seconds:.1f} с (незалежні дії паралельно)."
+            )
 
-        if action_type == "add_reaction":
-            return {
-                "message_id": action_body.get("message_id"),
-                "emoji": action_body.get("reaction") or action_body.get("emoji"),
-            }
+    async def _run_plan_step(
+        self,
+        chat_id: int,
+        user_id: int,
+        step: PlanStep,
+        dependency: asyncio.Task | None,
+        interrupt: asyncio.Event | None,
+        durations: Dict[int, float],
+    ) -> bool:
+        """Виконує один крок плану після його залежності. False — крок перервано."""
+
+        if dependency is not None:
+            await asyncio.wait({dependency})
+            if not dependency.result():
+                # Попередній крок ланцюжка перервано — далі план не актуальний.
+                return False
+
+        action = step.action
+        handler = self._action_handlers.get(action.type)
+        if not handler:
+            print(f"ℹ️ Немає хендлера для дії {action.type}. Пропускаю.")
+            return True
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            # Перед виконанням будь-якої дії робимо просту паузу, якщо її вимагає LLM.
+            interrupted = await sleep_unless_interrupted(action.wait_seconds, interrupt)
+            if not interrupted:
+                # Дія, що встигла завершитися (наприклад, меседж уже надіслано),
+                # лишається виконаною, навіть якщо переривання прийшло під час неї.
+                completed = await handler(
+                    telegram=self.telegram,
+                    history=self.history,
+                    chat_id=chat_id,
+                    user_id=user_id,
+                    action=action,
+                    interrupt=interrupt,
+                )
+                interrupted = completed is False
+        except Exception as exc:
+            # Збій однієї дії не зупиняє решту плану.
+            print(f"❌ Помилка виконання дії {action.type} для {user_id}: {exc}")
+            interrupted = False
+        finally:
+            durations[step.index] = loop.time() - started
+        return not interrupted
 
-        # Для wait, fake_typing, ignore нічого додатково не потрібно.
-        return {}
+    def _record_plan_interrupt(
+        self, user_id: int, remaining: Sequence[Action], spent_seconds: float
+    ) -> None:
+        """Рахує скинуті дії та час, який план ще мав би зайняти."""
 
+        saved_seconds = max(0.0, sum(planned_seconds(action) for action in remaining) - spent_seconds)
+        self.plan_stats["interrupted"] += 1
+        self.plan_stats["dropped_actions"] += len(remaining)
+        self.plan_stats["saved_seconds"] += round(saved_seconds, 3)
+        print(
+            f"✋ План для {user_id} перервано: скинуто дій {len(remaining)}, "
+            f"зекономлено ~{saved_seconds:.1f} с."
+        )
@@ -0,0 +1,149 @@
+"""Адаптивний debounce: вікно очікування під темп набору конкретного користувача.
+
+Фіксовані DEBOUNCE_SECONDS додають ту саму затримку і до одиночного питання,
+і до швидкої серії повідомлень. Тут для кожного користувача тримаємо вибірку
+пауз між його повідомленнями:
+- пауза до BURST_GAP секунд — продовження тієї ж серії (gap);
+- довша пауза — серія закінчилась (кінець, у вибірці це None).
+
+Після кожного повідомлення шукаємо найменший час очікування t, для якого
+частка "ще одне повідомлення прийде пізніше за t" не перевищує
+TAIL_PROBABILITY. Хто пише одиночними повідомленнями, отримує короткий
+debounce, а хто робить довгі паузи між частинами думки — довший, у межах
+[MIN_SECONDS, MAX_SECONDS] і не довше MAX_WINDOW від першого повідомлення пачки.
+"""
+
+from __future__ import annotations
+
+import math
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Deque, Iterable
+
+from settings import (
+    ADAPTIVE_DEBOUNCE_BURST_GAP_SECONDS,
+    ADAPTIVE_DEBOUNCE_MARGIN_SECONDS,
+    ADAPTIVE_DEBOUNCE_MAX_SECONDS,
+    ADAPTIVE_DEBOUNCE_MAX_WINDOW_SECONDS,
+    ADAPTIVE_DEBOUNCE_MIN_SAMPLES,
+    ADAPTIVE_DEBOUNCE_MIN_SECONDS,
+    ADAPTIVE_DEBOUNCE_TAIL_PROBABILITY,
+    ADAPTIVE_DEBOUNCE_WINDOW,
+    DEBOUNCE_SECONDS,
+)
+
+
+@dataclass
+class TypingCadence:
+    """Вибірка пауз між повідомленнями одного користувача."""
+
+    # Паузи в межах серії (секунди) або None — серія на цьому закінчилась.
+    samples: Deque[float | None] = field(
+        default_factory=lambda: deque(maxlen=ADAPTIVE_DEBOUNCE_WINDOW)
+    )
+    last_message_at: float | None = None
+    # Коли прийшло перше повідомлення поточної пачки (для MAX_WINDOW).
+    batch_started_at: float | None = None
+    seeded: bool = False
+
+
+class AdaptiveDebounce:
+    """Рахує debounce для користувача з його темпу набору."""
+
+    def __init__(
+        self,
+        base_seconds: float = DEBOUNCE_SECONDS,
+        min_seconds: float = ADAPTIVE_DEBOUNCE_MIN_SECONDS,
+        max_seconds: float = ADAPTIVE_DEBOUNCE_MAX_SECONDS,
+        max_window_seconds: float = ADAPTIVE_DEBOUNCE_MAX_WINDOW_SECONDS,
+        burst_gap_seconds: float = ADAPTIVE_DEBOUNCE_BURST_GAP_SECONDS,
+        tail_probability: float = ADAPTIVE_DEBOUNCE_TAIL_PROBABILITY,
+        min_samples: int = ADAPTIVE_DEBOUNCE_MIN_SAMPLES,
+        margin_seconds: float = ADAPTIVE_DEBOUNCE_MARGIN_SECONDS,
+    ) -> None:
+        self.base_seconds = base_seconds
+        self.min_seconds = min_seconds
+        self.max_seconds = max_seconds
+        self.max_window_seconds = max_window_seconds
+        self.burst_gap_seconds = burst_gap_seconds
+        self.tail_probability = tail_probability
+        self.min_samples = min_samples
+        self.margin_seconds = margin_seconds
+
+    def seed_from_history(self, cadence: TypingCadence, messages: Iterable[dict]) -> None:
+        """Заповнює вибірку паузами між повідомленнями користувача з історії."""
+
+        cadence.seeded = True
+        previous: float | None = None
+        for message in messages:
+            if message.get("role") != "user":
+                continue
+            at = _parse_created_at(message.get("created_at"))
+            if at is None:
+                continue
+            if previous is not None and at >= previous:
+                self._add_gap(cadence, at - previous)
+            previous = at
+
+    def observe(self, cadence: TypingCadence, at: float) -> None:
+        """Фіксує нове повідомлення користувача в момент `at` (unix-секунди)."""
+
+        if cadence.last_message_at is not None and at >= cadence.last_message_at:
+            self._add_gap(cadence, at - cadence.last_message_at)
+        cadence.last_message_at = at
+
+    def delay_for(self, cadence: TypingCadence, at: float) -> float:
+        """Повертає, скільки чекати після повідомлення в момент `at`."""
+
+        if cadence.batch_started_at is None:
+            cadence.batch_started_at = at
+
+        delay = self._quantile_delay(cadence)
+        # Не тримаємо пачку відкритою довше за MAX_WINDOW від першого повідомлення.
+        window_left = cadence.batch_started_at + self.max_window_seconds - at
+        return max(self.min_seconds, min(delay, window_left))
+
+    def is_calibrated(self, cadence: TypingCadence) -> bool:
+        """True, коли пауз у вибірці досить, щоб довіряти адаптивному вікну.
+
+        До того роутер тримає звичайне вікно DEBOUNCE_SECONDS без перенесення,
+        інакше рівна серія повідомлень чекала б аж до MAX_WINDOW.
+        """
+
+        return len(cadence.samples) >= self.min_samples
+
+    @staticmethod
+    def close_batch(cadence: TypingCadence) -> None:
+        """Викликається, коли пачку забрав цикл діалогу."""
+
+        cadence.batch_started_at = None
+
+    def _quantile_delay(self, cadence: TypingCadence) -> float:
+        total = len(cadence.samples)
+        if total < self.min_samples:
+            return min(max(self.base_seconds, self.min_seconds), self.max_seconds)
+
+        gaps = sorted((gap for gap in cadence.samples if gap is not None), reverse=True)
+        # Дозволяємо не дочекатися не більше ніж `allowed` повідомлень із вибірки.
+        allowed = math.floor(self.tail_probability * total)
+        expected_gap = gaps[allowed] if allowed < len(gaps) else 0.0
+        delay = expected_gap + self.margin_seconds
+        return min(max(delay, self.min_seconds), self.max_seconds)
+
+    def _add_gap(self, cadence: TypingCadence, gap: float) -> None:
+        cadence.samples.append(gap if gap <= self.burst_gap_seconds else None)
+
+
+def _parse_created_at(value: str | None) -> float | None:
+    """created_at з історії (UTC без зони) → unix-секунди."""
+
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
@@ -0,0 +1,200 @@
+"""Єдиний debounce-двигун для всіх користувачів на основі колеса таймерів.
+
+Замість окремої asyncio-задачі зі sleep(DEBOUNCE_SECONDS) на кожного
+користувача тримаємо одне кільце слотів і одну задачу-тікер:
+- arm() кладе користувача у слот, що відповідає моменту спрацювання; якщо
+  затримка довша за один оберт кільця, рахуємо додаткові оберти (rounds);
+- повторний arm() для того самого користувача переносить запис (скидання
+  таймера) за O(1) — без скасування задач і нових таймер-хендлів;
+- на кожному тіку тікер розбирає лише поточний слот і віддає всіх, у кого
+  вийшов час, пачками у колбек on_due.
+
+Точність спрацювання — один тік (DEBOUNCE_TICK_SECONDS), чого для пауз
+у десятки секунд більш ніж достатньо.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Set, Tuple
+
+from settings import DEBOUNCE_BATCH_SIZE, DEBOUNCE_TICK_SECONDS, DEBOUNCE_WHEEL_SLOTS
+
+# Колбек отримує пачку (user_id, chat_id), для яких debounce завершився.
+DueCallback = Callable[[List[Tuple[int, int]]], None]
+
+
+@dataclass(slots=True)
+class _WheelEntry:
+    chat_id: int
+    slot: int
+    rounds: int
+    deadline: float
+
+
+class DebounceWheel:
+    """Колесо таймерів debounce з ключем user_id."""
+
+    def __init__(
+        self,
+        on_due: DueCallback,
+        tick_seconds: float = DEBOUNCE_TICK_SECONDS,
+        slots: int = DEBOUNCE_WHEEL_SLOTS,
+        batch_size: int = DEBOUNCE_BATCH_SIZE,
+    ) -> None:
+        self.tick_seconds = float(tick_seconds)
+        self.batch_size = max(1, int(batch_size))
+        self.stats: Dict[str, int] = {"armed": 0, "reset": 0, "cancelled": 0, "fired": 0}
+
+        self._on_due = on_due
+        self._slots: List[Set[int]] = [set() for _ in range(max(1, int(slots)))]
+        self._entries: Dict[int, _WheelEntry] = {}
+        self._cursor = 0
+        self._next_tick: float | None = None
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # =====================
+    # Публічні методи
+    # =====================
+
+    def arm(self, user_id: int, chat_id: int, delay: float, reset: bool = True) -> bool:
+        """Заводить debounce для користувача.
+
+        Якщо таймер уже заведено: при reset=True він переноситься на `delay`
+        від поточного моменту, інакше лишається як був. Повертає True, якщо
+        таймер заведено або перенесено.
+        """
+
+        entry = self._entries.get(user_id)
+        if entry is not None:
+            if not reset:
+                entry.chat_id = chat_id
+                return False
+            self._slots[entry.slot].discard(user_id)
+            self.stats["reset"] += 1
+        else:
+            self.stats["armed"] += 1
+
+        # Рахуємо тіки від найближчого тіку, щоб не спрацювати раніше за delay.
+        now = self._now()
+        first_tick = self.tick_seconds if self._next_tick is None else self._next_tick - now
+        ticks = 1 + max(0, math.ceil((delay - first_tick) / self.tick_seconds))
+        size = len(self._slots)
+        slot = (self._cursor + ticks) % size
+        self._entries[user_id] = _WheelEntry(
+            chat_id=chat_id,
+            slot=slot,
+            rounds=(ticks - 1) // size,
+            deadline=now + delay,
+        )
+        self._slots[slot].add(user_id)
+        self._ensure_running()
+        return True
+
+    def cancel(self, user_id: int) -> bool:
+        """Знімає таймер користувача. Повертає True, якщо він був заведений."""
+
+        entry = self._entries.pop(user_id, None)
+        if entry is None:
+            return False
+        self._slots[entry.slot].discard(user_id)
+        self.stats["cancelled"] += 1
+        return True
+
+    def is_pending(self, user_id: int) -> bool:
+        """True, якщо debounce користувача ще не спрацював."""
+
+        return user_id in self._entries
+
+    def remaining(self, user_id: int) -> float | None:
+        """Скільки секунд лишилося до спрацювання (None, якщо таймера немає)."""
+
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        return max(0.0, entry.deadline - self._now())
+
+    async def stop(self) -> None:
+        """Зупиняє тікер (заведені таймери лишаються в пам'яті)."""
+
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    # =====================
+    # Тікер
+    # =====================
+
+    @staticmethod
+    def _now() -> float:
+        return asyncio.get_running_loop().time()
+
+    def _ensure_running(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        """Крутить колесо, поки є заведені таймери; інакше чекає на arm()."""
+
+        loop = asyncio.get_running_loop()
+        while True:
+            if not self._entries:
+                self._next_tick = None
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            if self._next_tick is None:
+                self._next_tick = loop.time() + self.tick_seconds
+            delay = self._next_tick - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            # Якщо цикл подій відстав, наздоганяємо всі пропущені тіки разом.
+            due: List[Tuple[int, int]] = []
+            now = loop.time()
+            while self._next_tick <= now:
+                self._advance(due)
+                self._next_tick += self.tick_seconds
+
+            for start in range(0, len(due), self.batch_size):
+                batch = due[start : start + self.batch_size]
+                self.stats["fired"] += len(batch)
+                try:
+                    self._on_due(batch)
+                except Exception as exc:
+                    print(f"❌ Помилка обробки пачки debounce: {exc}")
+                # Віддаємо керування циклу подій між великими пачками.
+                await asyncio.sleep(0)
+
+    def _advance(self, due: List[Tuple[int, int]]) -> None:
+        """Зсуває курсор на один слот і збирає тих, у кого вийшов час."""
+
+        self._cursor = (self._cursor + 1) % len(self._slots)
+        slot = self._slots[self._cursor]
+        if not slot:
+            return
+
+        fired: List[int] = []
+        for user_id in slot:
+            entry = self._entries[user_id]
+            if entry.rounds > 0:
+                entry.rounds -= 1
+            else:
+                fired.append(user_id)
+
+        for user_id in fired:
+            slot.discard(user_id)
+            entry = self._entries.pop(user_id)
+            due.append((user_id, entry.chat_id))
@@ -0,0 +1,250 @@
+"""Append-only журнал inbox роутера для відновлення після перезапуску.
+
+Усе, що лежить у UserState.inbox, живе лише в пам'яті: якщо процес
+перезапуститься під час debounce або циклу, користувач не отримає відповіді,
+доки не напише знову. Тому кожна зміна inbox дописується рядком JSON у файл:
+- "msg" — надійшло нове повідомлення (ще до прийому в inbox);
+- "cycle_start" — цикл забрав перші `count` повідомлень (вони вже в історії);
+- "cycle_done" — цикл завершився, план дій передано далі.
+
+На старті журнал програється: повідомлення без циклу обробляються знову,
+а користувачі з незавершеним циклом позначаються для повторного циклу.
+Щоб файл не ріс без меж, його періодично переписують поточним станом.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import IO, Dict, List
+
+from settings import (
+    INBOX_JOURNAL_COMPACT_EVERY,
+    INBOX_JOURNAL_FSYNC,
+    INBOX_JOURNAL_MAX_AGE_SECONDS,
+    INBOX_JOURNAL_PATH,
+)
+
+
+@dataclass
+class JournalEntry:
+    """Відновлюваний стан inbox одного користувача."""
+
+    user_id: int
+    chat_id: int
+    # Повідомлення (dict-и з полями ReceivedMessage та часом запису "at").
+    messages: List[dict] = field(default_factory=list)
+    # Unix-час початку незавершеного циклу (None — циклу немає).
+    cycle_started_at: float | None = None
+
+
+class InboxJournal:
+    """Журнал inbox з дзеркалом поточного стану в пам'яті."""
+
+    def __init__(
+        self,
+        path: str | None = None,
+        compact_every: int = INBOX_JOURNAL_COMPACT_EVERY,
+        fsync: bool = INBOX_JOURNAL_FSYNC,
+        max_age_seconds: float | None = INBOX_JOURNAL_MAX_AGE_SECONDS,
+    ) -> None:
+        self.path = path or INBOX_JOURNAL_PATH
+        self.compact_every = max(1, int(compact_every))
+        self.fsync = fsync
+        self.max_age_seconds = max_age_seconds
+        # written, compacted, skipped_lines, expired
+        self.stats: Dict[str, int] = {"written": 0, "compacted": 0, "skipped_lines": 0, "expired": 0}
+
+        self._entries: Dict[int, JournalEntry] = {}
+        self._file: IO[str] | None = None
+        self._since_compact = 0
+
+    # =====================
+    # Публічні методи
+    # =====================
+
+    def replay(self) -> List[JournalEntry]:
+        """Читає журнал, стискає його і повертає, що потрібно відновити."""
+
+        self._entries.clear()
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as file:
+                    for line in file:
+                        self._apply_line(line)
+            except OSError as exc:
+                print(f"⚠️ Не вдалося прочитати журнал inbox: {exc}")
+
+        self._drop_expired(time.time())
+        self.compact()
+        return list(self._entries.values())
+
+    def record_message(self, user_id: int, chat_id: int, message: dict) -> None:
+        """Фіксує нове повідомлення в inbox користувача."""
+
+        record = {
+            "event": "msg",
+            "user_id": user_id,
+            "chat_id": chat_id,
+            "at": time.time(),
+            "message": message,
+        }
+        self._apply(record)
+        self._write(record)
+
+    def record_cycle_start(self, user_id: int, chat_id: int, count: int) -> None:
+        """Фіксує, що цикл забрав з inbox перші `count` повідомлень."""
+
+        record = {
+            "event": "cycle_start",
+            "user_id": user_id,
+            "chat_id": chat_id,
+            "at": time.time(),
+            "count": count,
+        }
+        self._apply(record)
+        self._write(record)
+
+    def record_cycle_done(self, user_id: int) -> None:
+        """Фіксує завершення циклу користувача."""
+
+        record = {"event": "cycle_done", "user_id": user_id}
+        self._apply(record)
+        self._write(record)
+
+    def pending_users(self) -> int:
+        """Скільки користувачів мають невідповідані повідомлення або незавершений цикл."""
+
+        return len(self._entries)
+
+    def compact(self) -> None:
+        """Атомарно переписує журнал лише поточним станом."""
+
+        self.close()
+        tmp_path = f"{self.path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                for record in self._snapshot_records():
+                    file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            os.replace(tmp_path, self.path)
+            self.stats["compacted"] += 1
+        except OSError as exc:
+            print(f"⚠️ Не вдалося стиснути журнал inbox: {exc}")
+        self._since_compact = 0
+
+    def close(self) -> None:
+        """Закриває файл журналу (наступний запис відкриє його знову)."""
+
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
+
+    # =====================
+    # Внутрішні методи
+    # =====================
+
+    def _write(self, record: dict) -> None:
+        """Дописує запис у кінець файлу; збій запису не зупиняє обробку."""
+
+        try:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self.stats["written"] += 1
+        except OSError as exc:
+            print(f"⚠️ Не вдалося записати в журнал inbox: {exc}")
+            self.close()
+            return
+
+        self._since_compact += 1
+        if self._since_compact >= self.compact_every:
+            self.compact()
+
+    def _apply_line(self, line: str) -> None:
+        line = line.strip()
+        if not line:
+            return
+        try:
+            record = json.loads(line)
+            self._apply(record)
+        except (ValueError, KeyError, TypeError):
+            # Обірваний останній рядок після аварії — просто пропускаємо.
+            self.stats["skipped_lines"] += 1
+
+    def _apply(self, record: dict) -> None:
+        """Застосовує один запис журналу до дзеркала в пам'яті."""
+
+        event = record["event"]
+        user_id = int(record["user_id"])
+        entry = self._entries.get(user_id)
+
+        if event in ("msg", "cycle_start"):
+            if entry is None:
+                entry = self._entries[user_id] = JournalEntry(user_id=user_id, chat_id=int(record["chat_id"]))
+            entry.chat_id = int(record["chat_id"])
+
+        if event == "msg":
+            entry.messages.append({**record["message"], "at": record.get("at")})
+        elif event == "cycle_start":
+            del entry.messages[: int(record.get("count") or 0)]
+            entry.cycle_started_at = record.get("at")
+        elif event == "cycle_done":
+            if entry is None:
+                return
+            entry.cycle_started_at = None
+            if not entry.messages:
+                del self._entries[user_id]
+
+    def _drop_expired(self, now: float) -> None:
+        """Відкидає повідомлення й цикли, старші за max_age_seconds."""
+
+        if self.max_age_seconds is None:
+            return
+        deadline = now - self.max_age_seconds
+        for user_id in list(self._entries):
+            entry = self._entries[user_id]
+            fresh = [message for message in entry.messages if (message.get("at") or now) >= deadline]
+            self.stats["expired"] += len(entry.messages) - len(fresh)
+            entry.messages = fresh
+            if entry.cycle_started_at is not None and entry.cycle_started_at < deadline:
+                entry.cycle_started_at = None
+            if not entry.messages and entry.cycle_started_at is None:
+                del self._entries[user_id]
+
+    def _snapshot_records(self) -> List[dict]:
+        """Мінімальний набір записів, що відтворює поточне дзеркало."""
+
+        records: List[dict] = []
+        for entry in self._entries.values():
+            if entry.cycle_started_at is not None:
+                records.append(
+                    {
+                        "event": "cycle_start",
+                        "user_id": entry.user_id,
+                        "chat_id": entry.chat_id,
+                        "at": entry.cycle_started_at,
+                        "count": 0,
+                    }
+                )
+            for message in entry.messages:
+                body = {key: value for key, value in message.items() if key != "at"}
+                records.append(
+                    {
+                        "event": "msg",
+                        "user_id": entry.user_id,
+                        "chat_id": entry.chat_id,
+                        "at": message.get("at"),
+                        "message": body,
+                    }
+                )
+        return records
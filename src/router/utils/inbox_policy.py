@@ -0,0 +1,76 @@
+"""Політика inbox користувача під час флуду: склеювання та обмеження.
+
+Без обмежень спамер або пачка пересланих повідомлень перетворюється на
+величезний пакет: кожне повідомлення окремо пишеться в історію і йде в LLM.
+- Поки входжень менше за max_entries, кожне повідомлення лишається окремим:
+  зі своїм message_id (на нього можуть посилатися реакції) і часом.
+- Коли inbox заповнений, новий текст склеюється з останнім текстовим
+  входженням (до max_text_chars символів) замість відкидання; id склеєних
+  зберігаються в media_meta.
+- Описів медіа в одному пакеті не більше за max_media.
+Відкинуте та склеєне рахується; роутер записує підсумок в історію.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, List
+
+from settings import INBOX_COALESCE_TEXT, INBOX_MAX_ENTRIES, INBOX_MAX_MEDIA, INBOX_MAX_TEXT_CHARS
+
+APPENDED = "appended"
+MERGED = "merged"
+DROPPED = "dropped"
+
+
+@dataclass
+class InboxPolicy:
+    """Вирішує, що робити з новим повідомленням: додати, склеїти чи відкинути."""
+
+    coalesce_text: bool = INBOX_COALESCE_TEXT
+    max_text_chars: int = INBOX_MAX_TEXT_CHARS
+    max_entries: int = INBOX_MAX_ENTRIES
+    max_media: int = INBOX_MAX_MEDIA
+
+    def add(self, inbox: List[Any], message: Any) -> str:
+        """Застосовує політику і повертає APPENDED, MERGED або DROPPED.
+
+        message та елементи inbox мають поля content, msg_type, media_meta,
+        message_time_iso і message_id (ReceivedMessage роутера).
+        """
+
+        if len(inbox) >= self.max_entries:
+            # Склеюємо лише під флудом: інакше губилися б окремі id і час повідомлень.
+            if message.msg_type == "text" and self._try_merge(inbox, message):
+                return MERGED
+            return DROPPED
+        if message.msg_type != "text" and self._media_count(inbox) >= self.max_media:
+            return DROPPED
+        inbox.append(message)
+        return APPENDED
+
+    def _try_merge(self, inbox: List[Any], message: Any) -> bool:
+        if not self.coalesce_text or not inbox:
+            return False
+        last = inbox[-1]
+        if last.msg_type != "text":
+            return False
+        merged_content = f"{last.content}\n{message.content}"
+        if len(merged_content) > self.max_text_chars:
+            return False
+
+        meta = dict(last.media_meta or {})
+        merged_ids = list(meta.get("merged_message_ids") or [])
+        if last.message_id is not None:
+            merged_ids.append(last.message_id)
+        meta["merged_message_ids"] = merged_ids
+        # Останнє повідомлення задає id і час: на нього посилаються реакції та відповіді.
+        last.content = merged_content
+        last.media_meta = meta
+        last.message_id = message.message_id
+        last.message_time_iso = message.message_time_iso
+        return True
+
+    @staticmethod
+    def _media_count(inbox: List[Any]) -> int:
+        return sum(1 for entry in inbox if entry.msg_type != "text")
@@ -0,0 +1,29 @@
+"""Допоміжні функції для переривання плану дій новим повідомленням користувача."""
+
+from __future__ import annotations
+
+import asyncio
+
+
+def is_interrupted(interrupt: asyncio.Event | None) -> bool:
+    """True, якщо план потрібно зупинити на найближчій безпечній точці."""
+
+    return interrupt is not None and interrupt.is_set()
+
+
+async def sleep_unless_interrupted(seconds: float, interrupt: asyncio.Event | None) -> bool:
+    """Спить `seconds` секунд або менше, якщо раніше спрацює interrupt.
+
+    Повертає True, якщо сон перервано.
+    """
+
+    if seconds <= 0:
+        return is_interrupted(interrupt)
+    if interrupt is None:
+        await asyncio.sleep(seconds)
+        return False
+    try:
+        await asyncio.wait_for(interrupt.wait(), timeout=seconds)
+        return True
+    except asyncio.TimeoutError:
+        return False
@@ -0,0 +1,202 @@
+"""Швидкий локальний ремонт JSON-відповідей LLM перед тим, як перепитувати модель.
+
+Виправляємо найчастіші поломки:
+- markdown-огорожі ```json ... ``` навколо відповіді;
+- зайвий текст до/після JSON;
+- коми перед закриваючою дужкою;
+- обірвану відповідь (обрізаємо до останнього повного елемента й закриваємо дужки).
+
+Модуль також можна запустити як скрипт, щоб порахувати частку відповідей,
+які розбираються з ремонтом і без, у записаній касеті LLM:
+    python -m src.router.utils.json_repair data/llm_cassettes/default.jsonl
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import sys
+from collections import Counter
+from typing import Any, List, Tuple
+
+_FENCE_RE = re.compile(r"^\s*```[a-zA-Z0-9_-]*\s*\n?(.*?)\n?\s*```\s*$", re.DOTALL)
+_TRAILING_COMMA_RE = re.compile(r",\s*([\]}])")
+
+# Скільки точок обрізання пробуємо для обірваної відповіді (від кінця).
+_MAX_TRUNCATION_ATTEMPTS = 20
+
+
+def repair_json(raw: str) -> Tuple[Any | None, List[str]]:
+    """Пробує розібрати JSON, поступово застосовуючи виправлення.
+
+    Повертає пару (дані, список застосованих виправлень). Якщо нічого не
+    допомогло — (None, виправлення, які пробували).
+    """
+
+    fixes: List[str] = []
+    if raw is None:
+        return None, fixes
+
+    text = raw.strip()
+    data = _try_load(text)
+    if data is not None:
+        return data, fixes
+
+    fence = _FENCE_RE.match(text)
+    if fence:
+        text = fence.group(1).strip()
+        fixes.append("code_fence")
+        data = _try_load(text)
+        if data is not None:
+            return data, fixes
+
+    sliced = _slice_json_region(text)
+    if sliced != text:
+        text = sliced
+        fixes.append("surrounding_text")
+        data = _try_load(text)
+        if data is not None:
+            return data, fixes
+
+    without_commas = _TRAILING_COMMA_RE.sub(r"\1", text)
+    if without_commas != text:
+        text = without_commas
+        fixes.append("trailing_comma")
+        data = _try_load(text)
+        if data is not None:
+            return data, fixes
+
+    data = _close_truncated(text)
+    if data is not None:
+        fixes.append("truncated")
+        return data, fixes
+
+    return None, fixes
+
+
+def _try_load(text: str) -> Any | None:
+    """json.loads без винятків: None, якщо текст не є валідним JSON."""
+
+    if not text:
+        return None
+    try:
+        return json.loads(text)
+    except (json.JSONDecodeError, ValueError):
+        return None
+
+
+def _slice_json_region(text: str) -> str:
+    """Відкидає текст до першої відкриваючої та після останньої закриваючої дужки."""
+
+    starts = [pos for pos in (text.find("["), text.find("{")) if pos != -1]
+    if not starts:
+        return text
+    start = min(starts)
+    end = max(text.rfind("]"), text.rfind("}"))
+    if end <= start:
+        # Закриваючої дужки немає (обірвана відповідь) — лише зрізаємо початок.
+        return text[start:]
+    return text[start : end + 1]
+
+
+def _close_truncated(text: str) -> Any | None:
+    """Обрізає обірваний JSON до останнього повного значення та закриває дужки.
+
+    Скануємо текст, відстежуючи рядки та стек дужок. Після кожного закритого
+    вкладеного об'єкта/масиву запам'ятовуємо точку обрізання разом зі станом
+    стека. Потім, починаючи з кінця, пробуємо дописати потрібні закриваючі
+    дужки й розібрати результат.
+    """
+
+    stack: List[str] = []
+    cut_points: List[Tuple[int, str]] = []
+    in_string = False
+    escaped = False
+
+    for index, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+
+        if char == '"':
+            in_string = True
+        elif char in "[{":
+            stack.append("]" if char == "[" else "}")
+        elif char in "]}":
+            if not stack:
+                break
+            stack.pop()
+            if stack:
+                cut_points.append((index + 1, "".join(reversed(stack))))
+
+    if not stack and not in_string:
+        # Дужки збалансовані — проблема не в обриві, ремонт тут не допоможе.
+        return None
+
+    for cut, closing in reversed(cut_points[-_MAX_TRUNCATION_ATTEMPTS:]):
+        candidate = _TRAILING_COMMA_RE.sub(r"\1", text[:cut] + closing)
+        data = _try_load(candidate)
+        if data is not None:
+            return data
+    return None
+
+
+def measure_parse_rate(cassette_path: str) -> Counter:
+    """Рахує, скільки записаних відповідей розбираються напряму, з ремонтом чи ніяк."""
+
+    stats: Counter = Counter()
+    with open(cassette_path, "r", encoding="utf-8") as file:
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+                content = entry["response"]["choices"][0]["message"]["content"]
+            except (json.JSONDecodeError, KeyError, IndexError, TypeError):
+                stats["unreadable_entry"] += 1
+                continue
+
+            stats["total"] += 1
+            data, fixes = repair_json(content)
+            if data is None:
+                stats["failed"] += 1
+            elif fixes:
+                stats["repaired"] += 1
+                for fix in fixes:
+                    stats[f"fix:{fix}"] += 1
+            else:
+                stats["ok"] += 1
+    return stats
+
+
+def main() -> None:
+    """Друкує частку успішного розбору для касети, переданої аргументом."""
+
+    if len(sys.argv) < 2:
+        print("Використання: python -m src.router.utils.json_repair <cassette.jsonl>")
+        raise SystemExit(2)
+
+    stats = measure_parse_rate(sys.argv[1])
+    total = stats.get("total", 0)
+    if not total:
+        print("ℹ️ У касеті немає відповідей для аналізу.")
+        return
+
+    raw_rate = stats.get("ok", 0) / total
+    repaired_rate = (stats.get("ok", 0) + stats.get("repaired", 0)) / total
+    print(f"📊 Відповідей: {total}")
+    print(f"   без ремонту: {raw_rate:.1%}")
+    print(f"   з ремонтом:  {repaired_rate:.1%}")
+    for key, value in sorted(stats.items()):
+        if key.startswith("fix:"):
+            print(f"   {key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
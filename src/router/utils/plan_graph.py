@@ -0,0 +1,45 @@
+"""Граф залежностей плану дій: що можна виконувати паралельно.
+
+Відправки (send_message, send_messages), паузи (wait) та ignore утворюють
+ланцюжок і виконуються строго по черзі — користувач бачить меседжі саме в
+тому порядку, який задумала LLM. Реакції та fake_typing нічого в чат не
+пишуть, тому стартують одразу після попереднього кроку ланцюжка і
+перекриваються з наступними відправками (а не затримують їх на час RPC).
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Sequence
+
+from src.router.actions.schema import Action
+
+# Дії, які не блокують наступні кроки плану.
+CONCURRENT_ACTION_TYPES = frozenset({"add_reaction", "fake_typing"})
+
+
+@dataclass(frozen=True)
+class PlanStep:
+    """Крок плану та індекс кроку ланцюжка, на завершення якого він чекає."""
+
+    index: int
+    action: Action
+    depends_on: int | None = None
+
+
+def is_concurrent(action: Action) -> bool:
+    """True, якщо дія може виконуватися паралельно з наступними кроками."""
+
+    return action.type in CONCURRENT_ACTION_TYPES
+
+
+def build_plan_graph(actions: Sequence[Action]) -> List[PlanStep]:
+    """Будує кроки плану: кожен чекає лише на останній крок ланцюжка перед ним."""
+
+    steps: List[PlanStep] = []
+    last_chain_step: int | None = None
+    for index, action in enumerate(actions):
+        steps.append(PlanStep(index=index, action=action, depends_on=last_chain_step))
+        if not is_concurrent(action):
+            last_chain_step = index
+    return steps
@@ -0,0 +1,71 @@
+"""Опис response_format для структурованого виводу дій LLM."""
+
+from __future__ import annotations
+
+from typing import Any, Dict
+
+# Типи дій з actions.txt разом зі старими/альтернативними назвами.
+ACTION_TYPES = [
+    "send_message",
+    "send_messages",
+    "react_to_message",
+    "add_reaction",
+    "fake_typping",
+    "fake_typing",
+    "ignore",
+    "wait",
+]
+
+# JSON-режим провайдерів вимагає об'єкт на верхньому рівні, тому масив дій
+# загортаємо в {"actions": [...]}. Цю інструкцію додаємо до системних промптів.
+JSON_MODE_INSTRUCTION = (
+    "Формат відповіді: поверни JSON-об'єкт виду {\"actions\": [ ... ]}, де actions — "
+    "масив дій у форматі, описаному вище. Жодного тексту поза JSON."
+)
+
+_MESSAGE_PART_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "content": {"type": "string"},
+        "wait_seconds": {"type": "number"},
+        "human_seconds": {"type": "number"},
+    },
+    "required": ["content"],
+}
+
+_ACTION_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "type": {"type": "string", "enum": ACTION_TYPES},
+        "wait_seconds": {"type": "number"},
+        "human_seconds": {"type": "number"},
+        "content": {"type": "string"},
+        "messages_count": {"type": "integer"},
+        "messages": {"type": "array", "items": _MESSAGE_PART_SCHEMA},
+        "message_id": {"type": "integer"},
+        "reaction": {"type": "string"},
+    },
+    "required": ["type"],
+}
+
+
+def build_response_format(mode: str | None) -> Dict[str, Any] | None:
+    """Повертає значення поля response_format для запиту або None, якщо режим вимкнено."""
+
+    if mode == "json_object":
+        return {"type": "json_object"}
+
+    if mode == "json_schema":
+        return {
+            "type": "json_schema",
+            "json_schema": {
+                "name": "telegram_actions",
+                "schema": {
+                    "type": "object",
+                    "properties": {"actions": {"type": "array", "items": _ACTION_SCHEMA}},
+                    "required": ["actions"],
+                },
+            },
+        }
+
+    return None
@@ -0,0 +1,85 @@
+"""Спекулятивна генерація відповіді LLM під час debounce.
+
+Поки триває debounce, роутер може вже запустити LLM з поточним inbox. Якщо
+до кінця вікна нових повідомлень не буде, цикл діалогу просто забирає
+готовий результат. Якщо прийде ще щось — результат викидається, а витрачені
+токени рахуються як "змарновані" й обмежуються бюджетом на користувача та
+глобальним бюджетом на добу.
+
+На користувача виконується не більше однієї спекуляції: запит до LLM іде в
+окремому потоці і скасуванням задачі його не зупинити, тож поки викинута
+генерація не завершилась, нова не стартує — її запустять з актуальним inbox
+одразу після завершення попередньої.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List
+
+from settings import SPECULATIVE_MAX_WASTED_TOKENS_GLOBAL, SPECULATIVE_MAX_WASTED_TOKENS_PER_USER
+
+
+@dataclass
+class Speculation:
+    """Одна спекулятивна генерація для користувача."""
+
+    # Повідомлення, з якими запущено LLM: результат придатний лише для них.
+    messages: List[dict]
+    task: asyncio.Task
+    started_at: float
+    finished_at: float | None = None
+    discarded: bool = False
+    # Щоб токени викинутої спекуляції не порахувати двічі.
+    waste_counted: bool = False
+    # Чат для нової спекуляції, що чекає на завершення цієї (вже викинутої).
+    restart_chat_id: int | None = None
+
+
+class SpeculationBudget:
+    """Добові ліміти змарнованих спекулятивних токенів (на користувача і загалом)."""
+
+    def __init__(
+        self,
+        per_user_tokens: int = SPECULATIVE_MAX_WASTED_TOKENS_PER_USER,
+        global_tokens: int = SPECULATIVE_MAX_WASTED_TOKENS_GLOBAL,
+    ) -> None:
+        self.per_user_tokens = per_user_tokens
+        self.global_tokens = global_tokens
+        self._day = self._today()
+        self._per_user: Dict[int, int] = {}
+        self._global = 0
+
+    def allows(self, user_id: int) -> bool:
+        """True, якщо для користувача ще можна запускати спекуляцію сьогодні."""
+
+        self._roll_day()
+        return (
+            self._global < self.global_tokens
+            and self._per_user.get(user_id, 0) < self.per_user_tokens
+        )
+
+    def add_waste(self, user_id: int, tokens: int) -> None:
+        """Додає токени викинутої спекуляції до лічильників."""
+
+        self._roll_day()
+        self._per_user[user_id] = self._per_user.get(user_id, 0) + tokens
+        self._global += tokens
+
+    @property
+    def wasted_today(self) -> int:
+        self._roll_day()
+        return self._global
+
+    def _roll_day(self) -> None:
+        today = self._today()
+        if today != self._day:
+            self._day = today
+            self._per_user.clear()
+            self._global = 0
+
+    @staticmethod
+    def _today() -> str:
+        return datetime.now(timezone.utc).strftime("%Y-%m-%d")
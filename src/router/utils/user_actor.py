@@ -0,0 +1,229 @@
+"""Акторна модель обробки: кожен користувач — актор з обмеженою скринькою.
+
+Усе, що стосується одного користувача (прийом повідомлення, цикл діалогу),
+кладеться в його скриньку (mailbox) і виконується одним споживачем строго
+по черзі. Тому між прийомом повідомлення і циклом немає вікон для гонок.
+- Споживач створюється ліниво при першому повідомленні і завершується,
+  якщо скринька порожня довше за idle_seconds.
+- Скринька обмежена: send() чекає на місце (зворотний тиск на джерело),
+  try_send() відмовляє одразу.
+- Спільний семафор обмежує, скільки акторів одночасно виконують роботу.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict
+
+from settings import DIALOG_CYCLE_WORKERS, USER_ACTOR_IDLE_SECONDS, USER_MAILBOX_SIZE
+
+# Обробник повідомлення актора: (user_id, message) -> None.
+ActorHandler = Callable[[int, Any], Awaitable[None]]
+
+# Маркер "за idle_seconds у скриньку нічого не прийшло".
+_IDLE = object()
+
+
+@dataclass
+class _Actor:
+    mailbox: asyncio.Queue
+    task: asyncio.Task | None = None
+    # True, поки споживач виконує повідомлення (а не чекає на нове).
+    working: bool = False
+    # Скільки повідомлень чекають на місце у повній скриньці (send()).
+    blocked_senders: int = 0
+
+
+class ActorSystem:
+    """Реєстр акторів користувачів зі спільним обмеженням паралельності."""
+
+    def __init__(
+        self,
+        handler: ActorHandler,
+        mailbox_size: int = USER_MAILBOX_SIZE,
+        max_concurrency: int = DIALOG_CYCLE_WORKERS,
+        idle_seconds: float = USER_ACTOR_IDLE_SECONDS,
+    ) -> None:
+        self.mailbox_size = max(1, int(mailbox_size))
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.idle_seconds = idle_seconds
+        # spawned, retired, sent, rejected, processed, failed
+        self.stats: Counter = Counter()
+
+        self._handler = handler
+        self._actors: Dict[int, _Actor] = {}
+        self._slots: asyncio.Semaphore | None = None
+        self._in_flight = 0
+        self._queued = 0
+
+    def __len__(self) -> int:
+        return len(self._actors)
+
+    @property
+    def in_flight(self) -> int:
+        """Скільки акторів просто зараз виконують роботу."""
+
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        """Скільки повідомлень чекають у скриньках усіх акторів (разом з тими, що чекають на місце)."""
+
+        return self._queued
+
+    # =====================
+    # Публічні методи
+    # =====================
+
+    async def send(self, user_id: int, message: Any) -> None:
+        """Кладе повідомлення у скриньку, чекаючи на місце, якщо вона повна."""
+
+        actor = self._ensure_actor(user_id)
+        actor.blocked_senders += 1
+        self._queued += 1
+        try:
+            await actor.mailbox.put(message)
+        except BaseException:
+            self._queued -= 1
+            raise
+        finally:
+            actor.blocked_senders -= 1
+        self.stats["sent"] += 1
+
+    def try_send(self, user_id: int, message: Any) -> bool:
+        """Кладе повідомлення без очікування. False — скринька повна."""
+
+        actor = self._ensure_actor(user_id)
+        try:
+            actor.mailbox.put_nowait(message)
+        except asyncio.QueueFull:
+            self.stats["rejected"] += 1
+            return False
+        self._queued += 1
+        self.stats["sent"] += 1
+        return True
+
+    def is_working(self, user_id: int) -> bool:
+        """True, якщо актор користувача виконує повідомлення просто зараз."""
+
+        actor = self._actors.get(user_id)
+        return actor is not None and actor.working
+
+    def pending(self, user_id: int) -> int:
+        """Скільки повідомлень чекає у скриньці користувача."""
+
+        actor = self._actors.get(user_id)
+        return actor.mailbox.qsize() if actor is not None else 0
+
+    def has_work(self, user_id: int) -> bool:
+        """True, якщо актор щось виконує або має непрочитані повідомлення."""
+
+        actor = self._actors.get(user_id)
+        if actor is None:
+            return False
+        return actor.working or not actor.mailbox.empty() or actor.blocked_senders > 0
+
+    async def drain(self, timeout: float) -> bool:
+        """Чекає до timeout секунд, поки всі актори не спорожнять скриньки. True — встигли."""
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while any(self.has_work(user_id) for user_id in self._actors):
+            if loop.time() >= deadline:
+                return False
+            await asyncio.sleep(0.05)
+        return True
+
+    async def stop(self) -> None:
+        """Зупиняє всіх споживачів (непрочитані повідомлення відкидаються)."""
+
+        tasks = [actor.task for actor in self._actors.values() if actor.task is not None]
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._actors.clear()
+        self._queued = 0
+
+    # =====================
+    # Споживач
+    # =====================
+
+    def _ensure_actor(self, user_id: int) -> _Actor:
+        actor = self._actors.get(user_id)
+        if actor is None:
+            actor = _Actor(mailbox=asyncio.Queue(maxsize=self.mailbox_size))
+            self._actors[user_id] = actor
+        self._ensure_consumer(user_id, actor)
+        return actor
+
+    def _ensure_consumer(self, user_id: int, actor: _Actor) -> None:
+        if actor.task is None or actor.task.done():
+            actor.task = asyncio.create_task(self._consume(user_id, actor))
+            self.stats["spawned"] += 1
+
+    def _slots_semaphore(self) -> asyncio.Semaphore:
+        # Створюємо в циклі подій, а не в конструкторі (роутер будується до asyncio.run).
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        return self._slots
+
+    async def _consume(self, user_id: int, actor: _Actor) -> None:
+        """Єдиний споживач скриньки користувача."""
+
+        slots = self._slots_semaphore()
+        while True:
+            message = await self._next_message(actor)
+            if message is _IDLE:
+                if actor.mailbox.empty() and actor.blocked_senders == 0:
+                    # Актор простоює — прибираємо його, наступне повідомлення створить новий.
+                    if self._actors.get(user_id) is actor:
+                        del self._actors[user_id]
+                    self.stats["retired"] += 1
+                    return
+                continue
+
+            self._queued -= 1
+            actor.working = True
+            try:
+                async with slots:
+                    self._in_flight += 1
+                    try:
+                        await self._handler(user_id, message)
+                        self.stats["processed"] += 1
+                    finally:
+                        self._in_flight -= 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                self.stats["failed"] += 1
+                print(f"❌ Помилка в акторі користувача {user_id}: {exc}")
+            finally:
+                actor.working = False
+                actor.mailbox.task_done()
+
+    async def _next_message(self, actor: _Actor) -> Any:
+        """Чекає на повідомлення не довше за idle_seconds (інакше повертає _IDLE).
+
+        asyncio.wait_for тут не підходить: у Python 3.11 він може "проковтнути"
+        скасування споживача, якщо повідомлення прийшло в той самий момент.
+        """
+
+        getter = asyncio.ensure_future(actor.mailbox.get())
+        try:
+            done, _ = await asyncio.wait({getter}, timeout=self.idle_seconds)
+        except asyncio.CancelledError:
+            getter.cancel()
+            raise
+        if not done:
+            getter.cancel()
+            # Getter міг устигнути забрати повідомлення до скасування.
+            await asyncio.wait({getter})
+            if getter.cancelled():
+                return _IDLE
+        return getter.result()
@@ -0,0 +1,155 @@
+"""Сховище станів користувачів з вивантаженням неактивних і жорсткою межею.
+
+Роутер створює UserState для кожного, хто колись написав. Щоб пам'ять
+довгоживучого процесу не росла без меж:
+- стани тримаються в порядку останнього звернення (LRU);
+- стан, до якого не зверталися довше за idle TTL, вивантажується, але лише
+  якщо роутер дозволяє (inbox і скринька актора порожні, цикл не виконується,
+  debounce не заведено, немає спекуляції чи відкладених дій — перевірку
+  передає сам роутер через can_evict);
+- якщо станів більше за max_states, вивантажуються найстаріші з дозволених.
+
+Вивантажений стан нічого не втрачає: при наступному повідомленні він
+створюється заново, а темп набору знову підтягується з історії.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import sys
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Dict, Generic, Iterator, Tuple, TypeVar
+
+from settings import USER_STATE_IDLE_TTL_SECONDS, USER_STATE_MAX_STATES, USER_STATE_SWEEP_SECONDS
+
+StateT = TypeVar("StateT")
+
+# Скільки найстаріших записів максимум переглядаємо за одне вивантаження за LRU,
+# щоб користувачі, яких вивантажувати не можна, не робили get() лінійним.
+_LRU_SCAN_LIMIT = 64
+
+
+class UserStateStore(Generic[StateT]):
+    """LRU-словник станів з вивантаженням за idle TTL і за лімітом кількості."""
+
+    def __init__(
+        self,
+        factory: Callable[[], StateT],
+        can_evict: Callable[[int, StateT], bool],
+        idle_ttl_seconds: float | None = USER_STATE_IDLE_TTL_SECONDS,
+        max_states: int | None = USER_STATE_MAX_STATES,
+        sweep_seconds: float = USER_STATE_SWEEP_SECONDS,
+    ) -> None:
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.max_states = max_states
+        self.sweep_seconds = sweep_seconds
+        self.stats: Dict[str, int] = {"created": 0, "evicted_idle": 0, "evicted_lru": 0}
+
+        self._factory = factory
+        self._can_evict = can_evict
+        # user_id -> (стан, момент останнього звернення); порядок = LRU.
+        self._items: "OrderedDict[int, Tuple[StateT, float]]" = OrderedDict()
+        self._last_sweep = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self._items
+
+    def items(self) -> Iterator[Tuple[int, StateT]]:
+        """Ітерує (user_id, стан) без оновлення порядку LRU."""
+
+        for user_id, (state, _) in self._items.items():
+            yield user_id, state
+
+    def get(self, user_id: int) -> StateT:
+        """Повертає (або створює) стан і позначає його як щойно використаний."""
+
+        now = time.monotonic()
+        entry = self._items.get(user_id)
+        if entry is None:
+            state = self._factory()
+            self.stats["created"] += 1
+        else:
+            state = entry[0]
+            self._items.move_to_end(user_id)
+        self._items[user_id] = (state, now)
+
+        if self.max_states is not None and len(self._items) > self.max_states:
+            self._evict_lru(keep=user_id)
+        if now - self._last_sweep >= self.sweep_seconds:
+            self.sweep(now)
+        return state
+
+    def sweep(self, now: float | None = None) -> int:
+        """Вивантажує стани, неактивні довше за idle TTL. Повертає їх кількість."""
+
+        now = time.monotonic() if now is None else now
+        self._last_sweep = now
+        if self.idle_ttl_seconds is None:
+            return 0
+
+        expired = []
+        # Порядок LRU: щойно трапився свіжий запис — далі лише свіжіші.
+        for user_id, (state, touched_at) in self._items.items():
+            if now - touched_at < self.idle_ttl_seconds:
+                break
+            if self._can_evict(user_id, state):
+                expired.append(user_id)
+
+        for user_id in expired:
+            del self._items[user_id]
+        self.stats["evicted_idle"] += len(expired)
+        if expired:
+            print(f"🧹 Вивантажено неактивних станів користувачів: {len(expired)} (живих: {len(self)}).")
+        return len(expired)
+
+    def approx_bytes(self) -> int:
+        """Приблизний обсяг пам'яті станів (поверхнево, без спільних об'єктів)."""
+
+        total = sys.getsizeof(self._items)
+        for _, (state, _) in self._items.items():
+            total += _approx_size(state)
+        return total
+
+    def _evict_lru(self, keep: int) -> None:
+        """Вивантажує найстаріші дозволені стани, поки не вкладемося в ліміт."""
+
+        scanned = 0
+        victims = []
+        overflow = len(self._items) - (self.max_states or 0)
+        for user_id, (state, _) in self._items.items():
+            if len(victims) >= overflow or scanned >= _LRU_SCAN_LIMIT:
+                break
+            scanned += 1
+            if user_id != keep and self._can_evict(user_id, state):
+                victims.append(user_id)
+
+        for user_id in victims:
+            del self._items[user_id]
+        self.stats["evicted_lru"] += len(victims)
+
+
+def _approx_size(value: object, depth: int = 0) -> int:
+    """Рекурсивна оцінка розміру: контейнери та поля dataclass-ів, решта поверхнево."""
+
+    size = sys.getsizeof(value)
+    if depth > 4:
+        return size
+    if isinstance(value, (str, bytes, int, float, bool)) or value is None:
+        return size
+    if isinstance(value, dict):
+        return size + sum(
+            _approx_size(key, depth + 1) + _approx_size(item, depth + 1) for key, item in value.items()
+        )
+    if isinstance(value, (list, tuple, set, frozenset, deque)):
+        return size + sum(_approx_size(item, depth + 1) for item in value)
+    if dataclasses.is_dataclass(value):
+        # Задачі, події тощо рахуємо лише поверхнево: вони посилаються на цикл подій.
+        return size + sum(
+            _approx_size(getattr(value, field.name), depth + 1)
+            for field in dataclasses.fields(value)
+        )
+    return size
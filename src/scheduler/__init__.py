@@ -0,0 +1,5 @@
+"""Центральний планувальник відкладених дій LLM."""
+
+from .action_scheduler import ActionScheduler, PendingPlan
+
+__all__ = ["ActionScheduler", "PendingPlan"]
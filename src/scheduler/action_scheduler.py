@@ -0,0 +1,414 @@
+"""
+action_scheduler.py — центральний планувальник відкладених дій LLM.
+
+Ідея:
+- Замість того щоб кожен цикл діалогу "висів" у asyncio.sleep(wait_seconds),
+  план дій користувача передається планувальнику й цикл одразу завершується.
+- Планувальник тримає купу (heap) моментів виконання і одну задачу, яка її
+  розбирає. Для кожного користувача в купі лежить лише наступна дія плану:
+  коли вона виконана, наступна ставиться в купу з власним wait_seconds.
+  Так зберігається порядок і паузи між діями одного користувача.
+- Реакції та fake_typing нічого не відправляють у ланцюжок, тому
+  виконуються відокремлено: наступна дія плану стає в купу одразу, не
+  чекаючи на їхній RPC (див. src/router/utils/plan_graph.py).
+- Невиконані дії зберігаються у JSON-файл, тож відкладені повідомлення
+  переживають перезапуск бота. Зміни лише позначають стан брудним: файл
+  переписує одна фонова задача (не частіше ніж раз на flush_seconds і в
+  окремому потоці), тож диск не гальмує цикл подій і всі чати.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import json
+import os
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Deque, Dict, List, Sequence, Set, Tuple
+
+from src.router.actions.schema import Action, ActionValidator, action_to_dict
+from src.router.utils.plan_graph import is_concurrent
+
+from .config import (
+    SCHEDULER_FLUSH_SECONDS,
+    SCHEDULER_MAX_LATENESS_SECONDS,
+    SCHEDULER_STATE_PATH,
+)
+
+# Виконавець однієї дії: (user_id, chat_id, action) -> None.
+ActionExecutor = Callable[[int, int, Action], Awaitable[None]]
+
+
+@dataclass
+class PendingPlan:
+    """Невиконаний залишок плану дій одного користувача."""
+
+    user_id: int
+    chat_id: int
+    actions: Deque[Action] = field(default_factory=deque)
+    # Unix-час, коли має виконатися перша дія з actions.
+    due_at: float = 0.0
+    # Поколінням відрізняємо актуальний запис у купі від застарілих.
+    token: int = 0
+    in_flight: bool = False
+
+
+class ActionScheduler:
+    """Купа відкладених дій, яку розбирає одна фонова задача."""
+
+    def __init__(
+        self,
+        executor: ActionExecutor,
+        path: str | None = None,
+        max_lateness_seconds: float | None = SCHEDULER_MAX_LATENESS_SECONDS,
+        flush_seconds: float = SCHEDULER_FLUSH_SECONDS,
+    ) -> None:
+        """Створює планувальник.
+
+        Parameters
+        ----------
+        executor: ActionExecutor
+            Корутина, яка виконує одну дію (без власної паузи wait_seconds —
+            паузу вже відміряв планувальник).
+        path: str | None
+            Файл зі збереженими діями. Якщо не передано — SCHEDULER_STATE_PATH.
+        max_lateness_seconds: float | None
+            Дії, прострочені більше ніж на стільки секунд після перезапуску,
+            відкидаються. None — виконувати завжди.
+        flush_seconds: float
+            Як довго збирати зміни перед перезаписом файлу.
+        """
+
+        self.path = path or SCHEDULER_STATE_PATH
+        self.max_lateness_seconds = max_lateness_seconds
+        self.flush_seconds = flush_seconds
+        # submitted, executed, failed, cancelled, restored, expired, overlapped, flushes
+        self.stats: Counter = Counter()
+
+        self._executor = executor
+        self._plans: Dict[int, PendingPlan] = {}
+        self._heap: List[Tuple[float, int, int]] = []
+        self._tokens = itertools.count(1)
+        self._running: Dict[int, asyncio.Task] = {}
+        # Відокремлені дії (реакції, typing), що виконуються паралельно з планом.
+        self._detached: Dict[int, Set[asyncio.Task]] = {}
+        self._wakeup = asyncio.Event()
+        self._drain_task: asyncio.Task | None = None
+        self._dirty = False
+        self._flush_now = asyncio.Event()
+        self._dirty_event = asyncio.Event()
+        self._flush_task: asyncio.Task | None = None
+        self._writing: asyncio.Future | None = None
+
+    # =====================
+    # Публічні методи
+    # =====================
+
+    async def start(self) -> None:
+        """Підвантажує збережені дії з диска та запускає задачу розбору купи."""
+
+        if self._drain_task is not None:
+            return
+        self._load()
+        self._drain_task = asyncio.create_task(self._drain())
+        self._flush_task = asyncio.create_task(self._flush_loop())
+        print(f"🗓️ Планувальник дій запущено, відкладених планів: {len(self._plans)}.")
+
+    async def stop(self) -> None:
+        """Зупиняє розбір купи й зберігає невиконані дії."""
+
+        if self._drain_task is not None:
+            self._drain_task.cancel()
+            try:
+                await self._drain_task
+            except asyncio.CancelledError:
+                pass
+            self._drain_task = None
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        if self._writing is not None:
+            # Потік запису не скасувати — дочекаємось, щоб не писати файл двічі одночасно.
+            await self._writing
+        await self._flush()
+
+    def submit(self, user_id: int, chat_id: int, actions: Sequence[Action]) -> None:
+        """Ставить план користувача в чергу, замінюючи попередній невиконаний."""
+
+        if not actions:
+            return
+
+        self._plans.pop(user_id, None)
+        plan = PendingPlan(user_id=user_id, chat_id=chat_id, actions=deque(actions))
+        self._plans[user_id] = plan
+        self._push(plan, time.time() + plan.actions[0].wait_seconds)
+        self.stats["submitted"] += len(actions)
+        self._save()
+
+    def cancel(self, user_id: int) -> PendingPlan | None:
+        """Знімає невиконані дії користувача. Повертає знятий план (або None)."""
+
+        plan = self._plans.pop(user_id, None)
+        if plan is None:
+            return None
+        self.stats["cancelled"] += len(plan.actions)
+        self._save()
+        return plan if plan.actions else None
+
+    def has_pending(self, user_id: int) -> bool:
+        """True, якщо для користувача є невиконані дії."""
+
+        plan = self._plans.get(user_id)
+        return plan is not None and bool(plan.actions)
+
+    def is_running(self, user_id: int) -> bool:
+        """True, якщо дія користувача виконується просто зараз."""
+
+        task = self._running.get(user_id)
+        if task is not None and not task.done():
+            return True
+        return bool(self._detached.get(user_id))
+
+    @property
+    def pending_count(self) -> int:
+        """Скільки дій загалом чекають на виконання."""
+
+        return sum(len(plan.actions) for plan in self._plans.values())
+
+    # =====================
+    # Розбір купи
+    # =====================
+
+    def _push(self, plan: PendingPlan, due_at: float) -> None:
+        plan.due_at = due_at
+        plan.token = next(self._tokens)
+        heapq.heappush(self._heap, (due_at, plan.token, plan.user_id))
+        self._wakeup.set()
+
+    def _is_current(self, token: int, user_id: int) -> bool:
+        plan = self._plans.get(user_id)
+        return plan is not None and plan.token == token and not plan.in_flight and bool(plan.actions)
+
+    def _next_delay(self) -> float | None:
+        """Секунди до найближчої актуальної дії (застарілі записи викидаємо)."""
+
+        while self._heap:
+            due_at, token, user_id = self._heap[0]
+            if self._is_current(token, user_id):
+                return due_at - time.time()
+            heapq.heappop(self._heap)
+        return None
+
+    async def _drain(self) -> None:
+        """Єдина фонова задача: чекає найближчого моменту і запускає дії."""
+
+        while True:
+            self._wakeup.clear()
+            delay = self._next_delay()
+            if delay is None:
+                await self._wakeup.wait()
+                continue
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            self._dispatch_due()
+
+    def _dispatch_due(self) -> None:
+        now = time.time()
+        while self._heap and self._heap[0][0] <= now:
+            _, token, user_id = heapq.heappop(self._heap)
+            if not self._is_current(token, user_id):
+                continue
+
+            plan = self._plans[user_id]
+            plan.in_flight = True
+            # Дію знімаємо з диска до виконання (запис без затримки): після
+            # аварії краще не надіслати повідомлення, ніж надіслати його двічі.
+            action = plan.actions.popleft()
+            self._save(urgent=True)
+
+            if is_concurrent(action):
+                self._detach(plan, action)
+                continue
+
+            previous = self._running.get(user_id)
+            task = asyncio.create_task(self._run_action(plan, action, previous))
+            self._running[user_id] = task
+            task.add_done_callback(lambda done, uid=user_id: self._forget_task(uid, done))
+
+    def _forget_task(self, user_id: int, task: asyncio.Task) -> None:
+        if self._running.get(user_id) is task:
+            del self._running[user_id]
+
+    def _detach(self, plan: PendingPlan, action: Action) -> None:
+        """Запускає незалежну дію окремо і одразу ставить у купу наступну."""
+
+        task = asyncio.create_task(self._run_detached(plan, action))
+        tasks = self._detached.setdefault(plan.user_id, set())
+        tasks.add(task)
+        task.add_done_callback(lambda done, uid=plan.user_id: self._forget_detached(uid, done))
+
+        plan.in_flight = False
+        if plan.actions:
+            self._push(plan, time.time() + plan.actions[0].wait_seconds)
+        else:
+            del self._plans[plan.user_id]
+            self._save()
+
+    def _forget_detached(self, user_id: int, task: asyncio.Task) -> None:
+        tasks = self._detached.get(user_id)
+        if tasks is None:
+            return
+        tasks.discard(task)
+        if not tasks:
+            del self._detached[user_id]
+
+    async def _run_detached(self, plan: PendingPlan, action: Action) -> None:
+        try:
+            await self._executor(plan.user_id, plan.chat_id, action)
+            self.stats["executed"] += 1
+            self.stats["overlapped"] += 1
+        except Exception as exc:
+            self.stats["failed"] += 1
+            print(f"❌ Помилка виконання запланованої дії {action.type} для {plan.user_id}: {exc}")
+
+    async def _run_action(
+        self, plan: PendingPlan, action: Action, previous: asyncio.Task | None
+    ) -> None:
+        """Виконує одну дію і ставить у купу наступну дію того ж плану."""
+
+        # Дії одного користувача ніколи не виконуються паралельно.
+        if previous is not None and not previous.done():
+            await asyncio.wait({previous})
+
+        try:
+            await self._executor(plan.user_id, plan.chat_id, action)
+            self.stats["executed"] += 1
+        except Exception as exc:
+            self.stats["failed"] += 1
+            print(f"❌ Помилка виконання запланованої дії {action.type} для {plan.user_id}: {exc}")
+        finally:
+            plan.in_flight = False
+
+        if self._plans.get(plan.user_id) is not plan:
+            # План скасували або замінили, поки дія виконувалась.
+            return
+        if plan.actions:
+            self._push(plan, time.time() + plan.actions[0].wait_seconds)
+        else:
+            del self._plans[plan.user_id]
+        self._save()
+
+    # =====================
+    # Збереження на диск
+    # =====================
+
+    def _save(self, urgent: bool = False) -> None:
+        """Позначає стан брудним; файл перепише фонова задача _flush_loop.
+
+        urgent=True — не чекати flush_seconds (наприклад, дію щойно знято з плану).
+        """
+
+        self._dirty = True
+        self._dirty_event.set()
+        if urgent:
+            self._flush_now.set()
+
+    async def _flush_loop(self) -> None:
+        """Єдина задача запису: збирає зміни за flush_seconds і пише їх поза циклом подій."""
+
+        while True:
+            await self._dirty_event.wait()
+            try:
+                await asyncio.wait_for(self._flush_now.wait(), timeout=self.flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            await self._flush()
+
+    async def _flush(self) -> None:
+        if not self._dirty:
+            return
+        self._dirty = False
+        self._dirty_event.clear()
+        self._flush_now.clear()
+        # Знімок робимо в циклі подій, а пишемо в окремому потоці.
+        self._writing = asyncio.ensure_future(asyncio.to_thread(self._write, self._snapshot()))
+        try:
+            await asyncio.shield(self._writing)
+        finally:
+            if self._writing.done():
+                self._writing = None
+        self.stats["flushes"] += 1
+
+    def _snapshot(self) -> dict:
+        return {
+            "plans": [
+                {
+                    "user_id": plan.user_id,
+                    "chat_id": plan.chat_id,
+                    "due_at": plan.due_at,
+                    "actions": [action_to_dict(action) for action in plan.actions],
+                }
+                for plan in self._plans.values()
+                if plan.actions
+            ]
+        }
+
+    def _write(self, data: dict) -> None:
+        """Атомарно переписує файл невиконаних дій."""
+
+        tmp_path = f"{self.path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump(data, file, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except Exception as exc:
+            # Збій запису не повинен зупиняти відправку — лише втратимо відновлення.
+            print(f"⚠️ Не вдалося зберегти відкладені дії: {exc}")
+
+    def _load(self) -> None:
+        """Відновлює плани з диска після перезапуску."""
+
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, json.JSONDecodeError) as exc:
+            print(f"⚠️ Не вдалося прочитати відкладені дії: {exc}")
+            return
+
+        validator = ActionValidator()
+        now = time.time()
+        for raw_plan in data.get("plans") or []:
+            try:
+                user_id = int(raw_plan["user_id"])
+                chat_id = int(raw_plan["chat_id"])
+                due_at = float(raw_plan.get("due_at") or now)
+            except (KeyError, TypeError, ValueError):
+                continue
+
+            actions = validator.validate(raw_plan.get("actions") or [])
+            if not actions:
+                continue
+            if self.max_lateness_seconds is not None and now - due_at > self.max_lateness_seconds:
+                self.stats["expired"] += len(actions)
+                print(f"⌛ Відкладені дії для {user_id} прострочено, пропускаю їх.")
+                continue
+
+            plan = PendingPlan(user_id=user_id, chat_id=chat_id, actions=deque(actions))
+            self._plans[user_id] = plan
+            self._push(plan, due_at)
+            self.stats["restored"] += len(actions)
+        self._save()
@@ -0,0 +1,9 @@
+from settings import (
+    SCHEDULER_ENABLED,
+    SCHEDULER_FLUSH_SECONDS,
+    SCHEDULER_MAX_LATENESS_SECONDS,
+    SCHEDULER_STATE_PATH,
+)
+
+# Налаштування планувальника визначаються у файлі settings.py, тож тут просто
+# імпортуємо вже готові значення.
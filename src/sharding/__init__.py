@@ -0,0 +1,7 @@
+"""Режим кількох процесів: ingest Telethon + шарди LLMRouter за user_id."""
+
+from .hash_ring import HashRing
+from .ingest import ShardedRouter
+from .worker import RemoteTelegramAPI, run_shard_worker
+
+__all__ = ["HashRing", "RemoteTelegramAPI", "ShardedRouter", "run_shard_worker"]
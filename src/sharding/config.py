@@ -0,0 +1,9 @@
+from settings import (
+    ROUTER_SHARD_CONNECT_TIMEOUT_SECONDS,
+    ROUTER_SHARD_HOST,
+    ROUTER_SHARD_VNODES,
+    ROUTER_SHARDS,
+)
+
+# Налаштування шардів визначаються у файлі settings.py, тож тут просто
+# імпортуємо вже готові значення.
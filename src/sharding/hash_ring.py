@@ -0,0 +1,40 @@
+"""Кільце consistent hashing: user_id → номер шарду.
+
+Кожен шард займає на кільці кілька віртуальних вузлів. Користувач належить
+першому вузлу за годинниковою стрілкою від свого хешу. При зміні кількості
+шардів переїжджає лише ~1/N користувачів, а не майже всі, як при user_id % N.
+"""
+
+from __future__ import annotations
+
+import bisect
+import hashlib
+from typing import List, Sequence
+
+from .config import ROUTER_SHARD_VNODES
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Незмінне кільце шардів з віртуальними вузлами."""
+
+    def __init__(self, shards: Sequence[int], vnodes: int = ROUTER_SHARD_VNODES) -> None:
+        if not shards:
+            raise ValueError("HashRing потребує хоча б один шард")
+
+        points = sorted(
+            (_hash(f"shard-{shard}#{replica}"), shard)
+            for shard in shards
+            for replica in range(max(1, int(vnodes)))
+        )
+        self._keys: List[int] = [point for point, _ in points]
+        self._shards: List[int] = [shard for _, shard in points]
+
+    def shard_for(self, user_id: int) -> int:
+        """Повертає шард, який обслуговує користувача."""
+
+        index = bisect.bisect(self._keys, _hash(f"user-{user_id}"))
+        return self._shards[index % len(self._shards)]
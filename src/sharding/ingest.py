@@ -0,0 +1,271 @@
+"""Основний процес у режимі шардів: Telethon-ingest і розподіл користувачів.
+
+ShardedRouter підставляється в TelegramAPI замість LLMRouter. Він нічого не
+генерує сам: лише хешує user_id на шард, пересилає туди повідомлення й
+реакції та виконує виклики TelegramAPI, які присилають воркери.
+
+Порядок повідомлень одного користувача зберігається: усі вони йдуть одним
+з'єднанням в один шард, а воркер обробляє їх послідовно.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+from collections import Counter
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple
+
+from .config import ROUTER_SHARD_CONNECT_TIMEOUT_SECONDS, ROUTER_SHARD_HOST, ROUTER_SHARDS
+from .hash_ring import HashRing
+from .protocol import FRAME_LIMIT, read_frame, write_frame
+from .worker import RouterFactory, run_shard_worker
+
+if TYPE_CHECKING:
+    from src.telegram_api.telegram_api import TelegramAPI
+
+# Методи TelegramAPI, які воркер може викликати в основному процесі.
+REMOTE_METHODS = frozenset(
+    {
+        "send_message",
+        "send_typing",
+        "hold_typing",
+        "send_reaction",
+        "download_voice_bytes",
+        "mark_messages_read",
+        "fetch_dialog_messages_after",
+    }
+)
+
+
+class ShardedRouter:
+    """Роутер-диспетчер: тримає процеси-шарди і канал зв'язку з ними."""
+
+    def __init__(
+        self,
+        telegram_api: "TelegramAPI",
+        shards: int = ROUTER_SHARDS,
+        host: str = ROUTER_SHARD_HOST,
+        connect_timeout: float = ROUTER_SHARD_CONNECT_TIMEOUT_SECONDS,
+        router_factory: RouterFactory | None = None,
+    ) -> None:
+        """Готує диспетчер.
+
+        Parameters
+        ----------
+        telegram_api: TelegramAPI
+            Єдиний Telethon-клієнт, через який ідуть усі вихідні виклики.
+        shards: int
+            Кількість процесів-воркерів.
+        router_factory: RouterFactory | None
+            Фабрика роутера у воркері (має імпортуватися за іменем для spawn).
+            None — повноцінний LLMRouter.
+        """
+
+        self.telegram = telegram_api
+        self.shards = max(1, int(shards))
+        self.host = host
+        self.connect_timeout = connect_timeout
+        self.ring = HashRing(range(self.shards))
+        # forwarded, reactions, calls, call_errors, dropped
+        self.stats: Counter = Counter()
+
+        self._router_factory = router_factory
+        self._server: asyncio.AbstractServer | None = None
+        self._processes: List[multiprocessing.process.BaseProcess] = []
+        self._writers: Dict[int, asyncio.StreamWriter] = {}
+        self._connected: Dict[int, asyncio.Event] = {shard: asyncio.Event() for shard in range(self.shards)}
+        self._calls: Dict[Tuple[int, int], asyncio.Task] = {}
+
+    # =====================
+    # Життєвий цикл
+    # =====================
+
+    async def start(self) -> None:
+        """Відкриває локальний канал, запускає воркери й чекає, поки всі підключаться."""
+
+        if self._server is not None:
+            return
+        self._server = await asyncio.start_server(self._on_connection, self.host, 0, limit=FRAME_LIMIT)
+        port = self._server.sockets[0].getsockname()[1]
+
+        context = multiprocessing.get_context("spawn")
+        for shard in range(self.shards):
+            process = context.Process(
+                target=run_shard_worker,
+                args=(shard, self.host, port, self._router_factory),
+                name=f"router-shard-{shard}",
+                daemon=True,
+            )
+            process.start()
+            self._processes.append(process)
+
+        await self._wait_for_shards()
+        print(f"🧩 Запущено {self.shards} шардів роутера (порт {port}).")
+
+    async def _wait_for_shards(self) -> None:
+        """Чекає на hello від усіх воркерів; падає одразу, якщо воркер завершився."""
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.connect_timeout
+        while not all(event.is_set() for event in self._connected.values()):
+            dead = [process.name for process in self._processes if not process.is_alive()]
+            if dead:
+                raise RuntimeError(f"Воркери шардів завершилися під час старту: {', '.join(dead)}")
+            if loop.time() > deadline:
+                raise TimeoutError("Не всі шарди роутера підключилися вчасно")
+            await asyncio.sleep(0.05)
+
+    async def stop(self) -> None:
+        """Закриває канал і зупиняє процеси-воркери."""
+
+        # Закрите з'єднання воркер сприймає як сигнал завершитися.
+        for writer in list(self._writers.values()):
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+        self._writers.clear()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for process in self._processes:
+            await asyncio.to_thread(process.join, 5)
+            if process.is_alive():
+                process.terminate()
+        self._processes.clear()
+
+    # =====================
+    # Інтерфейс роутера для TelegramAPI
+    # =====================
+
+    async def handle_incoming_message(
+        self,
+        user_id: int,
+        chat_id: int,
+        content: str,
+        msg_type: str,
+        media_meta: dict | None,
+        message_time: datetime,
+        message_id: int | None = None,
+        prepare_media: bool = False,
+    ) -> bool:
+        """Пересилає вхідне повідомлення в шард користувача.
+
+        prepare_media ігнорується: медіа розпізнає роутер у шарді. Повертає
+        False, якщо шард недоступний (тоді повідомлення лишається непрочитаним).
+        """
+
+        forwarded = await self._forward(
+            user_id,
+            {
+                "type": "message",
+                "kwargs": {
+                    "user_id": user_id,
+                    "chat_id": chat_id,
+                    "content": content,
+                    "msg_type": msg_type,
+                    "media_meta": media_meta,
+                    "message_time": message_time,
+                    "message_id": message_id,
+                },
+            },
+        )
+        if forwarded:
+            self.stats["forwarded"] += 1
+        return forwarded
+
+    async def record_reaction(
+        self, user_id: int, message_id: int | None, emoji: str, message_time_iso: str
+    ) -> None:
+        """Пересилає реакцію користувача в його шард (історію пише лише шард)."""
+
+        await self._forward(
+            user_id,
+            {
+                "type": "reaction",
+                "kwargs": {
+                    "user_id": user_id,
+                    "message_id": message_id,
+                    "emoji": emoji,
+                    "message_time_iso": message_time_iso,
+                },
+            },
+        )
+        self.stats["reactions"] += 1
+
+    # =====================
+    # Канал зв'язку з воркерами
+    # =====================
+
+    async def _forward(self, user_id: int, frame: dict) -> bool:
+        shard = self.ring.shard_for(user_id)
+        writer = self._writers.get(shard)
+        if writer is None:
+            self.stats["dropped"] += 1
+            print(f"❌ Шард {shard} недоступний — повідомлення від {user_id} не передано.")
+            return False
+        write_frame(writer, frame)
+        await writer.drain()
+        return True
+
+    async def _on_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Обслуговує з'єднання одного воркера до його закриття."""
+
+        hello = await read_frame(reader)
+        if not hello or hello.get("type") != "hello":
+            writer.close()
+            return
+        shard = int(hello["shard"])
+        self._writers[shard] = writer
+        self._connected[shard].set()
+
+        try:
+            while True:
+                frame = await read_frame(reader)
+                if frame is None:
+                    break
+                kind = frame.get("type")
+                if kind == "call":
+                    key = (shard, frame.get("id"))
+                    task = asyncio.create_task(self._run_call(shard, writer, frame))
+                    self._calls[key] = task
+                    task.add_done_callback(lambda _done, key=key: self._calls.pop(key, None))
+                elif kind == "cancel":
+                    task = self._calls.pop((shard, frame.get("id")), None)
+                    if task is not None:
+                        task.cancel()
+        finally:
+            print(f"🔌 Шард {shard} від'єднався.")
+            if self._writers.get(shard) is writer:
+                del self._writers[shard]
+            for (call_shard, _), task in list(self._calls.items()):
+                if call_shard == shard:
+                    task.cancel()
+
+    async def _run_call(self, shard: int, writer: asyncio.StreamWriter, frame: dict) -> None:
+        """Виконує виклик TelegramAPI для воркера і надсилає йому результат."""
+
+        method = frame.get("method")
+        response: Dict[str, Any] = {"type": "result", "id": frame.get("id")}
+        self.stats["calls"] += 1
+        try:
+            if method not in REMOTE_METHODS:
+                raise ValueError(f"метод {method!r} недоступний для шардів")
+            value = await getattr(self.telegram, method)(**(frame.get("kwargs") or {}))
+            if method == "send_message":
+                # Message Telethon не серіалізується — воркеру потрібні лише id і date.
+                value = {"id": getattr(value, "id", None), "date": getattr(value, "date", None)}
+            response["value"] = value
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            self.stats["call_errors"] += 1
+            response["error"] = f"{type(exc).__name__}: {exc}"
+
+        if writer.is_closing():
+            return
+        write_frame(writer, response)
+        await writer.drain()
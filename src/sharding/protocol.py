@@ -0,0 +1,65 @@
+"""Кадри локального каналу між основним процесом і воркерами шардів.
+
+Кожен кадр — один рядок JSON. datetime і bytes кодуються службовими
+dict-ами, бо стандартний json їх не підтримує.
+
+Основний процес → воркер:
+- {"type": "message", "kwargs": {...}} — аргументи handle_incoming_message;
+- {"type": "reaction", "kwargs": {...}} — аргументи record_reaction;
+- {"type": "result", "id": n, "value": ..., "error": ...} — відповідь на call.
+
+Воркер → основний процес:
+- {"type": "hello", "shard": n} — перший кадр після підключення;
+- {"type": "call", "id": n, "method": "...", "kwargs": {...}} — виклик TelegramAPI;
+- {"type": "cancel", "id": n} — скасувати виклик (наприклад, перерваний typing).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import json
+from datetime import datetime
+from typing import Any
+
+# Максимальна довжина кадру: voice у base64 може займати кілька мегабайт.
+FRAME_LIMIT = 64 * 1024 * 1024
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, (bytes, bytearray)):
+        return {"__bytes__": base64.b64encode(bytes(value)).decode("ascii")}
+    raise TypeError(f"Тип {type(value).__name__} не передається між шардами")
+
+
+def _object_hook(value: dict) -> Any:
+    if "__datetime__" in value and len(value) == 1:
+        return datetime.fromisoformat(value["__datetime__"])
+    if "__bytes__" in value and len(value) == 1:
+        return base64.b64decode(value["__bytes__"])
+    return value
+
+
+def encode_frame(frame: dict) -> bytes:
+    return (json.dumps(frame, ensure_ascii=False, default=_default) + "\n").encode("utf-8")
+
+
+def decode_frame(line: bytes) -> dict:
+    return json.loads(line.decode("utf-8"), object_hook=_object_hook)
+
+
+async def read_frame(reader: asyncio.StreamReader) -> dict | None:
+    """Читає один кадр; None — з'єднання закрито."""
+
+    line = await reader.readline()
+    if not line:
+        return None
+    return decode_frame(line)
+
+
+def write_frame(writer: asyncio.StreamWriter, frame: dict) -> None:
+    """Ставить кадр у буфер writer (drain викликає сторона, що пише)."""
+
+    writer.write(encode_frame(frame))
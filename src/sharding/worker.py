@@ -0,0 +1,276 @@
+"""Процес-воркер шарду: власний LLMRouter і віддалений TelegramAPI.
+
+Воркер підключається до основного процесу, отримує від нього повідомлення
+лише своїх користувачів і обробляє їх звичайним LLMRouter. Усі виклики
+Telegram (відправка, typing, реакції, завантаження voice) повертаються в
+основний процес через RemoteTelegramAPI — Telethon-клієнт там один.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Callable, Dict
+
+from .protocol import FRAME_LIMIT, read_frame, write_frame
+
+# Фабрика роутера для воркера: (telegram, shard_id) -> об'єкт з start(),
+# handle_incoming_message() і record_reaction().
+RouterFactory = Callable[[Any, int], Any]
+
+
+class RemoteCallError(RuntimeError):
+    """Виклик TelegramAPI в основному процесі завершився помилкою."""
+
+
+class _RemoteTypingHold:
+    """Утримання typing в основному процесі: виклик hold_typing, який скасовують."""
+
+    def __init__(self, telegram: "RemoteTelegramAPI", chat_id: int | str) -> None:
+        self._telegram = telegram
+        self._chat_id = chat_id
+        self._call_id: int | None = None
+
+    async def __aenter__(self) -> "_RemoteTypingHold":
+        self._call_id, future = self._telegram._start_call("hold_typing", chat_id=self._chat_id)
+        # Результату не буде (виклик лише скасовують) — помилку достатньо "забрати".
+        future.add_done_callback(lambda done: done.cancelled() or done.exception())
+        await self._telegram._flush()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.release()
+
+    def release(self) -> None:
+        if self._call_id is None:
+            return
+        future = self._telegram._pending.pop(self._call_id, None)
+        if future is not None:
+            future.cancel()
+        write_frame(self._telegram._writer, {"type": "cancel", "id": self._call_id})
+        self._call_id = None
+
+
+class RemoteTelegramAPI:
+    """Замінник TelegramAPI у воркері: кожен метод — виклик в основний процес."""
+
+    def __init__(self, shard_id: int) -> None:
+        self.shard_id = shard_id
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+
+    async def connect(self, host: str, port: int) -> asyncio.StreamReader:
+        """Підключається до основного процесу і представляється номером шарду."""
+
+        self._reader, self._writer = await asyncio.open_connection(host, port, limit=FRAME_LIMIT)
+        await self._send({"type": "hello", "shard": self.shard_id})
+        return self._reader
+
+    def resolve(self, frame: dict) -> None:
+        """Передає результат виклику тому, хто на нього чекає."""
+
+        future = self._pending.pop(frame.get("id"), None)
+        if future is None or future.done():
+            return
+        if frame.get("error"):
+            future.set_exception(RemoteCallError(frame["error"]))
+        else:
+            future.set_result(frame.get("value"))
+
+    def fail_all(self, reason: str) -> None:
+        """Завершує всі очікувані виклики помилкою (з'єднання втрачено)."""
+
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(RemoteCallError(reason))
+        self._pending.clear()
+
+    # =====================
+    # Методи TelegramAPI
+    # =====================
+
+    async def send_message(self, chat_id: int | str, text: str):
+        """Надсилає повідомлення; повертає об'єкт з id і date, як Message Telethon."""
+
+        value = await self._call("send_message", chat_id=chat_id, text=text) or {}
+        return SimpleNamespace(id=value.get("id"), date=value.get("date"))
+
+    async def send_typing(
+        self, chat_id: int | str, duration: float, interrupt: asyncio.Event | None = None
+    ) -> bool:
+        """Показує typing; якщо interrupt спрацює раніше — скасовує його в основному процесі."""
+
+        if duration <= 0:
+            return False
+        call_id, future = self._start_call("send_typing", chat_id=chat_id, duration=duration)
+        await self._flush()
+        if interrupt is None:
+            return bool(await future)
+
+        waiter = asyncio.create_task(interrupt.wait())
+        try:
+            done, _ = await asyncio.wait({future, waiter}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            waiter.cancel()
+        if future in done:
+            return bool(future.result())
+
+        self._pending.pop(call_id, None)
+        future.cancel()
+        await self._send({"type": "cancel", "id": call_id})
+        return True
+
+    def typing_session(self, chat_id: int | str) -> _RemoteTypingHold:
+        """Тримає typing в основному процесі на весь блок `async with`."""
+
+        return _RemoteTypingHold(self, chat_id)
+
+    async def send_reaction(self, chat_id: int | str, message_id: int | str, emoji: str) -> None:
+        await self._call("send_reaction", chat_id=chat_id, message_id=message_id, emoji=emoji)
+
+    async def download_voice_bytes(
+        self, chat_id: int | str, message_id: int | None, file_id: int | None = None
+    ) -> bytes | None:
+        return await self._call(
+            "download_voice_bytes", chat_id=chat_id, message_id=message_id, file_id=file_id
+        )
+
+    async def mark_messages_read(self, chat_id: int | str, max_message_id: int) -> None:
+        await self._call("mark_messages_read", chat_id=chat_id, max_message_id=max_message_id)
+
+    async def fetch_dialog_messages_after(
+        self, chat_id: int | str, last_message_id: int, limit: int = 50
+    ) -> list[dict]:
+        return await self._call(
+            "fetch_dialog_messages_after", chat_id=chat_id, last_message_id=last_message_id, limit=limit
+        ) or []
+
+    async def iter_dialog_messages_after(
+        self, chat_id: int | str, last_message_id: int, limit: int = 50
+    ) -> AsyncIterator[dict]:
+        # Генератор між процесами не передати: беремо обмежене вікно одним викликом.
+        for message in await self.fetch_dialog_messages_after(chat_id, last_message_id, limit=limit):
+            yield message
+
+    # =====================
+    # Внутрішні методи
+    # =====================
+
+    def _start_call(self, method: str, **kwargs: Any) -> tuple[int, asyncio.Future]:
+        call_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[call_id] = future
+        write_frame(self._writer, {"type": "call", "id": call_id, "method": method, "kwargs": kwargs})
+        return call_id, future
+
+    async def _call(self, method: str, **kwargs: Any) -> Any:
+        _, future = self._start_call(method, **kwargs)
+        await self._flush()
+        return await future
+
+    async def _send(self, frame: dict) -> None:
+        write_frame(self._writer, frame)
+        await self._flush()
+
+    async def _flush(self) -> None:
+        await self._writer.drain()
+
+
+class ShardWorker:
+    """Цикл воркера: читає кадри й передає їх роутеру, зберігаючи порядок по користувачу."""
+
+    def __init__(self, shard_id: int, host: str, port: int, router_factory: RouterFactory) -> None:
+        self.shard_id = shard_id
+        self.host = host
+        self.port = port
+        self.telegram = RemoteTelegramAPI(shard_id)
+        self._router_factory = router_factory
+        self._router = None
+        # Остання задача кожного користувача: нову запускаємо лише після неї.
+        self._chains: Dict[int, asyncio.Task] = {}
+
+    async def run(self) -> None:
+        reader = await self.telegram.connect(self.host, self.port)
+        self._router = self._router_factory(self.telegram, self.shard_id)
+        await self._router.start()
+        print(f"🧩 Шард {self.shard_id} готовий.")
+
+        try:
+            while True:
+                frame = await read_frame(reader)
+                if frame is None:
+                    print(f"🔌 Шард {self.shard_id}: основний процес закрив з'єднання.")
+                    self.telegram.fail_all("з'єднання з основним процесом закрито")
+                    return
+
+                kind = frame.get("type")
+                if kind == "result":
+                    self.telegram.resolve(frame)
+                elif kind in ("message", "reaction"):
+                    self._enqueue(kind, frame.get("kwargs") or {})
+                else:
+                    print(f"⚠️ Шард {self.shard_id}: невідомий кадр {kind!r}.")
+        finally:
+            stop = getattr(self._router, "stop", None)
+            if stop is not None:
+                # Telegram через основний процес уже недоступний — не чекаємо
+                # акторів, лише зберігаємо відкладені дії та журнал inbox шарду.
+                await stop(grace_seconds=0)
+
+    def _enqueue(self, kind: str, kwargs: dict) -> None:
+        """Запускає обробку кадру після попереднього кадру того ж користувача."""
+
+        user_id = int(kwargs.get("user_id") or 0)
+        previous = self._chains.get(user_id)
+        task = asyncio.create_task(self._deliver(kind, kwargs, previous))
+        self._chains[user_id] = task
+        task.add_done_callback(lambda done, uid=user_id: self._forget(uid, done))
+
+    def _forget(self, user_id: int, task: asyncio.Task) -> None:
+        if self._chains.get(user_id) is task:
+            del self._chains[user_id]
+
+    async def _deliver(self, kind: str, kwargs: dict, previous: asyncio.Task | None) -> None:
+        if previous is not None and not previous.done():
+            await asyncio.wait({previous})
+        try:
+            if kind == "message":
+                await self._router.handle_incoming_message(**kwargs)
+            else:
+                await self._router.record_reaction(**kwargs)
+        except Exception as exc:
+            print(f"❌ Шард {self.shard_id}: помилка обробки {kind} для {kwargs.get('user_id')}: {exc}")
+
+
+def build_router(telegram: RemoteTelegramAPI, shard_id: int):
+    """Фабрика за замовчуванням: повноцінний LLMRouter з файлами стану цього шарду."""
+
+    # Імпортуємо тут, щоб основний процес не тягнув LLM/STT-залежності роутера.
+    from src.history.history_manager import HistoryManager
+    from src.llm_api.cassette import LLMCassette
+    from src.llm_api.llm_api import LLMAPI
+    from src.llm_api.utils.loader import load_system_prompt
+    from src.router.llm_router import LLMRouter
+
+    return LLMRouter(
+        telegram_api=telegram,
+        llm_api=LLMAPI(cassette=LLMCassette.from_config()),
+        history_manager=HistoryManager(),
+        system_prompt=load_system_prompt(),
+        shard_id=shard_id,
+    )
+
+
+def run_shard_worker(
+    shard_id: int, host: str, port: int, router_factory: RouterFactory | None = None
+) -> None:
+    """Точка входу процесу-воркера (має бути імпортованою для multiprocessing spawn)."""
+
+    worker = ShardWorker(shard_id, host, port, router_factory or build_router)
+    try:
+        asyncio.run(worker.run())
+    except KeyboardInterrupt:
+        pass
@@ -14,13 +14,20 @@ from settings import (
 # Тимчасова директорія для проміжних файлів
 os.makedirs(STT_TMP_DIR, exist_ok=True)
 
-# Перевіряємо існування файлу з ключами та виставляємо змінну для Google SDK
-if STT_ENABLED and not GOOGLE_CREDENTIALS_PATH:
-    raise RuntimeError("❌ GOOGLE_CREDENTIALS_PATH обов'язковий, коли STT_ENABLED=True")
-
-if GOOGLE_CREDENTIALS_PATH:
-    if not os.path.isfile(GOOGLE_CREDENTIALS_PATH):
-        raise FileNotFoundError(
-            f"❌ GOOGLE_CREDENTIALS_PATH не існує: {GOOGLE_CREDENTIALS_PATH}"
-        )
-    os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = GOOGLE_CREDENTIALS_PATH
+
+def check_credentials() -> None:
+    """Перевіряє існування файлу з ключами та виставляє змінну для Google SDK.
+
+    Викликається під час старту main.py і перед створенням клієнта Google, а не
+    під час імпорту: так роутер імпортується без ключів (тести, replay касети).
+    """
+
+    if STT_ENABLED and not GOOGLE_CREDENTIALS_PATH:
+        raise RuntimeError("❌ GOOGLE_CREDENTIALS_PATH обов'язковий, коли STT_ENABLED=True")
+
+    if GOOGLE_CREDENTIALS_PATH:
+        if not os.path.isfile(GOOGLE_CREDENTIALS_PATH):
+            raise FileNotFoundError(
+                f"❌ GOOGLE_CREDENTIALS_PATH не існує: {GOOGLE_CREDENTIALS_PATH}"
+            )
+        os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = GOOGLE_CREDENTIALS_PATH
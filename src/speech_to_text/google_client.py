@@ -6,7 +6,7 @@ from typing import Any, Optional
 from google.cloud import speech
 from google.protobuf.json_format import MessageToJson
 
-from .config import STT_ALT_LANGUAGES, STT_PRIMARY_LANGUAGE
+from .config import STT_ALT_LANGUAGES, STT_PRIMARY_LANGUAGE, check_credentials
 
 
 @dataclass
@@ -26,8 +26,9 @@ class SpeechResult:
     raw_response: Optional[Any] = None
 
 
-# Підготовлений клієнт та конфіг, щоб не створювати їх щоразу
-_speech_client = speech.SpeechClient()
+# Підготовлений клієнт та конфіг, щоб не створювати їх щоразу.
+# Клієнт створюється при першому розпізнаванні (йому потрібні ключі Google).
+_speech_client: speech.SpeechClient | None = None
 _recognition_config = speech.RecognitionConfig(
     encoding=speech.RecognitionConfig.AudioEncoding.OGG_OPUS,
     sample_rate_hertz=48000,
@@ -37,6 +38,16 @@ _recognition_config = speech.RecognitionConfig(
 )
 
 
+def _get_client() -> speech.SpeechClient:
+    """Повертає спільний клієнт Google STT, створюючи його при першому виклику."""
+
+    global _speech_client
+    if _speech_client is None:
+        check_credentials()
+        _speech_client = speech.SpeechClient()
+    return _speech_client
+
+
 def transcribe_bytes_detailed(audio_bytes: bytes) -> SpeechResult:
     """
     Відправляє байти аудіо у Google Speech-to-Text і повертає розширений результат.
@@ -53,7 +64,7 @@ def transcribe_bytes_detailed(audio_bytes: bytes) -> SpeechResult:
     print(f"Основна мова: {_recognition_config.language_code}")
     print(f"Альтернативні: {_recognition_config.alternative_language_codes}\n")
 
-    response = _speech_client.recognize(config=_recognition_config, audio=audio)
+    response = _get_client().recognize(config=_recognition_config, audio=audio)
 
     # Відображаємо сирий JSON у консоль, щоб легше діагностувати помилки
     try:
@@ -0,0 +1,211 @@
+"""Сесія Telethon у пам'яті з періодичним збереженням у .session файл.
+
+Стандартна SQLiteSession пише в диск на кожну нову сутність і кожен
+апдейт pts — під великим потоком апдейтів це постійне смикання SQLite.
+Тут уся робота йде з пам'яттю (MemorySession), а в той самий .session
+файл стан скидається пачкою:
+- кожні interval секунд (run_periodic), якщо щось змінилось;
+- одразу після зміни авторизації (auth_key, DC) — щоб не логінитись заново;
+- при закритті клієнта (client.disconnect() викликає session.close()).
+Формат файлу той самий, тож опцію можна вимкнути без повторного входу.
+Після аварійної зупинки втрачаються лише зміни з останнього інтервалу:
+Telethon дотягне пропущені апдейти через getDifference від збереженого pts.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from collections import Counter
+from typing import Any, Dict, Tuple
+
+from telethon.sessions import MemorySession, SQLiteSession
+
+from settings import TELEGRAM_SESSION_CHECKPOINT_SECONDS
+
+# (id, hash, username, phone, name) — рядок сутності, як у MemorySession.
+EntityRow = Tuple[Any, ...]
+
+
+class CheckpointSession(MemorySession):
+    """MemorySession, що відновлюється з .session файлу і зберігається в нього."""
+
+    def __init__(self, session_path: str) -> None:
+        """Піднімає стан із .session файлу (якщо він є).
+
+        Parameters
+        ----------
+        session_path: str
+            Шлях до .session файлу (розширення можна не вказувати, як у Telethon).
+        """
+
+        super().__init__()
+        path = str(session_path)
+        self.filename = path if path.endswith(".session") else f"{path}.session"
+        # checkpoints, skipped, errors, entities_written
+        self.stats: Counter = Counter()
+
+        self._rows_by_id: Dict[int, EntityRow] = {}
+        self._pending_entities: Dict[int, EntityRow] = {}
+        self._states_dirty = False
+        self._auth_dirty = False
+        self._deleted = False
+        self._restore()
+
+    # =====================
+    # Перевизначення MemorySession
+    # =====================
+
+    def set_dc(self, dc_id, server_address, port):
+        super().set_dc(dc_id, server_address, port)
+        self._auth_dirty = True
+
+    @MemorySession.auth_key.setter
+    def auth_key(self, value):
+        self._auth_key = value
+        self._auth_dirty = True
+
+    @MemorySession.takeout_id.setter
+    def takeout_id(self, value):
+        self._takeout_id = value
+        self._auth_dirty = True
+
+    def set_update_state(self, entity_id, state):
+        previous = self._update_states.get(entity_id)
+        self._update_states[entity_id] = state
+        # Telethon щохвилини перезаписує всі стани (з новою датою для каналів) —
+        # брудним вважаємо лише реальний зсув pts/qts/seq.
+        if previous is None or _state_key(previous) != _state_key(state):
+            self._states_dirty = True
+
+    def process_entities(self, tlo):
+        for row in self._entities_to_rows(tlo):
+            self._remember_row(row, pending=True)
+
+    def save(self):
+        # Telethon кличе save() після входу та щохвилини; пишемо лише авторизацію,
+        # решту скидає run_periodic або close().
+        if self._auth_dirty:
+            self.checkpoint()
+
+    def close(self):
+        self.checkpoint()
+
+    def delete(self):
+        # log_out(): авторизація більше недійсна, файл прибираємо.
+        self._deleted = True
+        try:
+            os.remove(self.filename)
+            return True
+        except OSError:
+            return False
+
+    # =====================
+    # Збереження
+    # =====================
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self._auth_dirty or self._states_dirty or self._pending_entities)
+
+    def checkpoint(self) -> bool:
+        """Скидає зміни в .session файл. Повертає True, якщо щось записано."""
+
+        if self._deleted or not self.dirty:
+            self.stats["skipped"] += 1
+            return False
+
+        entities = self._pending_entities
+        self._pending_entities = {}
+        self._auth_dirty = self._states_dirty = False
+        try:
+            self._write(entities, dict(self._update_states))
+        except Exception as exc:
+            # Не вийшло — зміни лишаються брудними до наступного інтервалу.
+            for entity_id, row in entities.items():
+                self._pending_entities.setdefault(entity_id, row)
+            self._auth_dirty = self._states_dirty = True
+            self.stats["errors"] += 1
+            print(f"⚠️ Не вдалося зберегти сесію Telegram у {self.filename}: {exc}")
+            return False
+
+        self.stats["checkpoints"] += 1
+        self.stats["entities_written"] += len(entities)
+        return True
+
+    async def run_periodic(self, interval: float = TELEGRAM_SESSION_CHECKPOINT_SECONDS) -> None:
+        """Фонова задача: checkpoint кожні interval секунд."""
+
+        while True:
+            await asyncio.sleep(interval)
+            self.checkpoint()
+
+    # =====================
+    # Внутрішні методи
+    # =====================
+
+    def _remember_row(self, row: EntityRow, pending: bool) -> None:
+        entity_id = row[0]
+        previous = self._rows_by_id.get(entity_id)
+        if previous == row:
+            return
+        if previous is not None:
+            # Один рядок на id, інакше пошук по username/name бачив би застарілі.
+            self._entities.discard(previous)
+        self._rows_by_id[entity_id] = row
+        self._entities.add(row)
+        if pending:
+            self._pending_entities[entity_id] = row
+
+    def _write(self, entities: Dict[int, EntityRow], update_states: Dict[int, Any]) -> None:
+        sqlite = SQLiteSession(self.filename)
+        try:
+            sqlite.set_dc(self._dc_id, self._server_address, self._port)
+            sqlite.takeout_id = self._takeout_id
+            # Сеттер auth_key сам переписує таблицю sessions.
+            sqlite.auth_key = self._auth_key
+            for entity_id, state in update_states.items():
+                sqlite.set_update_state(entity_id, state)
+            if entities:
+                now = int(time.time())
+                cursor = sqlite._cursor()
+                try:
+                    cursor.executemany(
+                        "insert or replace into entities values (?,?,?,?,?,?)",
+                        [row + (now,) for row in entities.values()],
+                    )
+                finally:
+                    cursor.close()
+        finally:
+            # close() робить commit — усе потрапляє на диск однією транзакцією.
+            sqlite.close()
+
+    def _restore(self) -> None:
+        if not os.path.exists(self.filename):
+            return
+        sqlite = SQLiteSession(self.filename)
+        try:
+            self._dc_id = sqlite.dc_id
+            self._server_address = sqlite.server_address
+            self._port = sqlite.port
+            self._takeout_id = sqlite.takeout_id
+            key = sqlite.auth_key
+            self._auth_key = key if key is not None and key.key else None
+            self._update_states = dict(sqlite.get_update_states())
+
+            cursor = sqlite._cursor()
+            try:
+                rows = cursor.execute(
+                    "select id, hash, username, phone, name from entities"
+                ).fetchall()
+            finally:
+                cursor.close()
+            for row in rows:
+                self._remember_row(tuple(row), pending=False)
+        finally:
+            sqlite.close()
+
+
+def _state_key(state: Any) -> tuple:
+    return (state.pts, state.qts, state.seq)
@@ -0,0 +1,207 @@
+"""LRU-кеш сутностей Telegram (користувачі, чати) з TTL і збереженням на диск.
+
+Без кешу кожне вхідне повідомлення робило event.get_sender(), адмін-консоль
+резолвила username через get_entity на кожну команду, а send_reaction щоразу
+будувала peer з голого id. Тут зберігається все потрібне, щоб обійтися без
+RPC: профільні поля для user_info та access_hash для InputPeer.
+- Ключ — id; окремий індекс username → id.
+- Запис старший за ttl_seconds вважається промахом і резолвиться заново.
+- Понад max_entries вивантажуються найдавніше використані записи.
+- Кеш зберігається у JSON, тож після холодного старту записи вже є.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from collections import Counter, OrderedDict
+from dataclasses import asdict, dataclass, fields
+from typing import Any, Dict
+
+from settings import (
+    ENTITY_CACHE_MAX_ENTRIES,
+    ENTITY_CACHE_PATH,
+    ENTITY_CACHE_SAVE_EVERY,
+    ENTITY_CACHE_TTL_SECONDS,
+)
+
+
+@dataclass
+class CachedEntity:
+    """Знімок сутності Telegram з полями, які використовує бот."""
+
+    id: int
+    kind: str = "user"  # user | chat | channel
+    access_hash: int | None = None
+    username: str | None = None
+    first_name: str | None = None
+    last_name: str | None = None
+    title: str | None = None
+    about: str | None = None
+    bot: bool = False
+    cached_at: float = 0.0
+
+    @classmethod
+    def from_entity(cls, entity: Any) -> "CachedEntity":
+        """Будує запис з об'єкта Telethon (User, Chat, Channel) або іншого запису."""
+
+        if isinstance(entity, CachedEntity):
+            return entity
+        kind = type(entity).__name__.lower()
+        return cls(
+            id=int(entity.id),
+            kind=kind if kind in ("user", "chat", "channel") else "user",
+            access_hash=getattr(entity, "access_hash", None),
+            username=getattr(entity, "username", None),
+            first_name=getattr(entity, "first_name", None),
+            last_name=getattr(entity, "last_name", None),
+            title=getattr(entity, "title", None),
+            about=getattr(entity, "about", None),
+            bot=bool(getattr(entity, "bot", False)),
+            cached_at=time.time(),
+        )
+
+
+class EntityCache:
+    """Кеш сутностей з лічильниками влучань."""
+
+    def __init__(
+        self,
+        path: str | None = ENTITY_CACHE_PATH,
+        max_entries: int = ENTITY_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = ENTITY_CACHE_TTL_SECONDS,
+        save_every: int = ENTITY_CACHE_SAVE_EVERY,
+    ) -> None:
+        """Створює кеш і підвантажує збережені записи.
+
+        Parameters
+        ----------
+        path: str | None
+            JSON-файл кешу. None — лише в пам'яті.
+        """
+
+        self.path = path
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = ttl_seconds
+        self.save_every = max(1, int(save_every))
+        # hits, misses, expired, stored, evicted, loaded
+        self.stats: Counter = Counter()
+
+        self._entries: "OrderedDict[int, CachedEntity]" = OrderedDict()
+        self._usernames: Dict[str, int] = {}
+        self._unsaved = 0
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # =====================
+    # Публічні методи
+    # =====================
+
+    def get(self, key: int | str) -> CachedEntity | None:
+        """Повертає свіжий запис за id або username (None — треба резолвити)."""
+
+        entity_id = self._lookup_id(key)
+        entry = self._entries.get(entity_id) if entity_id is not None else None
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+        if time.time() - entry.cached_at > self.ttl_seconds:
+            self.stats["expired"] += 1
+            self.stats["misses"] += 1
+            return None
+        self._entries.move_to_end(entity_id)
+        self.stats["hits"] += 1
+        return entry
+
+    def put(self, entity: Any) -> CachedEntity:
+        """Кладе (або оновлює) сутність у кеш і повертає її запис."""
+
+        entry = CachedEntity.from_entity(entity)
+        previous = self._entries.pop(entry.id, None)
+        if previous is not None and previous.username:
+            self._usernames.pop(_normalize_username(previous.username), None)
+        if entry.access_hash is None and previous is not None:
+            # min-сутності з апдейтів приходять без access_hash — не губимо відомий.
+            entry.access_hash = previous.access_hash
+        self._store(entry)
+        self.stats["stored"] += 1
+
+        self._unsaved += 1
+        if self._unsaved >= self.save_every:
+            self.save()
+        return entry
+
+    def metrics(self) -> Dict[str, float]:
+        """Розмір кешу, лічильники та частка влучань."""
+
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            "entries": len(self._entries),
+            "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else 0.0,
+            **self.stats,
+        }
+
+    def save(self) -> None:
+        """Атомарно переписує файл кешу."""
+
+        self._unsaved = 0
+        if not self.path:
+            return
+        data = {"entities": [asdict(entry) for entry in self._entries.values()]}
+        tmp_path = f"{self.path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump(data, file, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except Exception as exc:
+            # Кеш — лише оптимізація: без файлу просто резолвимо заново.
+            print(f"⚠️ Не вдалося зберегти кеш сутностей: {exc}")
+
+    # =====================
+    # Внутрішні методи
+    # =====================
+
+    def _lookup_id(self, key: int | str) -> int | None:
+        if isinstance(key, int):
+            return key
+        text = str(key).strip()
+        if text.lstrip("-").isdigit():
+            return int(text)
+        return self._usernames.get(_normalize_username(text))
+
+    def _store(self, entry: CachedEntity) -> None:
+        self._entries[entry.id] = entry
+        if entry.username:
+            self._usernames[_normalize_username(entry.username)] = entry.id
+        while len(self._entries) > self.max_entries:
+            _, evicted = self._entries.popitem(last=False)
+            if evicted.username:
+                self._usernames.pop(_normalize_username(evicted.username), None)
+            self.stats["evicted"] += 1
+
+    def _load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, json.JSONDecodeError) as exc:
+            print(f"⚠️ Не вдалося прочитати кеш сутностей: {exc}")
+            return
+
+        known = {item.name for item in fields(CachedEntity)}
+        for raw in data.get("entities") or []:
+            try:
+                entry = CachedEntity(**{key: value for key, value in raw.items() if key in known})
+            except TypeError:
+                continue
+            self._store(entry)
+            self.stats["loaded"] += 1
+
+
+def _normalize_username(username: str) -> str:
+    return username.strip().lstrip("@").lower()
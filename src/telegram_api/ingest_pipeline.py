@@ -0,0 +1,153 @@
+"""Конвеєр прийому вхідних апдейтів з обмеженим пулом воркерів.
+
+Раніше обробник Telethon робив усе сам: get_sender, user_info.txt на диску,
+mark_read і весь handle_incoming_message разом із завантаженням та
+розпізнаванням voice. Кілька великих голосових підряд — і кожен апдейт
+висів секундами. Тепер обробник лише кладе подію в конвеєр, а далі:
+- у кожного ключа (користувача) своя FIFO-черга, і одночасно обробляється
+  лише одна його подія — порядок повідомлень користувача зберігається;
+- обробкою займаються не більше workers задач, тож важкі голосові не
+  множать паралельні завантаження/STT без меж;
+- понад max_pending подій нові відкидаються (їх підтягне sync_unread),
+  а не накопичуються в пам'яті.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import Counter, deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, List
+
+from settings import INGEST_LATENCY_SAMPLES, INGEST_MAX_PENDING, INGEST_WORKERS
+
+# Обробник однієї події (збагачення, медіа, передача в роутер).
+IngestProcessor = Callable[[Any], Awaitable[None]]
+
+
+@dataclass
+class _Item:
+    payload: Any
+    enqueued_at: float
+
+
+class IngestPipeline:
+    """Черги подій по користувачах + спільний пул воркерів."""
+
+    def __init__(
+        self,
+        process: IngestProcessor,
+        workers: int = INGEST_WORKERS,
+        max_pending: int = INGEST_MAX_PENDING,
+        latency_samples: int = INGEST_LATENCY_SAMPLES,
+    ) -> None:
+        self.workers = max(1, int(workers))
+        self.max_pending = max(1, int(max_pending))
+        # submitted, processed, failed, dropped
+        self.stats: Counter = Counter()
+
+        self._process = process
+        # Ключ має лінію, поки в нього є події в черзі або в обробці.
+        self._lanes: Dict[int | str, Deque[_Item]] = {}
+        self._ready: asyncio.Queue | None = None
+        self._tasks: List[asyncio.Task] = []
+        self._pending = 0
+        self._in_flight = 0
+        self._waits: Deque[float] = deque(maxlen=max(1, int(latency_samples)))
+
+    @property
+    def pending(self) -> int:
+        """Скільки подій чекають на воркера."""
+
+        return self._pending
+
+    # =====================
+    # Публічні методи
+    # =====================
+
+    def submit(self, key: int | str, payload: Any) -> bool:
+        """Кладе подію в чергу ключа без очікування. False — конвеєр переповнений."""
+
+        if self._pending >= self.max_pending:
+            self.stats["dropped"] += 1
+            return False
+        self._ensure_running()
+        item = _Item(payload=payload, enqueued_at=time.monotonic())
+        lane = self._lanes.get(key)
+        if lane is None:
+            self._lanes[key] = deque([item])
+            self._ready.put_nowait(key)
+        else:
+            # Ключ уже в черзі готових або в обробці — воркер забере подію після попередньої.
+            lane.append(item)
+        self._pending += 1
+        self.stats["submitted"] += 1
+        return True
+
+    def metrics(self) -> Dict[str, float]:
+        """Глибина черги, зайняті воркери та очікування до старту обробки (секунди)."""
+
+        ordered = sorted(self._waits)
+
+        def percentile(fraction: float) -> float:
+            if not ordered:
+                return 0.0
+            return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+        return {
+            "pending": self._pending,
+            "in_flight": self._in_flight,
+            "keys": len(self._lanes),
+            "wait_p50": round(percentile(0.5), 3),
+            "wait_p95": round(percentile(0.95), 3),
+            **self.stats,
+        }
+
+    async def stop(self) -> None:
+        """Зупиняє воркерів; необроблені події відкидаються."""
+
+        for task in self._tasks:
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        self._lanes.clear()
+        self._ready = None
+        self._pending = 0
+
+    # =====================
+    # Воркери
+    # =====================
+
+    def _ensure_running(self) -> None:
+        # Створюємо в циклі подій, а не в конструкторі (TelegramAPI будується до asyncio.run).
+        if self._ready is None:
+            self._ready = asyncio.Queue()
+        self._tasks = [task for task in self._tasks if not task.done()]
+        while len(self._tasks) < self.workers:
+            self._tasks.append(asyncio.create_task(self._worker()))
+
+    async def _worker(self) -> None:
+        while True:
+            key = await self._ready.get()
+            lane = self._lanes.get(key)
+            if not lane:
+                continue
+            item = lane.popleft()
+            self._pending -= 1
+            self._in_flight += 1
+            self._waits.append(time.monotonic() - item.enqueued_at)
+            try:
+                await self._process(item.payload)
+                self.stats["processed"] += 1
+            except Exception as exc:
+                self.stats["failed"] += 1
+                print(f"❌ Помилка обробки вхідного апдейту для {key}: {exc}")
+            finally:
+                self._in_flight -= 1
+                if lane:
+                    # Ключ іде в кінець черги готових — інші користувачі не голодують.
+                    self._ready.put_nowait(key)
+                elif self._lanes.get(key) is lane:
+                    del self._lanes[key]
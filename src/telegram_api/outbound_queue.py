@@ -0,0 +1,271 @@
+"""Черга вихідних викликів Telegram з лімітами та обробкою FloodWait.
+
+Раніше кожна корутина викликала client.send_message напряму: при масовій
+розсилці акаунт ловив FloodWait, а повідомлення губилося в загальному
+except хендлера. Тут усі відправки проходять через одну чергу:
+- у кожного чату своя FIFO-черга, і в чат одночасно йде лише один виклик,
+  тому порядок повідомлень зберігається;
+- токени беруться з відра чату і зі спільного відра акаунта;
+- FloodWait паркує лише цей чат на вказаний час, після чого виклик
+  повторюється (інші чати продовжують відправлятися);
+- затримка в черзі (від submit до старту виклику) потрапляє в метрики.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import Counter, OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, Set
+
+from settings import (
+    OUTBOUND_CHAT_BURST,
+    OUTBOUND_CHAT_RATE_PER_SECOND,
+    OUTBOUND_DELAY_SAMPLES,
+    OUTBOUND_FLOOD_MAX_RETRIES,
+    OUTBOUND_GLOBAL_BURST,
+    OUTBOUND_GLOBAL_RATE_PER_SECOND,
+    OUTBOUND_MAX_FLOOD_WAIT_SECONDS,
+)
+
+# Виклик Telegram, який треба виконати (наприклад, lambda: client.send_message(...)).
+OutboundCall = Callable[[], Awaitable[Any]]
+# Визначає, чи помилка — FloodWait, і скільки секунд чекати (None — інша помилка).
+RetryAfter = Callable[[BaseException], float | None]
+
+
+class TokenBucket:
+    """Класичне відро токенів: rate токенів за секунду, не більше burst."""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = max(rate, 1e-6)
+        self.capacity = max(1.0, float(burst))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def wait_time(self, now: float) -> float:
+        """Скільки секунд до появи токена (0 — токен є)."""
+
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def is_full(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+    def take(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+
+@dataclass
+class _Job:
+    call: OutboundCall
+    future: asyncio.Future
+    enqueued_at: float
+    attempts: int = 0
+
+
+@dataclass
+class _ChatLane:
+    bucket: TokenBucket
+    jobs: Deque[_Job] = field(default_factory=deque)
+    in_flight: bool = False
+    parked_until: float = 0.0
+
+
+class OutboundQueue:
+    """Одна черга вихідних викликів на акаунт."""
+
+    def __init__(
+        self,
+        retry_after: RetryAfter,
+        global_rate: float = OUTBOUND_GLOBAL_RATE_PER_SECOND,
+        global_burst: int = OUTBOUND_GLOBAL_BURST,
+        chat_rate: float = OUTBOUND_CHAT_RATE_PER_SECOND,
+        chat_burst: int = OUTBOUND_CHAT_BURST,
+        max_retries: int = OUTBOUND_FLOOD_MAX_RETRIES,
+        max_flood_wait: float = OUTBOUND_MAX_FLOOD_WAIT_SECONDS,
+        delay_samples: int = OUTBOUND_DELAY_SAMPLES,
+    ) -> None:
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.max_retries = max_retries
+        self.max_flood_wait = max_flood_wait
+        # submitted, sent, failed, flood_waits, retries
+        self.stats: Counter = Counter()
+
+        self._retry_after = retry_after
+        self._global = TokenBucket(global_rate, global_burst)
+        # Порядок чатів — черговість обходу (round-robin між чатами).
+        self._lanes: "OrderedDict[int | str, _ChatLane]" = OrderedDict()
+        self._delays: Deque[float] = deque(maxlen=max(1, int(delay_samples)))
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._calls: Set[asyncio.Task] = set()
+
+    # =====================
+    # Публічні методи
+    # =====================
+
+    async def submit(self, chat_id: int | str, call: OutboundCall) -> Any:
+        """Ставить виклик у чергу чату і повертає його результат (або кидає помилку)."""
+
+        self._ensure_running()
+        lane = self._lanes.get(chat_id)
+        if lane is None:
+            lane = _ChatLane(bucket=TokenBucket(self.chat_rate, self.chat_burst))
+            self._lanes[chat_id] = lane
+        future = asyncio.get_running_loop().create_future()
+        lane.jobs.append(_Job(call=call, future=future, enqueued_at=time.monotonic()))
+        self.stats["submitted"] += 1
+        self._wakeup.set()
+        return await future
+
+    def metrics(self) -> Dict[str, float]:
+        """Глибина черги, припарковані чати та затримки в черзі (секунди)."""
+
+        ordered = sorted(self._delays)
+
+        def percentile(fraction: float) -> float:
+            if not ordered:
+                return 0.0
+            return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+        now = time.monotonic()
+        return {
+            "queued": sum(len(lane.jobs) for lane in self._lanes.values()),
+            "parked_chats": sum(1 for lane in self._lanes.values() if lane.parked_until > now),
+            "delay_p50": round(percentile(0.5), 3),
+            "delay_p95": round(percentile(0.95), 3),
+            "delay_max": round(ordered[-1], 3) if ordered else 0.0,
+            **self.stats,
+        }
+
+    async def stop(self) -> None:
+        """Зупиняє диспетчер; невідправлені виклики завершуються скасуванням."""
+
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for lane in self._lanes.values():
+            for job in lane.jobs:
+                if not job.future.done():
+                    job.future.cancel()
+        self._lanes.clear()
+
+    # =====================
+    # Диспетчер
+    # =====================
+
+    def _ensure_running(self) -> None:
+        # Створюємо в циклі подій, а не в конструкторі (TelegramAPI будується до asyncio.run).
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            delay = self._dispatch_ready()
+            if delay is None:
+                await self._wakeup.wait()
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def _dispatch_ready(self) -> float | None:
+        """Запускає всі виклики, для яких є токени. Повертає секунди до наступної спроби."""
+
+        now = time.monotonic()
+        next_delay: float | None = None
+
+        def later(seconds: float) -> None:
+            nonlocal next_delay
+            next_delay = seconds if next_delay is None else min(next_delay, seconds)
+
+        for chat_id in list(self._lanes):
+            lane = self._lanes[chat_id]
+            while lane.jobs and lane.jobs[0].future.done():
+                # Того, хто чекав, уже скасували — відправляти нікому.
+                lane.jobs.popleft()
+            if not lane.jobs:
+                # Порожню лінію прибираємо, лише коли відро чату відновилося,
+                # інакше чат щоразу отримував би новий сплеск токенів.
+                if not lane.in_flight and lane.bucket.is_full(now):
+                    del self._lanes[chat_id]
+                continue
+            if lane.in_flight:
+                continue
+            if lane.parked_until > now:
+                later(lane.parked_until - now)
+                continue
+            chat_wait = lane.bucket.wait_time(now)
+            if chat_wait > 0:
+                later(chat_wait)
+                continue
+            global_wait = self._global.wait_time(now)
+            if global_wait > 0:
+                later(global_wait)
+                break
+
+            lane.bucket.take(now)
+            self._global.take(now)
+            job = lane.jobs.popleft()
+            lane.in_flight = True
+            # Чат, що щойно відправив, іде в кінець — інші не голодують.
+            self._lanes.move_to_end(chat_id)
+            self._delays.append(now - job.enqueued_at)
+            task = asyncio.create_task(self._execute(chat_id, lane, job))
+            self._calls.add(task)
+            task.add_done_callback(self._calls.discard)
+        return next_delay
+
+    async def _execute(self, chat_id: int | str, lane: _ChatLane, job: _Job) -> None:
+        try:
+            result = await job.call()
+        except Exception as exc:
+            seconds = self._retry_after(exc)
+            if seconds is None:
+                self.stats["failed"] += 1
+                self._settle(job, exc=exc)
+            elif job.attempts >= self.max_retries or seconds > self.max_flood_wait:
+                self.stats["flood_waits"] += 1
+                self.stats["failed"] += 1
+                print(f"❌ FloodWait {seconds:.0f} с у чаті {chat_id} — відправку скасовано.")
+                self._settle(job, exc=exc)
+            else:
+                # Паркуємо лише цей чат; виклик повернеться першим у його черзі.
+                self.stats["flood_waits"] += 1
+                self.stats["retries"] += 1
+                job.attempts += 1
+                lane.parked_until = time.monotonic() + seconds
+                lane.jobs.appendleft(job)
+                print(f"⏳ FloodWait {seconds:.0f} с у чаті {chat_id} — повторю відправку.")
+        else:
+            self.stats["sent"] += 1
+            self._settle(job, result=result)
+        finally:
+            lane.in_flight = False
+            self._wakeup.set()
+
+    @staticmethod
+    def _settle(job: _Job, result: Any = None, exc: BaseException | None = None) -> None:
+        if job.future.done():
+            return
+        if exc is not None:
+            job.future.set_exception(exc)
+        else:
+            job.future.set_result(result)
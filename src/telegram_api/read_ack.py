@@ -0,0 +1,116 @@
+"""Об'єднання позначок «прочитано» в один RPC на чат.
+
+Раніше кожне вхідне повідомлення робило окремий event.mark_read(), тож пачка
+з десяти меседжів — це десять ReadHistory підряд. Тут позначки збираються:
+- на чат запам'ятовується лише найбільший message_id за вікно window_seconds;
+- після вікна йде один send_read_acknowledge(max_id) на чат;
+- позначка, яку вже покрито відправленим max_id, RPC не робить зовсім.
+Кожне mark() повертає future, який завершиться (True/False), коли позначку
+буде відправлено, — sync_unread на нього чекає, прийом повідомлень ні.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Set
+
+from settings import READ_ACK_WINDOW_SECONDS
+
+# Відправляє позначку в Telegram: (chat_id, max_id) -> None.
+ReadAcknowledge = Callable[[int | str, int], Awaitable[None]]
+
+
+@dataclass
+class _PendingAck:
+    max_id: int
+    future: asyncio.Future
+    handle: asyncio.TimerHandle | None = None
+
+
+class ReadAckCoalescer:
+    """Збирає позначки прочитаного по чатах і відправляє їх пачками."""
+
+    def __init__(
+        self,
+        acknowledge: ReadAcknowledge,
+        window_seconds: float = READ_ACK_WINDOW_SECONDS,
+    ) -> None:
+        self.window_seconds = window_seconds
+        # requested, sent, saved, errors
+        self.stats: Counter = Counter()
+
+        self._acknowledge = acknowledge
+        self._pending: Dict[int | str, _PendingAck] = {}
+        # Найбільший уже відправлений max_id по чатах.
+        self._acked: Dict[int | str, int] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    # =====================
+    # Публічні методи
+    # =====================
+
+    def mark(self, chat_id: int | str, message_id: int) -> asyncio.Future:
+        """Позначає чат прочитаним до message_id (включно) з відкладеною відправкою."""
+
+        self.stats["requested"] += 1
+        loop = asyncio.get_running_loop()
+        pending = self._pending.get(chat_id)
+        if pending is not None:
+            # Уже чекає відправки — лише піднімаємо max_id, RPC той самий.
+            pending.max_id = max(pending.max_id, message_id)
+            self.stats["saved"] += 1
+            return pending.future
+
+        if message_id <= self._acked.get(chat_id, 0):
+            self.stats["saved"] += 1
+            future = loop.create_future()
+            future.set_result(True)
+            return future
+
+        pending = _PendingAck(max_id=message_id, future=loop.create_future())
+        pending.handle = loop.call_later(self.window_seconds, self._start, chat_id)
+        self._pending[chat_id] = pending
+        return pending.future
+
+    async def flush(self) -> None:
+        """Відправляє всі позначки одразу (наприклад, перед зупинкою)."""
+
+        for chat_id in list(self._pending):
+            self._start(chat_id)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def metrics(self) -> Dict[str, int]:
+        """Лічильники позначок: скільки просили, скільки RPC відправлено і заощаджено."""
+
+        return {"pending": len(self._pending), **self.stats}
+
+    # =====================
+    # Внутрішні методи
+    # =====================
+
+    def _start(self, chat_id: int | str) -> None:
+        pending = self._pending.pop(chat_id, None)
+        if pending is None:
+            return
+        if pending.handle is not None:
+            pending.handle.cancel()
+        task = asyncio.create_task(self._send(chat_id, pending))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, chat_id: int | str, pending: _PendingAck) -> None:
+        ok = False
+        try:
+            await self._acknowledge(chat_id, pending.max_id)
+            ok = True
+            self.stats["sent"] += 1
+            self._acked[chat_id] = max(self._acked.get(chat_id, 0), pending.max_id)
+        except Exception as exc:
+            self.stats["errors"] += 1
+            print(f"⚠️ Не вдалося позначити повідомлення прочитаними в чаті {chat_id}: {exc}")
+        finally:
+            if not pending.future.done():
+                pending.future.set_result(ok)
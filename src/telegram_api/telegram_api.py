@@ -2,12 +2,25 @@ import asyncio
 import json
 import os
 from datetime import datetime, timezone
-
-from telethon import TelegramClient, events, functions, types, utils
-from telethon.tl.types import Channel, Chat, User
-
-from settings import ANSWER_TO_TELEGRAM_BOTS, HISTORY_BASE_DIR, USER_INFO_FILENAME
+from typing import AsyncIterator
+
+from telethon import TelegramClient, errors, events, functions, types, utils
+from telethon.tl.types import Channel, Chat
+
+from settings import (
+    ANSWER_TO_TELEGRAM_BOTS,
+    HISTORY_BASE_DIR,
+    TELEGRAM_MEMORY_SESSION,
+    TELEGRAM_SESSION_CHECKPOINT_SECONDS,
+    USER_INFO_FILENAME,
+)
+from .checkpoint_session import CheckpointSession
 from .config import SESSION_DIR, SESSION_NAME, TELEGRAM_API_HASH, TELEGRAM_API_ID
+from .entity_cache import CachedEntity, EntityCache
+from .ingest_pipeline import IngestPipeline
+from .outbound_queue import OutboundQueue
+from .read_ack import ReadAckCoalescer
+from .typing_session import TypingHold, TypingSessions
 
 class TelegramAPI:
     """Клас-обгортка для Telegram-клієнта (Telethon)."""
@@ -33,8 +46,16 @@ class TelegramAPI:
         target_session = session_name or SESSION_NAME
         session_path = os.path.join(SESSION_DIR, target_session)
 
+        # Сесія в пам'яті з періодичним збереженням у той самий .session файл
+        self.session = CheckpointSession(session_path) if TELEGRAM_MEMORY_SESSION else None
+        self._checkpoint_task: asyncio.Task | None = None
+
         # Ініціалізуємо клієнт
-        self.client = TelegramClient(session_path, TELEGRAM_API_ID, TELEGRAM_API_HASH)
+        self.client = TelegramClient(
+            self.session if self.session is not None else session_path,
+            TELEGRAM_API_ID,
+            TELEGRAM_API_HASH,
+        )
 
         # Зберігаємо прапорець, чи потрібно слухати вхідні події
         self._enable_incoming = enable_incoming
@@ -42,6 +63,21 @@ class TelegramAPI:
         # Роутер ми підставимо пізніше через set_router()
         self._router = None
 
+        # Один оновлюваний статус typing на чат (спільний для всіх дій плану)
+        self.typing = TypingSessions(sender=self._set_typing)
+
+        # Усі відправки йдуть через чергу з лімітами Telegram та повтором після FloodWait
+        self.outbound = OutboundQueue(retry_after=self._flood_wait_seconds)
+
+        # Кеш користувачів/peer-ів, щоб не резолвити їх на кожне повідомлення
+        self.entities = EntityCache()
+
+        # Обробник апдейтів лише ставить подію в чергу; решту роблять воркери
+        self.ingest = IngestPipeline(process=self._ingest_new_message)
+
+        # Позначки «прочитано» об'єднуються: один RPC на чат за коротке вікно
+        self.read_acks = ReadAckCoalescer(acknowledge=self._send_read_acknowledge)
+
         # Реєструємо обробники тільки якщо вхідний потік дозволено
         if self._enable_incoming:
             # incoming=True — ловимо тільки повідомлення від інших користувачів
@@ -59,18 +95,111 @@ class TelegramAPI:
     async def connect(self) -> None:
         """Підключається до Telegram, авторизує користувача при першому запуску."""
         await self.client.start()
+        if self.session is not None and self._checkpoint_task is None:
+            self._checkpoint_task = asyncio.create_task(
+                self.session.run_periodic(TELEGRAM_SESSION_CHECKPOINT_SECONDS)
+            )
         me = await self.client.get_me()
         print(f"✅ Авторизовано як: {me.first_name} (id: {me.id})")
 
     async def run(self) -> None:
         """Запускає нескінченне прослуховування повідомлень."""
         print("👂 Слухаю вхідні повідомлення... (Ctrl+C щоб вийти)")
-        await self.client.run_until_disconnected()
+        try:
+            await self.client.run_until_disconnected()
+        finally:
+            await self.ingest.stop()
+            await self.read_acks.flush()
+            read_stats = self.read_acks.metrics()
+            print(
+                f"👁 Позначки прочитаного: {read_stats.get('sent', 0)} запитів "
+                f"на {read_stats.get('requested', 0)} позначок "
+                f"(заощаджено {read_stats.get('saved', 0)})."
+            )
+            entity_stats = self.entities.metrics()
+            print(
+                f"📇 Кеш сутностей: {entity_stats['entries']} записів, "
+                f"влучань {entity_stats['hit_rate']:.0%} "
+                f"({entity_stats.get('hits', 0)} / промахів {entity_stats.get('misses', 0)}, "
+                f"прострочено {entity_stats.get('expired', 0)}, витіснено {entity_stats.get('evicted', 0)})."
+            )
+            outbound_stats = self.outbound.metrics()
+            print(
+                f"📤 Черга вихідних: {outbound_stats.get('sent', 0)} з {outbound_stats.get('submitted', 0)} "
+                f"викликів надіслано, FloodWait {outbound_stats.get('flood_waits', 0)}, "
+                f"повторів {outbound_stats.get('retries', 0)}, помилок {outbound_stats.get('failed', 0)}, "
+                f"в черзі {outbound_stats['queued']}; затримка p50={outbound_stats['delay_p50']}с "
+                f"p95={outbound_stats['delay_p95']}с max={outbound_stats['delay_max']}с."
+            )
+            self.entities.save()
+            if self._checkpoint_task is not None:
+                self._checkpoint_task.cancel()
+                self._checkpoint_task = None
+            if self.session is not None:
+                # На випадок зупинки без client.disconnect() (Ctrl+C).
+                self.session.checkpoint()
+
+    async def disconnect(self) -> None:
+        """Зупиняє чергу вихідних викликів і відключає клієнт (сесія зберігається при закритті)."""
+
+        await self.outbound.stop()
+        if self.client.is_connected():
+            await self.client.disconnect()
+
+    async def resolve_entity(self, key: int | str) -> CachedEntity:
+        """Повертає користувача/чат за id або username, звертаючись до Telegram лише при промаху кешу."""
+
+        cached = self.entities.get(key)
+        if cached is not None:
+            return cached
+        entity = await self.client.get_entity(key)
+        return self.entities.put(entity)
+
+    def input_peer(self, chat_id: int | str):
+        """Готовий InputPeer з кешу (None, якщо сутність ще невідома)."""
+
+        try:
+            real_id, peer_type = utils.resolve_id(int(chat_id))
+        except (TypeError, ValueError):
+            return None
+        entry = self.entities.get(real_id)
+        if entry is None:
+            return None
+        if peer_type is types.PeerChat:
+            return types.InputPeerChat(chat_id=entry.id)
+        if entry.access_hash is None:
+            return None
+        if peer_type is types.PeerChannel:
+            return types.InputPeerChannel(channel_id=entry.id, access_hash=entry.access_hash)
+        return types.InputPeerUser(user_id=entry.id, access_hash=entry.access_hash)
+
+    @staticmethod
+    def _outbound_lane(chat_id) -> int | str:
+        """Канонічний ключ лінії вихідної черги — позначений peer id (як event.chat_id).
+
+        Усі виклики в один чат мають іти однією лінією, інакше порядок і
+        ліміти чату діляться між "-100…", "100…" та "…"-рядком. Юзернейми
+        лишаються як є.
+        """
+
+        if isinstance(chat_id, str):
+            try:
+                chat_id = int(chat_id)
+            except ValueError:
+                return chat_id
+        try:
+            return utils.get_peer_id(chat_id)
+        except TypeError:
+            return chat_id
 
     async def send_message(self, chat_id: int | str, text: str):
         """Надсилає повідомлення у вказаний чат (без reply) і повертає Message."""
 
-        message = await self.client.send_message(chat_id, text)
+        message = await self.outbound.submit(
+            self._outbound_lane(chat_id), lambda: self.client.send_message(chat_id, text)
+        )
+        # Telegram гасить typing разом із повідомленням — сесія це враховує.
+        self.typing.message_sent(chat_id)
         print(f"📨 Відправлено повідомлення в чат {chat_id}: {text}")
         return message
 
@@ -150,148 +279,205 @@ class TelegramAPI:
     async def fetch_unread_messages(self, chat_id: int | str) -> list[dict]:
         """Повертає всі непрочитані вхідні повідомлення у вигляді простих словників.
 
-        Ми проходимося по повідомленнях з кінця діалогу (новіші першими) і
-        зупиняємося, щойно натрапляємо на перше прочитане повідомлення.
-        Це дозволяє не сканувати всю історію, якщо непрочитані лежать блоком.
+        Списком-обгорткою над iter_unread_messages — для місць, яким потрібен
+        увесь блок одразу. Повідомлення вже йдуть від старого до нового.
+        """
+
+        return [message async for message in self.iter_unread_messages(chat_id)]
+
+    async def iter_unread_messages(
+        self, chat_id: int | str, limit: int | None = None
+    ) -> AsyncIterator[dict]:
+        """Віддає непрочитані вхідні повідомлення від старого до нового.
+
+        Межі беремо з самого діалогу: read_inbox_max_id (усе до нього
+        прочитано), top_message (останнє повідомлення) та unread_count.
+        Тож читається рівно діапазон непрочитаних сторінками Telethon, а не
+        вся історія з кінця, навіть якщо непрочитані перемежовані нашими
+        відповідями. Якщо непрочитаних немає — жодного запиту за повідомленнями.
 
         Відразу описуємо тип повідомлення через _detect_message_type, щоб
         отримати такий самий prepared_content, як під час онлайн-обробки.
         """
 
-        unread_messages: list[dict] = []
-        found_unread_block = False
+        dialog = await self._get_dialog(chat_id)
+        if dialog is None or not dialog.unread_count:
+            return
 
-        async for message in self.client.iter_messages(chat_id, limit=None):
+        remaining = dialog.unread_count if limit is None else min(limit, dialog.unread_count)
+        async for message in self.client.iter_messages(
+            chat_id,
+            min_id=dialog.read_inbox_max_id,
+            max_id=dialog.top_message + 1,
+            reverse=True,
+        ):
             if getattr(message, "out", False):
                 # Пропускаємо наші власні повідомлення, нас цікавлять тільки вхідні.
                 continue
-
-            if getattr(message, "unread", False):
-                found_unread_block = True
-                msg_type, prepared_content, media_meta = self._detect_message_type(message)
-                unread_messages.append(
-                    {
-                        "id": getattr(message, "id", None),
-                        "text": prepared_content,
-                        "date": getattr(message, "date", None) or datetime.now(timezone.utc),
-                        "msg_type": msg_type,
-                        "media_meta": media_meta,
-                    }
-                )
-            elif found_unread_block:
-                # Якщо ми вже назбирали непрочитані та дійшли до прочитаного,
-                # вважаємо, що блок непрочитаних завершився.
+            yield self._message_record(message)
+            remaining -= 1
+            if remaining <= 0:
                 break
 
-        # Сортуємо за id, щоб у історії повідомлення збереглись у правильному порядку (від старого до нового).
-        unread_messages.sort(key=lambda item: item.get("id") or 0)
-        return unread_messages
-
     async def fetch_messages_after(
         self, chat_id: int | str, last_message_id: int, limit: int | None = None
     ) -> list[dict]:
-        """Повертає всі вхідні повідомлення після last_message_id включно.
+        """Повертає всі вхідні повідомлення після last_message_id (список над iter_messages_after)."""
 
-        Використовується для догрузки пропущених повідомлень навіть якщо вони вже
-        позначені прочитаними. Якщо limit передано, зрізаємо результат до цього
-        розміру з кінця (щоб залишились найновіші).
-        """
-
-        collected: list[dict] = []
-
-        async for message in self.client.iter_messages(chat_id, min_id=last_message_id):
-            if getattr(message, "out", False):
-                continue
-
-            msg_type, prepared_content, media_meta = self._detect_message_type(message)
-            collected.append(
-                {
-                    "id": getattr(message, "id", None),
-                    "text": prepared_content,
-                    "date": getattr(message, "date", None) or datetime.now(timezone.utc),
-                    "msg_type": msg_type,
-                    "media_meta": media_meta,
-                }
-            )
+        return [
+            message
+            async for message in self.iter_messages_after(chat_id, last_message_id, limit=limit)
+        ]
 
-        collected.sort(key=lambda item: item.get("id") or 0)
+    async def iter_messages_after(
+        self, chat_id: int | str, last_message_id: int, limit: int | None = None
+    ) -> AsyncIterator[dict]:
+        """Віддає вхідні повідомлення після last_message_id від старого до нового.
 
-        if limit is not None and len(collected) > limit:
-            collected = collected[-limit:]
+        Використовується для догрузки пропущених повідомлень навіть якщо вони вже
+        позначені прочитаними. Якщо limit передано, лишаються найновіші limit
+        повідомлень: читаємо з кінця лише до них (а не всю історію від
+        last_message_id). Без limit — потоком від last_message_id уперед.
+        """
 
-        return collected
+        async for message in self._iter_after(
+            chat_id, last_message_id, limit=limit, incoming_only=True
+        ):
+            yield message
 
     async def fetch_dialog_messages_after(
         self, chat_id: int | str, last_message_id: int, limit: int = 50
     ) -> list[dict]:
-        """Повертає як вхідні, так і вихідні повідомлення після last_message_id.
+        """Повертає вхідні й вихідні повідомлення після last_message_id (список над iter_dialog_messages_after).
 
-        Потрібно для синхронізації історії, коли потрібно підтягнути пропущені
-        меседжі обох ролей. Обмежуємо результат максимально `limit` елементами,
-        щоб не перевантажувати диск і пам'ять.
+        Лишився для RemoteTelegramAPI шардів: генератор не передати між процесами.
         """
 
-        collected: list[dict] = []
-
-        async for message in self.client.iter_messages(chat_id, min_id=last_message_id):
-            msg_type, prepared_content, media_meta = self._detect_message_type(message)
-            collected.append(
-                {
-                    "id": getattr(message, "id", None),
-                    "text": prepared_content,
-                    "date": getattr(message, "date", None) or datetime.now(timezone.utc),
-                    "msg_type": msg_type,
-                    "media_meta": media_meta,
-                    "out": getattr(message, "out", False),
-                }
+        return [
+            message
+            async for message in self.iter_dialog_messages_after(
+                chat_id, last_message_id, limit=limit
             )
+        ]
 
-        collected.sort(key=lambda item: item.get("id") or 0)
+    async def iter_dialog_messages_after(
+        self, chat_id: int | str, last_message_id: int, limit: int | None = 50
+    ) -> AsyncIterator[dict]:
+        """Віддає як вхідні, так і вихідні повідомлення після last_message_id.
 
-        if len(collected) > limit:
-            collected = collected[-limit:]
+        Потрібно для синхронізації історії, коли потрібно підтягнути пропущені
+        меседжі обох ролей. Лишаються максимально `limit` найновіших, і з
+        Telegram читаються лише вони, щоб не перевантажувати мережу й пам'ять.
+        """
 
-        return collected
+        async for message in self._iter_after(
+            chat_id, last_message_id, limit=limit, incoming_only=False
+        ):
+            yield message
 
     async def fetch_recent_incoming_messages(
         self, chat_id: int | str, limit: int = 20
     ) -> list[dict]:
-        """Повертає останні N вхідних повідомлень користувача.
+        """Повертає останні вхідні повідомлення (список над iter_recent_incoming_messages)."""
+
+        return [
+            message async for message in self.iter_recent_incoming_messages(chat_id, limit=limit)
+        ]
+
+    async def iter_recent_incoming_messages(
+        self, chat_id: int | str, limit: int = 20
+    ) -> AsyncIterator[dict]:
+        """Віддає вхідні серед останніх N повідомлень чату, від старого до нового.
 
         Фільтруємо лише не наші повідомлення (out=False), щоб зібрати чисту
         історію користувача для ініціалізації діалогу.
         """
 
-        collected: list[dict] = []
-
-        async for message in self.client.iter_messages(chat_id, limit=limit):
+        window = [message async for message in self.client.iter_messages(chat_id, limit=limit)]
+        for message in reversed(window):
             if getattr(message, "out", False):
                 continue
+            yield self._message_record(message)
+
+    async def _iter_after(
+        self,
+        chat_id: int | str,
+        last_message_id: int,
+        limit: int | None,
+        incoming_only: bool,
+    ) -> AsyncIterator[dict]:
+        """Спільна вибірка після last_message_id у правильному напрямку.
+
+        Без limit ідемо reverse=True від last_message_id і віддаємо записи
+        одразу. З limit потрібні найновіші, тож ідемо з кінця, зупиняємося
+        на limit-му підхожому повідомленні й віддаємо це вікно від старого до нового.
+        """
 
-            msg_type, prepared_content, media_meta = self._detect_message_type(message)
-            collected.append(
-                {
-                    "id": getattr(message, "id", None),
-                    "text": prepared_content,
-                    "date": getattr(message, "date", None) or datetime.now(timezone.utc),
-                    "msg_type": msg_type,
-                    "media_meta": media_meta,
-                }
-            )
+        if limit is None:
+            async for message in self.client.iter_messages(
+                chat_id, min_id=last_message_id, reverse=True
+            ):
+                if incoming_only and getattr(message, "out", False):
+                    continue
+                yield self._message_record(message, with_out=not incoming_only)
+            return
 
-        collected.sort(key=lambda item: item.get("id") or 0)
-        return collected
+        if limit <= 0:
+            return
+        window: list = []
+        async for message in self.client.iter_messages(chat_id, min_id=last_message_id):
+            if incoming_only and getattr(message, "out", False):
+                continue
+            window.append(message)
+            if len(window) >= limit:
+                break
+        for message in reversed(window):
+            yield self._message_record(message, with_out=not incoming_only)
 
-    async def mark_messages_read(self, chat_id: int | str, max_message_id: int) -> None:
-        """Позначає повідомлення у чаті як прочитані до вказаного message_id включно."""
+    async def _get_dialog(self, chat_id: int | str):
+        """Діалог із лічильниками прочитаного (один GetPeerDialogs без обходу всіх діалогів)."""
 
         try:
-            await self.client.send_read_acknowledge(chat_id, max_id=max_message_id)
-            print(
-                f"👁 Позначено прочитаним чат {chat_id} до message_id={max_message_id}."
+            peer = self.input_peer(chat_id) or await self.client.get_input_entity(chat_id)
+            result = await self.client(
+                functions.messages.GetPeerDialogsRequest(peers=[types.InputDialogPeer(peer=peer)])
             )
         except Exception as exc:
-            print(f"⚠️ Не вдалося позначити повідомлення прочитаними: {exc}")
+            print(f"⚠️ Не вдалося отримати стан діалогу {chat_id}: {exc}")
+            return None
+        return result.dialogs[0] if result.dialogs else None
+
+    def _message_record(self, message, with_out: bool = False) -> dict:
+        """Простий словник повідомлення (як у fetch_* хелперах) для історії/синхронізації."""
+
+        msg_type, prepared_content, media_meta = self._detect_message_type(message)
+        record = {
+            "id": getattr(message, "id", None),
+            "text": prepared_content,
+            "date": getattr(message, "date", None) or datetime.now(timezone.utc),
+            "msg_type": msg_type,
+            "media_meta": media_meta,
+        }
+        if with_out:
+            record["out"] = getattr(message, "out", False)
+        return record
+
+    async def mark_messages_read(self, chat_id: int | str, max_message_id: int) -> None:
+        """Позначає повідомлення у чаті як прочитані до вказаного message_id включно.
+
+        Йде через той самий коалесер, що й вхідні повідомлення, і чекає, поки
+        об'єднана позначка піде в Telegram.
+        """
+
+        await self.read_acks.mark(chat_id, max_message_id)
+
+    async def _send_read_acknowledge(self, chat_id: int | str, max_message_id: int) -> None:
+        """Один ReadHistory-запит для чату (викликає ReadAckCoalescer)."""
+
+        await self.client.send_read_acknowledge(
+            self.input_peer(chat_id) or chat_id, max_id=max_message_id
+        )
+        print(f"👁 Позначено прочитаним чат {chat_id} до message_id={max_message_id}.")
 
     async def _on_new_message(self, event) -> None:
         """
@@ -310,10 +496,26 @@ class TelegramAPI:
             print("⚠️ Отримано повідомлення, але роутер не налаштований.")
             return
 
-        sender = await event.get_sender()
+        # Далі все (відправник, медіа, роутер) — у воркерах, по черзі для кожного чату.
+        if not self.ingest.submit(event.chat_id, event):
+            print(
+                f"🚧 Черга вхідних переповнена ({self.ingest.pending}) — "
+                f"повідомлення в чаті {event.chat_id} підтягне sync_unread."
+            )
+
+    async def _ingest_new_message(self, event) -> None:
+        """Обробка вхідного повідомлення воркером конвеєра (поза обробником Telethon)."""
+
+        # Відправник з кешу; get_sender() (можливий RPC) — лише при промаху або застарілому записі.
+        sender_id = getattr(event, "sender_id", None)
+        sender = self.entities.get(sender_id) if sender_id is not None else None
+        if sender is None:
+            sender = await event.get_sender()
+            if sender is not None:
+                self.entities.put(sender)
 
         # Ігноруємо телеграм-ботів, якщо це заборонено налаштуванням.
-        if not ANSWER_TO_TELEGRAM_BOTS and isinstance(sender, User) and getattr(sender, "bot", False):
+        if not ANSWER_TO_TELEGRAM_BOTS and getattr(sender, "bot", False):
             return
 
         # Безпечний витяг ID відправника: беремо з sender або з самого event
@@ -350,24 +552,28 @@ class TelegramAPI:
             is_private_chat=event.is_private,
         )
 
-        try:
-            # Позначаємо повідомлення як прочитане, щоби Telegram не показував "непрочитано".
-            await event.mark_read()
-        except Exception as exc:
-            # Якщо не вдалось — просто лог, бо це не критично для подальшої логіки.
-            print(f"⚠️ Не вдалося позначити повідомлення прочитаним: {exc}")
-
-        # Передаємо в роутер для обробки (LLM, логіка, відповідь)
-        await self._router.handle_incoming_message(
+        # Передаємо в роутер для обробки (LLM, логіка, відповідь). Роутер спершу
+        # журналює повідомлення й сигналізує переривання плану, а вже потім
+        # завантажує та розпізнає медіа (ShardedRouter цього не вміє — тоді це
+        # зробить шард).
+        message_id = getattr(event.message, "id", None)
+        accepted = await self._router.handle_incoming_message(
             user_id=user_id,
             chat_id=chat_id,
             content=prepared_content,
             msg_type=msg_type,
             media_meta=media_meta,
             message_time=message_date,
-            message_id=getattr(event.message, "id", None),
+            message_id=message_id,
+            prepare_media=True,
         )
 
+        # Позначаємо прочитаним лише прийняте роутером: відкинуте під
+        # перевантаженням лишається непрочитаним і його підтягне sync_unread.
+        # Не чекаємо: позначки пачки меседжів підуть одним запитом після вікна.
+        if accepted and message_id is not None:
+            self.read_acks.mark(chat_id, message_id)
+
     def _detect_message_type(self, message) -> tuple[str, str, dict]:
         """Визначає тип повідомлення та повертає опис для історії/LLM.
 
@@ -599,8 +805,16 @@ class TelegramAPI:
         except Exception:
             return "unknown"
 
-    async def send_typing(self, chat_id: int | str, duration: float) -> None:
-        """Надсилає статус "typing" та чекає потрібний час.
+    async def send_typing(
+        self,
+        chat_id: int | str,
+        duration: float,
+        interrupt: asyncio.Event | None = None,
+    ) -> bool:
+        """Показує статус "typing" та чекає потрібний час.
+
+        Статус тримається через спільну сесію чату (див. typing_session.py):
+        кілька показів поспіль не перезапускають typing і не мерехтять.
 
         Parameters
         ----------
@@ -608,17 +822,65 @@ class TelegramAPI:
             Чат, у якому потрібно показати, що "бот" набирає текст.
         duration: float
             Скільки секунд підтримувати статус typing.
+        interrupt: asyncio.Event | None
+            Якщо подія спрацює раніше, показ typing припиняється одразу.
+
+        Returns
+        -------
+        bool
+            True, якщо показ typing перервано подією interrupt.
         """
 
         if duration <= 0:
-            return
+            return False
 
-        try:
-            # context manager Telethon сам зніме статус typing після виходу з блоку
-            async with self.client.action(chat_id, "typing"):
+        async with self.typing.hold(chat_id):
+            if interrupt is None:
                 await asyncio.sleep(duration)
-        except Exception as exc:
-            print(f"⚠️ Не вдалося показати статус typing у чаті {chat_id}: {exc}")
+                return False
+            try:
+                await asyncio.wait_for(interrupt.wait(), timeout=duration)
+                return True
+            except asyncio.TimeoutError:
+                return False
+
+    def typing_session(self, chat_id: int | str) -> TypingHold:
+        """Тримає typing у чаті на весь блок `async with` (наприклад, на всю пачку меседжів).
+
+        Відправлене всередині повідомлення не гасить статус: він одразу
+        показується знову. Щоб typing зник разом з останнім повідомленням,
+        утримання знімають (release()) перед його відправкою.
+        """
+
+        return self.typing.hold(chat_id)
+
+    async def hold_typing(self, chat_id: int | str) -> None:
+        """Тримає typing, доки виклик не скасують (для воркерів шардів)."""
+
+        async with self.typing.hold(chat_id):
+            await asyncio.Event().wait()
+
+    @staticmethod
+    def _flood_wait_seconds(exc: BaseException) -> float | None:
+        """Скільки чекати після FloodWait/SlowModeWait (None — інша помилка)."""
+
+        if isinstance(exc, (errors.FloodWaitError, errors.SlowModeWaitError)):
+            return float(exc.seconds)
+        return None
+
+    async def _set_typing(self, chat_id: int | str, typing: bool) -> None:
+        """Один RPC SetTyping: показати статус набору або скасувати його.
+
+        Іде через ту саму лінію вихідної черги, що й повідомлення чату: ліміти
+        спільні, а FloodWait паркує лінію замість того, щоб сесія typing
+        продовжувала смикати Telegram.
+        """
+
+        action = types.SendMessageTypingAction() if typing else types.SendMessageCancelAction()
+        request = functions.messages.SetTypingRequest(
+            peer=self.input_peer(chat_id) or chat_id, action=action
+        )
+        await self.outbound.submit(self._outbound_lane(chat_id), lambda: self.client(request))
 
     async def send_reaction(self, chat_id: int | str, message_id: int | str, emoji: str) -> None:
         """Ставитиме реакцію на конкретне повідомлення у чаті.
@@ -644,15 +906,15 @@ class TelegramAPI:
 
         try:
             # Використовуємо низькорівневий запит, який стабільно працює із збереженими сесіями.
-            await self.client(
-                functions.messages.SendReactionRequest(
-                    peer=prepared_chat_id,
-                    msg_id=prepared_message_id,
-                    reaction=[types.ReactionEmoji(emoticon=emoji)],
-                    big=False,
-                    add_to_recent=False,
-                )
+            request = functions.messages.SendReactionRequest(
+                # Peer з кешу не потребує резолву; інакше Telethon знайде його сам.
+                peer=self.input_peer(chat_id) or prepared_chat_id,
+                msg_id=prepared_message_id,
+                reaction=[types.ReactionEmoji(emoticon=emoji)],
+                big=False,
+                add_to_recent=False,
             )
+            await self.outbound.submit(self._outbound_lane(chat_id), lambda: self.client(request))
 
             print(
                 f"✅ Додано реакцію '{emoji}' у чаті {prepared_chat_id} для message_id={prepared_message_id}."
@@ -688,14 +950,11 @@ class TelegramAPI:
             user_id = utils.get_peer_id(recent_reaction.peer_id)
             emoji = getattr(recent_reaction.reaction, "emoticon", None) or "(unknown)"
 
-            # Фіксуємо простановку реакції у історії з чітким форматом, який читається як людьми, так і LLM.
-            self._router.history.append_message(
+            # Історію пише роутер: у режимі шардів це робить процес, якому належить користувач.
+            await self._router.record_reaction(
                 user_id=user_id,
-                role="user",
-                content=f"[REACTION] '{emoji}' on message_id = {message_id}",
+                emoji=emoji,
                 message_time_iso=message_time_iso,
-                # Зберігаємо ID повідомлення, на яке поставили реакцію, щоб
-                # у контексті можна було зв'язати реакцію з конкретним меседжем.
                 message_id=message_id,
             )
 
@@ -747,7 +1006,8 @@ class TelegramAPI:
             "chat_title": chat_title,
         }
 
-        if isinstance(sender, (Channel, Chat)) and not profile_data["first_name"]:
+        is_group = isinstance(sender, (Channel, Chat)) or getattr(sender, "kind", "user") != "user"
+        if is_group and not profile_data["first_name"]:
             # Для групових чатів first_name/last_name зазвичай відсутні, тому підхоплюємо title
             profile_data["first_name"] = getattr(sender, "title", None)
 
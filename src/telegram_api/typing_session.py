@@ -0,0 +1,165 @@
+"""Сесії статусу typing: один оновлюваний статус на чат замість RPC на кожен меседж.
+
+Раніше кожен показ typing відкривав новий client.action(...): SetTyping на
+вході, cancel на виході — і так для кожного повідомлення пачки, з помітним
+мерехтінням між ними. Тут статус чату живе, поки його хтось тримає (hold):
+- перший hold надсилає typing, далі він оновлюється кожні refresh_seconds;
+- після відправки повідомлення Telegram сам гасить typing: якщо статус ще
+  тримають — одразу показуємо його знову, якщо ні — сесія закривається без
+  cancel-RPC (typing зникає саме з останнім повідомленням);
+- коли останній hold знято без відправки, сесія живе ще linger_seconds: якщо
+  за цей час почнеться наступний показ, статус не перезапускається.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Set
+
+from settings import TYPING_LINGER_SECONDS, TYPING_REFRESH_SECONDS
+
+# Надсилає статус чату: (chat_id, typing) -> None; typing=False — скасування.
+TypingSender = Callable[[int | str, bool], Awaitable[None]]
+
+
+@dataclass
+class _Session:
+    holders: int = 0
+    task: asyncio.Task | None = None
+    wake: asyncio.Event = field(default_factory=asyncio.Event)
+    stop_handle: asyncio.TimerHandle | None = None
+    # Після останнього оновлення в чат відправлено повідомлення (typing згас).
+    sent_since_refresh: bool = False
+
+
+class TypingHold:
+    """Утримання статусу typing у чаті (async context manager)."""
+
+    def __init__(self, sessions: "TypingSessions", chat_id: int | str) -> None:
+        self._sessions = sessions
+        self._chat_id = chat_id
+        self._session: _Session | None = None
+
+    async def __aenter__(self) -> "TypingHold":
+        self._session = self._sessions._acquire(self._chat_id)
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.release()
+
+    def release(self) -> None:
+        """Знімає утримання достроково (повторний виклик нічого не робить)."""
+
+        if self._session is not None:
+            self._sessions._release(self._chat_id, self._session)
+            self._session = None
+
+
+class TypingSessions:
+    """Реєстр сесій typing по чатах."""
+
+    def __init__(
+        self,
+        sender: TypingSender,
+        refresh_seconds: float = TYPING_REFRESH_SECONDS,
+        linger_seconds: float = TYPING_LINGER_SECONDS,
+    ) -> None:
+        self.refresh_seconds = refresh_seconds
+        self.linger_seconds = linger_seconds
+        # started, refreshes, cancels, closed_by_send, errors
+        self.stats: Counter = Counter()
+
+        self._sender = sender
+        self._sessions: Dict[int | str, _Session] = {}
+        self._background: Set[asyncio.Task] = set()
+
+    def hold(self, chat_id: int | str) -> TypingHold:
+        """Повертає утримання статусу typing для `async with`."""
+
+        return TypingHold(self, chat_id)
+
+    def is_active(self, chat_id: int | str) -> bool:
+        return chat_id in self._sessions
+
+    def message_sent(self, chat_id: int | str) -> None:
+        """Викликається після відправки повідомлення в чат."""
+
+        session = self._sessions.get(chat_id)
+        if session is None:
+            return
+        session.sent_since_refresh = True
+        if session.holders:
+            # Статус ще потрібен (далі буде наступне повідомлення) — показуємо одразу.
+            session.wake.set()
+        else:
+            self.stats["closed_by_send"] += 1
+            self._close(chat_id, session, cancel=False)
+
+    # =====================
+    # Внутрішні методи
+    # =====================
+
+    def _acquire(self, chat_id: int | str) -> _Session:
+        session = self._sessions.get(chat_id)
+        if session is None:
+            session = _Session()
+            self._sessions[chat_id] = session
+            session.task = asyncio.create_task(self._refresh_loop(chat_id, session))
+            self.stats["started"] += 1
+        else:
+            if session.stop_handle is not None:
+                session.stop_handle.cancel()
+                session.stop_handle = None
+            if session.sent_since_refresh:
+                session.wake.set()
+        session.holders += 1
+        return session
+
+    def _release(self, chat_id: int | str, session: _Session) -> None:
+        session.holders -= 1
+        if session.holders > 0 or self._sessions.get(chat_id) is not session:
+            return
+        if session.sent_since_refresh:
+            # Typing уже згас разом із відправленим повідомленням.
+            self._close(chat_id, session, cancel=False)
+            return
+        loop = asyncio.get_running_loop()
+        session.stop_handle = loop.call_later(
+            self.linger_seconds, self._close, chat_id, session, True
+        )
+
+    def _close(self, chat_id: int | str, session: _Session, cancel: bool) -> None:
+        if self._sessions.get(chat_id) is session:
+            del self._sessions[chat_id]
+        if session.stop_handle is not None:
+            session.stop_handle.cancel()
+            session.stop_handle = None
+        if session.task is not None:
+            session.task.cancel()
+        if cancel:
+            self.stats["cancels"] += 1
+            task = asyncio.create_task(self._send(chat_id, False))
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+
+    async def _refresh_loop(self, chat_id: int | str, session: _Session) -> None:
+        while self._sessions.get(chat_id) is session:
+            session.wake.clear()
+            session.sent_since_refresh = False
+            self.stats["refreshes"] += 1
+            await self._send(chat_id, True)
+            try:
+                await asyncio.wait_for(session.wake.wait(), timeout=self.refresh_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _send(self, chat_id: int | str, typing: bool) -> None:
+        try:
+            await self._sender(chat_id, typing)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            self.stats["errors"] += 1
+            print(f"⚠️ Не вдалося оновити статус typing у чаті {chat_id}: {exc}")
@@ -0,0 +1,4 @@
+from settings import USAGE_LEDGER_ENABLED, USAGE_LEDGER_PATH
+
+# Налаштування журналу витрат визначаються у файлі settings.py, тож тут просто
+# імпортуємо вже готові значення.
@@ -0,0 +1,165 @@
+"""
+usage_ledger.py — журнал витрат токенів і затримок LLM.
+
+Ідея:
+- Кожен виклик LLM дописується окремим рядком у JSONL-файл (append-only).
+- Агрегати (по користувачу, моделі та дню) рахуються під час читання,
+  тож файл ніколи не переписується і не може зіпсуватися частковим записом.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Tuple
+
+from .config import USAGE_LEDGER_ENABLED, USAGE_LEDGER_PATH
+
+
+@dataclass
+class UsageBucket:
+    """Сумарні витрати для однієї групи викликів."""
+
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    wall_seconds: List[float] = field(default_factory=list)
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def add(self, record: dict) -> None:
+        """Додає один запис журналу до агрегату."""
+
+        self.calls += 1
+        self.prompt_tokens += int(record.get("prompt_tokens") or 0)
+        self.completion_tokens += int(record.get("completion_tokens") or 0)
+        self.cached_tokens += int(record.get("cached_tokens") or 0)
+        wall = record.get("wall_seconds")
+        if wall is not None:
+            self.wall_seconds.append(float(wall))
+
+    def percentile(self, fraction: float) -> float | None:
+        """Повертає перцентиль затримки (None, якщо замірів немає)."""
+
+        if not self.wall_seconds:
+            return None
+        ordered = sorted(self.wall_seconds)
+        index = min(len(ordered) - 1, int(fraction * len(ordered)))
+        return ordered[index]
+
+
+class UsageLedger:
+    """Append-only журнал викликів LLM з агрегацією по користувачах."""
+
+    def __init__(self, path: str | None = None, enabled: bool = USAGE_LEDGER_ENABLED):
+        """Створює журнал.
+
+        Parameters
+        ----------
+        path: str | None
+            Шлях до JSONL-файлу. Якщо не передано — USAGE_LEDGER_PATH.
+        enabled: bool
+            Якщо False, record() нічого не пише (читання працює завжди).
+        """
+
+        self.path = path or USAGE_LEDGER_PATH
+        self.enabled = enabled
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        user_id: int,
+        model: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        cached_tokens: int = 0,
+        wall_seconds: float | None = None,
+        server_seconds: float | None = None,
+        kind: str = "dialog",
+        reason: str | None = None,
+    ) -> None:
+        """Дописує один виклик LLM у журнал.
+
+        kind — звідки прийшов виклик (dialog, proactive, admin_proactive...),
+        reason — причина вибору моделі (див. ModelChoice у роутері).
+        """
+
+        if not self.enabled:
+            return
+
+        now = datetime.now(timezone.utc)
+        entry = {
+            "ts": now.strftime("%Y-%m-%dT%H:%M:%S"),
+            "day": now.strftime("%Y-%m-%d"),
+            "user_id": user_id,
+            "model": model,
+            "kind": kind,
+            "reason": reason,
+            "prompt_tokens": int(prompt_tokens or 0),
+            "completion_tokens": int(completion_tokens or 0),
+            "cached_tokens": int(cached_tokens or 0),
+            "wall_seconds": wall_seconds,
+            "server_seconds": server_seconds,
+        }
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":"))
+
+        try:
+            with self._lock:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as file:
+                    file.write(line + "\n")
+        except Exception as exc:
+            # Облік не повинен ламати відповідь користувачу.
+            print(f"⚠️ Не вдалося записати usage для {user_id}: {exc}")
+
+    def iter_records(self, days: int | None = None) -> Iterator[dict]:
+        """Ітерує записи журналу, за потреби лише за останні `days` днів."""
+
+        if not os.path.exists(self.path):
+            return
+
+        min_day = None
+        if days is not None:
+            min_day = (datetime.now(timezone.utc) - timedelta(days=max(days - 1, 0))).strftime(
+                "%Y-%m-%d"
+            )
+
+        with open(self.path, "r", encoding="utf-8") as file:
+            for line in file:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Битий рядок (наприклад, обірваний запис) просто пропускаємо.
+                    continue
+                if min_day and (record.get("day") or "") < min_day:
+                    continue
+                yield record
+
+    def aggregate(self, days: int | None = None) -> Dict[Tuple[int, str, str], UsageBucket]:
+        """Групує витрати за ключем (user_id, model, day)."""
+
+        buckets: Dict[Tuple[int, str, str], UsageBucket] = defaultdict(UsageBucket)
+        for record in self.iter_records(days=days):
+            key = (record.get("user_id"), record.get("model") or "unknown", record.get("day") or "")
+            buckets[key].add(record)
+        return dict(buckets)
+
+    def top_users(self, limit: int = 10, days: int | None = None) -> List[Tuple[int, UsageBucket]]:
+        """Повертає користувачів, відсортованих за сумарними токенами (спадання)."""
+
+        per_user: Dict[int, UsageBucket] = defaultdict(UsageBucket)
+        for record in self.iter_records(days=days):
+            per_user[record.get("user_id")].add(record)
+
+        ranked = sorted(per_user.items(), key=lambda item: item[1].total_tokens, reverse=True)
+        return ranked[: max(limit, 0)]
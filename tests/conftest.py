@@ -0,0 +1,122 @@
+"""Спільні тестові заміни для роутера: Telegram без мережі, скриптова LLM і фабрика роутера."""
+
+import json
+import os
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Додаємо шлях до кореня проєкту, щоб імпорт src працював під час тестів.
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+# Конфіг LLM вимагає ключ під час імпорту; для офлайн-тестів достатньо заглушки.
+os.environ.setdefault("LLM_API_KEY", "test-key")
+
+from src.history.history_manager import HistoryManager
+from src.llm_api.result import LLMResult, LLMUsage
+from src.router.utils.interrupt import sleep_unless_interrupted
+from src.telegram_api.typing_session import TypingSessions
+from src.usage.usage_ledger import UsageLedger
+
+
+class FakeTelegram:
+    """Telegram без мережі: записує надіслане, кожне повідомлення отримує новий id і поточний час.
+
+    message_id — необов'язкова функція text -> id, якщо тесту потрібні id,
+    виведені з тексту (наприклад, щоб перевірити їх на іншому боці RPC).
+    """
+
+    def __init__(self, first_message_id: int = 100, message_id=None) -> None:
+        self.sent = []
+        self.sent_to = []
+        self._next_id = first_message_id
+        self._message_id = message_id
+        self.typing = TypingSessions(sender=self._set_typing)
+
+    def typing_session(self, chat_id):
+        return self.typing.hold(chat_id)
+
+    async def _set_typing(self, chat_id, typing) -> None:
+        return None
+
+    async def send_typing(self, chat_id, seconds, interrupt=None) -> bool:
+        return await sleep_unless_interrupted(seconds, interrupt)
+
+    async def send_message(self, chat_id, text):
+        self.sent.append(text)
+        self.sent_to.append((chat_id, text))
+        self._next_id += 1
+        message_id = self._message_id(text) if self._message_id else self._next_id
+        return SimpleNamespace(id=message_id, date=datetime.now(timezone.utc))
+
+
+class ScriptedLLM:
+    """LLM без мережі: reply(messages) повертає список дій, які загортаються в LLMResult."""
+
+    model = "m"
+    fallback_model = None
+
+    def __init__(self, reply, wall_seconds: float = 0.0) -> None:
+        self.reply = reply
+        self.wall_seconds = wall_seconds
+
+    def generate(self, messages, model=None, timeout=None, response_format=None) -> LLMResult:
+        actions = {"actions": self.reply(messages)}
+        return LLMResult(
+            content=json.dumps(actions),
+            model=model or self.model,
+            usage=LLMUsage(10, 5, 0),
+            wall_seconds=self.wall_seconds,
+        )
+
+
+@pytest.fixture
+def fake_telegram():
+    """Клас FakeTelegram — тести створюють екземпляри або наслідуються від нього."""
+
+    return FakeTelegram
+
+
+@pytest.fixture
+def scripted_llm():
+    """Клас ScriptedLLM — сценарій тесту передає лише свою функцію reply."""
+
+    return ScriptedLLM
+
+
+@pytest.fixture
+def router_module(monkeypatch):
+    """Модуль роутера з налаштуваннями для швидких офлайн-тестів.
+
+    Debounce короткий, спекуляція, адаптивний debounce і user_info вимкнені;
+    тест може перевизначити будь-що з цього своїм monkeypatch.setattr.
+    """
+
+    import src.router.llm_router as llm_router
+
+    monkeypatch.setattr(llm_router, "DEBOUNCE_SECONDS", 0.01)
+    monkeypatch.setattr(llm_router, "SPECULATIVE_GENERATION_ENABLED", False)
+    monkeypatch.setattr(llm_router, "ADAPTIVE_DEBOUNCE_ENABLED", False)
+    monkeypatch.setattr(llm_router, "USER_INFO_SYSTEM_PROMPT", False)
+    return llm_router
+
+
+@pytest.fixture
+def make_router(tmp_path, router_module):
+    """Фабрика LLMRouter з історією й обліком токенів у tmp_path."""
+
+    def build(telegram, llm, dialogs: str = "dialogs", system_prompt: str = "Ти — співрозмовник."):
+        return router_module.LLMRouter(
+            telegram,
+            llm,
+            HistoryManager(base_dir=str(tmp_path / dialogs)),
+            system_prompt,
+            usage_ledger=UsageLedger(path=str(tmp_path / "usage.jsonl")),
+        )
+
+    return build
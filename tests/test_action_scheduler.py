@@ -0,0 +1,168 @@
+"""Тести для планувальника відкладених дій."""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+# Додаємо шлях до кореня проєкту, щоб імпорт src працював під час тестів.
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src.router.actions.schema import AddReactionAction, SendMessageAction, WaitAction
+from src.scheduler.action_scheduler import ActionScheduler
+
+
+def test_actions_run_in_order_after_their_waits(tmp_path) -> None:
+    """Дії плану виконуються по черзі, а submit не чекає на паузи."""
+
+    executed = []
+
+    async def executor(user_id, chat_id, action) -> None:
+        executed.append((user_id, action.content))
+
+    async def scenario() -> None:
+        scheduler = ActionScheduler(executor, path=str(tmp_path / "jobs.json"))
+        await scheduler.start()
+        scheduler.submit(
+            1,
+            10,
+            [
+                SendMessageAction(content="раз", wait_seconds=0.05),
+                SendMessageAction(content="два", wait_seconds=0.05),
+            ],
+        )
+        scheduler.submit(2, 20, [SendMessageAction(content="інший")])
+        assert executed == []
+        await asyncio.sleep(0.3)
+        await scheduler.stop()
+
+    asyncio.run(scenario())
+
+    assert [item for item in executed if item[0] == 1] == [(1, "раз"), (1, "два")]
+    assert (2, "інший") in executed
+
+
+def test_cancel_drops_remaining_actions(tmp_path) -> None:
+    """Скасований план більше не виконується і не лишається на диску."""
+
+    executed = []
+
+    async def executor(user_id, chat_id, action) -> None:
+        executed.append(action)
+
+    async def scenario():
+        scheduler = ActionScheduler(executor, path=str(tmp_path / "jobs.json"))
+        await scheduler.start()
+        scheduler.submit(1, 10, [SendMessageAction(content="пізно", wait_seconds=5)])
+        dropped = scheduler.cancel(1)
+        await asyncio.sleep(0.05)
+        await scheduler.stop()
+        return dropped
+
+    dropped = asyncio.run(scenario())
+
+    assert executed == []
+    assert [action.content for action in dropped.actions] == ["пізно"]
+    saved = json.loads((tmp_path / "jobs.json").read_text(encoding="utf-8"))
+    assert saved["plans"] == []
+
+
+def test_pending_actions_survive_restart(tmp_path) -> None:
+    """Невиконані дії зберігаються на диск і виконуються після перезапуску."""
+
+    path = str(tmp_path / "jobs.json")
+    executed = []
+
+    async def executor(user_id, chat_id, action) -> None:
+        executed.append((user_id, chat_id, action))
+
+    async def first_run() -> None:
+        scheduler = ActionScheduler(executor, path=path)
+        await scheduler.start()
+        scheduler.submit(
+            1, 10, [WaitAction(wait_seconds=60), SendMessageAction(content="після рестарту")]
+        )
+        await scheduler.stop()
+
+    async def second_run() -> None:
+        # Імітуємо, що час паузи вже минув, поки бот був вимкнений.
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        data["plans"][0]["due_at"] -= 60
+        Path(path).write_text(json.dumps(data), encoding="utf-8")
+
+        scheduler = ActionScheduler(executor, path=path)
+        await scheduler.start()
+        await asyncio.sleep(0.1)
+        await scheduler.stop()
+
+    asyncio.run(first_run())
+    assert executed == []
+    asyncio.run(second_run())
+
+    assert [(user, chat, action.type) for user, chat, action in executed] == [
+        (1, 10, "wait"),
+        (1, 10, "send_message"),
+    ]
+    assert executed[1][2] == SendMessageAction(content="після рестарту")
+
+
+def test_reaction_does_not_delay_next_send(tmp_path) -> None:
+    """Повільна реакція виконується окремо: наступна відправка її не чекає."""
+
+    events = []
+
+    async def executor(user_id, chat_id, action) -> None:
+        if action.type == "add_reaction":
+            await asyncio.sleep(0.3)
+        events.append(action.type)
+
+    async def scenario():
+        scheduler = ActionScheduler(executor, path=str(tmp_path / "jobs.json"))
+        await scheduler.start()
+        scheduler.submit(
+            1, 10, [AddReactionAction(message_id=5), SendMessageAction(content="відповідь")]
+        )
+        await asyncio.sleep(0.1)
+        sent_first = list(events)
+        running = scheduler.is_running(1)
+        await asyncio.sleep(0.4)
+        await scheduler.stop()
+        return sent_first, running, scheduler.stats
+
+    sent_first, running, stats = asyncio.run(scenario())
+
+    assert sent_first == ["send_message"]
+    # Поки реакція триває, користувач вважається зайнятим (для переривання плану).
+    assert running is True
+    assert events == ["send_message", "add_reaction"]
+    assert stats["overlapped"] == 1
+
+
+def test_state_file_writes_are_batched(tmp_path) -> None:
+    """Сотня submit — кілька фонових записів компактного JSON, а не запис на кожну зміну."""
+
+    async def executor(user_id, chat_id, action) -> None:
+        pass
+
+    path = tmp_path / "jobs.json"
+
+    async def scenario():
+        scheduler = ActionScheduler(executor, path=str(path), flush_seconds=0.05)
+        await scheduler.start()
+        for user_id in range(100):
+            scheduler.submit(user_id, user_id, [SendMessageAction(content="пізніше", wait_seconds=60)])
+        # Диск ще не чіпали: зміни лише позначено.
+        assert not path.exists()
+        await asyncio.sleep(0.15)
+        assert path.exists()
+        await scheduler.stop()
+        return scheduler.stats
+
+    stats = asyncio.run(scenario())
+
+    assert stats["flushes"] <= 2
+    raw = path.read_text(encoding="utf-8")
+    assert "\n" not in raw
+    assert len(json.loads(raw)["plans"]) == 100
@@ -0,0 +1,104 @@
+"""Тести для валідатора схеми дій LLM."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Додаємо шлях до кореня проєкту, щоб імпорт src працював під час тестів.
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src.router.actions.schema import (
+    ActionValidator,
+    AddReactionAction,
+    FakeTypingAction,
+    SendMessageAction,
+    SendMessagesAction,
+)
+
+
+def test_aliases_and_numbers_are_normalized() -> None:
+    """Старі назви типів і числа-рядки приводяться до типізованих дій."""
+
+    validator = ActionValidator()
+    actions = validator.validate(
+        [
+            {"type": "react_to_message", "message_id": "42", "reaction": "🔥"},
+            {"type": "fake_typping", "wait_seconds": "1.5", "human_seconds": 3},
+        ]
+    )
+
+    assert actions == [
+        AddReactionAction(message_id=42, emoji="🔥"),
+        FakeTypingAction(wait_seconds=1.5, human_seconds=3.0),
+    ]
+    assert validator.stats["accepted"] == 2
+
+
+def test_seconds_are_clamped_to_configured_limits() -> None:
+    """Завеликі та від'ємні паузи обрізаються до меж, а не відкидаються."""
+
+    validator = ActionValidator(max_wait_seconds=10, max_human_seconds=5)
+    (action,) = validator.validate(
+        [{"type": "send_message", "content": "hi", "wait_seconds": 600, "human_seconds": -2}]
+    )
+
+    assert action == SendMessageAction(content="hi", wait_seconds=10.0, human_seconds=0.0)
+    assert validator.stats["clamped:wait_seconds"] == 1
+    assert validator.stats["clamped:human_seconds"] == 1
+
+
+def test_malformed_entries_are_rejected_with_reasons() -> None:
+    """Биті елементи відкидаються, а причина кожної відмови рахується."""
+
+    validator = ActionValidator()
+    actions = validator.validate(
+        [
+            "text",
+            {"content": "без типу"},
+            {"type": "dance"},
+            {"type": "send_message", "content": "   "},
+            {"type": "react_to_message", "reaction": "👍"},
+            {"type": "wait", "wait_seconds": "довго"},
+        ]
+    )
+
+    assert actions == []
+    assert validator.stats["rejected:not_object"] == 1
+    assert validator.stats["rejected:missing_type"] == 1
+    assert validator.stats["rejected:unknown_type"] == 1
+    assert validator.stats["rejected:invalid_text:content"] == 1
+    assert validator.stats["rejected:missing_field:message_id"] == 1
+    assert validator.stats["rejected:invalid_number:wait_seconds"] == 1
+
+
+def test_send_messages_drops_broken_parts_only() -> None:
+    """Бите повідомлення випадає з пачки, решта лишається з human_seconds дії."""
+
+    validator = ActionValidator()
+    (action,) = validator.validate(
+        [
+            {
+                "type": "send_messages",
+                "human_seconds": 2,
+                "messages": [{"content": "раз"}, {"content": ""}, {"content": "два", "human_seconds": 4}],
+            }
+        ]
+    )
+
+    assert isinstance(action, SendMessagesAction)
+    assert [part.content for part in action.messages] == ["раз", "два"]
+    assert [part.human_seconds for part in action.messages] == [2.0, 4.0]
+    assert validator.stats["dropped_part:invalid_text:content"] == 1
+
+
+def test_actions_are_immutable_and_slotted() -> None:
+    """Дії не мають __dict__ і не змінюються після валідації."""
+
+    (action,) = ActionValidator().validate([{"type": "send_message", "content": "hi"}])
+
+    assert not hasattr(action, "__dict__")
+    with pytest.raises(AttributeError):
+        action.content = "інше"  # type: ignore[misc]
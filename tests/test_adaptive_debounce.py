@@ -0,0 +1,101 @@
+"""Тести для адаптивного debounce."""
+
+import sys
+from pathlib import Path
+
+# Додаємо шлях до кореня проєкту, щоб імпорт src працював під час тестів.
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src.router.utils.adaptive_debounce import AdaptiveDebounce, TypingCadence
+
+
+def _policy() -> AdaptiveDebounce:
+    return AdaptiveDebounce(
+        base_seconds=14,
+        min_seconds=3,
+        max_seconds=30,
+        max_window_seconds=60,
+        burst_gap_seconds=60,
+        tail_probability=0.1,
+        min_samples=5,
+        margin_seconds=1,
+    )
+
+
+def _feed(policy: AdaptiveDebounce, cadence: TypingCadence, gaps) -> None:
+    at = 0.0
+    policy.observe(cadence, at)
+    for gap in gaps:
+        at += gap
+        policy.observe(cadence, at)
+
+
+def test_uses_base_delay_until_enough_samples() -> None:
+    """Поки вибірка мала, працює звичайний DEBOUNCE_SECONDS."""
+
+    policy = _policy()
+    cadence = TypingCadence()
+    _feed(policy, cadence, [2, 2])
+    # Некалібрований користувач: роутер не переносить вікно з кожним повідомленням.
+    assert policy.is_calibrated(cadence) is False
+
+    assert policy.delay_for(cadence, 100.0) == 14
+
+
+def test_single_message_user_gets_short_window() -> None:
+    """Хто пише одиночними повідомленнями, отримує мінімальне вікно."""
+
+    policy = _policy()
+    cadence = TypingCadence()
+    _feed(policy, cadence, [600] * 20)
+    assert policy.is_calibrated(cadence) is True
+
+    assert policy.delay_for(cadence, 100.0) == 3
+
+
+def test_slow_typist_gets_longer_window_within_bounds() -> None:
+    """Довгі паузи всередині серії подовжують вікно, але не понад max."""
+
+    policy = _policy()
+    cadence = TypingCadence()
+    _feed(policy, cadence, [20, 22, 18, 25, 21, 600, 19, 24, 600, 23])
+    # 10% хвоста — одна найдовша пауза (25 с) може "не дочекатися": 24 + 1 с запасу.
+    assert policy.delay_for(cadence, 0.0) == 25
+
+    _feed(policy, cadence, [45] * 20)
+    cadence.batch_started_at = None
+    assert policy.delay_for(cadence, 0.0) == 30
+
+
+def test_batch_window_is_capped_from_first_message() -> None:
+    """Пачка не тримається відкритою довше за max_window від першого повідомлення."""
+
+    policy = _policy()
+    cadence = TypingCadence()
+    _feed(policy, cadence, [25] * 20)
+
+    assert policy.delay_for(cadence, 0.0) == 26
+    assert policy.delay_for(cadence, 50.0) == 10
+    policy.close_batch(cadence)
+    assert policy.delay_for(cadence, 50.0) == 26
+
+
+def test_seed_from_history_uses_user_timestamps_only() -> None:
+    """Вибірка з історії бере паузи лише між повідомленнями користувача."""
+
+    policy = _policy()
+    cadence = TypingCadence()
+    policy.seed_from_history(
+        cadence,
+        [
+            {"role": "user", "created_at": "2024-01-01T10:00:00"},
+            {"role": "user", "created_at": "2024-01-01T10:00:04"},
+            {"role": "assistant", "created_at": "2024-01-01T10:00:20"},
+            {"role": "user", "created_at": "2024-01-01T11:00:00"},
+        ],
+    )
+
+    assert list(cadence.samples) == [4.0, None]
+    assert cadence.seeded is True
@@ -0,0 +1,91 @@
+"""Тести для сесії Telethon у пам'яті з checkpoint у .session файл."""
+
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Додаємо шлях до кореня проєкту, щоб імпорт src працював під час тестів.
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from telethon import types
+from telethon.crypto import AuthKey
+from telethon.sessions import SQLiteSession
+
+from src.telegram_api.checkpoint_session import CheckpointSession
+
+
+def _state(pts: int) -> types.updates.State:
+    return types.updates.State(
+        pts=pts, qts=1, date=datetime(2024, 1, 1, tzinfo=timezone.utc), seq=3, unread_count=0
+    )
+
+
+def _user(user_id: int, username: str) -> types.User:
+    return types.User(id=user_id, access_hash=user_id * 10, username=username, first_name="Тест")
+
+
+def test_restart_restores_state_from_checkpoint(tmp_path) -> None:
+    """Після «падіння» нова сесія піднімає авторизацію, pts і сутності з останнього checkpoint."""
+
+    path = tmp_path / "user_session"
+    session = CheckpointSession(str(path))
+    session.set_dc(2, "149.154.167.51", 443)
+    session.auth_key = AuthKey(b"\x01" * 256)
+    session.set_update_state(0, _state(pts=100))
+    session.set_update_state(1_234, _state(pts=7))
+    session.process_entities([_user(5, "Alice")])
+    assert session.checkpoint() is True
+
+    # Зміни після checkpoint без close() — при аварійній зупинці вони втрачаються.
+    session.set_update_state(0, _state(pts=150))
+
+    restored = CheckpointSession(str(path))
+    assert restored.dc_id == 2
+    assert restored.server_address == "149.154.167.51"
+    assert restored.auth_key.key == b"\x01" * 256
+    states = dict(restored.get_update_states())
+    assert states[0].pts == 100
+    assert states[1_234].pts == 7
+    assert restored.get_entity_rows_by_username("alice") == (5, 50)
+    assert restored.dirty is False
+
+    # Файл лишається звичайною SQLiteSession — опцію можна вимкнути.
+    sqlite = SQLiteSession(str(path))
+    assert sqlite.get_update_state(0).pts == 100
+    sqlite.close()
+
+
+def test_checkpoint_writes_only_changes(tmp_path) -> None:
+    """Без змін checkpoint нічого не пише; однаковий pts з новою датою — не зміна."""
+
+    session = CheckpointSession(str(tmp_path / "user_session"))
+    session.set_update_state(0, _state(pts=10))
+    assert session.checkpoint() is True
+    assert session.checkpoint() is False
+
+    same = types.updates.State(pts=10, qts=1, date=datetime.now(timezone.utc), seq=3, unread_count=0)
+    session.set_update_state(0, same)
+    session.process_entities([_user(5, "alice")])
+    session.process_entities([_user(5, "alice")])
+    assert session.checkpoint() is True
+    assert session.stats["entities_written"] == 1
+
+    # Новий username замінює рядок у пам'яті, а не додає дубль.
+    session.process_entities([_user(5, "alice_new")])
+    assert session.get_entity_rows_by_username("alice") is None
+    assert session.get_entity_rows_by_username("alice_new") == (5, 50)
+
+
+def test_close_flushes_last_changes(tmp_path) -> None:
+    """close() (його кличе client.disconnect()) зберігає зміни після останнього інтервалу."""
+
+    path = tmp_path / "user_session.session"
+    session = CheckpointSession(str(path))
+    session.set_update_state(0, _state(pts=1))
+    session.checkpoint()
+    session.set_update_state(0, _state(pts=42))
+    session.close()
+
+    assert dict(CheckpointSession(str(path)).get_update_states())[0].pts == 42
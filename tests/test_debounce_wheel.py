@@ -0,0 +1,79 @@
+"""Тести для колеса таймерів debounce."""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# Додаємо шлях до кореня проєкту, щоб імпорт src працював під час тестів.
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src.router.utils.debounce_wheel import DebounceWheel
+
+
+def _collect(fired: list):
+    loop = asyncio.get_running_loop()
+    return lambda batch: fired.extend((user_id, chat_id, loop.time()) for user_id, chat_id in batch)
+
+
+def test_fires_not_earlier_than_delay() -> None:
+    """Таймер спрацьовує не раніше за затримку і не пізніше ніж за тік."""
+
+    async def scenario():
+        fired: list = []
+        wheel = DebounceWheel(on_due=_collect(fired), tick_seconds=0.02, slots=8)
+        started = asyncio.get_running_loop().time()
+        wheel.arm(1, 100, 0.1)
+        await asyncio.sleep(0.25)
+        await wheel.stop()
+        return fired, started
+
+    fired, started = asyncio.run(scenario())
+
+    assert [(user_id, chat_id) for user_id, chat_id, _ in fired] == [(1, 100)]
+    assert 0.1 <= fired[0][2] - started < 0.2
+
+
+def test_reset_and_cancel() -> None:
+    """Скидання переносить спрацювання, скасування прибирає таймер."""
+
+    async def scenario():
+        fired: list = []
+        wheel = DebounceWheel(on_due=_collect(fired), tick_seconds=0.02, slots=8)
+        wheel.arm(1, 1, 0.1)
+        wheel.arm(2, 2, 0.1)
+        await asyncio.sleep(0.06)
+        wheel.arm(1, 1, 0.1)
+        assert wheel.arm(2, 2, 5, reset=False) is False
+        assert wheel.cancel(2) is True
+        await asyncio.sleep(0.07)
+        early = [user_id for user_id, _, _ in fired]
+        await asyncio.sleep(0.1)
+        await wheel.stop()
+        return early, [user_id for user_id, _, _ in fired], wheel
+
+    early, fired, wheel = asyncio.run(scenario())
+
+    assert early == []
+    assert fired == [1]
+    assert not wheel.is_pending(2)
+    assert wheel.stats["reset"] == 1
+
+
+def test_delay_longer_than_one_revolution() -> None:
+    """Затримка, довша за оберт колеса, відпрацьовує через додаткові оберти."""
+
+    async def scenario():
+        fired: list = []
+        wheel = DebounceWheel(on_due=_collect(fired), tick_seconds=0.01, slots=4)
+        started = asyncio.get_running_loop().time()
+        wheel.arm(7, 7, 0.15)
+        await asyncio.sleep(0.3)
+        await wheel.stop()
+        return fired, started
+
+    fired, started = asyncio.run(scenario())
+
+    assert len(fired) == 1
+    assert fired[0][2] - started >= 0.15
@@ -0,0 +1,73 @@
+"""Тести для кешу сутностей Telegram."""
+
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+# Додаємо шлях до кореня проєкту, щоб імпорт src працював під час тестів.
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src.telegram_api.entity_cache import EntityCache
+
+
+class User(SimpleNamespace):
+    """Замінник telethon User: кеш визначає тип за назвою класу."""
+
+
+def test_lookup_by_id_and_username_counts_hits() -> None:
+    """Запис знаходиться за id і username (без @ і регістру), влучання рахуються."""
+
+    cache = EntityCache(path=None)
+    cache.put(User(id=7, access_hash=99, username="Alice", first_name="Аліса"))
+
+    assert cache.get(7).first_name == "Аліса"
+    assert cache.get("@alice").id == 7
+    assert cache.get("bob") is None
+
+    # Новий username замінює старий в індексі.
+    cache.put(User(id=7, access_hash=99, username="alice_new"))
+    assert cache.get("alice") is None
+    assert cache.get("alice_new").id == 7
+
+    metrics = cache.metrics()
+    assert metrics["hits"] == 3
+    assert metrics["misses"] == 2
+    assert metrics["hit_rate"] == 0.6
+
+
+def test_expired_and_least_recent_entries_are_dropped() -> None:
+    """Застарілий запис — промах, а понад ліміт вивантажується найдавніше використаний."""
+
+    cache = EntityCache(path=None, max_entries=2, ttl_seconds=60)
+    cache.put(User(id=1, access_hash=1))
+    cache.put(User(id=2, access_hash=2))
+    cache.get(1)
+    cache.put(User(id=3, access_hash=3))
+
+    assert cache.get(2) is None
+    assert cache.get(1) is not None
+    assert cache.stats["evicted"] == 1
+
+    cache._entries[1].cached_at = time.time() - 120
+    assert cache.get(1) is None
+    assert cache.stats["expired"] == 1
+
+
+def test_cache_survives_restart_and_keeps_access_hash(tmp_path) -> None:
+    """Після перезапуску записи читаються з файлу; min-сутність не стирає access_hash."""
+
+    path = str(tmp_path / "entities.json")
+    cache = EntityCache(path=path, save_every=100)
+    cache.put(User(id=5, access_hash=555, username="carol", bot=True))
+    cache.put(User(id=5, access_hash=None, username="carol"))
+    cache.save()
+
+    restored = EntityCache(path=path)
+
+    entry = restored.get("carol")
+    assert entry.id == 5
+    assert entry.access_hash == 555
+    assert restored.stats["loaded"] == 1
@@ -126,3 +126,23 @@ def test_get_last_message_id_unknown_role_returns_zero(history: HistoryManager)
 
     # Використовуємо приватний метод для перевірки поведінки без аварій.
     assert history.get_last_message_id(user_id=42, role="moderator") == 0
+
+
+def test_build_message_matches_stored_record(history: HistoryManager) -> None:
+    """build_message повертає запис у тому ж вигляді, що й append_message."""
+
+    preview = history.build_message(
+        role="user",
+        content="ще не записане",
+        message_time_iso="2024-05-01T10:20:30.123456+00:00",
+        message_id=77,
+    )
+    history.append_message(
+        user_id=5,
+        role="user",
+        content="ще не записане",
+        message_time_iso="2024-05-01T10:20:30.123456+00:00",
+        message_id=77,
+    )
+
+    assert history.get_recent_context(user_id=5) == [preview]
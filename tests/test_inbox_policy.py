@@ -0,0 +1,68 @@
+"""Тести для політики inbox під час флуду."""
+
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+# Додаємо шлях до кореня проєкту, щоб імпорт src працював під час тестів.
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src.router.utils.inbox_policy import APPENDED, DROPPED, MERGED, InboxPolicy
+
+
+@dataclass
+class _Message:
+    content: str
+    msg_type: str = "text"
+    media_meta: dict | None = None
+    message_time_iso: str | None = None
+    message_id: int | None = None
+
+
+def test_texts_are_coalesced_only_when_inbox_is_full() -> None:
+    """До заповнення кожен текст — окреме входження; під флудом тексти склеюються з останнім."""
+
+    policy = InboxPolicy(coalesce_text=True, max_text_chars=100, max_entries=2, max_media=5)
+    inbox = []
+
+    assert policy.add(inbox, _Message("привіт", message_id=1, message_time_iso="t1")) == APPENDED
+    assert policy.add(inbox, _Message("як справи?", message_id=2, message_time_iso="t2")) == APPENDED
+    assert policy.add(inbox, _Message("ти тут?", message_id=3, message_time_iso="t3")) == MERGED
+
+    assert len(inbox) == 2
+    assert inbox[0].message_id == 1
+    assert inbox[1].content == "як справи?\nти тут?"
+    assert inbox[1].message_id == 3
+    assert inbox[1].message_time_iso == "t3"
+    assert inbox[1].media_meta["merged_message_ids"] == [2]
+
+
+def test_full_inbox_drops_what_cannot_be_merged() -> None:
+    """У заповненому inbox текст після медіа чи задовгий склеєний текст відкидаються."""
+
+    policy = InboxPolicy(coalesce_text=True, max_text_chars=10, max_entries=2, max_media=5)
+    inbox = []
+
+    policy.add(inbox, _Message("раз", message_id=1))
+    policy.add(inbox, _Message("[voice]", msg_type="voice", message_id=2))
+    assert policy.add(inbox, _Message("два", message_id=3)) == DROPPED
+
+    inbox = [_Message("раз", message_id=1), _Message("два", message_id=2)]
+    assert policy.add(inbox, _Message("дуже довгий текст", message_id=4)) == DROPPED
+    assert [entry.message_id for entry in inbox] == [1, 2]
+
+
+def test_media_and_entries_are_capped() -> None:
+    """Понад ліміт медіа та входжень повідомлення відкидаються."""
+
+    policy = InboxPolicy(coalesce_text=False, max_text_chars=100, max_entries=4, max_media=2)
+    inbox = []
+
+    outcomes = [policy.add(inbox, _Message("[photo]", msg_type="photo")) for _ in range(3)]
+    assert outcomes == [APPENDED, APPENDED, DROPPED]
+
+    outcomes = [policy.add(inbox, _Message("текст")) for _ in range(3)]
+    assert outcomes == [APPENDED, APPENDED, DROPPED]
+    assert len(inbox) == 4
@@ -0,0 +1,95 @@
+"""Тести для конвеєра прийому вхідних апдейтів."""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# Додаємо шлях до кореня проєкту, щоб імпорт src працював під час тестів.
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src.telegram_api.ingest_pipeline import IngestPipeline
+
+
+def test_order_is_kept_per_user_while_others_proceed() -> None:
+    """Повільне голосове користувача 1 не затримує користувача 2, але його наступні меседжі чекають."""
+
+    async def scenario() -> list:
+        done = []
+
+        async def process(item) -> None:
+            user_id, label, delay = item
+            await asyncio.sleep(delay)
+            done.append((user_id, label))
+
+        pipeline = IngestPipeline(process=process, workers=4)
+        pipeline.submit(1, (1, "voice", 0.05))
+        pipeline.submit(1, (1, "text", 0.0))
+        pipeline.submit(2, (2, "text", 0.0))
+        await asyncio.sleep(0.1)
+        await pipeline.stop()
+        return done
+
+    done = asyncio.run(scenario())
+    assert done == [(2, "text"), (1, "voice"), (1, "text")]
+
+
+def test_worker_pool_bounds_concurrency_and_submit_does_not_wait() -> None:
+    """Шість важких подій від різних користувачів — не більше двох одночасно, submit миттєвий."""
+
+    async def scenario() -> tuple:
+        active = 0
+        peak = 0
+
+        async def process(_item) -> None:
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.02)
+            active -= 1
+
+        pipeline = IngestPipeline(process=process, workers=2)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        for user_id in range(6):
+            assert pipeline.submit(user_id, user_id) is True
+        submit_seconds = loop.time() - started
+        await asyncio.sleep(0.15)
+        metrics = pipeline.metrics()
+        await pipeline.stop()
+        return peak, submit_seconds, metrics
+
+    peak, submit_seconds, metrics = asyncio.run(scenario())
+    assert peak == 2
+    assert submit_seconds < 0.01
+    assert metrics["processed"] == 6
+    assert metrics["pending"] == 0
+    assert metrics["keys"] == 0
+
+
+def test_overflow_is_dropped_and_errors_do_not_stop_workers() -> None:
+    """Понад max_pending події відкидаються, а виняток обробника не зупиняє воркера."""
+
+    async def scenario() -> tuple:
+        seen = []
+
+        async def process(item) -> None:
+            if item == "bad":
+                raise RuntimeError("boom")
+            seen.append(item)
+
+        pipeline = IngestPipeline(process=process, workers=1, max_pending=2)
+        accepted = [pipeline.submit(1, item) for item in ("bad", "ok", "extra")]
+        await asyncio.sleep(0.01)
+        accepted.append(pipeline.submit(1, "later"))
+        await asyncio.sleep(0.01)
+        metrics = pipeline.metrics()
+        await pipeline.stop()
+        return accepted, seen, metrics
+
+    accepted, seen, metrics = asyncio.run(scenario())
+    assert accepted == [True, True, False, True]
+    assert seen == ["ok", "later"]
+    assert metrics["failed"] == 1
+    assert metrics["dropped"] == 1
@@ -0,0 +1,85 @@
+"""Тести для локального ремонту JSON-відповідей LLM."""
+
+import json
+import sys
+from pathlib import Path
+
+# Додаємо шлях до кореня проєкту, щоб імпорт src працював під час тестів.
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src.router.utils.json_repair import measure_parse_rate, repair_json
+
+
+def test_valid_json_needs_no_fixes() -> None:
+    """Валідна відповідь розбирається без жодних виправлень."""
+
+    data, fixes = repair_json('[{"type": "ignore"}]')
+
+    assert data == [{"type": "ignore"}]
+    assert fixes == []
+
+
+def test_code_fence_and_trailing_comma_are_removed() -> None:
+    """Markdown-огорожа та кома перед дужкою прибираються."""
+
+    raw = '```json\n[{"type": "send_message", "content": "hi",},]\n```'
+    data, fixes = repair_json(raw)
+
+    assert data == [{"type": "send_message", "content": "hi"}]
+    assert fixes == ["code_fence", "trailing_comma"]
+
+
+def test_surrounding_text_is_sliced_off() -> None:
+    """Текст до і після JSON не заважає розбору."""
+
+    data, fixes = repair_json('Ось дії: {"actions": [{"type": "ignore"}]} Дякую!')
+
+    assert data == {"actions": [{"type": "ignore"}]}
+    assert "surrounding_text" in fixes
+
+
+def test_truncated_array_keeps_complete_elements() -> None:
+    """Обірваний останній елемент відкидається, повні — зберігаються."""
+
+    raw = '[{"type": "send_message", "content": "a"}, {"type": "send_message", "content": "поча'
+    data, fixes = repair_json(raw)
+
+    assert data == [{"type": "send_message", "content": "a"}]
+    assert "truncated" in fixes
+
+
+def test_truncated_wrapped_actions_object() -> None:
+    """Обрив усередині обгортки {"actions": [...]} теж ремонтується."""
+
+    raw = '{"actions": [{"type": "ignore"}, {"type": "wait", "wait_seconds": 1}, {"type": "send'
+    data, _ = repair_json(raw)
+
+    assert data == {"actions": [{"type": "ignore"}, {"type": "wait", "wait_seconds": 1}]}
+
+
+def test_hopeless_text_returns_none() -> None:
+    """Звичайний текст без JSON ремонту не піддається."""
+
+    data, _ = repair_json("Привіт! Як справи?")
+
+    assert data is None
+
+
+def test_measure_parse_rate_over_cassette(tmp_path) -> None:
+    """Статистика касети розрізняє валідні, відремонтовані та зламані відповіді."""
+
+    path = tmp_path / "cassette.jsonl"
+    contents = ['[{"type": "ignore"}]', '```json\n[{"type": "ignore"}]\n```', "просто текст"]
+    with open(path, "w", encoding="utf-8") as file:
+        for content in contents:
+            entry = {"key": "k", "response": {"choices": [{"message": {"content": content}}]}}
+            file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    stats = measure_parse_rate(str(path))
+
+    assert stats["total"] == 3
+    assert stats["ok"] == 1
+    assert stats["repaired"] == 1
+    assert stats["failed"] == 1
@@ -0,0 +1,89 @@
+"""Тести для ковзної статистики затримок LLM."""
+
+import math
+import sys
+from pathlib import Path
+
+import pytest
+
+# Додаємо шлях до кореня проєкту, щоб імпорт src працював під час тестів.
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src.llm_api.latency import LatencyTracker
+from src.llm_api.llm_api import LLMAPI, LLMTimeoutError
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _tracker(clock, **kwargs) -> LatencyTracker:
+    options = dict(window=10, min_samples=2, percentile=0.9, max_depth_bucket=4, max_age_seconds=60)
+    options.update(kwargs)
+    return LatencyTracker(clock=clock, **options)
+
+
+def test_estimate_needs_min_samples_and_uses_nearest_bucket() -> None:
+    """Прогноз береться з найближчої глибини, де вже достатньо замірів."""
+
+    tracker = _tracker(FakeClock())
+    tracker.observe("m", 0, 1.0)
+    assert tracker.estimate("m", 0) is None
+
+    tracker.observe("m", 0, 2.0)
+    assert tracker.estimate("m", 0) == 2.0
+    assert tracker.estimate("m", 3) == 2.0
+    assert tracker.estimate("other", 0) is None
+
+
+def test_timeout_is_not_an_ordinary_sample() -> None:
+    """Таймаут робить прогноз нескінченним, а не дорівнює ліміту таймауту."""
+
+    tracker = _tracker(FakeClock())
+    tracker.observe("m", 0, 1.0)
+    tracker.observe_timeout("m", 0)
+
+    assert tracker.estimate("m", 0) == math.inf
+
+
+def test_old_samples_expire_and_estimate_recovers() -> None:
+    """Після max_age_seconds таймаути забуваються, і модель знову "швидка"."""
+
+    clock = FakeClock()
+    tracker = _tracker(clock)
+    tracker.observe_timeout("m", 0)
+    tracker.observe_timeout("m", 0)
+    assert tracker.estimate("m", 0) == math.inf
+
+    clock.now = 61.0
+    assert tracker.estimate("m", 0) is None
+
+    tracker.observe("m", 0, 0.5)
+    tracker.observe("m", 0, 0.7)
+    assert tracker.estimate("m", 0) == 0.7
+
+
+def test_llm_api_records_timeout_as_censored_sample(monkeypatch) -> None:
+    """LLMAPI передає таймаут у observe_timeout, а успішний виклик — у observe."""
+
+    api = LLMAPI()
+    api.latency = _tracker(FakeClock(), min_samples=1)
+
+    def _timeout(payload, timeout):
+        raise LLMTimeoutError("timeout")
+
+    monkeypatch.setattr(api, "_post", _timeout)
+    with pytest.raises(LLMTimeoutError):
+        api.generate([{"role": "user", "content": "hi"}], model="m", timeout=0.1)
+    assert api.latency.estimate("m", 0) == math.inf
+
+    response = {"choices": [{"message": {"role": "assistant", "content": "[]"}}]}
+    monkeypatch.setattr(api, "_post", lambda payload, timeout: (response, None))
+    api.generate([{"role": "user", "content": "hi"}], model="fast", timeout=0.1)
+    assert api.latency.estimate("fast", 0) < 1
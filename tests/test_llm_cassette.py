@@ -0,0 +1,105 @@
+"""Тести для касети LLM: запис відповідей і детерміноване відтворення."""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Додаємо шлях до кореня проєкту, щоб імпорт src працював під час тестів.
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+# Конфіг LLM вимагає ключ під час імпорту; для офлайн-тестів достатньо заглушки.
+os.environ.setdefault("LLM_API_KEY", "test-key")
+
+from src.llm_api.cassette import CassetteMissError, LLMCassette
+from src.llm_api.llm_api import LLMAPI
+
+
+def _fake_response(content: str) -> dict:
+    """Будує мінімальну відповідь у форматі OpenAI-сумісного API."""
+
+    return {"choices": [{"message": {"role": "assistant", "content": content}}]}
+
+
+def test_make_key_ignores_dict_order() -> None:
+    """Ключ касети не залежить від порядку ключів у payload."""
+
+    first = {"model": "m", "messages": [{"role": "user", "content": "hi"}]}
+    second = {"messages": [{"content": "hi", "role": "user"}], "model": "m"}
+
+    assert LLMCassette.make_key(first) == LLMCassette.make_key(second)
+
+
+def test_make_key_ignores_times_and_message_ids() -> None:
+    """Час і message_id у рядках історії не змінюють ключ, а сам текст — змінює."""
+
+    def payload(line: str) -> dict:
+        return {"model": "m", "messages": [{"role": "user", "content": line}]}
+
+    first = payload("date: 2026-01-01T10:00:00 | message_id: 11 | message: hi")
+    second = payload("date: 2026-03-15T12:31:00 | message_id: 5001 | message: hi")
+    other = payload("date: 2026-01-01T10:00:00 | message_id: 11 | message: bye")
+
+    assert LLMCassette.make_key(first) == LLMCassette.make_key(second)
+    assert LLMCassette.make_key(first) != LLMCassette.make_key(other)
+
+
+def test_record_then_replay_roundtrip(tmp_path, monkeypatch) -> None:
+    """Записана відповідь відтворюється без мережі для того самого запиту."""
+
+    path = str(tmp_path / "cassette.jsonl")
+    messages = [{"role": "user", "content": "привіт"}]
+
+    recorder = LLMAPI(cassette=LLMCassette(path, mode="record"))
+    monkeypatch.setattr(
+        recorder, "_post", lambda payload, timeout: (_fake_response('[{"type": "ignore"}]'), 0.05)
+    )
+    assert recorder.generate(messages).content == '[{"type": "ignore"}]'
+
+    player = LLMAPI(cassette=LLMCassette(path, mode="replay", latency_scale=0))
+
+    def _no_network(payload, timeout):
+        raise AssertionError("replay не повинен ходити в мережу")
+
+    monkeypatch.setattr(player, "_post", _no_network)
+    replayed = player.generate(messages)
+    assert replayed.content == '[{"type": "ignore"}]'
+    assert replayed.server_seconds == 0.05
+
+    with pytest.raises(CassetteMissError):
+        player.generate([{"role": "user", "content": "інший запит"}])
+
+
+def test_replay_scales_recorded_latency(tmp_path) -> None:
+    """Replay витримує записану затримку, помножену на latency_scale."""
+
+    path = str(tmp_path / "cassette.jsonl")
+    payload = {"model": "m", "messages": []}
+    LLMCassette(path, mode="record").record(payload, _fake_response("x"), latency=0.2)
+
+    cassette = LLMCassette(path, mode="replay", latency_scale=0.5)
+    started = time.monotonic()
+    response, _ = cassette.replay(payload)
+    elapsed = time.monotonic() - started
+
+    assert response["choices"][0]["message"]["content"] == "x"
+    assert 0.09 <= elapsed < 0.2
+
+
+def test_repeated_requests_replay_in_recorded_order(tmp_path) -> None:
+    """Однаковий запит, записаний кілька разів, відтворюється по черзі."""
+
+    path = str(tmp_path / "cassette.jsonl")
+    payload = {"model": "m", "messages": []}
+    recorder = LLMCassette(path, mode="record")
+    recorder.record(payload, _fake_response("first"), latency=0)
+    recorder.record(payload, _fake_response("second"), latency=0)
+
+    cassette = LLMCassette(path, mode="replay", latency_scale=0)
+    contents = [cassette.replay(payload)[0]["choices"][0]["message"]["content"] for _ in range(3)]
+
+    assert contents == ["first", "second", "second"]
@@ -0,0 +1,68 @@
+"""Тести для відмови провайдера від response_format."""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Додаємо шлях до кореня проєкту, щоб імпорт src працював під час тестів.
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+# Конфіг LLM вимагає ключ під час імпорту; для офлайн-тестів достатньо заглушки.
+os.environ.setdefault("LLM_API_KEY", "test-key")
+
+from src.llm_api.llm_api import LLMAPI, LLMHTTPError
+
+MESSAGES = [{"role": "user", "content": "привіт"}]
+JSON_MODE = {"type": "json_object"}
+
+
+def _fake_response(content: str) -> dict:
+    return {"choices": [{"message": {"role": "assistant", "content": content}}]}
+
+
+class ScriptedPost:
+    """Замість HTTP: перший виклик кидає задану помилку, далі — успішна відповідь."""
+
+    def __init__(self, error: LLMHTTPError) -> None:
+        self.error = error
+        self.calls = []
+
+    def __call__(self, payload, timeout):
+        self.calls.append(("response_format" in payload, timeout))
+        if len(self.calls) == 1:
+            raise self.error
+        return _fake_response("[]"), None
+
+
+def test_rejected_response_format_is_disabled_and_retry_shares_timeout(monkeypatch) -> None:
+    """Відмова саме від response_format вимикає його, а повтор отримує лише залишок таймауту."""
+
+    api = LLMAPI()
+    post = ScriptedPost(LLMHTTPError(400, "Unrecognized request argument: response_format"))
+    monkeypatch.setattr(api, "_post", post)
+
+    result = api.generate(MESSAGES, timeout=5, response_format=JSON_MODE)
+
+    assert result.content == "[]"
+    assert api.response_format_supported is False
+    assert [with_format for with_format, _ in post.calls] == [True, False]
+    assert post.calls[0][1] == 5
+    assert 0 < post.calls[1][1] < 5
+
+
+def test_other_bad_request_keeps_response_format(monkeypatch) -> None:
+    """Інша 400 зі словом "JSON" пробрасується без повтору й не вимикає response_format."""
+
+    api = LLMAPI()
+    post = ScriptedPost(LLMHTTPError(400, "We could not parse the JSON body of your request."))
+    monkeypatch.setattr(api, "_post", post)
+
+    with pytest.raises(LLMHTTPError):
+        api.generate(MESSAGES, timeout=5, response_format=JSON_MODE)
+
+    assert api.response_format_supported is True
+    assert len(post.calls) == 1
@@ -0,0 +1,88 @@
+"""Тести для локального stub-сервера LLM."""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+import requests
+
+# Додаємо шлях до кореня проєкту, щоб імпорт src працював під час тестів.
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src.llm_stub.server import LatencyDistribution, StubLLMServer
+
+
+@pytest.fixture()
+def stub_factory():
+    """Піднімає stub-сервери на вільних портах і гарантовано їх зупиняє."""
+
+    servers: list[StubLLMServer] = []
+
+    def _start(**kwargs) -> StubLLMServer:
+        server = StubLLMServer(port=0, latency="fixed:0", seed=1, **kwargs).start()
+        servers.append(server)
+        return server
+
+    yield _start
+    for server in servers:
+        server.stop()
+
+
+def test_latency_distribution_rejects_bad_spec() -> None:
+    """Невідомий розподіл або неправильна кількість параметрів — ValueError."""
+
+    with pytest.raises(ValueError):
+        LatencyDistribution("gamma:1,2")
+    with pytest.raises(ValueError):
+        LatencyDistribution("uniform:1")
+    assert LatencyDistribution("fixed:0.5").sample() == 0.5
+
+
+def test_completion_contains_valid_actions(stub_factory) -> None:
+    """Відповідь містить JSON-масив дій і usage, як очікує LLMRouter."""
+
+    server = stub_factory()
+    response = requests.post(
+        server.url,
+        json={
+            "model": "stub",
+            "messages": [{"role": "user", "content": "date: x | message_id: 42 | message: hi"}],
+        },
+        timeout=5,
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    actions = json.loads(body["choices"][0]["message"]["content"])
+    assert isinstance(actions, list) and actions
+    assert {action["type"] for action in actions} <= {"react_to_message", "send_message", "send_messages"}
+    assert body["usage"]["prompt_tokens"] > 0
+
+
+def test_rate_limit_injection_returns_429(stub_factory) -> None:
+    """При rate_limit_rate=1 кожен запит отримує 429 з Retry-After."""
+
+    server = stub_factory(rate_limit_rate=1.0, retry_after_seconds=3)
+    response = requests.post(server.url, json={"messages": []}, timeout=5)
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "3"
+    assert server.stats["rate_limited"] == 1
+
+
+def test_streaming_ends_with_done_marker(stub_factory) -> None:
+    """У потоковому режимі чанки складаються у валідний JSON і завершуються [DONE]."""
+
+    server = stub_factory(stream_chunk_delay=0)
+    response = requests.post(server.url, json={"stream": True, "messages": []}, stream=True, timeout=5)
+    lines = [line.decode("utf-8") for line in response.iter_lines() if line]
+
+    assert lines[-1] == "data: [DONE]"
+    content = "".join(
+        json.loads(line[len("data: "):])["choices"][0]["delta"].get("content", "")
+        for line in lines[:-1]
+    )
+    assert isinstance(json.loads(content), list)
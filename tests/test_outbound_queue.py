@@ -0,0 +1,165 @@
+"""Тести для черги вихідних викликів Telegram."""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Додаємо шлях до кореня проєкту, щоб імпорт src працював під час тестів.
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from telethon.tl.types import InputPeerUser, User
+
+from src.telegram_api.entity_cache import EntityCache
+from src.telegram_api.outbound_queue import OutboundQueue
+from src.telegram_api.telegram_api import TelegramAPI
+
+
+class FakeFloodWait(Exception):
+    """Замінник FloodWaitError Telethon з полем seconds."""
+
+    def __init__(self, seconds: float) -> None:
+        super().__init__(f"flood wait {seconds}")
+        self.seconds = seconds
+
+
+def _retry_after(exc):
+    return exc.seconds if isinstance(exc, FakeFloodWait) else None
+
+
+def test_calls_of_one_chat_keep_their_order() -> None:
+    """Виклики одного чату виконуються строго в порядку submit."""
+
+    sent = []
+
+    async def scenario():
+        queue = OutboundQueue(_retry_after, global_rate=1000, global_burst=100, chat_rate=1000, chat_burst=100)
+
+        async def send(text):
+            await asyncio.sleep(0.01 if text == "a" else 0)
+            sent.append(text)
+            return text
+
+        results = await asyncio.gather(*(queue.submit(1, lambda text=text: send(text)) for text in "abc"))
+        await queue.stop()
+        return results
+
+    results = asyncio.run(scenario())
+
+    assert results == ["a", "b", "c"]
+    assert sent == ["a", "b", "c"]
+
+
+def test_flood_wait_parks_only_affected_chat() -> None:
+    """FloodWait відкладає лише свій чат; виклик повторюється і повертає результат."""
+
+    events = []
+    attempts = {"flooded": 0}
+
+    async def scenario():
+        queue = OutboundQueue(_retry_after, global_rate=1000, global_burst=100, chat_rate=1000, chat_burst=100)
+        started = time.monotonic()
+
+        async def flooded():
+            attempts["flooded"] += 1
+            if attempts["flooded"] == 1:
+                raise FakeFloodWait(0.2)
+            events.append(("flooded", time.monotonic() - started))
+            return "ok"
+
+        async def other():
+            events.append(("other", time.monotonic() - started))
+            return "other"
+
+        first = asyncio.create_task(queue.submit(1, flooded))
+        await asyncio.sleep(0.01)
+        second = await queue.submit(2, other)
+        result = await first
+        await queue.stop()
+        return result, second, queue.metrics()
+
+    result, second, metrics = asyncio.run(scenario())
+
+    assert (result, second) == ("ok", "other")
+    assert [name for name, _ in events] == ["other", "flooded"]
+    assert events[0][1] < 0.1
+    assert events[1][1] >= 0.2
+    assert metrics["flood_waits"] == 1
+    assert metrics["retries"] == 1
+    assert metrics["delay_max"] >= 0.2
+
+
+def test_global_bucket_limits_rate_across_chats() -> None:
+    """Спільне відро акаунта обмежує темп навіть коли чати різні."""
+
+    async def scenario():
+        queue = OutboundQueue(_retry_after, global_rate=20, global_burst=1, chat_rate=1000, chat_burst=100)
+
+        async def send():
+            return time.monotonic()
+
+        started = time.monotonic()
+        stamps = await asyncio.gather(*(queue.submit(chat_id, send) for chat_id in range(5)))
+        await queue.stop()
+        return [stamp - started for stamp in stamps]
+
+    stamps = asyncio.run(scenario())
+
+    # Перший виклик — з запасу відра, решта чотири — по одному кожні 50 мс.
+    assert max(stamps) >= 0.18
+
+
+def test_message_and_reaction_share_one_chat_lane() -> None:
+    """send_message і send_reaction у той самий чат ідуть однією лінією черги."""
+
+    class RecordingQueue:
+        def __init__(self) -> None:
+            self.lanes = []
+
+        async def submit(self, chat_id, call):
+            self.lanes.append(chat_id)
+            return None
+
+    async def scenario() -> list:
+        api = TelegramAPI.__new__(TelegramAPI)
+        api.entities = EntityCache(path=None)
+        api.outbound = RecordingQueue()
+        api.typing = type("Typing", (), {"message_sent": lambda self, chat_id: None})()
+        await api.send_message(-1001234567, "привіт")
+        await api.send_reaction("-1001234567", 5, "👍")
+        await api.send_reaction(42, 6, "👍")
+        return api.outbound.lanes
+
+    assert asyncio.run(scenario()) == [-1001234567, -1001234567, 42]
+
+
+def test_typing_goes_through_chat_lane_and_waits_out_flood() -> None:
+    """SetTyping іде лінією чату з InputPeer з кешу, а FloodWait паркує лінію замість помилки."""
+
+    class FakeClient:
+        def __init__(self) -> None:
+            self.requests = []
+
+        async def __call__(self, request):
+            self.requests.append(request)
+            if len(self.requests) == 1:
+                raise FakeFloodWait(0.05)
+            return True
+
+    async def scenario():
+        api = TelegramAPI.__new__(TelegramAPI)
+        api.entities = EntityCache(path=None)
+        api.entities.put(User(id=42, access_hash=99))
+        api.client = FakeClient()
+        api.outbound = OutboundQueue(_retry_after, chat_rate=1000, chat_burst=100)
+        await api._set_typing(42, True)
+        await api.outbound.stop()
+        return api.client.requests, api.outbound.metrics()
+
+    requests, stats = asyncio.run(scenario())
+
+    assert len(requests) == 2
+    assert requests[-1].peer == InputPeerUser(user_id=42, access_hash=99)
+    assert stats["flood_waits"] == 1 and stats["sent"] == 1
@@ -0,0 +1,42 @@
+"""Тести для графа залежностей плану дій."""
+
+import sys
+from pathlib import Path
+
+# Додаємо шлях до кореня проєкту, щоб імпорт src працював під час тестів.
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src.router.actions.schema import (
+    AddReactionAction,
+    FakeTypingAction,
+    SendMessageAction,
+    WaitAction,
+)
+from src.router.utils.plan_graph import build_plan_graph
+
+
+def test_sends_form_a_chain_and_reactions_overlap() -> None:
+    """Відправки чекають одна на одну, а реакція — лише на відправку перед нею."""
+
+    steps = build_plan_graph(
+        [
+            AddReactionAction(message_id=1),
+            SendMessageAction(content="раз"),
+            FakeTypingAction(human_seconds=2),
+            WaitAction(wait_seconds=1),
+            SendMessageAction(content="два"),
+            AddReactionAction(message_id=2),
+        ]
+    )
+
+    assert [step.depends_on for step in steps] == [None, None, 1, 1, 3, 4]
+
+
+def test_plan_without_sends_has_no_dependencies() -> None:
+    """Самі реакції та typing стартують одночасно."""
+
+    steps = build_plan_graph([AddReactionAction(message_id=1), FakeTypingAction(human_seconds=1)])
+
+    assert [step.depends_on for step in steps] == [None, None]
@@ -0,0 +1,105 @@
+"""Тести для переривання плану дій новим повідомленням."""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# Додаємо шлях до кореня проєкту, щоб імпорт src працював під час тестів.
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src.history.history_manager import HistoryManager
+from src.router.actions import handle_send_messages
+from src.router.actions.schema import (
+    MessagePart,
+    SendMessageAction,
+    SendMessagesAction,
+    planned_seconds,
+)
+from src.router.utils.interrupt import sleep_unless_interrupted
+
+
+def test_sleep_returns_early_when_interrupted() -> None:
+    """Сон завершується одразу після сигналу, а не через повний час."""
+
+    async def scenario() -> tuple:
+        interrupt = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        loop.call_later(0.05, interrupt.set)
+        started = loop.time()
+        interrupted = await sleep_unless_interrupted(5, interrupt)
+        return interrupted, loop.time() - started
+
+    interrupted, elapsed = asyncio.run(scenario())
+
+    assert interrupted is True
+    assert elapsed < 1
+
+
+def test_send_messages_stops_between_parts(tmp_path, fake_telegram) -> None:
+    """Після сигналу решта пачки не надсилається і не потрапляє в історію."""
+
+    telegram = fake_telegram()
+    history = HistoryManager(base_dir=str(tmp_path))
+    action = SendMessagesAction(
+        messages=(
+            MessagePart(content="перше", human_seconds=0.01),
+            MessagePart(content="друге", wait_seconds=5, human_seconds=1),
+            MessagePart(content="третє", human_seconds=1),
+        )
+    )
+
+    async def scenario() -> bool:
+        interrupt = asyncio.Event()
+        asyncio.get_running_loop().call_later(0.1, interrupt.set)
+        return await handle_send_messages(telegram, history, 1, 1, action, interrupt=interrupt)
+
+    completed = asyncio.run(scenario())
+
+    assert completed is False
+    assert telegram.sent == ["перше"]
+    assert [item["content"] for item in history.get_recent_context(1)] == ["перше"]
+
+
+def test_planned_seconds_counts_waits_and_typing() -> None:
+    """Плановий час пачки — сума пауз і typing усіх повідомлень."""
+
+    action = SendMessagesAction(
+        messages=(MessagePart("a", 1, 2), MessagePart("b", 0, 3)),
+        wait_seconds=4,
+    )
+
+    assert planned_seconds(action) == 10
+
+
+def test_message_sent_before_interrupt_counts_as_done(capsys, make_router, fake_telegram) -> None:
+    """Переривання під час відправки першого меседжу скидає лише другий — перший уже надіслано."""
+
+    class InterruptingTelegram(fake_telegram):
+        async def send_message(self, chat_id, text):
+            message = await super().send_message(chat_id, text)
+            interrupt.set()
+            return message
+
+    interrupt = None
+    telegram = InterruptingTelegram()
+    router = make_router(telegram, None, system_prompt="")
+    actions = [
+        SendMessageAction(content="перше", human_seconds=0),
+        SendMessageAction(content="друге", human_seconds=0.5),
+    ]
+
+    async def scenario() -> None:
+        nonlocal interrupt
+        interrupt = asyncio.Event()
+        await router._execute_actions(1, 1, actions, interrupt=interrupt)
+
+    asyncio.run(scenario())
+
+    assert telegram.sent == ["перше"]
+    assert router.plan_stats["interrupted"] == 1
+    assert router.plan_stats["dropped_actions"] == 1
+
+    router.print_stats()
+    assert "перервано 1 (скинуто 1 дій" in capsys.readouterr().out
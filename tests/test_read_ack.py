@@ -0,0 +1,73 @@
+"""Тести для об'єднання позначок «прочитано»."""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# Додаємо шлях до кореня проєкту, щоб імпорт src працював під час тестів.
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src.telegram_api.read_ack import ReadAckCoalescer
+
+
+def test_burst_is_one_request_per_chat_with_max_id() -> None:
+    """Пачка позначок у двох чатах — по одному запиту на чат з найбільшим id."""
+
+    async def scenario() -> tuple:
+        calls = []
+
+        async def acknowledge(chat_id, max_id) -> None:
+            calls.append((chat_id, max_id))
+
+        acks = ReadAckCoalescer(acknowledge=acknowledge, window_seconds=0.02)
+        for message_id in (10, 12, 11):
+            acks.mark(1, message_id)
+        future = acks.mark(2, 5)
+        assert await future is True
+        return calls, acks.metrics()
+
+    calls, metrics = asyncio.run(scenario())
+    assert sorted(calls) == [(1, 12), (2, 5)]
+    assert metrics["requested"] == 4
+    assert metrics["sent"] == 2
+    assert metrics["saved"] == 2
+
+
+def test_already_acknowledged_id_needs_no_request() -> None:
+    """Позначка, покрита вже відправленим max_id (sync_unread після прийому), RPC не робить."""
+
+    async def scenario() -> tuple:
+        calls = []
+
+        async def acknowledge(chat_id, max_id) -> None:
+            calls.append((chat_id, max_id))
+
+        acks = ReadAckCoalescer(acknowledge=acknowledge, window_seconds=0.01)
+        await acks.mark(1, 20)
+        assert await acks.mark(1, 15) is True
+        await acks.mark(1, 21)
+        return calls, acks.metrics()
+
+    calls, metrics = asyncio.run(scenario())
+    assert calls == [(1, 20), (1, 21)]
+    assert metrics["saved"] == 1
+
+
+def test_flush_sends_immediately_and_errors_resolve_false() -> None:
+    """flush() не чекає на вікно; помилка Telegram завершує future значенням False."""
+
+    async def scenario() -> tuple:
+        async def acknowledge(chat_id, max_id) -> None:
+            raise RuntimeError("PEER_ID_INVALID")
+
+        acks = ReadAckCoalescer(acknowledge=acknowledge, window_seconds=60)
+        future = acks.mark(7, 3)
+        await acks.flush()
+        return future.result(), acks.metrics()
+
+    result, metrics = asyncio.run(scenario())
+    assert result is False
+    assert metrics["errors"] == 1
+    assert metrics["pending"] == 0
@@ -0,0 +1,74 @@
+"""Тест відтворення касети LLM на рівні роутера: повторний прогін діалогу без мережі."""
+
+import asyncio
+import json
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Додаємо шлях до кореня проєкту, щоб імпорт src працював під час тестів.
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src.llm_api.cassette import LLMCassette
+from src.llm_api.llm_api import LLMAPI
+
+
+def _fake_response(content: str) -> dict:
+    """Відповідь LLM з однією дією send_message."""
+
+    actions = {"actions": [{"type": "send_message", "content": content, "human_seconds": 0}]}
+    return {"choices": [{"message": {"role": "assistant", "content": json.dumps(actions)}}]}
+
+
+async def _run_dialog(
+    make_router, telegram, llm: LLMAPI, first_message_id: int, started: datetime
+) -> list:
+    """Два вхідні повідомлення з відповіддю на кожне; повертає надіслані тексти."""
+
+    router = make_router(telegram, llm, dialogs=f"dialogs_{first_message_id}")
+    for index, text in enumerate(("привіт", "як справи?"), start=1):
+        await router.handle_incoming_message(
+            user_id=7,
+            chat_id=7,
+            content=text,
+            msg_type="text",
+            media_meta=None,
+            message_time=started + timedelta(minutes=index),
+            message_id=first_message_id + index,
+        )
+        for _ in range(200):
+            if len(telegram.sent) == index:
+                break
+            await asyncio.sleep(0.01)
+    await router.actors.stop()
+    return telegram.sent
+
+
+def test_router_dialog_replays_with_other_ids_and_times(
+    tmp_path, monkeypatch, make_router, fake_telegram
+) -> None:
+    """Записаний прогін відтворюється, хоча message_id і час у повторі інші."""
+
+    path = str(tmp_path / "cassette.jsonl")
+
+    recorder = LLMAPI(cassette=LLMCassette(path, mode="record"))
+    replies = iter(["Привіт!", "Добре, а в тебе?"])
+    monkeypatch.setattr(
+        recorder, "_post", lambda payload, timeout: (_fake_response(next(replies)), 0.01)
+    )
+    started = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    recorded = asyncio.run(_run_dialog(make_router, fake_telegram(1_100), recorder, 1_000, started))
+
+    player = LLMAPI(cassette=LLMCassette(path, mode="replay", latency_scale=0))
+
+    def _no_network(payload, timeout):
+        raise AssertionError("replay не повинен ходити в мережу")
+
+    monkeypatch.setattr(player, "_post", _no_network)
+    started = datetime(2026, 3, 15, 12, 30, tzinfo=timezone.utc)
+    replayed = asyncio.run(_run_dialog(make_router, fake_telegram(5_100), player, 5_000, started))
+
+    assert recorded == ["Привіт!", "Добре, а в тебе?"]
+    assert replayed == recorded
@@ -0,0 +1,124 @@
+"""Тести вибору моделі роутером за бюджетом затримки."""
+
+import asyncio
+import math
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Додаємо шлях до кореня проєкту, щоб імпорт src працював під час тестів.
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src.llm_api.latency import LatencyTracker
+
+
+def ok_reply(messages) -> list:
+    return [{"type": "send_message", "content": "ок", "human_seconds": 0}]
+
+
+class TimedLLM:
+    """Основна і резервна моделі з заданою затримкою; заміри пише в LatencyTracker, як LLMAPI."""
+
+    model = "primary"
+    fallback_model = "fallback"
+    in_flight = 0
+
+    def __init__(self, scripted, delays: dict) -> None:
+        self.scripted = scripted
+        self.delays = delays
+        self.calls = []
+        # window=1: прогноз — останній замір, щоб одна проба одразу його оновлювала.
+        self.latency = LatencyTracker(window=1, min_samples=1, max_age_seconds=None)
+
+    def generate(self, messages, model=None, timeout=None, response_format=None):
+        model = model or self.model
+        self.calls.append(model)
+        time.sleep(self.delays[model])
+        self.latency.observe(model, 0, self.delays[model])
+        return self.scripted.generate(messages, model=model)
+
+
+def test_probe_lets_primary_recover_after_timeouts(
+    monkeypatch, router_module, make_router, fake_telegram, scripted_llm
+) -> None:
+    """Після таймаутів кожен N-й виклик пробує основну модель і повертає її, коли вона вкладається."""
+
+    monkeypatch.setattr(router_module, "LLM_LATENCY_BUDGET_SECONDS", 0.5)
+    monkeypatch.setattr(router_module, "LLM_FALLBACK_PROBE_EVERY", 3)
+    llm = TimedLLM(scripted_llm(ok_reply), {"primary": 0.0, "fallback": 0.0})
+    llm.latency.observe_timeout("primary", 0)
+    router = make_router(fake_telegram(), llm)
+
+    async def scenario() -> list:
+        choices = []
+        for _ in range(4):
+            _, choice = await router._generate_with_budget(chat_id=7, messages_for_llm=[])
+            choices.append(choice)
+        return choices
+
+    choices = asyncio.run(scenario())
+
+    assert [choice.reason for choice in choices] == [
+        "fallback_predicted",
+        "fallback_predicted",
+        "primary_probe",
+        "primary_within_budget",
+    ]
+    assert choices[0].expected_seconds == math.inf
+    assert llm.calls == ["fallback", "fallback", "primary", "primary"]
+
+
+def test_slow_primary_falls_back_on_timeout(
+    monkeypatch, router_module, make_router, fake_telegram, scripted_llm
+) -> None:
+    """Без прогнозу основна модель отримує бюджет як таймаут, далі — резервна."""
+
+    monkeypatch.setattr(router_module, "LLM_LATENCY_BUDGET_SECONDS", 0.1)
+    llm = TimedLLM(scripted_llm(ok_reply), {"primary": 0.3, "fallback": 0.0})
+    router = make_router(fake_telegram(), llm)
+
+    result, choice = asyncio.run(router._generate_with_budget(chat_id=7, messages_for_llm=[]))
+
+    assert choice.reason == "fallback_timeout"
+    assert choice.model == result.model == "fallback"
+
+
+def test_cycle_records_model_choice_in_state_and_usage(
+    monkeypatch, router_module, make_router, fake_telegram, scripted_llm
+) -> None:
+    """Цикл відповіді зберігає ModelChoice у стані й пише причину в журнал usage."""
+
+    monkeypatch.setattr(router_module, "LLM_LATENCY_BUDGET_SECONDS", 0.5)
+    llm = TimedLLM(scripted_llm(ok_reply), {"primary": 0.0, "fallback": 0.0})
+    llm.latency.observe("primary", 0, 5.0)
+    telegram = fake_telegram()
+    router = make_router(telegram, llm)
+
+    async def scenario() -> None:
+        await router.handle_incoming_message(
+            user_id=7,
+            chat_id=7,
+            content="привіт",
+            msg_type="text",
+            media_meta=None,
+            message_time=datetime.now(timezone.utc),
+            message_id=1,
+        )
+        for _ in range(200):
+            if telegram.sent:
+                break
+            await asyncio.sleep(0.01)
+        await router.actors.stop()
+
+    asyncio.run(scenario())
+
+    assert telegram.sent == ["ок"]
+    choice = router._get_state(7).last_model_choice
+    assert (choice.model, choice.reason) == ("fallback", "fallback_predicted")
+    records = list(router.usage_ledger.iter_records())
+    assert [(record["model"], record["reason"]) for record in records] == [
+        ("fallback", "fallback_predicted")
+    ]
@@ -0,0 +1,99 @@
+"""Тести для режиму шардів роутера (кільце хешування та канал між процесами)."""
+
+import asyncio
+import sys
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Додаємо шлях до кореня проєкту, щоб імпорт src працював під час тестів.
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src.sharding import HashRing, ShardedRouter
+from src.sharding.protocol import decode_frame, encode_frame
+
+
+class EchoRouter:
+    """Роутер для воркера: відповідає "<шард>:<текст>" через віддалений TelegramAPI."""
+
+    def __init__(self, telegram, shard_id: int) -> None:
+        self.telegram = telegram
+        self.shard_id = shard_id
+
+    async def start(self) -> None:
+        return None
+
+    async def handle_incoming_message(self, user_id, chat_id, content, msg_type, media_meta, message_time, message_id=None):
+        message = await self.telegram.send_message(chat_id, f"{self.shard_id}:{content}")
+        assert message.id == message_id
+
+    async def record_reaction(self, user_id, message_id, emoji, message_time_iso):
+        await self.telegram.send_message(user_id, f"{self.shard_id}:reaction:{emoji}")
+
+
+def build_echo_router(telegram, shard_id: int) -> EchoRouter:
+    return EchoRouter(telegram, shard_id)
+
+
+def test_hash_ring_is_stable_and_moves_few_users() -> None:
+    """Користувач завжди потрапляє в той самий шард, а новий шард забирає лише частину користувачів."""
+
+    ring = HashRing(range(4))
+    users = range(10_000)
+    assignment = [ring.shard_for(user) for user in users]
+    assert assignment == [ring.shard_for(user) for user in users]
+    assert min(Counter(assignment).values()) > 1_500
+
+    bigger = HashRing(range(5))
+    moved = sum(1 for user, shard in zip(users, assignment) if bigger.shard_for(user) != shard)
+    assert moved < 3_000
+
+
+def test_protocol_roundtrips_datetime_and_bytes() -> None:
+    """datetime і bytes переживають кодування кадру."""
+
+    moment = datetime(2024, 5, 1, 10, 0, tzinfo=timezone.utc)
+    frame = {"type": "result", "id": 1, "value": {"date": moment, "raw": b"\x00\xff"}}
+
+    assert decode_frame(encode_frame(frame)) == frame
+
+
+def _message_id_from_text(text: str):
+    """Id повідомлення — номер після "-" у тексті, щоб EchoRouter у воркері міг його звірити."""
+
+    return int(text.rsplit("-", 1)[-1]) if "-" in text else None
+
+
+def test_sharded_router_preserves_per_user_order(fake_telegram) -> None:
+    """Повідомлення йдуть у шард користувача і повертаються в початковому порядку."""
+
+    async def scenario():
+        telegram = fake_telegram(message_id=_message_id_from_text)
+        router = ShardedRouter(telegram_api=telegram, shards=2, router_factory=build_echo_router)
+        await router.start()
+        try:
+            now = datetime.now(timezone.utc)
+            for index in range(20):
+                for user_id in (101, 202, 303):
+                    await router.handle_incoming_message(
+                        user_id, user_id, f"{user_id}-{index}", "text", None, now, index
+                    )
+            await router.record_reaction(101, 5, "👍", now.isoformat())
+            for _ in range(200):
+                if len(telegram.sent_to) == 61:
+                    break
+                await asyncio.sleep(0.05)
+        finally:
+            await router.stop()
+        return router, telegram.sent_to
+
+    router, sent = asyncio.run(scenario())
+
+    assert len(sent) == 61
+    for user_id in (101, 202, 303):
+        shard = router.ring.shard_for(user_id)
+        texts = [text for chat_id, text in sent if chat_id == user_id and "reaction" not in text]
+        assert texts == [f"{shard}:{user_id}-{index}" for index in range(20)]
+    assert (101, f"{router.ring.shard_for(101)}:reaction:👍") in sent
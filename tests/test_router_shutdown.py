@@ -0,0 +1,73 @@
+"""Тест упорядкованої зупинки роутера: відкладені дії та inbox лишаються на диску."""
+
+import asyncio
+import json
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Додаємо шлях до кореня проєкту, щоб імпорт src працював під час тестів.
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src.router.utils.inbox_journal import InboxJournal
+from src.scheduler.action_scheduler import ActionScheduler
+
+
+def plan_reply(messages) -> list:
+    """Один меседж одразу і ще один — через хвилину."""
+
+    return [
+        {"type": "send_message", "content": "зараз", "human_seconds": 0},
+        {"type": "send_message", "content": "пізніше", "wait_seconds": 60, "human_seconds": 0},
+    ]
+
+
+def test_stop_persists_scheduled_actions_and_unprocessed_inbox(
+    tmp_path, capsys, monkeypatch, router_module, make_router, fake_telegram, scripted_llm
+) -> None:
+    """Після stop() відкладений меседж лежить у файлі планувальника, а нове повідомлення — у журналі."""
+
+    monkeypatch.setattr(router_module, "DEBOUNCE_SECONDS", 0.05)
+    scheduler_path = str(tmp_path / "pending.json")
+    journal_path = str(tmp_path / "inbox.jsonl")
+
+    async def scenario() -> list:
+        telegram = fake_telegram()
+        router = make_router(telegram, scripted_llm(plan_reply))
+        router.scheduler = ActionScheduler(executor=router._run_scheduled_action, path=scheduler_path)
+        await router.scheduler.start()
+        router.inbox_journal = InboxJournal(path=journal_path)
+
+        async def receive(text: str, message_id: int) -> None:
+            await router.handle_incoming_message(
+                user_id=7,
+                chat_id=7,
+                content=text,
+                msg_type="text",
+                media_meta=None,
+                message_time=datetime.now(timezone.utc),
+                message_id=message_id,
+            )
+
+        await receive("привіт", 1)
+        for _ in range(200):
+            if telegram.sent:
+                break
+            await asyncio.sleep(0.01)
+        # Друге повідомлення ще в debounce, коли процес зупиняється.
+        await receive("ти тут?", 2)
+        await router.stop(grace_seconds=1)
+        assert router.scheduler is None and router.inbox_journal is None
+        return telegram.sent
+
+    sent = asyncio.run(scenario())
+
+    assert sent == ["зараз"]
+    assert "Стани користувачів: живих 1" in capsys.readouterr().out
+    with open(scheduler_path, "r", encoding="utf-8") as file:
+        plans = json.load(file)["plans"]
+    assert [action["content"] for plan in plans for action in plan["actions"]] == ["пізніше"]
+    restored = InboxJournal(path=journal_path).replay()
+    assert [message["content"] for entry in restored for message in entry.messages] == ["ти тут?"]
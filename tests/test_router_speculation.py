@@ -0,0 +1,75 @@
+"""Тести спекулятивної генерації роутера: не більше одного запиту до LLM на користувача."""
+
+import asyncio
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Додаємо шлях до кореня проєкту, щоб імпорт src працював під час тестів.
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+
+class SlowReply:
+    """Відповідь LLM за 0.1 с, що рахує, скільки запитів виконується одночасно."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, messages) -> list:
+        with self._lock:
+            self.calls += 1
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.1)
+        with self._lock:
+            self.active -= 1
+        last = messages[-1]["content"].rsplit("message: ", 1)[-1]
+        return [{"type": "send_message", "content": f"re:{last}", "human_seconds": 0}]
+
+
+def test_burst_keeps_one_speculation_in_flight_and_answers_latest(
+    capsys, monkeypatch, router_module, make_router, fake_telegram, scripted_llm
+) -> None:
+    """Пачка з п'яти меседжів під час debounce — одночасно не більше одного запиту до LLM."""
+
+    monkeypatch.setattr(router_module, "DEBOUNCE_SECONDS", 0.4)
+    monkeypatch.setattr(router_module, "SPECULATIVE_GENERATION_ENABLED", True)
+
+    async def scenario() -> tuple:
+        llm = SlowReply()
+        telegram = fake_telegram()
+        router = make_router(telegram, scripted_llm(llm, wall_seconds=0.1))
+        for index in range(1, 6):
+            await router.handle_incoming_message(
+                user_id=7,
+                chat_id=7,
+                content=f"m{index}",
+                msg_type="text",
+                media_meta=None,
+                message_time=datetime.now(timezone.utc),
+                message_id=index,
+            )
+            await asyncio.sleep(0.02)
+        for _ in range(200):
+            if telegram.sent:
+                break
+            await asyncio.sleep(0.01)
+        await router.stop(grace_seconds=0)
+        return llm, telegram.sent, router.speculation_stats
+
+    llm, sent, stats = asyncio.run(scenario())
+    summary = capsys.readouterr().out
+    assert llm.peak == 1
+    assert llm.calls == 2
+    assert sent == ["re:m5"]
+    assert stats["deferred"] == 4
+    assert stats["hits"] == 1
+    # Підсумок при зупинці показує частку влучань від запусків.
+    assert f"{stats['hits']} влучань з {stats['started']} запусків" in summary
@@ -0,0 +1,43 @@
+"""Тести для бюджету змарнованих спекулятивних токенів."""
+
+import sys
+from pathlib import Path
+
+# Додаємо шлях до кореня проєкту, щоб імпорт src працював під час тестів.
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src.router.utils.speculation import SpeculationBudget
+
+
+def test_per_user_limit_blocks_only_that_user() -> None:
+    """Ліміт на користувача не заважає іншим користувачам."""
+
+    budget = SpeculationBudget(per_user_tokens=100, global_tokens=1_000)
+    budget.add_waste(1, 120)
+
+    assert budget.allows(1) is False
+    assert budget.allows(2) is True
+
+
+def test_global_limit_blocks_everyone() -> None:
+    """Глобальний ліміт вимикає спекуляцію для всіх."""
+
+    budget = SpeculationBudget(per_user_tokens=1_000, global_tokens=150)
+    budget.add_waste(1, 80)
+    budget.add_waste(2, 80)
+
+    assert budget.allows(3) is False
+    assert budget.wasted_today == 160
+
+
+def test_limits_reset_on_new_day() -> None:
+    """З новою добою лічильники обнуляються."""
+
+    budget = SpeculationBudget(per_user_tokens=100, global_tokens=100)
+    budget.add_waste(1, 500)
+    budget._day = "2000-01-01"
+
+    assert budget.allows(1) is True
+    assert budget.wasted_today == 0
@@ -0,0 +1,77 @@
+"""Тести для сесій статусу typing."""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# Додаємо шлях до кореня проєкту, щоб імпорт src працював під час тестів.
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src.telegram_api.typing_session import TypingSessions
+
+
+def _recording_sessions(calls, **kwargs) -> TypingSessions:
+    async def sender(chat_id, typing) -> None:
+        calls.append((chat_id, typing))
+
+    return TypingSessions(sender, **kwargs)
+
+
+def test_back_to_back_holds_share_one_status() -> None:
+    """Два покази поспіль не перезапускають typing, а після linger він скасовується."""
+
+    calls = []
+
+    async def scenario():
+        sessions = _recording_sessions(calls, refresh_seconds=10, linger_seconds=0.1)
+        async with sessions.hold(1):
+            await asyncio.sleep(0.01)
+        async with sessions.hold(1):
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.2)
+        return sessions.stats
+
+    stats = asyncio.run(scenario())
+
+    assert calls == [(1, True), (1, False)]
+    assert stats["started"] == 1
+
+
+def test_status_is_restored_after_send_while_held() -> None:
+    """Поки статус тримають, відправлене повідомлення не гасить typing надовго."""
+
+    calls = []
+
+    async def scenario():
+        sessions = _recording_sessions(calls, refresh_seconds=10, linger_seconds=10)
+        async with sessions.hold(1):
+            await asyncio.sleep(0.01)
+            sessions.message_sent(1)
+            await asyncio.sleep(0.01)
+
+    asyncio.run(scenario())
+
+    assert calls[:2] == [(1, True), (1, True)]
+
+
+def test_status_ends_with_last_message_without_cancel() -> None:
+    """Якщо утримання зняли перед останньою відправкою, cancel-RPC не потрібен."""
+
+    calls = []
+
+    async def scenario():
+        sessions = _recording_sessions(calls, refresh_seconds=10, linger_seconds=10)
+        async with sessions.hold(1) as typing:
+            await asyncio.sleep(0.01)
+            typing.release()
+            sessions.message_sent(1)
+        await asyncio.sleep(0.01)
+        return sessions
+
+    sessions = asyncio.run(scenario())
+
+    assert calls == [(1, True)]
+    assert not sessions.is_active(1)
+    assert sessions.stats["closed_by_send"] == 1
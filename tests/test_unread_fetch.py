@@ -0,0 +1,155 @@
+"""Тести для потокових вибірок повідомлень TelegramAPI (непрочитані, після message_id)."""
+
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# Додаємо шлях до кореня проєкту, щоб імпорт src працював під час тестів.
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from telethon import functions, types
+
+from src.telegram_api.entity_cache import EntityCache
+from src.telegram_api.telegram_api import TelegramAPI
+
+
+def _message(message_id: int, out: bool = False) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=message_id,
+        out=out,
+        message=f"m{message_id}",
+        date=None,
+        voice=None,
+        audio=None,
+        video_note=None,
+        video=None,
+        document=None,
+        photo=None,
+    )
+
+
+class FakeClient:
+    """Мінімальний клієнт: GetPeerDialogs і iter_messages з семантикою min_id/max_id/reverse."""
+
+    def __init__(self, history: list, read_inbox_max_id: int, unread_count: int) -> None:
+        self.history = history
+        self.dialog = SimpleNamespace(
+            read_inbox_max_id=read_inbox_max_id,
+            unread_count=unread_count,
+            top_message=max(message.id for message in history),
+        )
+        self.iter_calls = []
+        self.scanned = 0
+
+    async def get_input_entity(self, chat_id):
+        return types.InputPeerUser(user_id=chat_id, access_hash=1)
+
+    async def __call__(self, request):
+        assert isinstance(request, functions.messages.GetPeerDialogsRequest)
+        return SimpleNamespace(dialogs=[self.dialog])
+
+    async def iter_messages(self, chat_id, limit=None, min_id=0, max_id=0, reverse=False):
+        self.iter_calls.append({"min_id": min_id, "max_id": max_id, "reverse": reverse})
+        ordered = sorted(self.history, key=lambda message: message.id, reverse=not reverse)
+        yielded = 0
+        for message in ordered:
+            if message.id <= min_id or (max_id and message.id >= max_id):
+                continue
+            if limit is not None and yielded >= limit:
+                return
+            self.scanned += 1
+            yielded += 1
+            yield message
+
+
+def _api(client: FakeClient) -> TelegramAPI:
+    api = TelegramAPI.__new__(TelegramAPI)
+    api.client = client
+    api.entities = EntityCache(path=None)
+    return api
+
+
+def test_reads_exactly_the_unread_range_oldest_first() -> None:
+    """Довга історія, непрочитані перемежовані нашими відповідями — читається лише діапазон після read_inbox_max_id."""
+
+    history = [_message(message_id) for message_id in range(1, 1_001)]
+    for message in history[995:998]:
+        message.out = True  # наші відповіді між непрочитаними
+    client = FakeClient(history, read_inbox_max_id=990, unread_count=7)
+
+    async def scenario() -> list:
+        return await _api(client).fetch_unread_messages(42)
+
+    unread = asyncio.run(scenario())
+    assert [item["id"] for item in unread] == [991, 992, 993, 994, 995, 999, 1000]
+    assert unread[0]["text"] == "m991"
+    assert client.iter_calls == [{"min_id": 990, "max_id": 1_001, "reverse": True}]
+    assert client.scanned == 10
+
+
+def test_no_unread_means_no_history_requests() -> None:
+    """unread_count=0 — історію не читаємо взагалі."""
+
+    client = FakeClient([_message(1), _message(2)], read_inbox_max_id=2, unread_count=0)
+
+    async def scenario() -> list:
+        return [item async for item in _api(client).iter_unread_messages(42)]
+
+    assert asyncio.run(scenario()) == []
+    assert client.iter_calls == []
+
+
+def test_generator_stops_at_limit_and_unread_count() -> None:
+    """Генератор віддає повідомлення потоком і зупиняється на limit, не гортаючи далі."""
+
+    history = [_message(message_id) for message_id in range(1, 501)]
+    client = FakeClient(history, read_inbox_max_id=100, unread_count=400)
+
+    async def scenario() -> list:
+        return [item["id"] async for item in _api(client).iter_unread_messages(42, limit=3)]
+
+    assert asyncio.run(scenario()) == [101, 102, 103]
+    assert client.scanned == 3
+
+
+def test_dialog_messages_after_reads_only_the_newest_window() -> None:
+    """Якір далеко позаду: читаються лише 50 найновіших, а не тисячі від якоря."""
+
+    history = [_message(message_id, out=message_id % 2 == 0) for message_id in range(1, 5_001)]
+    client = FakeClient(history, read_inbox_max_id=0, unread_count=0)
+
+    async def scenario() -> list:
+        api = _api(client)
+        return [item async for item in api.iter_dialog_messages_after(42, last_message_id=10, limit=50)]
+
+    records = asyncio.run(scenario())
+    assert [item["id"] for item in records] == list(range(4_951, 5_001))
+    assert records[0]["out"] is False and records[1]["out"] is True
+    assert client.iter_calls == [{"min_id": 10, "max_id": 0, "reverse": False}]
+    assert client.scanned == 50
+
+
+def test_messages_after_without_limit_streams_forward_and_stops_early() -> None:
+    """Без limit вибірка йде reverse=True від якоря, лише вхідні, і зупиняється разом зі споживачем."""
+
+    history = [_message(message_id, out=message_id == 12) for message_id in range(1, 1_001)]
+    client = FakeClient(history, read_inbox_max_id=0, unread_count=0)
+
+    async def scenario() -> list:
+        collected = []
+        async for item in _api(client).iter_messages_after(42, last_message_id=10):
+            collected.append(item["id"])
+            if len(collected) == 3:
+                break
+        recent = await _api(client).fetch_recent_incoming_messages(42, limit=3)
+        return collected, [item["id"] for item in recent]
+
+    collected, recent = asyncio.run(scenario())
+    assert collected == [11, 13, 14]
+    assert "out" not in _api(client)._message_record(history[0])
+    assert client.iter_calls[0] == {"min_id": 10, "max_id": 0, "reverse": True}
+    assert client.scanned == 4 + 3
+    assert recent == [998, 999, 1_000]
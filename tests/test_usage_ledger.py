@@ -0,0 +1,70 @@
+"""Тести для журналу витрат LLM (UsageLedger)."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Додаємо шлях до кореня проєкту, щоб імпорт src працював під час тестів.
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src.usage.usage_ledger import UsageLedger
+
+
+@pytest.fixture()
+def ledger(tmp_path) -> UsageLedger:
+    """Створює журнал у тимчасовій директорії."""
+
+    return UsageLedger(path=str(tmp_path / "usage" / "ledger.jsonl"), enabled=True)
+
+
+def test_aggregate_groups_by_user_model_and_day(ledger: UsageLedger) -> None:
+    """Записи одного користувача й моделі за день складаються в один агрегат."""
+
+    ledger.record(user_id=1, model="big", prompt_tokens=100, completion_tokens=10, wall_seconds=1.0)
+    ledger.record(user_id=1, model="big", prompt_tokens=50, completion_tokens=5, wall_seconds=3.0)
+    ledger.record(user_id=1, model="small", prompt_tokens=10, completion_tokens=1, wall_seconds=0.2)
+
+    buckets = ledger.aggregate()
+    big = [bucket for (user, model, _), bucket in buckets.items() if user == 1 and model == "big"]
+
+    assert len(buckets) == 2
+    assert big[0].calls == 2
+    assert big[0].total_tokens == 165
+
+
+def test_top_users_sorted_by_tokens_with_percentiles(ledger: UsageLedger) -> None:
+    """top_users повертає найдорожчих користувачів першими та рахує перцентилі."""
+
+    for seconds in (1.0, 2.0, 3.0, 4.0):
+        ledger.record(user_id=7, model="m", prompt_tokens=10, completion_tokens=0, wall_seconds=seconds)
+    ledger.record(user_id=8, model="m", prompt_tokens=1000, completion_tokens=0, wall_seconds=9.0)
+
+    ranked = ledger.top_users(limit=5)
+
+    assert [user_id for user_id, _ in ranked] == [8, 7]
+    assert ranked[1][1].percentile(0.5) == 3.0
+    assert ranked[1][1].percentile(0.95) == 4.0
+
+
+def test_broken_lines_are_skipped(ledger: UsageLedger) -> None:
+    """Обірваний рядок у журналі не ламає читання решти записів."""
+
+    ledger.record(user_id=3, model="m", prompt_tokens=5, completion_tokens=5)
+    with open(ledger.path, "a", encoding="utf-8") as file:
+        file.write('{"user_id": 3, "model"')
+
+    assert ledger.top_users()[0][1].calls == 1
+
+
+def test_disabled_ledger_does_not_write(tmp_path) -> None:
+    """Вимкнений журнал не створює файл."""
+
+    path = tmp_path / "ledger.jsonl"
+    UsageLedger(path=str(path), enabled=False).record(
+        user_id=1, model="m", prompt_tokens=1, completion_tokens=1
+    )
+
+    assert not path.exists()
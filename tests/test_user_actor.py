@@ -0,0 +1,93 @@
+"""Тести для акторів користувачів зі спільним лімітом паралельності."""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# Додаємо шлях до кореня проєкту, щоб імпорт src працював під час тестів.
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src.router.utils.user_actor import ActorSystem
+
+
+def test_messages_of_one_user_are_processed_in_order() -> None:
+    """Повідомлення одного користувача не обганяють одне одного навіть з різною тривалістю."""
+
+    async def scenario():
+        processed = []
+
+        async def handler(user_id, message):
+            # Перше повідомлення "повільне" — друге все одно має йти після нього.
+            await asyncio.sleep(0.05 if message == 0 else 0)
+            processed.append((user_id, message))
+
+        actors = ActorSystem(handler, mailbox_size=10, max_concurrency=4, idle_seconds=1)
+        for message in range(3):
+            await actors.send(1, message)
+            await actors.send(2, message)
+        await asyncio.sleep(0.2)
+        await actors.stop()
+        return processed
+
+    processed = asyncio.run(scenario())
+
+    assert [message for user_id, message in processed if user_id == 1] == [0, 1, 2]
+    assert [message for user_id, message in processed if user_id == 2] == [0, 1, 2]
+
+
+def test_global_concurrency_is_bounded() -> None:
+    """Одночасно працює не більше акторів, ніж дозволяє спільний ліміт."""
+
+    async def scenario():
+        active = 0
+        peak = 0
+
+        async def handler(user_id, message):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.02)
+            active -= 1
+
+        actors = ActorSystem(handler, mailbox_size=10, max_concurrency=3, idle_seconds=1)
+        for user_id in range(10):
+            await actors.send(user_id, "ping")
+        await asyncio.sleep(0.2)
+        await actors.stop()
+        return peak, actors.stats["processed"]
+
+    peak, processed = asyncio.run(scenario())
+
+    assert peak == 3
+    assert processed == 10
+
+
+def test_full_mailbox_rejects_and_idle_actor_retires() -> None:
+    """try_send відмовляє при повній скриньці, а актор без роботи завершується."""
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def handler(user_id, message):
+            await release.wait()
+
+        actors = ActorSystem(handler, mailbox_size=1, max_concurrency=1, idle_seconds=0.05)
+        assert actors.try_send(1, "перше") is True
+        while not actors.is_working(1):
+            # Чекаємо, поки споживач забере перше повідомлення.
+            await asyncio.sleep(0.01)
+        assert actors.try_send(1, "друге") is True
+        assert actors.try_send(1, "третє") is False
+        assert actors.has_work(1) is True
+
+        release.set()
+        await asyncio.sleep(0.2)
+        return len(actors), actors.stats
+
+    live, stats = asyncio.run(scenario())
+
+    assert live == 0
+    assert stats["rejected"] == 1
+    assert stats["retired"] == 1
@@ -0,0 +1,69 @@
+"""Тести для сховища станів користувачів з вивантаженням."""
+
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List
+
+# Додаємо шлях до кореня проєкту, щоб імпорт src працював під час тестів.
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src.router.utils.user_state_store import UserStateStore
+
+
+@dataclass
+class FakeState:
+    inbox: List[str] = field(default_factory=list)
+
+
+def _can_evict(user_id: int, state: FakeState) -> bool:
+    return not state.inbox
+
+
+def test_get_returns_same_state_until_evicted() -> None:
+    """Повторний get() віддає той самий об'єкт стану."""
+
+    store = UserStateStore(FakeState, _can_evict, idle_ttl_seconds=None, max_states=None)
+    first = store.get(1)
+
+    assert store.get(1) is first
+    assert len(store) == 1
+    assert store.stats["created"] == 1
+
+
+def test_sweep_evicts_only_idle_states_without_work() -> None:
+    """Неактивний стан з непорожнім inbox не вивантажується."""
+
+    store = UserStateStore(FakeState, _can_evict, idle_ttl_seconds=10, max_states=None)
+    store.get(1)
+    store.get(2).inbox.append("ще не оброблено")
+    store.get(3)
+
+    # Робимо 1 і 2 "старими", а 3 лишається свіжим.
+    for user_id in (1, 2):
+        state, touched_at = store._items[user_id]
+        store._items[user_id] = (state, touched_at - 60)
+
+    evicted = store.sweep()
+
+    assert evicted == 1
+    assert 1 not in store
+    assert 2 in store and 3 in store
+    assert store.stats["evicted_idle"] == 1
+
+
+def test_max_states_evicts_least_recently_used() -> None:
+    """Понад ліміт вивантажуються найстаріші стани, які дозволено вивантажити."""
+
+    store = UserStateStore(FakeState, _can_evict, idle_ttl_seconds=None, max_states=2)
+    store.get(1).inbox.append("зайнятий")
+    store.get(2)
+    store.get(3)
+
+    assert 1 in store
+    assert 2 not in store
+    assert 3 in store
+    assert store.stats["evicted_lru"] == 1
+    assert store.approx_bytes() > 0